@@ -0,0 +1,29 @@
+"""Add composite index for literature list keyset pagination
+
+Revision ID: 28ad85c978cd
+Revises: 27ad85c978cd
+Create Date: 2026-10-16 00:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "28ad85c978cd"
+down_revision = "27ad85c978cd"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_literature_list_order",
+        "literature",
+        ["quality_score", "created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_literature_list_order", table_name="literature")
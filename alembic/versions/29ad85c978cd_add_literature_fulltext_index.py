@@ -0,0 +1,32 @@
+"""Add ngram FULLTEXT index on literature title and abstract
+
+Revision ID: 29ad85c978cd
+Revises: 28ad85c978cd
+Create Date: 2026-10-16 00:10:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "29ad85c978cd"
+down_revision = "28ad85c978cd"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # ngram 分词器支持中文；SQLite 轻量模式的 FTS5 表由 init_database 创建
+    if op.get_bind().dialect.name != "mysql":
+        return
+    op.execute(
+        "CREATE FULLTEXT INDEX ix_literature_fulltext ON literature (title, abstract) WITH PARSER ngram"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "mysql":
+        return
+    op.drop_index("ix_literature_fulltext", table_name="literature")
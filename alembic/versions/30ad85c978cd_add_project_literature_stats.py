@@ -0,0 +1,40 @@
+"""Add materialized project literature statistics table
+
+Revision ID: 30ad85c978cd
+Revises: 29ad85c978cd
+Create Date: 2026-10-16 00:20:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "30ad85c978cd"
+down_revision = "29ad85c978cd"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "project_literature_stats",
+        sa.Column("project_id", sa.Integer(), sa.ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("total_literature", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("processed_literature", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_segments", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("year_distribution", sa.JSON(), nullable=True),
+        sa.Column("top_journals", sa.JSON(), nullable=True),
+        sa.Column("is_stale", sa.Boolean(), nullable=False, server_default=sa.text("0")),
+        sa.Column("refreshed_at", sa.DateTime(timezone=True), nullable=True),
+        mysql_engine="InnoDB",
+        mysql_charset="utf8mb4",
+    )
+    op.create_index("ix_project_literature_stats_is_stale", "project_literature_stats", ["is_stale"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_project_literature_stats_is_stale", table_name="project_literature_stats")
+    op.drop_table("project_literature_stats")
@@ -0,0 +1,60 @@
+"""Add indexed normalized-title hash to literature for batch deduplication
+
+Revision ID: 31ad85c978cd
+Revises: 30ad85c978cd
+Create Date: 2026-10-16 00:30:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.literature_identity import title_hash
+
+
+# revision identifiers, used by Alembic.
+revision = "31ad85c978cd"
+down_revision = "30ad85c978cd"
+branch_labels = None
+depends_on = None
+
+_BACKFILL_BATCH = 1000
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("literature") as batch_op:
+        batch_op.add_column(sa.Column("title_hash", sa.String(length=40), nullable=True))
+        batch_op.create_index("ix_literature_title_hash", ["title_hash"])
+
+    # 按主键分批回填已有文献的标题哈希
+    connection = op.get_bind()
+    literature = sa.table(
+        "literature",
+        sa.column("id", sa.Integer),
+        sa.column("title", sa.Text),
+        sa.column("title_hash", sa.String),
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(literature.c.id, literature.c.title)
+            .where(literature.c.id > last_id)
+            .order_by(literature.c.id)
+            .limit(_BACKFILL_BATCH)
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            literature.update()
+            .where(literature.c.id == sa.bindparam("row_id"))
+            .values(title_hash=sa.bindparam("hash_value")),
+            [{"row_id": row.id, "hash_value": title_hash(row.title)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("literature") as batch_op:
+        batch_op.drop_index("ix_literature_title_hash")
+        batch_op.drop_column("title_hash")
@@ -5,10 +5,15 @@
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import text, and_, or_
+from sqlalchemy import text, and_, or_, select, func, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 from pydantic import BaseModel
 from enum import Enum
+from datetime import datetime
+from decimal import Decimal
 import asyncio
+import base64
 import tempfile
 import os
 import json
@@ -18,7 +23,7 @@ import hashlib
 import uuid
 from loguru import logger
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.core.security import get_current_active_user
 from app.core.exceptions import ErrorFactory, handle_exceptions, ErrorCode
 from app.models.user import User
@@ -33,7 +38,10 @@ from app.services.zotero_service import ThirdPartyIntegrationManager
 from app.services.research_rabbit_client import ResearchRabbitClient
 from app.services.shared_literature_service import SharedLiteratureService
 from app.services.task_service import TaskService
+from app.services.literature_fulltext import literature_fulltext_search
+from app.services.project_stats_service import get_project_stats
 from app.core.config import settings
+from app.core.cache import cache_manager, CacheLevel
 from app.schemas.literature_schemas import (
     LiteratureCreateRequest, LiteratureUpdateRequest, LiteratureResponse,
     LiteratureListResponse, LiteratureSearchRequest, LiteratureSearchResponse,
@@ -65,8 +73,11 @@ def _normalize_source_platform(raw: Optional[str]) -> str:
     return key or "semantic_scholar"
 
 
-def _build_literature_response(lit: Literature) -> LiteratureResponse:
-    """统一构造 LiteratureResponse，避免重复代码"""
+def _build_literature_response(lit: Literature, include_content: bool = True) -> LiteratureResponse:
+    """统一构造 LiteratureResponse，避免重复代码
+
+    include_content=False 时不访问 parsed_content，用于只加载了列表列的对象。
+    """
     normalized_source = _normalize_source_platform(getattr(lit, "source_platform", None))
     return LiteratureResponse(
         id=lit.id,
@@ -86,7 +97,7 @@ def _build_literature_response(lit: Literature) -> LiteratureResponse:
         pdf_path=lit.pdf_path,
         status=lit.status,
         parsing_status=lit.parsing_status if lit.parsing_status else "pending",
-        parsed_content=lit.parsed_content,
+        parsed_content=lit.parsed_content if include_content else None,
         citation_count=lit.citation_count or 0,
         impact_factor=float(lit.impact_factor) if lit.impact_factor is not None else None,
         quality_score=float(lit.quality_score) if lit.quality_score is not None else None,
@@ -107,6 +118,113 @@ def _build_literature_response(lit: Literature) -> LiteratureResponse:
     )
 
 
+# 列表视图实际渲染的列；parsed_content、raw_data 等大字段只在详情或 fields=full 时加载
+_LITERATURE_LIST_COLUMNS = (
+    Literature.id, Literature.title, Literature.authors, Literature.abstract, Literature.keywords,
+    Literature.journal, Literature.publication_year, Literature.volume, Literature.issue,
+    Literature.pages, Literature.doi, Literature.source_platform, Literature.source_url,
+    Literature.pdf_url, Literature.pdf_path, Literature.status, Literature.parsing_status,
+    Literature.citation_count, Literature.impact_factor, Literature.quality_score,
+    Literature.is_downloaded, Literature.is_parsed, Literature.is_starred, Literature.file_path,
+    Literature.file_size, Literature.file_hash, Literature.created_at, Literature.updated_at,
+    Literature.tags, Literature.category,
+)
+
+# SQLite 以文本保存时间：ORM 写入 'YYYY-MM-DD HH:MM:SS.ffffff'，CURRENT_TIMESTAMP 默认值为
+# 'YYYY-MM-DD HH:MM:SS'，两种格式按字符串比较时顺序错误，排序和游标比较前统一格式
+_SQLITE_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%f"
+
+
+def _sortable_timestamp(dialect: Optional[str], value):
+    if dialect == "sqlite":
+        return func.strftime(_SQLITE_TIMESTAMP_FORMAT, value)
+    return value
+
+
+def _literature_list_order(dialect: Optional[str]):
+    """文献列表排序，与 ix_literature_list_order 索引对应"""
+    return (
+        Literature.quality_score.desc(),
+        _sortable_timestamp(dialect, Literature.created_at).desc(),
+        Literature.id.desc(),
+    )
+
+
+def _query_param(value):
+    """直接调用端点函数时未传的参数是 Query(...) 对象，取其默认值"""
+    return value.default if hasattr(value, "default") else value
+
+
+def _encode_literature_cursor(lit: Literature) -> str:
+    payload = [
+        str(lit.quality_score) if lit.quality_score is not None else None,
+        lit.created_at.isoformat() if lit.created_at is not None else None,
+        lit.id,
+    ]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def _encode_relevance_cursor(offset: int) -> str:
+    """按相关度排序的结果没有稳定的键集，游标记录已返回的条数"""
+    payload = {"offset": offset}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def _decode_literature_cursor(cursor: str):
+    """解析游标；相关度游标返回 int 偏移量，默认排序游标返回键集三元组"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        if isinstance(payload, dict):
+            offset = int(payload["offset"])
+            if offset < 0:
+                raise ValueError(offset)
+            return offset
+        quality, created_at, literature_id = payload
+        return (
+            Decimal(quality) if quality is not None else None,
+            datetime.fromisoformat(created_at) if created_at is not None else None,
+            int(literature_id),
+        )
+    except (ValueError, TypeError, KeyError, ArithmeticError):
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+
+
+def _after_literature_cursor(dialect: Optional[str], quality, created_at, literature_id: int):
+    """按 _literature_list_order 排序时位于游标行之后的条件
+
+    MySQL 与 SQLite 降序排列时 NULL 都在最后，因此 NULL 值需要单独展开。
+    """
+    condition = Literature.id < literature_id
+    created_at_key = (
+        _sortable_timestamp(dialect, Literature.created_at),
+        _sortable_timestamp(dialect, literal(created_at, Literature.created_at.type)) if created_at is not None else None,
+    )
+    for column, value in (created_at_key, (Literature.quality_score, quality)):
+        if value is None:
+            condition = and_(column.is_(None), condition)
+        else:
+            condition = or_(column < value, column.is_(None), and_(column == value, condition))
+    return condition
+
+
+async def _count_literature(db: AsyncSession, conditions, total_mode: str, cache_key: str) -> Optional[int]:
+    """按 total_mode 统计文献总数：exact 实时计数，cached 复用短期缓存，none 跳过"""
+    if total_mode == "none":
+        return None
+    if total_mode == "cached":
+        cached = await cache_manager.get(cache_key, level=CacheLevel.LOCAL)
+        if cached is not None:
+            return cached
+
+    total = await db.scalar(select(func.count(Literature.id)).where(*conditions)) or 0
+    if total_mode == "cached":
+        await cache_manager.set(
+            cache_key, total, ttl=settings.literature_count_cache_ttl, level=CacheLevel.LOCAL
+        )
+    return total
+
+
 def _user_accessible_literature_query(
     db: Session,
     user_id: int,
@@ -151,6 +269,30 @@ def _user_accessible_literature_query(
         return query.distinct(Literature.id)
     return query
 
+def _accessible_literature_condition(user_id: int):
+    """当前用户可访问文献的过滤条件：直接归属或通过关联表归属于用户的项目"""
+    owned_project_ids = select(Project.id).where(Project.owner_id == user_id)
+    return or_(
+        Literature.project_id.in_(owned_project_ids),
+        Literature.projects.any(Project.owner_id == user_id),
+    )
+
+
+def _project_literature_condition(project_id: int):
+    return or_(
+        Literature.project_id == project_id,
+        Literature.projects.any(Project.id == project_id),
+    )
+
+
+async def _require_owned_project(db: AsyncSession, project_id: int, user_id: int) -> Project:
+    project = await db.scalar(
+        select(Project).where(Project.id == project_id, Project.owner_id == user_id)
+    )
+    if not project:
+        raise HTTPException(status_code=404, detail="项目不存在")
+    return project
+
 # 处理方式枚举和请求模型
 
 class ProcessingMethodEnum(str, Enum):
@@ -495,74 +637,15 @@ async def get_literature_segments(
 async def get_project_literature_statistics(
     project_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取项目文献统计信息"""
     
     # 验证项目所有权
-    project = db.query(Project).filter(
-        Project.id == project_id,
-        Project.owner_id == current_user.id
-    ).first()
+    await _require_owned_project(db, project_id, current_user.id)
     
-    if not project:
-        raise HTTPException(status_code=404, detail="项目不存在")
-    
-    # 统计文献信息
-    total_literature = db.query(Literature).filter(
-        or_(
-            Literature.project_id == project_id,
-            Literature.projects.any(id=project_id)
-        )
-    ).count()
-
-    processed_literature = db.query(Literature).filter(
-        or_(
-            Literature.project_id == project_id,
-            Literature.projects.any(id=project_id)
-        ),
-        Literature.is_parsed == True
-    ).count()
-
-    total_segments = db.query(LiteratureSegment).join(Literature).filter(
-        or_(
-            Literature.project_id == project_id,
-            Literature.projects.any(id=project_id)
-        )
-    ).count()
-    
-    # 按年份统计
-    year_stats = db.execute(text("""
-        SELECT publication_year, COUNT(*) as count
-        FROM literature l
-        JOIN project_literature_associations pla ON l.id = pla.literature_id
-        WHERE pla.project_id = :project_id AND l.publication_year IS NOT NULL
-        GROUP BY publication_year
-        ORDER BY publication_year DESC
-    """), {"project_id": project_id}).fetchall()
-    
-    # 按期刊统计
-    journal_stats = db.execute(text("""
-        SELECT journal, COUNT(*) as count
-        FROM literature l
-        JOIN project_literature_associations pla ON l.id = pla.literature_id
-        WHERE pla.project_id = :project_id AND l.journal IS NOT NULL
-        GROUP BY journal
-        ORDER BY count DESC
-        LIMIT 10
-    """), {"project_id": project_id}).fetchall()
-    
-    return {
-        "total_literature": total_literature,
-        "processed_literature": processed_literature,
-        "processing_rate": (processed_literature / total_literature * 100) if total_literature > 0 else 0,
-        "total_segments": total_segments,
-        "unprocessed_literature": total_literature - processed_literature,
-        "storage_saved": {
-            "year_distribution": [{"year": row[0], "count": row[1]} for row in year_stats],
-            "top_journals": [{"journal": row[0], "count": row[1]} for row in journal_stats]
-        }
-    }
+    # 读取物化的统计行，文献变更后按需刷新
+    return await get_project_stats(db, project_id)
 
 
 # 新增的可靠性相关Schema
@@ -1668,13 +1751,21 @@ async def list_literature(
     size: Optional[int] = Query(None, alias="size"),
     query: Optional[str] = Query(None, alias="query"),
     project_id: Optional[int] = None,
+    cursor: Optional[str] = Query(None, description="游标分页：传入上一页返回的 next_cursor，提供时忽略 page"),
+    fields: str = Query("summary", pattern="^(summary|full)$", description="summary 只加载列表渲染的列；full 额外返回 parsed_content"),
+    total_mode: str = Query("exact", pattern="^(exact|cached|none)$", description="exact 实时计数；cached 使用短期缓存的计数；none 不计数"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """获取文献列表 - 基础端点"""
+    """获取文献列表 - 基础端点
+
+    支持两种分页：page/page_size 偏移分页，以及基于 (quality_score, created_at, id) 的游标分页。
+    深翻页应使用游标分页，并可通过 total_mode 避免每页都执行 COUNT。
+    关键词过滤优先走全文索引并按相关度排序，此时 next_cursor 记录相关度顺序中的偏移量。
+    """
 
     try:
-        requested_size = size.default if hasattr(size, "default") else size
+        requested_size = _query_param(size)
         normalized_size: Optional[int] = None
         if requested_size is not None:
             try:
@@ -1684,41 +1775,73 @@ async def list_literature(
 
         actual_page_size = max(1, normalized_size) if normalized_size and normalized_size > 0 else max(1, page_size)
         page = max(page, 1)
-        offset = (page - 1) * actual_page_size
-
-        query_builder = _user_accessible_literature_query(db, current_user.id, project_id)
-
-        required_methods = ("order_by", "count", "offset", "limit", "all")
-        if not all(hasattr(query_builder, attr) for attr in required_methods):
-            return []
-
-        raw_query = query.default if hasattr(query, "default") else query
-        if raw_query:
-            filter_keyword = raw_query.strip()
-            if filter_keyword:
+        cursor = _query_param(cursor)
+        include_content = _query_param(fields) == "full"
+        total_mode = _query_param(total_mode)
+
+        conditions = [_accessible_literature_condition(current_user.id)]
+        if project_id is not None:
+            await _require_owned_project(db, project_id, current_user.id)
+            conditions.append(_project_literature_condition(project_id))
+
+        raw_query = _query_param(query)
+        filter_keyword = raw_query.strip() if raw_query else ""
+        fulltext = None
+        if filter_keyword:
+            fulltext = await literature_fulltext_search.build(db, filter_keyword)
+            if fulltext is not None:
+                conditions.append(fulltext.condition)
+            else:
                 sanitized = f"%{filter_keyword}%"
-                query_builder = query_builder.filter(
+                conditions.append(
                     or_(
                         Literature.title.ilike(sanitized),
                         Literature.abstract.ilike(sanitized),
                     )
                 )
 
-        total = query_builder.order_by(None).count()
-        literature_items = (
-            query_builder
-            .order_by(
-                Literature.quality_score.desc(),
-                Literature.created_at.desc(),
-                Literature.id.desc(),
-            )
-            .offset(offset)
-            .limit(actual_page_size)
-            .all()
+        count_key = "literature_count:{}:{}:{}".format(
+            current_user.id, project_id, hashlib.md5(filter_keyword.encode("utf-8")).hexdigest()
         )
+        total = await _count_literature(db, conditions, total_mode, count_key)
+
+        dialect = getattr(getattr(getattr(db, "bind", None), "dialect", None), "name", None)
+        statement = select(Literature).where(*conditions)
+        position = _decode_literature_cursor(cursor) if cursor else None
+        relevance_ordered = False
+        offset = 0
+        if isinstance(position, tuple):
+            statement = statement.where(
+                _after_literature_cursor(dialect, *position)
+            ).order_by(*_literature_list_order(dialect))
+        else:
+            offset = position if position is not None else (page - 1) * actual_page_size
+            if fulltext is not None:
+                # 关键词命中全文索引时按相关度排序
+                relevance_ordered = True
+                statement, score = fulltext.rank(statement)
+                statement = statement.order_by(score.desc(), Literature.id.desc())
+            else:
+                statement = statement.order_by(*_literature_list_order(dialect))
+            statement = statement.offset(offset)
+        if not include_content:
+            statement = statement.options(load_only(*_LITERATURE_LIST_COLUMNS))
+
+        # 多取一条用于判断是否还有下一页
+        literature_items = (await db.scalars(statement.limit(actual_page_size + 1))).all()
+        has_more = len(literature_items) > actual_page_size
+        literature_items = literature_items[:actual_page_size]
+
+        next_cursor = None
+        if has_more:
+            # 游标必须与本页的排序方式一致，否则下一页会重复或遗漏
+            next_cursor = (
+                _encode_relevance_cursor(offset + actual_page_size)
+                if relevance_ordered
+                else _encode_literature_cursor(literature_items[-1])
+            )
 
-        items = [_build_literature_response(lit) for lit in literature_items]
-        has_more = (page * actual_page_size) < total
+        items = [_build_literature_response(lit, include_content) for lit in literature_items]
 
         return LiteraturePageResponse(
             items=items,
@@ -1726,6 +1849,7 @@ async def list_literature(
             page=page,
             page_size=actual_page_size,
             has_more=has_more,
+            next_cursor=next_cursor,
         )
     except HTTPException:
         raise
@@ -1738,25 +1862,21 @@ async def list_literature(
 async def get_literature(
     literature_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取单个文献详情"""
     try:
-        literature = db.query(Literature).filter(Literature.id == literature_id).first()
+        literature = await db.scalar(select(Literature).where(Literature.id == literature_id))
 
         if not literature:
             raise HTTPException(status_code=404, detail="文献不存在")
 
-        project_ids = [pid for (pid,) in db.query(Project.id).filter(Project.owner_id == current_user.id).all()]
-
-        has_access = False
-        if literature.project_id and literature.project_id in project_ids:
-            has_access = True
-        else:
-            associated_ids = {proj.id for proj in literature.projects}
-            if associated_ids.intersection(project_ids):
-                has_access = True
-
+        has_access = await db.scalar(
+            select(Literature.id).where(
+                Literature.id == literature_id,
+                _accessible_literature_condition(current_user.id),
+            )
+        )
         if not has_access:
             raise HTTPException(status_code=403, detail="无权访问该文献")
 
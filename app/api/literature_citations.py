@@ -5,13 +5,14 @@
 from typing import Dict, List, Optional
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
 from pydantic import BaseModel
 
 from app.core.database import get_db
 from app.core.security import get_current_active_user
 from app.models.user import User
-from app.models.literature import Literature
+from app.models.literature import Literature, LiteratureSegment
 from app.services.research_rabbit_client import ResearchRabbitClient
 from app.services.stream_progress_service import stream_progress_service
 from loguru import logger
@@ -192,7 +193,7 @@ async def get_literature_quick_stats(
         "title": literature.title,
         "authors": literature.authors,
         "journal": literature.journal,
-        "year": literature.publication_date.year if literature.publication_date else None,
+        "year": literature.publication_year,
         "doi": literature.doi,
         "abstract": literature.abstract[:500] + "..." if len(literature.abstract or "") > 500 else literature.abstract,
         "keywords": literature.keywords,
@@ -200,7 +201,10 @@ async def get_literature_quick_stats(
         "pdf_available": bool(literature.pdf_path),
         "citation_count": literature.citation_count,  # 来自数据库的缓存值
         "has_detailed_citations": False,  # 表示需要懒加载
-        "segments_count": len(literature.segments) if literature.segments else 0
+        # 只计数，不加载全部段落
+        "segments_count": db.query(func.count(LiteratureSegment.id)).filter(
+            LiteratureSegment.literature_id == literature_id
+        ).scalar() or 0
     }
 
 @router.post("/task/{task_id}/literature-batch-stats")
@@ -212,7 +216,8 @@ async def get_literature_batch_stats(
 ):
     """批量获取文献统计信息"""
     
-    literature_list = db.query(Literature).filter(
+    # 一次性预加载段落，避免逐篇懒加载
+    literature_list = db.query(Literature).options(selectinload(Literature.segments)).filter(
         Literature.id.in_(literature_ids)
     ).all()
     
@@ -223,7 +228,7 @@ async def get_literature_batch_stats(
             "title": lit.title,
             "authors": lit.authors[:3] if lit.authors else [],  # 只显示前3个作者
             "journal": lit.journal,
-            "year": lit.publication_date.year if lit.publication_date else None,
+            "year": lit.publication_year,
             "quality_score": lit.quality_score,
             "citation_count": lit.citation_count,
             "has_pdf": bool(lit.pdf_path),
@@ -15,6 +15,9 @@ from app.middleware.performance_monitor import (
     performance_analyzer,
     PerformanceAnalyzer
 )
+from app.services.embedding_cache import embedding_cache
+from app.services.llm_cache import llm_cache
+from app.services.llm_concurrency import get_llm_concurrency_stats
 
 router = APIRouter()
 
@@ -52,6 +55,31 @@ async def get_performance_report(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"生成报告失败: {str(e)}")
 
+@router.get("/metrics/cache-stats")
+async def get_cache_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    """获取AI相关缓存的命中统计"""
+    return {
+        "status": "success",
+        "data": {
+            "embedding": embedding_cache.get_stats(),
+            "llm_completion": llm_cache.get_stats(),
+        },
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@router.get("/metrics/llm-concurrency")
+async def get_llm_concurrency(
+    current_user: User = Depends(get_current_active_user)
+):
+    """获取大模型调用并发控制器状态（并发上限、排队、预算与限流统计）"""
+    return {
+        "status": "success",
+        "data": get_llm_concurrency_stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
 @router.get("/metrics/endpoint-stats")
 async def get_endpoint_stats(
     endpoint: Optional[str] = None,
@@ -19,6 +19,7 @@ from app.models.project import Project
 from app.models.task import Task, TaskProgress
 from app.models.experience import ExperienceBook
 from app.services.ai_service import AIService
+from app.services.llm_cache import is_json_content, llm_cache
 from app.utils.file_handler import FileHandler
 from loguru import logger
 from app.schemas.response_schemas import StandardResponse
@@ -344,11 +345,13 @@ async def determine_research_direction(
 }}
 """
         
-        response = await ai_service.client.chat.completions.create(
+        response = await llm_cache.create(
+            ai_service.client,
             model=settings.openai_model,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.3,
-            max_tokens=1000
+            max_tokens=1000,
+            validate=is_json_content
         )
         
         result = json.loads(response.choices[0].message.content)
@@ -424,11 +427,13 @@ async def upload_project_files(
 """
                 
                 try:
-                    analysis_response = await ai_service.client.chat.completions.create(
+                    analysis_response = await llm_cache.create(
+                        ai_service.client,
                         model=settings.openai_model,
                         messages=[{"role": "user", "content": analysis_prompt}],
                         temperature=0.2,
-                        max_tokens=1000
+                        max_tokens=1000,
+                        validate=is_json_content
                     )
                     
                     analysis_result = json.loads(analysis_response.choices[0].message.content)
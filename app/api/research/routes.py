@@ -1,9 +1,10 @@
 """Research mode API endpoints."""
 
+import asyncio
 import json
 from datetime import datetime
 from io import BytesIO
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
 from uuid import uuid4
 
 from fastapi import APIRouter, Depends, HTTPException, Response
@@ -34,6 +35,8 @@ from app.services.research_share_store import share_store
 
 router = APIRouter()
 
+_SSE_KEEPALIVE_SECONDS = 15.0
+
 
 _MODE_BY_TASK_TYPE = {
     TaskType.LITERATURE_COLLECTION.value: "auto",
@@ -289,6 +292,73 @@ async def research_query(
     raise HTTPException(status_code=400, detail="Unsupported mode")
 
 
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def _sse_stream(events: AsyncIterator[Tuple[str, Dict[str, Any]]]) -> AsyncIterator[str]:
+    """
+    把 (事件名, 数据) 转为 SSE 文本
+
+    事件生成器在单独的任务中完整运行（保持同一个上下文，llm_priority 等上下文变量有效），
+    长时间没有事件（如证据提取阶段）时发送注释行保活；客户端断开时取消生成任务。
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
+
+    async def produce() -> None:
+        try:
+            async for item in events:
+                queue.put_nowait(item)
+        finally:
+            queue.put_nowait(finished)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=_SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if item is finished:
+                break
+            event, data = item
+            yield _sse_event(event, data)
+        await producer
+    finally:
+        producer.cancel()
+
+
+@router.post("/query/stream")
+async def research_query_stream(
+    request: ResearchQueryRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    RAG 模式的流式问答（Server-Sent Events）
+
+    事件依次为 sources（检索到的来源）、若干 token（答案片段）与 done（完整结果及 token 用量），
+    出错时发送 error。
+    """
+    if request.mode != "rag":
+        raise HTTPException(status_code=400, detail="仅 RAG 模式支持流式回答")
+
+    orchestrator = ResearchOrchestrator(db, current_user)
+    events = orchestrator.stream_rag(
+        project_id=request.project_id,
+        query=request.query,
+        max_literature_count=request.max_literature_count,
+        context_literature_ids=request.context_literature_ids,
+    )
+    return StreamingResponse(
+        _sse_stream(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/analysis", response_model=ResearchAnalysisResponse)
 async def research_analysis(
     request: ResearchAnalysisRequest,
@@ -4,10 +4,12 @@ from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from pydantic import BaseModel
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.core.security import get_current_user
 from app.models.project import Project
 from app.models.task import Task, TaskStatus, TaskType
@@ -246,6 +248,7 @@ async def get_task_statistics(
         total_token_usage=stats["cost_summary"]["total_token_usage"],
         total_cost_estimate=stats["cost_summary"]["total_cost_estimate"],
         models=stats["cost_summary"]["models"],
+        cache=stats["cost_summary"].get("cache", {}),
     )
 
     breakdown = [
@@ -267,12 +270,17 @@ async def get_task_statistics(
 @router.get("/{task_id}", response_model=TaskDetailResponse)
 async def get_task_detail(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    service = TaskService(db)
-    task = _require_task(service.get_task(task_id, current_user.id))
-    return TaskDetailResponse.from_orm(task)
+    # 任务状态轮询频率高，走异步会话避免阻塞事件循环
+    task = await db.scalar(
+        select(Task)
+        .join(Project)
+        .where(Task.id == task_id, Project.owner_id == current_user.id)
+        .options(selectinload(Task.progress_logs))
+    )
+    return TaskDetailResponse.from_orm(_require_task(task))
 
 
 @router.post("/{task_id}/retry", response_model=TaskDetailResponse)
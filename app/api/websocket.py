@@ -5,11 +5,13 @@ WebSocket API for real-time progress streaming
 
 import asyncio
 import json
-from typing import Dict, List
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 from fastapi.websockets import WebSocketState
 from loguru import logger
 
+from app.core.config import settings
 from app.services.stream_progress_service import (
     stream_progress_service, 
     ws_progress_manager,
@@ -18,16 +20,145 @@ from app.services.stream_progress_service import (
 
 router = APIRouter()
 
+TERMINAL_EVENT_STATUSES = {"completed", "failed", "stage_completed"}
+
+
+class ConnectionSender:
+    """单个WebSocket连接的有界发送队列
+
+    生产者只做入队（不等待网络），由独立的写协程按顺序发送，慢客户端只会拖慢自己。
+    队列满时优先丢弃最旧的可合并消息（进度类）；同一 coalesce_key 的待发送消息只保留最新一条。
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_queue_size: int,
+        send_timeout: float,
+        on_dead: Callable[[WebSocket], Awaitable[None]],
+        task_id: Optional[str] = None
+    ):
+        self.websocket = websocket
+        self.task_id = task_id
+        self.max_queue_size = max_queue_size
+        self.send_timeout = send_timeout
+        self._on_dead = on_dead
+        # [coalesce_key, message]；被合并或丢弃的条目原地置空，发送时跳过
+        self._queue: Deque[List[Optional[str]]] = deque()
+        self._pending_by_key: Dict[str, List[Optional[str]]] = {}
+        self._depth = 0
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self.closed = False
+        self.stats = {"sent": 0, "dropped": 0, "coalesced": 0, "max_depth": 0}
+
+    def start(self):
+        self._writer = asyncio.create_task(self._drain())
+
+    @property
+    def depth(self) -> int:
+        return self._depth
+
+    def enqueue(self, message: str, coalesce_key: Optional[str] = None) -> bool:
+        """非阻塞入队，返回消息是否被接收"""
+        if self.closed:
+            return False
+
+        if coalesce_key is not None:
+            pending = self._pending_by_key.get(coalesce_key)
+            if pending is not None:
+                pending[1] = message
+                self.stats["coalesced"] += 1
+                return True
+
+        if self._depth >= self.max_queue_size:
+            self._drop_oldest()
+
+        entry = [coalesce_key, message]
+        self._queue.append(entry)
+        self._depth += 1
+        if coalesce_key is not None:
+            self._pending_by_key[coalesce_key] = entry
+        self.stats["max_depth"] = max(self.stats["max_depth"], self._depth)
+        self._wakeup.set()
+        return True
+
+    def _drop_oldest(self):
+        victim = next((entry for entry in self._queue if entry[0] is not None and entry[1] is not None), None)
+        if victim is None:
+            victim = next(entry for entry in self._queue if entry[1] is not None)
+        self._discard(victim)
+        self.stats["dropped"] += 1
+
+    def _discard(self, entry: List[Optional[str]]):
+        if entry[0] is not None and self._pending_by_key.get(entry[0]) is entry:
+            del self._pending_by_key[entry[0]]
+        entry[1] = None
+        self._depth -= 1
+
+    def _pop(self) -> Optional[str]:
+        while self._queue:
+            entry = self._queue.popleft()
+            if entry[1] is None:
+                continue
+            message = entry[1]
+            self._discard(entry)
+            return message
+        return None
+
+    async def _drain(self):
+        try:
+            while not self.closed:
+                message = self._pop()
+                if message is None:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                if self.websocket.client_state != WebSocketState.CONNECTED:
+                    break
+                await asyncio.wait_for(self.websocket.send_text(message), timeout=self.send_timeout)
+                self.stats["sent"] += 1
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            logger.warning(f"WebSocket发送失败，关闭连接: {e}")
+
+        if not self.closed:
+            await self._on_dead(self.websocket)
+
+    async def close(self):
+        self.closed = True
+        self._wakeup.set()
+        if self._writer and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+
+
 class ConnectionManager:
     """WebSocket连接管理器"""
     
     def __init__(self):
         self.active_connections: Dict[str, List[WebSocket]] = {}
         self.task_connections: Dict[str, List[WebSocket]] = {}
+        self.senders: Dict[WebSocket, ConnectionSender] = {}
+        self.stats = {"sent": 0, "dropped": 0, "coalesced": 0}
         
     async def connect(self, websocket: WebSocket, task_id: str = None):
         """建立WebSocket连接"""
         await websocket.accept()
+
+        sender = ConnectionSender(
+            websocket,
+            max_queue_size=settings.websocket_send_queue_size,
+            send_timeout=settings.websocket_send_timeout,
+            on_dead=self._handle_dead_connection,
+            task_id=task_id
+        )
+        self.senders[websocket] = sender
+        sender.start()
         
         # 全局连接池
         if "global" not in self.active_connections:
@@ -41,12 +172,18 @@ class ConnectionManager:
             self.task_connections[task_id].append(websocket)
             
             # 订阅任务进度更新
-            await ws_progress_manager.add_websocket_subscriber(task_id, websocket)
+            await ws_progress_manager.add_websocket_subscriber(task_id, websocket, sender=sender.enqueue)
             
         logger.info(f"WebSocket连接建立: task_id={task_id}, 总连接数={len(self.active_connections.get('global', []))}")
         
     async def disconnect(self, websocket: WebSocket, task_id: str = None):
         """断开WebSocket连接"""
+        sender = self.senders.pop(websocket, None)
+        if sender is not None:
+            for key in self.stats:
+                self.stats[key] += sender.stats[key]
+            await sender.close()
+
         # 从全局连接池移除
         if "global" in self.active_connections:
             try:
@@ -67,54 +204,52 @@ class ConnectionManager:
             await ws_progress_manager.remove_websocket_subscriber(task_id, websocket)
             
         logger.info(f"WebSocket连接断开: task_id={task_id}")
+
+    async def _handle_dead_connection(self, websocket: WebSocket):
+        sender = self.senders.get(websocket)
+        await self.disconnect(websocket, sender.task_id if sender else None)
         
     async def send_personal_message(self, message: str, websocket: WebSocket):
-        """发送个人消息"""
+        """发送个人消息（经由该连接的发送队列，保证与广播消息的顺序）"""
+        sender = self.senders.get(websocket)
+        if sender is not None:
+            sender.enqueue(message)
+            return
         try:
             if websocket.client_state == WebSocketState.CONNECTED:
                 await websocket.send_text(message)
         except Exception as e:
             logger.error(f"发送个人消息失败: {e}")
             
-    async def send_to_task(self, task_id: str, message: str):
-        """向特定任务的所有连接发送消息"""
-        if task_id not in self.task_connections:
-            return
-            
-        dead_connections = []
-        for websocket in self.task_connections[task_id]:
-            try:
-                if websocket.client_state == WebSocketState.CONNECTED:
-                    await websocket.send_text(message)
-                else:
-                    dead_connections.append(websocket)
-            except Exception as e:
-                logger.error(f"发送任务消息失败: {e}")
-                dead_connections.append(websocket)
-        
-        # 清理死连接
-        for dead_ws in dead_connections:
-            await self.disconnect(dead_ws, task_id)
+    async def send_to_task(self, task_id: str, message: str, coalesce_key: Optional[str] = None):
+        """向特定任务的所有连接发送消息
+
+        message 只序列化一次，由所有接收者的队列共享；入队不等待网络发送。
+        """
+        for websocket in self.task_connections.get(task_id, ()):
+            sender = self.senders.get(websocket)
+            if sender is not None:
+                sender.enqueue(message, coalesce_key)
             
-    async def broadcast(self, message: str):
+    async def broadcast(self, message: str, coalesce_key: Optional[str] = None):
         """广播消息给所有连接"""
-        if "global" not in self.active_connections:
-            return
-            
-        dead_connections = []
-        for websocket in self.active_connections["global"]:
-            try:
-                if websocket.client_state == WebSocketState.CONNECTED:
-                    await websocket.send_text(message)
-                else:
-                    dead_connections.append(websocket)
-            except Exception as e:
-                logger.error(f"广播消息失败: {e}")
-                dead_connections.append(websocket)
-        
-        # 清理死连接
-        for dead_ws in dead_connections:
-            await self.disconnect(dead_ws)
+        for websocket in self.active_connections.get("global", ()):
+            sender = self.senders.get(websocket)
+            if sender is not None:
+                sender.enqueue(message, coalesce_key)
+
+    def get_metrics(self) -> Dict[str, int]:
+        """发送队列指标：当前深度、累计发送/丢弃/合并数"""
+        senders = list(self.senders.values())
+        metrics = {key: value + sum(sender.stats[key] for sender in senders) for key, value in self.stats.items()}
+        depths = [sender.depth for sender in senders]
+        metrics.update({
+            "connections": len(senders),
+            "queued": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "queue_limit": settings.websocket_send_queue_size,
+        })
+        return metrics
 
 # 全局连接管理器
 manager = ConnectionManager()
@@ -123,7 +258,8 @@ manager = ConnectionManager()
 async def websocket_progress_endpoint(
     websocket: WebSocket, 
     task_id: str,
-    token: str = Query(None, description="认证令牌")
+    token: str = Query(None, description="认证令牌"),
+    last_event_id: str = Query(None, description="断线重连时最后收到的事件ID，用于补发错过的事件")
 ):
     """
     任务进度WebSocket端点
@@ -169,7 +305,9 @@ async def websocket_progress_endpoint(
         
         # 发送历史进度事件
         try:
-            history = await stream_progress_service.get_task_history(task_id, limit=10)
+            history = await stream_progress_service.get_task_history(
+                task_id, limit=10, after_event_id=last_event_id
+            )
             if history:
                 history_message = {
                     "type": "history_events",
@@ -483,7 +621,10 @@ async def websocket_global_endpoint(
                 if message.get("type") == "subscribe_task":
                     task_id = message.get("task_id")
                     if task_id:
-                        await ws_progress_manager.add_websocket_subscriber(task_id, websocket)
+                        sender = manager.senders.get(websocket)
+                        await ws_progress_manager.add_websocket_subscriber(
+                            task_id, websocket, sender=sender.enqueue if sender else None
+                        )
                         
             except asyncio.TimeoutError:
                 # 全局心跳
@@ -512,7 +653,8 @@ async def get_active_websocket_tasks():
             task_id: len(connections) 
             for task_id, connections in manager.task_connections.items()
         },
-        "active_tasks": await stream_progress_service.get_all_active_tasks()
+        "active_tasks": await stream_progress_service.get_all_active_tasks(),
+        "send_queues": manager.get_metrics()
     }
 
 # 在stream_progress_service中集成WebSocket通知
@@ -525,8 +667,9 @@ async def broadcast_progress_event(event: ProgressEvent):
         }
         message_str = json.dumps(message, ensure_ascii=False)
         
-        # 向任务特定连接发送
-        await manager.send_to_task(event.task_id, message_str)
+        # 向任务特定连接发送；非终态进度可合并，只保留最新一条
+        coalesce_key = None if event.status in TERMINAL_EVENT_STATUSES else f"progress:{event.task_id}"
+        await manager.send_to_task(event.task_id, message_str, coalesce_key)
         
     except Exception as e:
         logger.error(f"广播进度事件失败: {e}")
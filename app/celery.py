@@ -5,6 +5,7 @@ Celery异步任务配置 - 增强版本
 
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
 from kombu import Queue
 from app.core.config import settings
 
@@ -59,8 +60,37 @@ celery_app.conf.update(
 
     # 调度器配置
     beat_scheduler="celery.beat:PersistentScheduler",
+    beat_schedule={
+        # 项目文献统计：刷新过期行，每天全量对账一次
+        "refresh-project-literature-stats": {
+            "task": "app.tasks.celery_tasks.refresh_project_stats_celery",
+            "schedule": settings.project_stats_refresh_interval,
+        },
+        "reconcile-project-literature-stats": {
+            "task": "app.tasks.celery_tasks.reconcile_project_stats_celery",
+            "schedule": crontab(hour=3, minute=30),
+        },
+    },
 )
 
+
+@worker_process_init.connect
+def start_worker_runtime(**_):
+    """Worker子进程启动时创建常驻事件循环并预热Redis/OpenAI连接"""
+    from app.tasks.worker_runtime import bootstrap_worker
+    bootstrap_worker()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def stop_worker_runtime(**_):
+    """Worker（子）进程退出（含 max_tasks_per_child 回收）时关闭共享异步客户端、事件循环与PDF解析工作进程"""
+    from app.services.pdf_worker_pool import pdf_worker_pool
+    from app.tasks.worker_runtime import worker_runtime
+    worker_runtime.shutdown()
+    pdf_worker_pool.shutdown()
+
+
 # 通用重试策略配置，供任务复用
 default_retry_kwargs = {
     "autoretry_for": (ConnectionError, TimeoutError, OSError),
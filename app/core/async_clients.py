@@ -0,0 +1,137 @@
+"""
+进程级长生命周期异步客户端注册表
+
+AIService、RAGService 等在每次实例化时都会新建 AsyncOpenAI 客户端（各自的 httpx
+连接池），短任务因此反复经历 DNS 解析、TLS 握手与连接池预热。注册表按名称/配置
+复用客户端，并在进程退出（API 关闭或 Celery worker 子进程退出）时统一关闭。
+
+异步客户端的连接绑定到首次使用时的事件循环，因此注册表按 (名称, 事件循环) 保存实例：
+API 进程为 uvicorn 的事件循环，Celery worker 为 worker_runtime 的常驻循环，线程池中
+asyncio.run 的临时循环各自得到独立的客户端，循环关闭后其客户端在下次创建时被丢弃。
+openai() 返回的代理在每次访问属性时才按当前循环解析客户端，可以安全地保存在服务实例上。
+"""
+
+import asyncio
+import inspect
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+from openai import AsyncOpenAI
+
+from app.core.config import settings
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class LoopBoundClient:
+    """按当前事件循环解析真实客户端的代理，属性访问全部转发给该循环上的实例"""
+
+    def __init__(self, registry: "AsyncClientRegistry", name: str, factory: Callable[[], Any], closer: Optional[Callable[[Any], Any]]):
+        self._registry = registry
+        self._name = name
+        self._factory = factory
+        self._closer = closer
+
+    def current(self) -> Any:
+        """当前事件循环上的客户端，不存在时创建"""
+        return self._registry.get(self._name, self._factory, self._closer)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.current(), name)
+
+
+class AsyncClientRegistry:
+    """按 (名称, 事件循环) 缓存异步客户端，记录对应的关闭方法"""
+
+    def __init__(self):
+        # 键为 (名称, 循环id)；同时保存循环本身，避免循环被回收后 id 被复用
+        self._clients: Dict[Tuple[str, int], Tuple[Optional[asyncio.AbstractEventLoop], Any]] = {}
+        self._closers: Dict[Tuple[str, int], Callable[[Any], Any]] = {}
+        self._proxies: Dict[str, LoopBoundClient] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, factory: Callable[[], Any], closer: Optional[Callable[[Any], Any]] = None) -> Any:
+        """获取当前事件循环上已注册的客户端，不存在时用 factory 创建（factory 须为同步函数）"""
+        loop = _running_loop()
+        key = (name, id(loop))
+        entry = self._clients.get(key)
+        if entry is not None and entry[0] is loop:
+            return entry[1]
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None and entry[0] is loop:
+                return entry[1]
+            self._discard_closed_loops()
+            client = factory()
+            self._clients[key] = (loop, client)
+            if closer is not None:
+                self._closers[key] = closer
+        return client
+
+    def _discard_closed_loops(self) -> None:
+        # 已关闭循环上的客户端无法再使用，也无法在其循环中关闭，直接丢弃
+        for key, (loop, _) in list(self._clients.items()):
+            if loop is not None and loop.is_closed():
+                self._clients.pop(key, None)
+                self._closers.pop(key, None)
+
+    def openai(self, api_key: Optional[str] = None, base_url: Optional[str] = None) -> LoopBoundClient:
+        """
+        共享的 AsyncOpenAI 客户端，按 (api_key, base_url) 区分
+
+        base_url 为 None 时使用配置的 openai_base_url，传空字符串表示使用官方地址。
+        返回的代理在每个事件循环上使用各自的 AsyncOpenAI 实例。
+        """
+        api_key = api_key or settings.openai_api_key
+        base_url = base_url if base_url is not None else settings.openai_base_url
+        config: Dict[str, Any] = {"api_key": api_key}
+        if base_url:
+            config["base_url"] = base_url
+        name = f"openai:{hash((api_key, base_url))}"
+        proxy = self._proxies.get(name)
+        if proxy is None:
+            with self._lock:
+                proxy = self._proxies.setdefault(
+                    name,
+                    LoopBoundClient(self, name, lambda: AsyncOpenAI(**config), lambda client: client.close()),
+                )
+        return proxy
+
+    def names(self) -> Tuple[str, ...]:
+        return tuple(dict.fromkeys(name for name, _ in self._clients))
+
+    async def aclose(self) -> None:
+        """关闭当前事件循环上的客户端并清空注册表（其他循环上的客户端直接丢弃）"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = list(self._clients.items())
+            closers = dict(self._closers)
+            self._clients.clear()
+            self._closers.clear()
+
+        for key, (owner, client) in clients:
+            closer = closers.get(key)
+            if closer is None or owner not in (loop, None):
+                continue
+            try:
+                result = closer(client)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as exc:
+                logger.warning(f"关闭异步客户端 {key[0]} 失败: {exc}")
+
+    def reset(self) -> None:
+        """丢弃所有客户端而不关闭（用于 fork 后的子进程）"""
+        with self._lock:
+            self._clients.clear()
+            self._closers.clear()
+
+
+async_clients = AsyncClientRegistry()
+
@@ -0,0 +1,339 @@
+"""
+认证路径缓存
+
+每个已认证请求都要经过 get_current_user，这里把它的开销降到最低:
+1. TokenMemo: 记忆已验证的 JWT 解码结果，避免每次逐个密钥尝试解码;
+2. PrincipalCache: 按令牌 subject 缓存用户行快照（进程内短 TTL + Redis），
+   命中时以 merge(load=False) 挂到当前会话，不产生任何 SELECT;
+3. LastLoginRecorder: last_login 改为去抖的异步批量写入，每个用户每个周期最多写一次。
+
+用户行通过 ORM 更新并提交后，缓存会在 after_commit 时自动失效。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import redis.asyncio as redis
+from loguru import logger
+from sqlalchemy import DateTime, case, event, inspect, update
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, redis_client
+from app.core.redis import CacheKeys
+from app.core.time_utils import utc_now
+from app.models.user import User
+
+PRINCIPAL_KEY = CacheKeys.PREFIX + "auth:principal:{subject}"
+
+_REDIS_RETRY_INTERVAL = 30.0
+_LAST_LOGIN_FLUSH_DELAY = 1.0
+_INVALIDATE_INFO_KEY = "auth_cache_invalidate"
+
+
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class TokenMemo:
+    """已验证令牌的解码结果记忆（LRU），有效期不超过令牌自身的 exp"""
+
+    def __init__(self, max_size: Optional[int] = None, ttl: Optional[float] = None):
+        self.max_size = max_size or settings.auth_token_memo_size
+        self.ttl = ttl if ttl is not None else settings.auth_token_memo_ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = _token_digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if time.time() >= expires_at:
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return dict(payload)
+
+    def put(self, token: str, payload: Dict[str, Any]) -> None:
+        expires_at = time.time() + self.ttl
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+        key = _token_digest(token)
+        self._entries[key] = (expires_at, dict(payload))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# 快照只包含认证与用户资料响应需要的列；hashed_password 等敏感列不写入缓存，
+# 还原后的对象访问这些列时按需从数据库加载
+_PRINCIPAL_COLUMNS = (
+    "id", "email", "username", "full_name", "institution", "research_field", "avatar_url",
+    "is_active", "is_verified", "created_at", "updated_at", "last_login",
+)
+
+
+def _snapshot(user: User) -> Dict[str, Any]:
+    """把用户行中允许缓存的列值转成可 JSON 序列化的字典"""
+    data: Dict[str, Any] = {}
+    for key in _PRINCIPAL_COLUMNS:
+        value = getattr(user, key)
+        data[key] = value.isoformat() if isinstance(value, datetime) else value
+    return data
+
+
+def _restore(data: Dict[str, Any]) -> Dict[str, Any]:
+    values = {key: data[key] for key in _PRINCIPAL_COLUMNS if key in data}
+    for key, value in values.items():
+        if isinstance(User.__table__.columns[key].type, DateTime) and isinstance(value, str):
+            values[key] = datetime.fromisoformat(value)
+    return values
+
+
+class PrincipalCache:
+    """按令牌 subject（用户ID或邮箱）缓存用户行快照"""
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        local_ttl: Optional[float] = None,
+        redis_ttl: Optional[int] = None,
+        max_size: Optional[int] = None,
+        use_redis: Optional[bool] = None,
+    ):
+        self.redis_url = redis_url or settings.redis_url
+        self.local_ttl = local_ttl if local_ttl is not None else settings.auth_principal_local_ttl
+        self.redis_ttl = redis_ttl if redis_ttl is not None else settings.auth_principal_redis_ttl
+        self.max_size = max_size or settings.auth_token_memo_size
+        if use_redis is None:
+            use_redis = os.getenv("LIGHTWEIGHT_MODE", "false").lower() not in {"1", "true", "yes", "on"}
+        self.use_redis = use_redis
+        self._local: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # 与进度总线相同：Celery 任务每次 asyncio.run 都是新事件循环，客户端按循环区分
+        self._clients: Dict[int, redis.Redis] = {}
+        self._retry_at = 0.0
+        self.stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "invalidations": 0}
+
+    async def _client(self) -> Optional[redis.Redis]:
+        if not self.use_redis or time.monotonic() < self._retry_at:
+            return None
+        loop_id = id(asyncio.get_running_loop())
+        client = self._clients.get(loop_id)
+        if client is None:
+            self._clients.clear()
+            client = redis.from_url(self.redis_url, decode_responses=True)
+            self._clients[loop_id] = client
+        return client
+
+    def _mark_unavailable(self, exc: Exception) -> None:
+        self._retry_at = time.monotonic() + _REDIS_RETRY_INTERVAL
+        logger.warning(f"认证缓存Redis不可用，{_REDIS_RETRY_INTERVAL:.0f}秒内仅使用进程内缓存: {exc}")
+
+    def _remember(self, subject: str, data: Dict[str, Any]) -> None:
+        self._local[subject] = (time.monotonic() + self.local_ttl, data)
+        self._local.move_to_end(subject)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    async def get(self, subject: str) -> Optional[Dict[str, Any]]:
+        entry = self._local.get(subject)
+        if entry is not None:
+            expires_at, data = entry
+            if time.monotonic() < expires_at:
+                self.stats["local_hits"] += 1
+                return data
+            self._local.pop(subject, None)
+
+        client = await self._client()
+        if client is not None:
+            try:
+                raw = await client.get(PRINCIPAL_KEY.format(subject=subject))
+            except Exception as exc:
+                self._mark_unavailable(exc)
+                raw = None
+            if raw:
+                try:
+                    data = json.loads(raw)
+                except ValueError:
+                    data = None
+                if isinstance(data, dict):
+                    self.stats["redis_hits"] += 1
+                    self._remember(subject, data)
+                    return data
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, subject: str, user: User) -> None:
+        data = _snapshot(user)
+        self._remember(subject, data)
+        client = await self._client()
+        if client is None:
+            return
+        try:
+            await client.setex(PRINCIPAL_KEY.format(subject=subject), self.redis_ttl, json.dumps(data, ensure_ascii=False))
+        except Exception as exc:
+            self._mark_unavailable(exc)
+
+    @staticmethod
+    def attach(data: Dict[str, Any], db: Session) -> User:
+        """把快照还原为持久化状态的 User 并挂到会话上，不查询数据库
+
+        返回的对象与查询得到的对象用法相同：可以修改后提交，关系属性按需懒加载。
+        """
+        user = User(**_restore(data))
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    def invalidate(self, subjects: Iterable[Any]) -> None:
+        keys = {str(subject) for subject in subjects if subject is not None}
+        if not keys:
+            return
+        self.stats["invalidations"] += 1
+        for key in keys:
+            self._local.pop(key, None)
+        if not self.use_redis:
+            return
+
+        redis_keys = [PRINCIPAL_KEY.format(subject=key) for key in keys]
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None:
+            loop.create_task(self._delete_remote(redis_keys))
+            return
+        # 同步端点在线程池中提交，这里直接使用同步客户端
+        if time.monotonic() < self._retry_at:
+            return
+        try:
+            redis_client.delete(*redis_keys)
+        except Exception as exc:
+            self._mark_unavailable(exc)
+
+    async def _delete_remote(self, keys: list) -> None:
+        client = await self._client()
+        if client is None:
+            return
+        try:
+            await client.delete(*keys)
+        except Exception as exc:
+            self._mark_unavailable(exc)
+
+    def clear(self) -> None:
+        self._local.clear()
+
+
+class LastLoginRecorder:
+    """去抖的 last_login 写入器：每个用户每个周期最多记录一次，批量用单条 UPDATE 落库"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        interval: Optional[float] = None,
+        flush_delay: float = _LAST_LOGIN_FLUSH_DELAY,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval if interval is not None else settings.auth_last_login_interval
+        self.flush_delay = flush_delay
+        self._recorded_at: Dict[int, float] = {}
+        self._pending: Dict[int, datetime] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats = {"touches": 0, "recorded": 0, "flushes": 0, "errors": 0}
+
+    def touch(self, user_id: int) -> None:
+        self.stats["touches"] += 1
+        now = time.monotonic()
+        last = self._recorded_at.get(user_id)
+        if last is not None and now - last < self.interval:
+            return
+        self._recorded_at[user_id] = now
+        self._pending[user_id] = utc_now()
+        self.stats["recorded"] += 1
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # 没有事件循环时留到下一次 flush（如关闭时）
+        self._flush_task = loop.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_delay)
+        await self.flush()
+
+    async def flush(self) -> None:
+        task = self._flush_task
+        if task is not None and task is not asyncio.current_task() and not task.done():
+            task.cancel()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        await asyncio.to_thread(self._write, pending)
+
+        # 清理已超过去抖周期的记录，避免长时间运行后无限增长
+        threshold = time.monotonic() - self.interval
+        for user_id in [uid for uid, at in self._recorded_at.items() if at < threshold]:
+            self._recorded_at.pop(user_id, None)
+
+    def _write(self, pending: Dict[int, datetime]) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(
+                update(User)
+                .where(User.id.in_(list(pending)))
+                .values(last_login=case(pending, value=User.id))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            self.stats["flushes"] += 1
+        except Exception as exc:
+            db.rollback()
+            self.stats["errors"] += 1
+            logger.warning(f"批量更新最后登录时间失败: {exc}")
+        finally:
+            db.close()
+
+
+token_memo = TokenMemo()
+principal_cache = PrincipalCache()
+last_login_recorder = LastLoginRecorder()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _collect_user_invalidation(mapper, connection, target: User) -> None:
+    session = object_session(target)
+    if session is None:
+        return
+    subjects = session.info.setdefault(_INVALIDATE_INFO_KEY, set())
+    subjects.update({target.id, target.email})
+    subjects.update(inspect(target).attrs.email.history.deleted or ())
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    subjects = session.info.pop(_INVALIDATE_INFO_KEY, None)
+    if subjects:
+        principal_cache.invalidate(subjects)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_users(session: Session) -> None:
+    session.info.pop(_INVALIDATE_INFO_KEY, None)
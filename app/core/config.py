@@ -27,6 +27,26 @@ class Settings(BaseSettings):
         description="Redis连接URL"
     )
 
+    # 异步数据库连接池（AsyncSession，供异步端点使用）
+    async_db_pool_size: int = 10
+    async_db_max_overflow: int = 20
+
+    # 跨进程进度推送（Redis Pub/Sub + 定长Stream历史）
+    progress_bus_enabled: bool = True
+    progress_stream_maxlen: int = 200  # 每个任务保留的历史事件数
+    progress_stream_ttl: int = 24 * 3600  # 任务最后一次更新后历史保留时长（秒）
+
+    # 认证缓存（JWT验证结果记忆 + 用户主体缓存 + 最后登录时间去抖写入）
+    auth_token_memo_size: int = 10000
+    auth_token_memo_ttl: float = 300.0  # 记忆时长上限（秒），不会超过令牌自身的过期时间
+    auth_principal_local_ttl: float = 30.0  # 进程内主体缓存时长（秒）
+    auth_principal_redis_ttl: int = 300  # Redis主体缓存时长（秒）
+    auth_last_login_interval: float = 300.0  # 同一用户最后登录时间的最小写库间隔（秒）
+
+    # WebSocket发送队列（每个连接独立的有界队列 + 写协程）
+    websocket_send_queue_size: int = 256
+    websocket_send_timeout: float = 10.0  # 单条消息发送超时（秒），超时视为死连接
+
     # Elasticsearch配置
     elasticsearch_url: str = Field(
         default=os.getenv("ELASTICSEARCH_URL", "http://localhost:9200"),
@@ -36,7 +56,22 @@ class Settings(BaseSettings):
         default="raggar_",
         description="Elasticsearch索引名前缀"
     )
-    
+    es_bulk_chunk_size: int = Field(default=200, description="批量重建索引时每批读取/写入的文档数")
+    es_bulk_concurrency: int = Field(default=4, description="批量重建索引时同时处理的批次数")
+    es_bulk_max_retries: int = Field(default=3, description="单个批次写入失败时的最大重试次数")
+    hybrid_search_fusion: str = Field(default="rrf", description="混合检索融合方式: rrf / normalized / weighted")
+    hybrid_search_semantic_weight: float = Field(default=0.6, description="混合检索中语义检索的权重，关键词检索权重为 1 - 该值")
+    hybrid_search_rrf_k: int = Field(default=60, description="倒数排名融合的平滑常数k")
+    semantic_search_mode: str = Field(default="knn", description="语义检索方式: knn (HNSW近似检索) / script_score (暴力余弦)")
+    es_knn_num_candidates: int = Field(default=200, description="kNN检索时每个分片的候选数量，越大召回越高、延迟越高")
+    es_knn_candidate_factor: int = Field(default=10, description="候选数量至少为 top_k 的倍数")
+    embedding_dimensions: int = Field(default=1536, description="嵌入向量维度，需与嵌入模型一致")
+
+    # 本地向量索引（轻量模式或Elasticsearch不可用时的RAG检索）
+    local_vector_index_enabled: bool = True
+    local_vector_index_dir: str = "./cache/vector_index"
+    local_vector_index_sync_interval: int = 60  # 同一项目两次增量同步的最小间隔（秒）
+
     # JWT配置
     jwt_secret_key: str = Field(
         default="CHANGE-THIS-IN-PRODUCTION-USE-STRONG-SECRET-KEY",
@@ -56,7 +91,46 @@ class Settings(BaseSettings):
     openai_base_url: Optional[str] = None
     openai_model: str = "o1-mini"
     openai_embedding_model: str = "text-embedding-ada-002"
-    
+
+    # 嵌入向量缓存配置（内存LRU → Redis → 本地float32文件）
+    embedding_cache_enabled: bool = True
+    embedding_cache_memory_size: int = 20000
+    embedding_cache_redis_ttl: int = 30 * 24 * 3600  # 30天
+    embedding_cache_dir: str = "./cache/embeddings"
+
+    # 聊天补全缓存（内存LRU → 本地SQLite，键为模型+规范化提示词+采样参数）
+    llm_cache_enabled: bool = True
+    llm_cache_dir: str = "./cache/llm"
+    llm_cache_ttl: int = 14 * 24 * 3600  # 14天
+    llm_cache_max_bytes: int = 512 * 1024 * 1024  # 磁盘缓存上限，超出后按最近访问时间淘汰
+    llm_cache_memory_size: int = 2000
+    llm_cache_max_temperature: float = 0.2  # 未显式指定时只缓存不高于该温度的请求
+
+    # 出站大模型调用的全局并发控制（AIMD并发上限 + Redis协调的每分钟预算 + 优先级）
+    llm_concurrency_enabled: bool = True
+    llm_concurrency_initial: int = 8
+    llm_concurrency_min: int = 1
+    llm_concurrency_max: int = 64
+    llm_latency_target: float = 30.0  # 单次调用延迟超过该值（秒）时下调并发
+    llm_rate_limit_cooldown: float = 2.0  # 429 未返回 Retry-After 时的全局冷却秒数
+    llm_budget_redis_enabled: bool = True
+    llm_chat_requests_per_minute: int = 500
+    llm_chat_tokens_per_minute: int = 200000
+    llm_embedding_requests_per_minute: int = 3000
+    llm_embedding_tokens_per_minute: int = 1000000
+    llm_batch_budget_ratio: float = 0.8  # 批处理可用的预算比例，其余留给交互请求
+
+    # 文献相关性批量筛选（每次补全评估多篇论文，判定按研究方向+论文缓存）
+    relevance_screening_batch_size: int = 20
+    relevance_verdict_memory_size: int = 20000
+    relevance_verdict_cache_ttl: int = 14 * 24 * 3600  # 14天
+    # AI筛选前的本地预排序（嵌入余弦 + BM25），只把排名靠前与边界候选交给大模型
+    relevance_prefilter_enabled: bool = True
+    relevance_prefilter_forward_fraction: float = 0.35
+    relevance_prefilter_min_forward: int = 30  # 候选数不超过该值时不预筛
+    relevance_prefilter_borderline_margin: float = 0.05  # 归一化分数低于截断线不超过该值的候选也送审
+    relevance_prefilter_embedding_weight: float = 0.6
+
     # Claude Code配置
     claude_code_api_key: Optional[str] = None
     claude_code_base_url: Optional[str] = None
@@ -84,6 +158,26 @@ class Settings(BaseSettings):
     gemini_cli_command: Optional[str] = None
     gemini_cli_timeout: int = 90
 
+    # PDF解析缓存配置（按PDF内容SHA-256 + 解析器版本保存MinerU解析产物）
+    pdf_parse_cache_enabled: bool = True
+    pdf_parse_cache_dir: str = "./cache/pdf_parse"
+    pdf_parse_cache_max_bytes: int = 20 * 1024 * 1024 * 1024  # 20GB，gc时按最近访问淘汰
+    pdf_parse_cache_max_age_days: float = 180.0
+    # 分级PDF提取：低成本后端结果通过质量探测即返回，否则升级到MinerU
+    pdf_extraction_escalation_enabled: bool = True
+    pdf_extraction_auto_chain: list = ["fast_basic", "premium_mineru"]
+    pdf_probe_min_chars_per_page: int = 500
+    pdf_probe_min_page_chars: int = 100  # 非空白字符达到该值的页计入覆盖率
+    pdf_probe_min_page_coverage: float = 0.7
+    pdf_probe_max_garbled_ratio: float = 0.05
+    # PDF解析进程池（所有PDF解析在独立工作进程中执行，按优先级排队）
+    pdf_worker_pool_enabled: bool = True
+    pdf_worker_processes: int = 0  # 0 表示 CPU 核数 - 1
+    pdf_worker_start_method: str = "spawn"
+    pdf_worker_max_rss_mb: int = 4096  # 单个工作进程（含magic-pdf子进程）的内存上限
+    pdf_worker_task_timeout: int = 600
+    pdf_worker_max_tasks_per_child: int = 50
+
     # 文件上传配置
     max_file_size: int = 100 * 1024 * 1024  # 100MB
     upload_path: str = "./uploads"
@@ -93,6 +187,16 @@ class Settings(BaseSettings):
     max_literature_per_query: int = 5000
     literature_batch_size: int = 50
     literature_processing_concurrency: int = 3
+    literature_dedup_near_duplicate: bool = True  # 搜索建库去重时用 MinHash/LSH 识别近似重复标题
+    literature_dedup_near_threshold: float = 0.8  # 标题字符三元组 Jaccard 相似度阈值
+    literature_fulltext_enabled: bool = True  # 文献列表关键词过滤使用全文索引（MySQL ngram / SQLite FTS5）
+    project_stats_refresh_interval: float = 30.0  # 定时刷新过期项目文献统计的周期（秒）
+    literature_count_cache_ttl: int = 60  # 文献列表 total_mode=cached 时计数缓存的秒数
+    segment_writer_batch_size: int = 1000  # 段落批量写库的条数阈值
+    segment_writer_max_literature: int = 200  # 每批最多累积的文献数
+    segment_writer_flush_interval: float = 2.0  # 距上次写库超过该秒数时立即写库
+    task_progress_max_rate: float = 2.0  # 同一任务每秒最多推送的进度事件数
+    task_progress_persist_interval: float = 5.0  # 任务进度写库的最小间隔（秒）
 
     # 通知配置
     smtp_host: Optional[str] = Field(default=None, description="SMTP server host")
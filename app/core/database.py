@@ -4,6 +4,7 @@
 
 import os
 from pathlib import Path
+from typing import Optional
 
 import pymysql
 
@@ -11,6 +12,7 @@ pymysql.install_as_MySQLdb()
 
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine.url import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
 import redis
@@ -81,12 +83,72 @@ def _create_engine_from_settings():
     )
 
 
+def _create_async_engine_from_settings() -> AsyncEngine:
+    """构建异步引擎：MySQL 使用 aiomysql，轻量模式的 SQLite 使用 aiosqlite"""
+    url = make_url(settings.database_url)
+    backend = url.get_backend_name()
+
+    if backend.startswith("sqlite"):
+        if not _allow_sqlite():
+            raise ValueError(
+                "SQLite 仅允许在轻量模式或允许配置下使用，请配置 MySQL DATABASE_URL。"
+            )
+        return create_async_engine(
+            url.set(drivername="sqlite+aiosqlite"),
+            echo=settings.debug,
+        )
+
+    if not backend.startswith("mysql"):
+        raise ValueError(
+            f"Unsupported database backend '{backend}'. Only MySQL is supported in production."
+        )
+
+    return create_async_engine(
+        url.set(drivername="mysql+aiomysql"),
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        pool_size=settings.async_db_pool_size,
+        max_overflow=settings.async_db_max_overflow,
+        pool_timeout=30,
+        connect_args={
+            "charset": "utf8mb4",
+            "connect_timeout": 30,
+            "init_command": "SET sql_mode='STRICT_TRANS_TABLES'",
+        },
+        echo=settings.debug,
+    )
+
+
 # 数据库引擎实例
 engine = _create_engine_from_settings()
 
 # 会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 异步引擎按需创建，未安装异步驱动的环境（如仅运行Celery）不受影响
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """获取（必要时创建）全局异步引擎"""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        _async_engine = _create_async_engine_from_settings()
+        _async_session_factory = async_sessionmaker(
+            _async_engine,
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _async_engine
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    """创建异步会话，用法与 SessionLocal 对应"""
+    get_async_engine()
+    return _async_session_factory()
+
 # 基础模型类
 Base = declarative_base()
 
@@ -109,6 +171,20 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """获取异步数据库会话，供在事件循环上直接访问数据库的异步端点使用"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engine():
+    """关闭异步引擎的连接池"""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+
 async def init_database():
     """初始化数据库，创建所有表"""
     try:
@@ -116,6 +192,11 @@ async def init_database():
         await test_database_connection()
         # 创建所有表
         Base.metadata.create_all(bind=engine)
+        if engine.dialect.name == "sqlite":
+            # 轻量模式下为文献关键词过滤建立 FTS5 全文索引
+            from app.services.literature_fulltext import ensure_sqlite_fulltext
+            with engine.begin() as connection:
+                ensure_sqlite_fulltext(connection)
         print("✅ 数据库初始化成功")
     except Exception as e:
         print(f"❌ 数据库初始化失败: {e}")
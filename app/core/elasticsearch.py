@@ -10,6 +10,22 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+
+def dense_vector_field(
+    dims: int,
+    similarity: str = "cosine",
+    m: int = 16,
+    ef_construction: int = 100,
+) -> Dict[str, Any]:
+    """构建支持HNSW近似kNN检索的dense_vector字段映射"""
+    return {
+        "type": "dense_vector",
+        "dims": dims,
+        "index": True,
+        "similarity": similarity,
+        "index_options": {"type": "hnsw", "m": m, "ef_construction": ef_construction},
+    }
+
 class ElasticsearchClient:
     """Elasticsearch客户端封装"""
 
@@ -40,11 +56,26 @@ class ElasticsearchClient:
         if self.client:
             await self.client.close()
 
-    async def create_index(self, index_name: str, mapping: Dict[str, Any], settings_config: Optional[Dict[str, Any]] = None):
-        """创建索引"""
+    async def create_index(
+        self,
+        index_name: str,
+        mapping: Dict[str, Any],
+        settings_config: Optional[Dict[str, Any]] = None,
+        vector_fields: Optional[Dict[str, int]] = None,
+    ):
+        """创建索引
+
+        Args:
+            vector_fields: 需要HNSW索引的向量字段及其维度，例如 {"content_embedding": 1536}
+        """
         full_index_name = f"{self.index_prefix}{index_name}"
 
         try:
+            if vector_fields:
+                properties = mapping.setdefault("properties", {})
+                for field_name, dims in vector_fields.items():
+                    properties[field_name] = dense_vector_field(dims)
+
             index_body = {"mappings": mapping}
             if settings_config:
                 index_body["settings"] = settings_config
@@ -56,10 +87,49 @@ class ElasticsearchClient:
             )
             logger.info(f"Created index: {full_index_name}")
 
+            if vector_fields:
+                await self.ensure_vector_mapping(index_name, vector_fields)
+
         except Exception as e:
             logger.error(f"Failed to create index {full_index_name}: {e}")
             raise
 
+    async def ensure_vector_mapping(self, index_name: str, vector_fields: Dict[str, int]) -> bool:
+        """为已存在的索引补充向量字段映射
+
+        已存在且类型不同的字段无法原地修改，此时需要重建索引，返回False。
+        """
+        full_index_name = f"{self.index_prefix}{index_name}"
+
+        try:
+            current = await self.client.indices.get_mapping(index=full_index_name)
+            properties = (
+                current.get(full_index_name, {}).get("mappings", {}).get("properties", {})
+            )
+            missing = {
+                field_name: dense_vector_field(dims)
+                for field_name, dims in vector_fields.items()
+                if field_name not in properties
+            }
+            conflicting = [
+                field_name for field_name in vector_fields
+                if field_name in properties and not properties[field_name].get("index")
+            ]
+            if missing:
+                await self.client.indices.put_mapping(index=full_index_name, properties=missing)
+                logger.info(f"Added vector fields {list(missing)} to {full_index_name}")
+            if conflicting:
+                logger.warning(
+                    f"Vector fields {conflicting} in {full_index_name} are not HNSW-indexed; "
+                    "reindex required for kNN search"
+                )
+                return False
+            return True
+
+        except Exception as e:
+            logger.warning(f"Failed to ensure vector mapping for {full_index_name}: {e}")
+            return False
+
     async def index_document(self, index_name: str, doc_id: str, document: Dict[str, Any]):
         """索引文档"""
         full_index_name = f"{self.index_prefix}{index_name}"
@@ -75,19 +145,39 @@ class ElasticsearchClient:
             logger.error(f"Failed to index document {doc_id} in {full_index_name}: {e}")
             raise
 
-    async def bulk_index(self, index_name: str, documents: List[Dict[str, Any]]):
-        """批量索引文档"""
+    async def bulk_index(
+        self,
+        index_name: str,
+        documents: List[Dict[str, Any]],
+        id_field: str = "id",
+        refresh: bool = False,
+    ) -> Dict[str, Any]:
+        """批量索引文档，返回成功数量和失败文档ID列表"""
         full_index_name = f"{self.index_prefix}{index_name}"
 
         try:
             body = []
             for doc in documents:
-                action = {"index": {"_index": full_index_name, "_id": doc.get("id")}}
+                action = {"index": {"_index": full_index_name, "_id": str(doc.get(id_field))}}
                 body.extend([action, doc])
 
-            if body:
-                await self.client.bulk(body=body)
-                logger.info(f"Bulk indexed {len(documents)} documents to {full_index_name}")
+            if not body:
+                return {"indexed": 0, "failed": []}
+
+            response = await self.client.bulk(body=body, refresh=refresh)
+
+            failed: List[str] = []
+            if response.get("errors"):
+                for item in response.get("items", []):
+                    result = item.get("index", {})
+                    if result.get("error"):
+                        failed.append(result.get("_id"))
+                logger.warning(
+                    f"Bulk index to {full_index_name} had {len(failed)} failed documents"
+                )
+
+            logger.info(f"Bulk indexed {len(documents) - len(failed)} documents to {full_index_name}")
+            return {"indexed": len(documents) - len(failed), "failed": failed}
 
         except Exception as e:
             logger.error(f"Failed to bulk index documents to {full_index_name}: {e}")
@@ -16,6 +16,7 @@ from app.core.database import get_db
 from app.models.user import User
 from app.core.exceptions import ErrorFactory, AuthenticationError, ErrorCode
 from app.core.time_utils import utc_now
+from app.core.auth_cache import token_memo, principal_cache, last_login_recorder
 
 # 密码加密上下文 - 优化性能：使用rounds=10平衡安全性和速度
 pwd_context = CryptContext(
@@ -48,7 +49,14 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 def verify_token(token: str) -> Optional[dict]:
-    """验证令牌，支持主密钥与备用密钥"""
+    """验证令牌，支持主密钥与备用密钥
+
+    验证成功的结果会被记忆到令牌过期为止，同一令牌的后续请求无需重新解码。
+    """
+    cached = token_memo.get(token)
+    if cached is not None:
+        return cached
+
     last_error: Optional[JWTError] = None
 
     for idx, secret_key in enumerate(settings.jwt_decode_keys):
@@ -56,6 +64,7 @@ def verify_token(token: str) -> Optional[dict]:
             payload = jwt.decode(token, secret_key, algorithms=[settings.jwt_algorithm])
             if idx > 0:
                 logger.warning("JWT 使用备用密钥完成验证 (index=%s)", idx)
+            token_memo.put(token, payload)
             return payload
         except JWTError as exc:  # 记录最后一次错误，尝试下一把钥匙
             last_error = exc
@@ -65,6 +74,26 @@ def verify_token(token: str) -> Optional[dict]:
         logger.error("JWT 验证失败: %s", last_error)
     return None
 
+def _load_user(db: Session, user_identifier) -> Optional[User]:
+    """通过ID或邮箱查找用户"""
+    if isinstance(user_identifier, int) or str(user_identifier).isdigit():
+        # 如果是数字，按ID查找
+        return db.query(User).filter(User.id == int(user_identifier)).first()
+    # 否则按邮箱查找
+    return db.query(User).filter(User.email == user_identifier).first()
+
+async def _resolve_user(db: Session, user_identifier) -> Optional[User]:
+    """解析令牌主体，优先使用主体缓存，命中时不查询数据库"""
+    subject = str(user_identifier)
+    cached = await principal_cache.get(subject)
+    if cached is not None:
+        return principal_cache.attach(cached, db)
+
+    user = _load_user(db, user_identifier)
+    if user is not None:
+        await principal_cache.set(subject, user)
+    return user
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -82,21 +111,13 @@ async def get_current_user(
         if user_identifier is None:
             raise AuthenticationError(ErrorCode.INVALID_CREDENTIALS, "令牌中缺少用户信息")
         
-        # 尝试通过ID或邮箱查找用户
-        user = None
-        if isinstance(user_identifier, int) or str(user_identifier).isdigit():
-            # 如果是数字，按ID查找
-            user = db.query(User).filter(User.id == int(user_identifier)).first()
-        else:
-            # 否则按邮箱查找
-            user = db.query(User).filter(User.email == user_identifier).first()
+        user = await _resolve_user(db, user_identifier)
         
         if user is None:
             raise AuthenticationError(ErrorCode.USER_NOT_FOUND, f"用户不存在: {user_identifier}")
         
-        # 更新最后登录时间
-        user.last_login = utc_now()
-        db.commit()
+        # 最后登录时间由后台去抖写入，认证本身不写库
+        last_login_recorder.touch(user.id)
         
         return user
         
@@ -124,14 +145,7 @@ async def get_current_user_from_token(token: str, db: Session) -> Optional[User]
         if user_identifier is None:
             return None
         
-        # 尝试通过ID或邮箱查找用户
-        user = None
-        if isinstance(user_identifier, int) or str(user_identifier).isdigit():
-            # 如果是数字，按ID查找
-            user = db.query(User).filter(User.id == int(user_identifier)).first()
-        else:
-            # 否则按邮箱查找
-            user = db.query(User).filter(User.email == user_identifier).first()
+        user = await _resolve_user(db, user_identifier)
         
         return user if user and user.is_active else None
         
@@ -153,6 +153,11 @@ async def lifespan(app: FastAPI):
             stream_progress_service.websocket_broadcast = broadcast_progress_event
             print("WebSocket广播系统集成完成")
 
+            # 订阅其他进程（Celery worker / 其他API worker）发布的进度事件
+            from app.services.progress_bus import progress_bus
+            await progress_bus.start_listener(stream_progress_service.apply_remote_event)
+            print("跨进程进度总线订阅完成")
+
             # 初始化突破性功能服务
             from app.services.smart_research_assistant import smart_research_assistant
             from app.services.knowledge_graph_service import knowledge_graph_service
@@ -197,6 +202,13 @@ async def lifespan(app: FastAPI):
                     except Exception as e:
                         print(f"Redis关闭警告: {e}")
 
+                # 停止跨进程进度总线订阅
+                try:
+                    from app.services.progress_bus import progress_bus
+                    await progress_bus.stop_listener()
+                except Exception as e:
+                    print(f"进度总线关闭警告: {e}")
+
                 # 关闭Elasticsearch连接
                 if es_initialized:
                     try:
@@ -234,6 +246,22 @@ async def lifespan(app: FastAPI):
                 collaborative_workspace.user_connections.clear()
                 print("协作工作空间已清理")
 
+            # 停止PDF解析工作进程
+            from app.services.pdf_worker_pool import pdf_worker_pool
+            pdf_worker_pool.shutdown()
+
+            # 关闭共享的异步客户端（OpenAI连接池等）
+            from app.core.async_clients import async_clients
+            await async_clients.aclose()
+
+            # 写入尚未落库的最后登录时间
+            from app.core.auth_cache import last_login_recorder
+            await last_login_recorder.flush()
+
+            # 关闭异步数据库连接池
+            from app.core.database import dispose_async_engine
+            await dispose_async_engine()
+
         except Exception as e:
             print(f"关闭服务时出错: {e}")
 
@@ -4,7 +4,7 @@
 """
 
 from app.models.user import User, UserMembership, MembershipType
-from app.models.project import Project, project_literature_association
+from app.models.project import Project, ProjectLiteratureStats, project_literature_association
 from app.models.literature import Literature, LiteratureSegment
 from app.models.shared_literature import SharedLiterature, UserLiteratureReference
 from app.models.task import Task, TaskProgress, TaskType, TaskStatus
@@ -17,6 +17,9 @@ from app.models.collaboration import (
 from app.models.intelligent_template import TemplateDiscovery, PromptTemplate
 from app.models.interaction import InteractionSession, ClarificationCard, InteractionAnalytics
 
+# 注册项目文献统计的变更跟踪（会话 flush 事件）
+from app.models import stats_tracking  # noqa: F401
+
 # 导出所有模型
 __all__ = [
     # 用户模型
@@ -26,6 +29,7 @@ __all__ = [
     
     # 项目模型
     'Project',
+    'ProjectLiteratureStats',
     'project_literature_association',
     
     # 文献模型
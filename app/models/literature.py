@@ -2,11 +2,12 @@
 文献相关数据模型 - MySQL版本
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, JSON, Float, ForeignKey, DECIMAL
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, JSON, Float, ForeignKey, DECIMAL, Index, event
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.models.project import project_literature_association
+from app.utils.literature_identity import title_hash
 
 class Literature(Base):
     __tablename__ = "literature"
@@ -15,6 +16,7 @@ class Literature(Base):
 
     # 基础信息
     title = Column(Text, nullable=False)
+    title_hash = Column(String(40), index=True)  # 归一化标题的SHA-1，用于去重查询
     authors = Column(JSON)  # 作者列表
     abstract = Column(Text)
     keywords = Column(JSON)  # 关键词列表
@@ -79,9 +81,19 @@ class Literature(Base):
 
     # 索引配置 - MySQL全文索引
     __table_args__ = (
+        # 文献列表排序键，供游标分页使用
+        Index('ix_literature_list_order', 'quality_score', 'created_at', 'id'),
         {'mysql_engine': 'InnoDB', 'mysql_charset': 'utf8mb4'},
     )
 
+@event.listens_for(Literature, "before_insert")
+@event.listens_for(Literature, "before_update")
+def _sync_title_hash(mapper, connection, target: Literature) -> None:
+    value = title_hash(target.title)
+    if target.title_hash != value:
+        target.title_hash = value
+
+
 class LiteratureSegment(Base):
     __tablename__ = "literature_segments"
 
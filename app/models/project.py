@@ -85,3 +85,21 @@ class Project(Base):
     __table_args__ = (
         {'mysql_engine': 'InnoDB', 'mysql_charset': 'utf8mb4'},
     )
+
+class ProjectLiteratureStats(Base):
+    """项目文献统计的物化结果，文献变更时标记过期并按需刷新"""
+    __tablename__ = "project_literature_stats"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    total_literature = Column(Integer, nullable=False, default=0)
+    processed_literature = Column(Integer, nullable=False, default=0)
+    total_segments = Column(Integer, nullable=False, default=0)
+    year_distribution = Column(JSON)  # [{"year": 2024, "count": 3}, ...] 按年份倒序
+    top_journals = Column(JSON)  # [{"journal": "...", "count": 5}, ...] 前10个期刊
+
+    is_stale = Column(Boolean, nullable=False, default=False, server_default="0", index=True)
+    refreshed_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        {'mysql_engine': 'InnoDB', 'mysql_charset': 'utf8mb4'},
+    )
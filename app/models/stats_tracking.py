@@ -0,0 +1,103 @@
+"""
+项目文献统计的变更跟踪
+
+文献加入/移出项目、解析状态或期刊年份变化、段落增删时，把受影响项目的
+project_literature_stats 行标记为过期（与业务写入处于同一事务）。
+统计值本身由 app.services.project_stats_service 按需或定时重新计算。
+
+文献既可以通过 literature.project_id 直接归属项目，也可以通过关联表归属，
+因此受影响项目需要同时从两处解析。
+"""
+
+from typing import Iterable, Set
+
+from sqlalchemy import event, inspect, select, union, update
+from sqlalchemy.orm import Session
+
+from app.models.literature import Literature, LiteratureSegment
+from app.models.project import ProjectLiteratureStats, project_literature_association
+
+# 影响统计结果的文献属性
+TRACKED_LITERATURE_ATTRS = ("project_id", "projects", "is_parsed", "journal", "publication_year")
+
+_STALE_INFO_KEY = "stale_project_ids"
+
+
+def projects_for_literature(db: Session, literature_ids: Iterable[int]) -> Set[int]:
+    """查询文献当前所属的全部项目（直接归属 + 关联表）"""
+    ids = [literature_id for literature_id in set(literature_ids) if literature_id is not None]
+    if not ids:
+        return set()
+    statement = union(
+        select(Literature.project_id).where(Literature.id.in_(ids), Literature.project_id.isnot(None)),
+        select(project_literature_association.c.project_id).where(
+            project_literature_association.c.literature_id.in_(ids)
+        ),
+    )
+    return {project_id for project_id in db.execute(statement).scalars() if project_id is not None}
+
+
+def mark_projects_stale(db: Session, project_ids: Iterable[int]) -> None:
+    ids = [project_id for project_id in set(project_ids) if project_id is not None]
+    if not ids:
+        return
+    db.execute(
+        update(ProjectLiteratureStats)
+        .where(ProjectLiteratureStats.project_id.in_(ids), ProjectLiteratureStats.is_stale.is_(False))
+        .values(is_stale=True)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def mark_literature_projects_stale(db: Session, literature_ids: Iterable[int]) -> None:
+    """供绕过 ORM 的批量写入（如段落批量 INSERT）显式调用"""
+    mark_projects_stale(db, projects_for_literature(db, literature_ids))
+
+
+def _history_values(state, key: str) -> Set:
+    history = state.attrs[key].history
+    return {value for value in (*history.added, *history.deleted, *history.unchanged) if value is not None}
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_stale_projects(session: Session, flush_context, instances) -> None:
+    project_ids: Set[int] = set()
+    literature_ids: Set[int] = set()
+
+    for obj in session.new:
+        if isinstance(obj, Literature):
+            if obj.project_id is not None:
+                project_ids.add(obj.project_id)
+            project_ids.update(project.id for project in obj.projects if project.id is not None)
+        elif isinstance(obj, LiteratureSegment):
+            literature_ids.add(obj.literature_id or getattr(obj.literature, "id", None))
+
+    for obj in session.dirty:
+        if not isinstance(obj, Literature):
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[key].history.has_changes() for key in TRACKED_LITERATURE_ATTRS):
+            continue
+        literature_ids.add(obj.id)
+        project_ids.update(_history_values(state, "project_id"))
+        project_ids.update(project.id for project in _history_values(state, "projects"))
+
+    for obj in session.deleted:
+        if isinstance(obj, Literature):
+            literature_ids.add(obj.id)
+        elif isinstance(obj, LiteratureSegment):
+            literature_ids.add(obj.literature_id)
+
+    # 在本次 flush 写入前解析，移出项目或删除文献时仍能找到原项目
+    literature_ids.discard(None)
+    if literature_ids:
+        project_ids.update(projects_for_literature(session, literature_ids))
+    if project_ids:
+        session.info.setdefault(_STALE_INFO_KEY, set()).update(project_ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_collected_projects_stale(session: Session, flush_context) -> None:
+    project_ids = session.info.pop(_STALE_INFO_KEY, None)
+    if project_ids:
+        mark_projects_stale(session, project_ids)
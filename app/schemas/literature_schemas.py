@@ -226,10 +226,11 @@ class LiteratureListResponse(BaseModel):
 
 class LiteraturePageResponse(BaseModel):
     items: List[LiteratureResponse]
-    total: int
+    total: Optional[int]  # total_mode=none 时为空
     page: int
     page_size: int
     has_more: bool
+    next_cursor: Optional[str] = None  # 游标分页的下一页游标
 
 
 class LiteratureSearchResponse(BaseModel):
@@ -405,6 +406,7 @@ class LiteratureProjectStatisticsResponse(BaseModel):
     total_segments: int
     unprocessed_literature: int
     storage_saved: Dict[str, Any]
+    refreshed_at: Optional[datetime] = None  # 物化统计的最近刷新时间
 
 # 新增：文献段落响应模型
 class LiteratureSegmentItem(BaseModel):
@@ -69,6 +69,7 @@ class TaskCostSummary(BaseModel):
     total_token_usage: float
     total_cost_estimate: float
     models: Dict[str, Dict[str, float]] = Field(default_factory=dict)
+    cache: Dict[str, Dict[str, float]] = Field(default_factory=dict)
 
 
 class TaskStatisticsResponse(BaseModel):
@@ -4,31 +4,32 @@ AI服务 - 处理文献分析和经验生成
 """
 
 import asyncio
-from typing import List, Dict, Optional, Tuple
+from types import SimpleNamespace
+from typing import AsyncIterator, Callable, List, Dict, Optional, Tuple
 import openai
-from openai import AsyncOpenAI
 import json
 from loguru import logger
 import aiohttp
 
+from app.core.async_clients import async_clients
 from app.core.config import settings
 from app.utils.retry_handler import with_retry, RetryStrategy
 from app.services.task_cost_tracker import task_cost_tracker
+from app.services.embedding_cache import embedding_cache
+from app.services.llm_cache import is_json_content, llm_cache
+from app.services.llm_concurrency import governed_client
+from app.services.relevance_screening import ScreeningContext, relevance_screener
+
+# 单次 embeddings 请求携带的最大文本条数
+_EMBEDDING_REQUEST_LIMIT = 256
 
 class AIService:
     """AI服务类"""
     
     def __init__(self):
-        # 构建OpenAI客户端配置
-        client_config = {
-            "api_key": settings.openai_api_key
-        }
-        
-        # 如果配置了base_url，则使用自定义的base_url
-        if settings.openai_base_url:
-            client_config["base_url"] = settings.openai_base_url
-            
-        self.client = AsyncOpenAI(**client_config)
+        # 复用进程级共享的OpenAI客户端（配置了base_url时使用自定义的base_url），
+        # 补全与嵌入调用经过全局并发控制
+        self.client = governed_client(async_clients.openai())
         
     @with_retry("openai_api", max_attempts=3, base_delay=2.0, strategy=RetryStrategy.EXPONENTIAL_BACKOFF)
     async def screen_literature_relevance(
@@ -75,14 +76,13 @@ class AIService:
 }}
 """
             
-            response = await self.client.chat.completions.create(
+            response = await self._chat_completion(
                 model="gpt-3.5-turbo",  # 使用较便宜的模型进行初筛
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
-                max_tokens=500
+                max_tokens=500,
+                validate=is_json_content
             )
-            self._record_usage("gpt-3.5-turbo", response)
-            
             self._record_usage("gpt-3.5-turbo", response)
             result_text = response.choices[0].message.content
             result = json.loads(result_text)
@@ -104,6 +104,56 @@ class AIService:
                 "error": str(e)
             }
     
+    async def screen_literature_relevance_batch(
+        self,
+        literature_list: List[Dict],
+        research_keywords: List[str],
+        research_direction: Optional[str] = None,
+        batch_size: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        批量文献初筛 - 每次补全评估多篇文献，判定结果按研究方向缓存
+
+        Args:
+            literature_list: 文献数据列表
+            research_keywords: 研究关键词
+            research_direction: 研究方向（缺省时使用关键词）
+            batch_size: 每次补全包含的文献数
+
+        Returns:
+            与输入一一对应的筛选结果，格式同 screen_literature_relevance
+        """
+        context = ScreeningContext(
+            research_direction=research_direction or ", ".join(research_keywords),
+            keywords=tuple(research_keywords),
+        )
+
+        async def single(literature_data: Dict) -> Optional[float]:
+            result = await self.screen_literature_relevance(literature_data, research_keywords)
+            return result["relevance_score"] if result.get("success") else None
+
+        verdicts = await relevance_screener.screen(
+            self, context, literature_list, single, batch_size=batch_size
+        )
+        results = []
+        for verdict in verdicts:
+            if verdict is None:
+                results.append({
+                    "success": False,
+                    "relevance_score": 0,
+                    "details": {},
+                    "is_relevant": False,
+                    "error": "相关性评估失败"
+                })
+                continue
+            results.append({
+                "success": True,
+                "relevance_score": verdict["score"],
+                "details": verdict,
+                "is_relevant": verdict["score"] >= 6  # 与单篇筛选口径一致
+            })
+        return results
+
     async def generate_structure_template(
         self, 
         research_domain: str, 
@@ -162,11 +212,12 @@ class AIService:
 }}
 """
             
-            response = await self.client.chat.completions.create(
+            response = await self._chat_completion(
                 model=settings.openai_model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3,
-                max_tokens=2000
+                max_tokens=2000,
+                validate=is_json_content
             )
             self._record_usage(settings.openai_model, response)
             
@@ -259,7 +310,7 @@ class AIService:
     async def _extract_with_ai(self, prompt: str) -> str:
         """使用AI提取内容"""
         try:
-            response = await self.client.chat.completions.create(
+            response = await self._chat_completion(
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.2,
@@ -337,7 +388,7 @@ class AIService:
 请生成完整的经验书内容。
 """
             
-            response = await self.client.chat.completions.create(
+            response = await self._chat_completion(
                 model=settings.openai_model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3,
@@ -401,11 +452,12 @@ class AIService:
 }}
 """
             
-            response = await self.client.chat.completions.create(
+            response = await self._chat_completion(
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
-                max_tokens=1000
+                max_tokens=1000,
+                validate=is_json_content
             )
             self._record_usage("gpt-3.5-turbo", response)
 
@@ -471,7 +523,7 @@ class AIService:
 
 请生成完整的主经验内容。
 """
-            response = await self.client.chat.completions.create(
+            response = await self._chat_completion(
                 model=settings.openai_model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.2,
@@ -515,11 +567,12 @@ class AIService:
     "applications": ["应用1", "应用2"]
 }}
 """
-            response = await self.client.chat.completions.create(
+            response = await self._chat_completion(
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
-                max_tokens=500
+                max_tokens=500,
+                validate=is_json_content
             )
             self._record_usage("gpt-3.5-turbo", response)
 
@@ -537,33 +590,22 @@ class AIService:
             logger.error(f"提取覆盖范围失败: {e}")
             return []
     
-    async def answer_research_question(
-        self, 
+    @staticmethod
+    def _build_research_answer_prompt(
         question: str,
         main_experience: str,
-        relevant_segments: List[Dict] = None
-    ) -> Dict:
-        """
-        基于主经验回答研究问题
+        relevant_segments: Optional[List[Dict]] = None
+    ) -> str:
+        """构建基于主经验回答研究问题的提示词"""
+        # 准备上下文
+        context = f"主经验内容：\n{main_experience}\n\n"
         
-        Args:
-            question: 研究问题
-            main_experience: 主经验内容
-            relevant_segments: 相关文献段落
-            
-        Returns:
-            回答结果
-        """
-        try:
-            # 准备上下文
-            context = f"主经验内容：\n{main_experience}\n\n"
-            
-            if relevant_segments:
-                context += "相关文献段落：\n"
-                for i, segment in enumerate(relevant_segments[:3], 1):
-                    context += f"段落{i}：{segment.get('content', '')[:500]}\n\n"
-            
-            prompt = f"""
+        if relevant_segments:
+            context += "相关文献段落：\n"
+            for i, segment in enumerate(relevant_segments[:3], 1):
+                context += f"段落{i}：{segment.get('content', '')[:500]}\n\n"
+        
+        prompt = f"""
 作为科研专家，请基于提供的主经验和相关文献段落，回答以下研究问题。
 
 研究问题：{question}
@@ -579,7 +621,28 @@ class AIService:
 
 请确保回答具有实用性和可操作性。
 """
-            response = await self.client.chat.completions.create(
+        return prompt
+
+    async def answer_research_question(
+        self, 
+        question: str,
+        main_experience: str,
+        relevant_segments: List[Dict] = None
+    ) -> Dict:
+        """
+        基于主经验回答研究问题
+        
+        Args:
+            question: 研究问题
+            main_experience: 主经验内容
+            relevant_segments: 相关文献段落
+            
+        Returns:
+            回答结果
+        """
+        try:
+            prompt = self._build_research_answer_prompt(question, main_experience, relevant_segments)
+            response = await self._chat_completion(
                 model=settings.openai_model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3,
@@ -607,12 +670,75 @@ class AIService:
                 "error": str(e)
             }
     
+    async def stream_research_answer(
+        self,
+        question: str,
+        main_experience: str,
+        relevant_segments: List[Dict] = None,
+        usage_out: Optional[Dict] = None
+    ) -> AsyncIterator[str]:
+        """answer_research_question 的流式版本，逐段产出回答文本"""
+        prompt = self._build_research_answer_prompt(question, main_experience, relevant_segments)
+        async for delta in self.stream_chat_completion(
+            model=settings.openai_model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3,
+            max_tokens=2000,
+            usage_out=usage_out
+        ):
+            yield delta
+
+    async def stream_chat_completion(
+        self,
+        model: str,
+        messages: List[Dict],
+        usage_out: Optional[Dict] = None,
+        **params
+    ) -> AsyncIterator[str]:
+        """
+        流式对话补全（不经过补全缓存），逐段产出生成的文本
+
+        Args:
+            usage_out: 传入字典时，流结束后写入 token 用量
+
+        流结束时按最后一个分块携带的 usage 记录 token 消耗。
+        """
+        stream = await self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True},
+            **params
+        )
+        usage = None
+        try:
+            async for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                if chunk.choices:
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        yield delta
+        finally:
+            # 提前停止读取时及时释放并发槽位与连接
+            await stream.close()
+
+        self._record_usage(model, SimpleNamespace(usage=usage))
+        if usage_out is not None:
+            usage_out.update({
+                "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+                "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+                "total_tokens": getattr(usage, "total_tokens", 0) or 0,
+            })
+
     async def generate_completion(
         self,
         prompt: str,
         model: str = None,
         max_tokens: int = 1000,
-        temperature: float = 0.3
+        temperature: float = 0.3,
+        cache: Optional[bool] = None,
+        cache_validator: Optional[Callable[[str], bool]] = None
     ) -> Dict:
         """
         生成AI完成内容的通用方法
@@ -622,16 +748,20 @@ class AIService:
             model: 模型名称（可选，默认使用配置的模型）
             max_tokens: 最大token数
             temperature: 温度参数
+            cache: 补全缓存开关，None 时只缓存低温度请求，False 跳过缓存
+            cache_validator: 写入缓存前校验回复内容（如要求可解析为 JSON）
             
         Returns:
-            生成结果
+            生成结果（命中缓存时 cached 为 True，usage 记为 0）
         """
         try:
-            response = await self.client.chat.completions.create(
+            response = await self._chat_completion(
                 model=model or settings.openai_model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                cache=cache,
+                validate=cache_validator
             )
             self._record_usage(model or settings.openai_model, response)
 
@@ -640,6 +770,7 @@ class AIService:
             return {
                 "success": True,
                 "content": content,
+                "cached": getattr(response, "cached", False),
                 "usage": {
                     "prompt_tokens": response.usage.prompt_tokens if response.usage else 0,
                     "completion_tokens": response.usage.completion_tokens if response.usage else 0,
@@ -665,7 +796,7 @@ class AIService:
     @with_retry("openai_embedding", strategy=RetryStrategy.EXPONENTIAL_BACKOFF, max_attempts=3)
     async def get_embedding(self, text: str, model: str = None) -> List[float]:
         """
-        获取文本的嵌入向量
+        获取文本的嵌入向量（优先命中嵌入缓存）
 
         Args:
             text: 需要嵌入的文本
@@ -685,14 +816,22 @@ class AIService:
             # 使用配置的嵌入模型
             embedding_model = model or settings.openai_embedding_model
 
+            cached = await embedding_cache.get(embedding_model, cleaned_text)
+            if cached is not None:
+                task_cost_tracker.record_cache_usage("embedding", hits=1, misses=0)
+                return cached
+
             response = await self.client.embeddings.create(
                 input=cleaned_text,
                 model=embedding_model
             )
+            self._record_usage(embedding_model, response)
+            task_cost_tracker.record_cache_usage("embedding", hits=0, misses=1)
 
             embedding = response.data[0].embedding
             logger.debug(f"成功获取嵌入向量，维度: {len(embedding)}")
 
+            await embedding_cache.set(embedding_model, cleaned_text, embedding)
             return embedding
 
         except Exception as e:
@@ -700,6 +839,15 @@ class AIService:
             # 返回零向量作为fallback
             return [0.0] * 1536
 
+    async def _chat_completion(
+        self,
+        cache: Optional[bool] = None,
+        validate: Optional[Callable[[str], bool]] = None,
+        **kwargs
+    ):
+        """经过补全缓存的 chat.completions.create（命中时返回的 usage 为 None）"""
+        return await llm_cache.create(self.client, cache=cache, validate=validate, **kwargs)
+
     def _record_usage(self, model: str, response) -> None:
         try:
             usage = getattr(response, "usage", None)
@@ -716,40 +864,62 @@ class AIService:
 
     async def get_embeddings_batch(self, texts: List[str], model: str = None) -> List[List[float]]:
         """
-        批量获取文本嵌入向量
+        批量获取文本嵌入向量，仅对缓存未命中的文本调用API
 
         Args:
             texts: 文本列表
             model: 嵌入模型名称
 
         Returns:
-            嵌入向量列表
+            与输入一一对应的嵌入向量列表（空文本对应零向量）
         """
         try:
             if not texts:
                 return []
 
-            # 清理和限制文本
-            cleaned_texts = [text.strip()[:8000] for text in texts if text and text.strip()]
+            # 清理和限制文本，保持与输入位置一致
+            cleaned_texts = [text.strip()[:8000] if text and text.strip() else "" for text in texts]
 
-            if not cleaned_texts:
+            if not any(cleaned_texts):
                 logger.warning("所有文本都为空")
-                return [[0.0] * 1536] * len(texts)
+                return [[0.0] * 1536 for _ in texts]
 
             # 使用配置的嵌入模型
             embedding_model = model or settings.openai_embedding_model
 
-            response = await self.client.embeddings.create(
-                input=cleaned_texts,
-                model=embedding_model
+            # 同一批次内重复的文本只查询和请求一次，命中与未命中都按去重后的文本统计
+            unique_texts = list(dict.fromkeys(text for text in cleaned_texts if text))
+            cached = await embedding_cache.get_many(embedding_model, unique_texts)
+            known: Dict[str, List[float]] = {
+                text: vector for text, vector in zip(unique_texts, cached) if vector is not None
+            }
+            missing_texts = [text for text in unique_texts if text not in known]
+            task_cost_tracker.record_cache_usage(
+                "embedding",
+                hits=len(known),
+                misses=len(missing_texts),
             )
 
-            embeddings = [data.embedding for data in response.data]
-            logger.info(f"成功批量获取 {len(embeddings)} 个嵌入向量")
+            for start in range(0, len(missing_texts), _EMBEDDING_REQUEST_LIMIT):
+                chunk = missing_texts[start:start + _EMBEDDING_REQUEST_LIMIT]
+                response = await self.client.embeddings.create(
+                    input=chunk,
+                    model=embedding_model
+                )
+                self._record_usage(embedding_model, response)
+                chunk_vectors = [data.embedding for data in response.data]
+                known.update(zip(chunk, chunk_vectors))
+                await embedding_cache.set_many(embedding_model, chunk, chunk_vectors)
+
+            embeddings = [known.get(text) or [0.0] * 1536 for text in cleaned_texts]
+
+            logger.info(
+                f"成功批量获取 {len(embeddings)} 个嵌入向量（API请求 {len(missing_texts)} 条）"
+            )
 
             return embeddings
 
         except Exception as e:
             logger.error(f"批量获取嵌入向量失败: {e}")
             # 返回零向量作为fallback
-            return [[0.0] * 1536] * len(texts)
+            return [[0.0] * 1536 for _ in texts]
@@ -8,17 +8,77 @@ import asyncio
 import json
 import logging
 from datetime import datetime
-from typing import Any, Awaitable, Callable, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
 
+from app.core.config import settings
 from app.core.elasticsearch import get_elasticsearch
+from app.core.redis import CacheKeys, redis_manager
 from app.models.literature import Literature, LiteratureSegment
-from app.models.project import Project
+from app.models.project import Project, project_literature_association
 from app.services.ai_service import AIService
 
 logger = logging.getLogger(__name__)
 
+REINDEX_CHECKPOINT_KEY = CacheKeys.PREFIX + "reindex:checkpoint:{project_id}"
+
+ProgressCallback = Callable[[int, int, str], Awaitable[None]]
+
+
+def _usable_vector(vector: Optional[List[float]]) -> bool:
+    """零向量是嵌入失败时的兜底值，ES的cosine向量字段不接受零向量"""
+    return bool(vector) and any(vector)
+
+
+def build_literature_document(literature: Literature) -> Dict[str, Any]:
+    """构建文献的ES文档（不含向量）"""
+    return {
+        "literature_id": literature.id,
+        "title": literature.title,
+        "abstract": literature.abstract or "",
+        "authors": literature.authors or [],
+        "keywords": literature.keywords or [],
+        "journal": literature.journal,
+        "publication_year": literature.publication_year,
+        "doi": literature.doi,
+        "category": literature.category,
+        "tags": literature.tags or [],
+        "quality_score": float(literature.quality_score) if literature.quality_score else 0.0,
+        "reliability_score": float(literature.reliability_score) if literature.reliability_score else 0.5,
+        "citation_count": literature.citation_count or 0,
+        "impact_factor": float(literature.impact_factor) if literature.impact_factor else 0.0,
+        "source_platform": literature.source_platform,
+        "status": literature.status,
+        "created_at": literature.created_at.isoformat() if literature.created_at else None,
+        "updated_at": literature.updated_at.isoformat() if literature.updated_at else None
+    }
+
+
+def build_segment_document(
+    segment: LiteratureSegment,
+    literature: Literature,
+    project_ids: Sequence[int],
+) -> Dict[str, Any]:
+    """构建文献段落的ES文档（不含向量）"""
+    return {
+        "segment_id": segment.id,
+        "literature_id": segment.literature_id,
+        "project_ids": list(project_ids),
+        "segment_type": segment.segment_type,
+        "section_title": segment.section_title,
+        "content": segment.content,
+        "page_number": segment.page_number,
+        "paragraph_index": segment.paragraph_index,
+        "structured_data": segment.structured_data or {},
+        "extraction_confidence": float(segment.extraction_confidence) if segment.extraction_confidence else 0.0,
+        "literature_title": literature.title,
+        "literature_authors": literature.authors or [],
+        "publication_year": literature.publication_year,
+        "created_at": segment.created_at.isoformat() if segment.created_at else None
+    }
+
 class DataSyncService:
     """MySQL和Elasticsearch数据同步服务"""
 
@@ -56,32 +116,13 @@ class DataSyncService:
                 abstract_embedding = await self.ai_service.get_embedding(literature.abstract)
 
             # 构建ES文档
-            es_doc = {
-                "literature_id": literature.id,
-                "title": literature.title,
-                "abstract": literature.abstract or "",
-                "authors": literature.authors or [],
-                "keywords": literature.keywords or [],
-                "journal": literature.journal,
-                "publication_year": literature.publication_year,
-                "doi": literature.doi,
-                "category": literature.category,
-                "tags": literature.tags or [],
-                "quality_score": float(literature.quality_score) if literature.quality_score else 0.0,
-                "reliability_score": float(literature.reliability_score) if literature.reliability_score else 0.5,
-                "citation_count": literature.citation_count or 0,
-                "impact_factor": float(literature.impact_factor) if literature.impact_factor else 0.0,
-                "source_platform": literature.source_platform,
-                "status": literature.status,
-                "created_at": literature.created_at.isoformat() if literature.created_at else None,
-                "updated_at": literature.updated_at.isoformat() if literature.updated_at else None
-            }
+            es_doc = build_literature_document(literature)
 
             # 添加向量嵌入
-            if title_embedding:
+            if _usable_vector(title_embedding):
                 es_doc["title_embedding"] = title_embedding
 
-            if abstract_embedding:
+            if _usable_vector(abstract_embedding):
                 es_doc["abstract_embedding"] = abstract_embedding
 
             # 索引到Elasticsearch
@@ -119,25 +160,10 @@ class DataSyncService:
             project_ids = [p.id for p in literature.projects] if literature.projects else []
 
             # 构建ES文档
-            es_doc = {
-                "segment_id": segment.id,
-                "literature_id": segment.literature_id,
-                "project_ids": project_ids,
-                "segment_type": segment.segment_type,
-                "section_title": segment.section_title,
-                "content": segment.content,
-                "page_number": segment.page_number,
-                "paragraph_index": segment.paragraph_index,
-                "structured_data": segment.structured_data or {},
-                "extraction_confidence": float(segment.extraction_confidence) if segment.extraction_confidence else 0.0,
-                "literature_title": literature.title,
-                "literature_authors": literature.authors or [],
-                "publication_year": literature.publication_year,
-                "created_at": segment.created_at.isoformat() if segment.created_at else None
-            }
+            es_doc = build_segment_document(segment, literature, project_ids)
 
             # 添加内容嵌入
-            if content_embedding:
+            if _usable_vector(content_embedding):
                 es_doc["content_embedding"] = content_embedding
 
             # 索引到Elasticsearch
@@ -181,55 +207,347 @@ class DataSyncService:
             logger.error(f"Failed to sync project literature association: {e}")
             raise
 
-    async def bulk_sync_literature(self, literature_ids: List[int], db: Session) -> None:
-        """批量同步文献到Elasticsearch"""
-        for literature_id in literature_ids:
-            await self.sync_literature_to_es(literature_id, db)
+    async def bulk_sync_literature(self, literature_ids: List[int], db: Session) -> Dict[str, Any]:
+        """批量同步文献到Elasticsearch（批量嵌入 + bulk写入）"""
+        await self._ensure_client()
+        chunk_size = settings.es_bulk_chunk_size
+        return await self._run_bulk_pipeline(
+            "literature",
+            self._iter_id_chunks(db, Literature, literature_ids, chunk_size, self._load_literature_chunk),
+            self._index_literature_chunk,
+        )
 
-    async def bulk_sync_segments(self, segment_ids: List[int], db: Session) -> None:
-        """批量同步段落到Elasticsearch"""
-        for segment_id in segment_ids:
-            await self.sync_literature_segment_to_es(segment_id, db)
+    async def bulk_sync_segments(self, segment_ids: List[int], db: Session) -> Dict[str, Any]:
+        """批量同步段落到Elasticsearch（批量嵌入 + bulk写入）"""
+        await self._ensure_client()
+        chunk_size = settings.es_bulk_chunk_size
+        return await self._run_bulk_pipeline(
+            "segments",
+            self._iter_id_chunks(db, LiteratureSegment, segment_ids, chunk_size, self._load_segment_chunk),
+            self._index_segment_chunk,
+        )
 
     async def rebuild_project_indices(
         self,
         project_id: int,
         db: Session,
-        progress_callback: Optional[Callable[[int, int, str], Awaitable[None]]] = None,
-    ) -> None:
-        """重新同步项目相关文献和段落到Elasticsearch"""
+        progress_callback: Optional[ProgressCallback] = None,
+        resume: bool = True,
+    ) -> Dict[str, Any]:
+        """重新同步项目相关文献和段落到Elasticsearch
+
+        按主键分批流式读取、批量生成嵌入并通过bulk接口写入，每完成一段连续批次
+        就把已完成的最大ID写入检查点；中断后再次调用会从检查点继续。
+        """
 
         await self._ensure_client()
 
-        literatures = (
-            db.query(Literature)
-            .filter(Literature.projects.any(id=project_id))
-            .all()
+        checkpoint = await self._load_checkpoint(project_id) if resume else {}
+        if not resume:
+            await self._clear_checkpoint(project_id)
+
+        literature_after = int(checkpoint.get("literature", 0))
+        segment_after = int(checkpoint.get("segments", 0))
+
+        literature_total = (
+            db.query(Literature.id)
+            .filter(Literature.projects.any(id=project_id), Literature.id > literature_after)
+            .count()
         )
-        segments = (
-            db.query(LiteratureSegment)
+        segment_total = (
+            db.query(LiteratureSegment.id)
             .join(Literature)
-            .filter(Literature.projects.any(id=project_id))
-            .all()
+            .filter(Literature.projects.any(id=project_id), LiteratureSegment.id > segment_after)
+            .count()
         )
 
-        total = len(literatures) + len(segments)
+        total = literature_total + segment_total
         if total == 0:
-            return
+            await self._clear_checkpoint(project_id)
+            return {"literature": {"indexed": 0, "failed": 0}, "segments": {"indexed": 0, "failed": 0}}
+
+        if literature_after or segment_after:
+            logger.info(
+                f"Resuming index rebuild for project {project_id} "
+                f"from literature>{literature_after}, segments>{segment_after}"
+            )
 
         processed = 0
 
-        for literature in literatures:
-            await self.sync_literature_to_es(literature.id, db)
-            processed += 1
+        async def report(count: int, message: str) -> None:
+            nonlocal processed
+            processed += count
             if progress_callback:
-                await progress_callback(processed, total, f"同步文献 {literature.title[:50]}")
+                await progress_callback(processed, total, message)
 
-        for segment in segments:
-            await self.sync_literature_segment_to_es(segment.id, db)
-            processed += 1
-            if progress_callback:
-                await progress_callback(processed, total, f"同步段落 #{segment.id}")
+        chunk_size = settings.es_bulk_chunk_size
+
+        literature_result = await self._run_bulk_pipeline(
+            "literature",
+            self._iter_project_literature_chunks(db, project_id, literature_after, chunk_size),
+            self._index_literature_chunk,
+            on_chunk_done=lambda count: report(count, f"同步文献 {processed + count}/{total}"),
+            on_checkpoint=lambda last_id: self._save_checkpoint(project_id, "literature", last_id),
+        )
+        segment_result = await self._run_bulk_pipeline(
+            "segments",
+            self._iter_project_segment_chunks(db, project_id, segment_after, chunk_size),
+            self._index_segment_chunk,
+            on_chunk_done=lambda count: report(count, f"同步段落 {processed + count}/{total}"),
+            on_checkpoint=lambda last_id: self._save_checkpoint(project_id, "segments", last_id),
+        )
+
+        if not literature_result["failed"] and not segment_result["failed"]:
+            await self._clear_checkpoint(project_id)
+
+        return {"literature": literature_result, "segments": segment_result}
+
+    # ------------------------------------------------------------------
+    # 批量流水线
+    # ------------------------------------------------------------------
+    async def _run_bulk_pipeline(
+        self,
+        kind: str,
+        chunks: Iterator[Dict[str, Any]],
+        index_chunk: Callable[[List[Dict[str, Any]]], Awaitable[List[str]]],
+        on_chunk_done: Optional[Callable[[int], Awaitable[None]]] = None,
+        on_checkpoint: Optional[Callable[[int], Awaitable[None]]] = None,
+    ) -> Dict[str, Any]:
+        """生产者读取批次、多个消费者并发嵌入和写入。
+
+        队列长度等于并发数，读库速度超过写入速度时生产者会阻塞（背压）。
+        批次可能乱序完成，检查点只推进到连续完成的最后一个批次。
+        """
+        concurrency = max(1, settings.es_bulk_concurrency)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+        last_ids: Dict[int, int] = {}
+        finished: Dict[int, bool] = {}
+        next_to_commit = 0
+        checkpoint_lock = asyncio.Lock()
+        result = {"indexed": 0, "failed": 0}
+
+        async def advance_checkpoint() -> None:
+            nonlocal next_to_commit
+            # 串行写检查点，避免并发写入乱序导致检查点回退
+            async with checkpoint_lock:
+                last_committed = None
+                while finished.get(next_to_commit):
+                    last_committed = last_ids.pop(next_to_commit)
+                    finished.pop(next_to_commit)
+                    next_to_commit += 1
+                if last_committed is not None and on_checkpoint:
+                    await on_checkpoint(last_committed)
+
+        async def produce() -> None:
+            try:
+                for sequence, chunk in enumerate(chunks):
+                    last_ids[sequence] = chunk["last_id"]
+                    await queue.put((sequence, chunk["documents"]))
+                    # 让出事件循环，避免同步读库长时间阻塞
+                    await asyncio.sleep(0)
+            finally:
+                for _ in range(concurrency):
+                    await queue.put(None)
+
+        async def consume() -> None:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                sequence, documents = item
+                success = await self._index_with_retry(kind, documents, index_chunk)
+                if success:
+                    result["indexed"] += len(documents)
+                    finished[sequence] = True
+                    await advance_checkpoint()
+                else:
+                    result["failed"] += len(documents)
+                if on_chunk_done:
+                    await on_chunk_done(len(documents))
+
+        await asyncio.gather(produce(), *(consume() for _ in range(concurrency)))
+        logger.info(f"Bulk {kind} sync completed: {result['indexed']} indexed, {result['failed']} failed")
+        return result
+
+    async def _index_with_retry(
+        self,
+        kind: str,
+        documents: List[Dict[str, Any]],
+        index_chunk: Callable[[List[Dict[str, Any]]], Awaitable[List[str]]],
+    ) -> bool:
+        """写入单个批次，失败时只重试失败的文档"""
+        pending = documents
+        max_attempts = max(1, settings.es_bulk_max_retries)
+        for attempt in range(1, max_attempts + 1):
+            try:
+                failed_ids = set(await index_chunk(pending))
+                if not failed_ids:
+                    return True
+                id_field = "segment_id" if kind == "segments" else "literature_id"
+                pending = [doc for doc in pending if str(doc[id_field]) in failed_ids]
+                logger.warning(f"Bulk {kind} chunk attempt {attempt}: {len(pending)} documents failed")
+            except Exception as e:
+                logger.warning(f"Bulk {kind} chunk attempt {attempt} failed: {e}")
+            if attempt < max_attempts:
+                await asyncio.sleep(min(2 ** attempt, 30))
+        logger.error(f"Giving up on {len(pending)} {kind} documents after {max_attempts} attempts")
+        return False
+
+    async def _index_literature_chunk(self, documents: List[Dict[str, Any]]) -> List[str]:
+        titles = [doc.get("title") or "" for doc in documents]
+        abstracts = [doc.get("abstract") or "" for doc in documents]
+        embeddings = await self.ai_service.get_embeddings_batch(titles + abstracts)
+        title_vectors, abstract_vectors = embeddings[:len(documents)], embeddings[len(documents):]
+
+        for doc, title, abstract, title_vector, abstract_vector in zip(
+            documents, titles, abstracts, title_vectors, abstract_vectors
+        ):
+            if title and _usable_vector(title_vector):
+                doc["title_embedding"] = title_vector
+            if abstract and _usable_vector(abstract_vector):
+                doc["abstract_embedding"] = abstract_vector
+
+        response = await self.es_client.bulk_index(
+            "literature_index", documents, id_field="literature_id"
+        )
+        return response["failed"]
+
+    async def _index_segment_chunk(self, documents: List[Dict[str, Any]]) -> List[str]:
+        contents = [doc.get("content") or "" for doc in documents]
+        embeddings = await self.ai_service.get_embeddings_batch(contents)
+
+        for doc, content, vector in zip(documents, contents, embeddings):
+            if content and _usable_vector(vector):
+                doc["content_embedding"] = vector
+
+        response = await self.es_client.bulk_index(
+            "literature_segments_index", documents, id_field="segment_id"
+        )
+        return response["failed"]
+
+    # ------------------------------------------------------------------
+    # 分批读取
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _project_ids_by_literature(db: Session, literature_ids: Sequence[int]) -> Dict[int, List[int]]:
+        """一次查询取得一批文献关联的项目ID"""
+        mapping: Dict[int, List[int]] = {literature_id: [] for literature_id in literature_ids}
+        if not literature_ids:
+            return mapping
+        rows = db.execute(
+            select(
+                project_literature_association.c.literature_id,
+                project_literature_association.c.project_id,
+            ).where(project_literature_association.c.literature_id.in_(list(literature_ids)))
+        )
+        for literature_id, project_id in rows:
+            mapping.setdefault(literature_id, []).append(project_id)
+        return mapping
+
+    def _load_literature_chunk(self, db: Session, query) -> Dict[str, Any]:
+        literatures = query.all()
+        documents = [build_literature_document(literature) for literature in literatures]
+        return {"last_id": literatures[-1].id if literatures else 0, "documents": documents}
+
+    def _load_segment_chunk(self, db: Session, query) -> Dict[str, Any]:
+        segments = query.options(joinedload(LiteratureSegment.literature)).all()
+        project_ids = self._project_ids_by_literature(
+            db, list({segment.literature_id for segment in segments})
+        )
+        documents = [
+            build_segment_document(segment, segment.literature, project_ids.get(segment.literature_id, []))
+            for segment in segments
+        ]
+        return {"last_id": segments[-1].id if segments else 0, "documents": documents}
+
+    def _iter_project_literature_chunks(
+        self, db: Session, project_id: int, after_id: int, chunk_size: int
+    ) -> Iterator[Dict[str, Any]]:
+        """按主键键集分页读取项目文献，每批一条有界查询"""
+        while True:
+            query = (
+                db.query(Literature)
+                .filter(Literature.projects.any(id=project_id), Literature.id > after_id)
+                .order_by(Literature.id)
+                .limit(chunk_size)
+            )
+            chunk = self._load_literature_chunk(db, query)
+            if not chunk["documents"]:
+                return
+            after_id = chunk["last_id"]
+            yield chunk
+
+    def _iter_project_segment_chunks(
+        self, db: Session, project_id: int, after_id: int, chunk_size: int
+    ) -> Iterator[Dict[str, Any]]:
+        """按主键键集分页读取项目段落"""
+        while True:
+            query = (
+                db.query(LiteratureSegment)
+                .join(Literature)
+                .filter(Literature.projects.any(id=project_id), LiteratureSegment.id > after_id)
+                .order_by(LiteratureSegment.id)
+                .limit(chunk_size)
+            )
+            chunk = self._load_segment_chunk(db, query)
+            if not chunk["documents"]:
+                return
+            after_id = chunk["last_id"]
+            yield chunk
+
+    def _iter_id_chunks(
+        self,
+        db: Session,
+        model,
+        ids: Sequence[int],
+        chunk_size: int,
+        loader: Callable[[Session, Any], Dict[str, Any]],
+    ) -> Iterator[Dict[str, Any]]:
+        """按给定ID列表分批读取"""
+        ordered_ids = sorted(set(ids))
+        for start in range(0, len(ordered_ids), chunk_size):
+            chunk_ids = ordered_ids[start:start + chunk_size]
+            query = db.query(model).filter(model.id.in_(chunk_ids)).order_by(model.id)
+            chunk = loader(db, query)
+            if chunk["documents"]:
+                yield chunk
+
+    # ------------------------------------------------------------------
+    # 检查点
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _checkpoint_key(project_id: int) -> str:
+        return REINDEX_CHECKPOINT_KEY.format(project_id=project_id)
+
+    async def _load_checkpoint(self, project_id: int) -> Dict[str, str]:
+        try:
+            client = await redis_manager.get_client()
+            if client is None:
+                return {}
+            raw = await client.hgetall(self._checkpoint_key(project_id)) or {}
+            return {
+                (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+                for k, v in raw.items()
+            }
+        except Exception as e:
+            logger.warning(f"Failed to load reindex checkpoint for project {project_id}: {e}")
+            return {}
+
+    async def _save_checkpoint(self, project_id: int, kind: str, last_id: int) -> None:
+        try:
+            client = await redis_manager.get_client()
+            if client is not None:
+                await client.hset(self._checkpoint_key(project_id), kind, last_id)
+        except Exception as e:
+            logger.warning(f"Failed to save reindex checkpoint for project {project_id}: {e}")
+
+    async def _clear_checkpoint(self, project_id: int) -> None:
+        try:
+            client = await redis_manager.get_client()
+            if client is not None:
+                await client.delete(self._checkpoint_key(project_id))
+        except Exception as e:
+            logger.warning(f"Failed to clear reindex checkpoint for project {project_id}: {e}")
 
     async def remove_literature_from_es(self, literature_id: int):
         """从Elasticsearch移除文献"""
@@ -284,19 +602,8 @@ class DataSyncService:
 
     async def bulk_sync_literature_to_es(self, literature_ids: List[int], db: Session):
         """批量同步文献到Elasticsearch"""
-        success_count = 0
-        failed_count = 0
-
-        for literature_id in literature_ids:
-            try:
-                await self.sync_literature_to_es(literature_id, db)
-                success_count += 1
-            except Exception as e:
-                logger.error(f"Failed to sync literature {literature_id}: {e}")
-                failed_count += 1
-
-        logger.info(f"Bulk sync completed: {success_count} success, {failed_count} failed")
-        return {"success": success_count, "failed": failed_count}
+        result = await self.bulk_sync_literature(literature_ids, db)
+        return {"success": result["indexed"], "failed": result["failed"]}
 
     async def verify_sync_status(self, literature_id: int) -> Dict[str, bool]:
         """验证文献同步状态"""
@@ -0,0 +1,366 @@
+"""Content-addressed cache for text embeddings.
+
+Vectors are keyed by ``sha256(model + text)`` and looked up in three
+tiers: an in-process LRU, Redis (shared between workers) and an append-only
+float32 store on local disk.  Hits in a slower tier are promoted to the faster
+ones so repeated queries and re-indexing runs never reach the embeddings API.
+
+The key covers exactly the text sent to the API: callers clean the input once
+and pass the same string to both the cache and the embeddings request, so two
+inputs share a vector only if the API would have embedded identical text.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+
+from app.core.config import settings
+from app.core.redis import CacheKeys, redis_manager
+
+try:  # pragma: no cover - fcntl is unavailable on Windows
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+_DIGEST_SIZE = 32
+_REDIS_RETRY_INTERVAL = 60.0
+
+
+def embedding_key(model: str, text: str) -> bytes:
+    """Return the binary SHA-256 digest identifying ``text`` under ``model``."""
+
+    payload = f"{model}\x00{text}".encode("utf-8")
+    return hashlib.sha256(payload).digest()
+
+
+class _MemoryTier:
+    """Thread-safe LRU of float32 vectors."""
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._items: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._items.get(key)
+            if vector is not None:
+                self._items.move_to_end(key)
+            return vector
+
+    def put(self, key: bytes, vector: np.ndarray) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._items[key] = vector
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class _DiskSegment:
+    """Append-only vector file for a single (model, dimension) pair.
+
+    ``<name>.keys`` holds 32-byte digests and ``<name>.f32`` the matching
+    little-endian float32 rows in the same order, so the index can be rebuilt
+    by reading only the (small) key file.
+    """
+
+    def __init__(self, base_path: Path, dim: int) -> None:
+        self.dim = dim
+        self.keys_path = base_path.with_suffix(".keys")
+        self.vectors_path = base_path.with_suffix(".f32")
+        self._row_bytes = dim * 4
+        self._index: Dict[bytes, int] = {}
+        self._scanned_rows = 0
+
+    def _row_count_on_disk(self) -> int:
+        try:
+            key_rows = self.keys_path.stat().st_size // _DIGEST_SIZE
+            vector_rows = self.vectors_path.stat().st_size // self._row_bytes
+        except FileNotFoundError:
+            return 0
+        return min(key_rows, vector_rows)
+
+    def refresh(self) -> None:
+        """Index rows appended since the last scan (possibly by other processes)."""
+
+        rows = self._row_count_on_disk()
+        if rows <= self._scanned_rows:
+            return
+        with open(self.keys_path, "rb") as handle:
+            handle.seek(self._scanned_rows * _DIGEST_SIZE)
+            data = handle.read((rows - self._scanned_rows) * _DIGEST_SIZE)
+        for offset in range(0, len(data), _DIGEST_SIZE):
+            self._index[data[offset:offset + _DIGEST_SIZE]] = self._scanned_rows + offset // _DIGEST_SIZE
+        self._scanned_rows = rows
+
+    def read(self, keys: Iterable[bytes]) -> Dict[bytes, np.ndarray]:
+        positions = {key: self._index[key] for key in keys if key in self._index}
+        if not positions:
+            return {}
+        found: Dict[bytes, np.ndarray] = {}
+        fd = os.open(self.vectors_path, os.O_RDONLY)
+        try:
+            for key, row in positions.items():
+                raw = os.pread(fd, self._row_bytes, row * self._row_bytes)
+                if len(raw) == self._row_bytes:
+                    found[key] = np.frombuffer(raw, dtype="<f4")
+        finally:
+            os.close(fd)
+        return found
+
+    def append(self, items: Dict[bytes, np.ndarray]) -> None:
+        new_items = {key: vector for key, vector in items.items() if key not in self._index}
+        if not new_items:
+            return
+        self.keys_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.keys_path, "ab") as keys_handle, open(self.vectors_path, "ab") as vectors_handle:
+            if fcntl is not None:
+                fcntl.flock(keys_handle.fileno(), fcntl.LOCK_EX)
+            try:
+                # 先对齐到两份文件中较短的一份，丢弃崩溃时写了一半的记录
+                rows = self._row_count_on_disk()
+                keys_handle.truncate(rows * _DIGEST_SIZE)
+                vectors_handle.truncate(rows * self._row_bytes)
+                vectors_handle.write(b"".join(
+                    np.asarray(vector, dtype="<f4").tobytes() for vector in new_items.values()
+                ))
+                vectors_handle.flush()
+                keys_handle.write(b"".join(new_items.keys()))
+                keys_handle.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(keys_handle.fileno(), fcntl.LOCK_UN)
+        self.refresh()
+
+
+class _DiskTier:
+    """Compact on-disk float32 store, one segment per model and dimension."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._segments: Dict[str, Dict[int, _DiskSegment]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _safe_name(model: str) -> str:
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", model)
+
+    def _model_segments(self, model: str) -> Dict[int, _DiskSegment]:
+        segments = self._segments.get(model)
+        if segments is None:
+            segments = {}
+            pattern = f"{self._safe_name(model)}-*.keys"
+            for keys_path in self.root.glob(pattern) if self.root.exists() else []:
+                try:
+                    dim = int(keys_path.stem.rsplit("-", 1)[1])
+                except (IndexError, ValueError):
+                    continue
+                segments[dim] = _DiskSegment(keys_path.with_suffix(""), dim)
+            self._segments[model] = segments
+        return segments
+
+    def get_many(self, model: str, keys: Sequence[bytes]) -> Dict[bytes, np.ndarray]:
+        with self._lock:
+            found: Dict[bytes, np.ndarray] = {}
+            for segment in self._model_segments(model).values():
+                segment.refresh()
+                found.update(segment.read(key for key in keys if key not in found))
+            return found
+
+    def put_many(self, model: str, items: Dict[bytes, np.ndarray]) -> None:
+        with self._lock:
+            segments = self._model_segments(model)
+            by_dim: Dict[int, Dict[bytes, np.ndarray]] = {}
+            for key, vector in items.items():
+                by_dim.setdefault(int(vector.shape[0]), {})[key] = vector
+            for dim, dim_items in by_dim.items():
+                segment = segments.get(dim)
+                if segment is None:
+                    segment = _DiskSegment(self.root / f"{self._safe_name(model)}-{dim}", dim)
+                    segments[dim] = segment
+                segment.refresh()
+                segment.append(dim_items)
+
+
+class EmbeddingCache:
+    """Three-tier embedding cache shared by every ``AIService`` instance."""
+
+    def __init__(
+        self,
+        memory_size: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        redis_ttl: Optional[int] = None,
+        enabled: Optional[bool] = None,
+    ) -> None:
+        self.enabled = settings.embedding_cache_enabled if enabled is None else enabled
+        self.redis_ttl = redis_ttl or settings.embedding_cache_redis_ttl
+        self._memory = _MemoryTier(memory_size if memory_size is not None else settings.embedding_cache_memory_size)
+        self._disk = _DiskTier(Path(cache_dir or settings.embedding_cache_dir))
+        self._redis_retry_at = 0.0
+        self.stats: Dict[str, int] = {
+            "memory_hits": 0,
+            "redis_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Redis helpers
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _redis_key(model: str, key: bytes) -> str:
+        return f"{CacheKeys.PREFIX}embedding:{model}:{key.hex()}"
+
+    async def _redis_client(self):
+        if time.monotonic() < self._redis_retry_at:
+            return None
+        try:
+            client = await redis_manager.get_client()
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.debug(f"嵌入缓存无法获取Redis客户端: {exc}")
+            client = None
+        if client is None:
+            self._redis_retry_at = time.monotonic() + _REDIS_RETRY_INTERVAL
+        return client
+
+    async def _redis_get_many(self, model: str, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        client = await self._redis_client()
+        if client is None or not keys:
+            return {}
+        try:
+            values = await client.mget([self._redis_key(model, key) for key in keys])
+        except Exception as exc:
+            logger.debug(f"嵌入缓存Redis读取失败: {exc}")
+            self._redis_retry_at = time.monotonic() + _REDIS_RETRY_INTERVAL
+            return {}
+        return {
+            key: np.frombuffer(value, dtype="<f4")
+            for key, value in zip(keys, values)
+            if value
+        }
+
+    async def _redis_set_many(self, model: str, items: Dict[bytes, np.ndarray]) -> None:
+        client = await self._redis_client()
+        if client is None or not items:
+            return
+        try:
+            pipeline = client.pipeline()
+            for key, vector in items.items():
+                pipeline.setex(self._redis_key(model, key), self.redis_ttl, vector.astype("<f4").tobytes())
+            await pipeline.execute()
+        except Exception as exc:
+            logger.debug(f"嵌入缓存Redis写入失败: {exc}")
+            self._redis_retry_at = time.monotonic() + _REDIS_RETRY_INTERVAL
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    async def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Look up ``texts`` and return a vector (or ``None`` on miss) per input."""
+
+        if not self.enabled:
+            return [None] * len(texts)
+
+        keys = [embedding_key(model, text) for text in texts]
+        # 命中与未命中都按去重后的键统计
+        unique_keys = list(dict.fromkeys(keys))
+        found: Dict[bytes, np.ndarray] = {}
+
+        for key in unique_keys:
+            vector = self._memory.get(key)
+            if vector is not None:
+                found[key] = vector
+        self.stats["memory_hits"] += len(found)
+
+        pending = [key for key in unique_keys if key not in found]
+        if pending:
+            redis_found = await self._redis_get_many(model, pending)
+            self.stats["redis_hits"] += len(redis_found)
+            for key, vector in redis_found.items():
+                self._memory.put(key, vector)
+            found.update(redis_found)
+            pending = [key for key in pending if key not in redis_found]
+
+        if pending:
+            try:
+                disk_found = await asyncio.to_thread(self._disk.get_many, model, pending)
+            except Exception as exc:
+                logger.warning(f"嵌入缓存磁盘读取失败: {exc}")
+                disk_found = {}
+            self.stats["disk_hits"] += len(disk_found)
+            for key, vector in disk_found.items():
+                self._memory.put(key, vector)
+            if disk_found:
+                await self._redis_set_many(model, disk_found)
+            found.update(disk_found)
+
+        self.stats["misses"] += sum(1 for key in unique_keys if key not in found)
+        return [found[key].tolist() if key in found else None for key in keys]
+
+    async def get(self, model: str, text: str) -> Optional[List[float]]:
+        return (await self.get_many(model, [text]))[0]
+
+    async def set_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Store freshly computed vectors in every tier."""
+
+        if not self.enabled or not texts:
+            return
+
+        items: Dict[bytes, np.ndarray] = {}
+        for text, vector in zip(texts, vectors):
+            array = np.asarray(vector, dtype="<f4")
+            if array.size == 0 or not np.any(array):
+                # 零向量是失败时的兜底值，不能写入缓存
+                continue
+            items[embedding_key(model, text)] = array
+        if not items:
+            return
+
+        for key, vector in items.items():
+            self._memory.put(key, vector)
+        await self._redis_set_many(model, items)
+        try:
+            await asyncio.to_thread(self._disk.put_many, model, items)
+        except Exception as exc:
+            logger.warning(f"嵌入缓存磁盘写入失败: {exc}")
+        self.stats["stores"] += len(items)
+
+    async def set(self, model: str, text: str, vector: Sequence[float]) -> None:
+        await self.set_many(model, [text], [vector])
+
+    def get_stats(self) -> Dict[str, float]:
+        hits = self.stats["memory_hits"] + self.stats["redis_hits"] + self.stats["disk_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "hits": hits,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+
+
+embedding_cache = EmbeddingCache()
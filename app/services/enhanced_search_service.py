@@ -7,12 +7,19 @@ import json
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 
+from app.core.config import settings
 from app.core.elasticsearch import get_elasticsearch
 from app.services.ai_service import AIService
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 混合检索结果融合方式
+FUSION_WEIGHTED = "weighted"      # 原始分数加权（旧行为）
+FUSION_NORMALIZED = "normalized"  # 各路分数min-max归一化后加权
+FUSION_RRF = "rrf"                # 倒数排名融合，只依赖名次
+FUSION_MODES = {FUSION_WEIGHTED, FUSION_NORMALIZED, FUSION_RRF}
+
 class EnhancedSearchService:
     """基于Elasticsearch的增强搜索服务"""
 
@@ -30,7 +37,8 @@ class EnhancedSearchService:
         project_id: Optional[int] = None,
         search_type: str = "hybrid",  # hybrid, semantic, keyword
         top_k: int = 10,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        fusion: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         混合搜索：语义搜索 + 关键词搜索
@@ -41,6 +49,7 @@ class EnhancedSearchService:
             search_type: 搜索类型 (hybrid, semantic, keyword)
             top_k: 返回结果数量
             filters: 额外过滤条件
+            fusion: 结果融合方式 (rrf, normalized, weighted)，默认取配置
 
         Returns:
             搜索结果字典
@@ -51,10 +60,23 @@ class EnhancedSearchService:
             elif search_type == "keyword":
                 return await self.keyword_search(query, project_id, top_k, filters)
             else:
-                # 混合搜索
-                semantic_results = await self.semantic_search(query, project_id, top_k * 2, filters)
-                keyword_results = await self.keyword_search(query, project_id, top_k * 2, filters)
-                return self.merge_and_rerank(semantic_results, keyword_results, top_k)
+                # 混合搜索：查询向量生成+语义检索与关键词检索并发执行
+                semantic_results, keyword_results = await asyncio.gather(
+                    self.semantic_search(query, project_id, top_k * 2, filters),
+                    self.keyword_search(query, project_id, top_k * 2, filters),
+                    return_exceptions=True
+                )
+
+                if isinstance(semantic_results, Exception) and isinstance(keyword_results, Exception):
+                    raise semantic_results
+                if isinstance(semantic_results, Exception):
+                    logger.warning(f"Semantic leg failed, using keyword results only: {semantic_results}")
+                    semantic_results = {"results": []}
+                if isinstance(keyword_results, Exception):
+                    logger.warning(f"Keyword leg failed, using semantic results only: {keyword_results}")
+                    keyword_results = {"results": []}
+
+                return self.merge_and_rerank(semantic_results, keyword_results, top_k, fusion=fusion)
 
         except Exception as e:
             logger.error(f"Hybrid search failed: {e}")
@@ -99,6 +121,19 @@ class EnhancedSearchService:
                         "terms": {"keywords": filters["keywords"]}
                     })
 
+            source_fields = [
+                "segment_id", "literature_id", "content", "section_title",
+                "literature_title", "literature_authors", "publication_year",
+                "structured_data", "extraction_confidence"
+            ]
+
+            if settings.semantic_search_mode == "knn":
+                try:
+                    return await self._knn_search(query_embedding, filter_conditions, top_k, source_fields)
+                except Exception as knn_error:
+                    # 旧索引的向量字段未建立HNSW索引时退回暴力检索
+                    logger.warning(f"kNN search failed, falling back to script_score: {knn_error}")
+
             # 构建语义搜索查询
             search_body = {
                 "size": top_k,
@@ -115,11 +150,7 @@ class EnhancedSearchService:
                         }
                     }
                 },
-                "_source": [
-                    "segment_id", "literature_id", "content", "section_title",
-                    "literature_title", "literature_authors", "publication_year",
-                    "structured_data", "extraction_confidence"
-                ]
+                "_source": source_fields
             }
 
             response = await self.es_client.search(
@@ -133,6 +164,35 @@ class EnhancedSearchService:
             logger.error(f"Semantic search failed: {e}")
             raise
 
+    async def _knn_search(
+        self,
+        query_embedding: List[float],
+        filter_conditions: List[Dict[str, Any]],
+        top_k: int,
+        source_fields: List[str]
+    ) -> Dict[str, Any]:
+        """基于HNSW的近似kNN检索，过滤条件作为预过滤在图搜索中生效"""
+        num_candidates = max(settings.es_knn_num_candidates, top_k * settings.es_knn_candidate_factor)
+        knn_clause: Dict[str, Any] = {
+            "field": "content_embedding",
+            "query_vector": query_embedding,
+            "k": top_k,
+            "num_candidates": min(num_candidates, 10000),  # ES上限
+        }
+        if filter_conditions:
+            knn_clause["filter"] = filter_conditions
+
+        response = await self.es_client.search(
+            index_name="literature_segments_index",
+            query={"knn": knn_clause, "size": top_k, "_source": source_fields}
+        )
+
+        # cosine相似度的kNN得分为 (1 + cos) / 2，换算成与script_score一致的 cos + 1
+        for hit in response.get("hits", {}).get("hits", []):
+            hit["_score"] = (hit.get("_score") or 0.0) * 2.0
+
+        return self._format_search_results(response, "semantic")
+
     async def keyword_search(
         self,
         query: str,
@@ -312,43 +372,88 @@ class EnhancedSearchService:
         self,
         semantic_results: Dict[str, Any],
         keyword_results: Dict[str, Any],
-        top_k: int
+        top_k: int,
+        fusion: Optional[str] = None
     ) -> Dict[str, Any]:
-        """合并和重新排序搜索结果"""
+        """合并和重新排序搜索结果
+
+        每条结果保留各路原始分数（``semantic_score``/``keyword_score``），
+        ``hybrid_score`` 按融合方式计算并用于排序：
+
+        - ``rrf``: sum(1 / (k + rank))，不受两路分数量纲差异影响
+        - ``normalized``: 两路分数分别min-max归一化到[0, 1]后加权
+        - ``weighted``: 原始分数直接加权（旧行为）
+        """
         try:
+            fusion = fusion or settings.hybrid_search_fusion
+            if fusion not in FUSION_MODES:
+                logger.warning(f"Unknown fusion mode {fusion!r}, falling back to {FUSION_RRF}")
+                fusion = FUSION_RRF
+
+            semantic_weight = settings.hybrid_search_semantic_weight
+            keyword_weight = 1.0 - semantic_weight
+
             # 提取结果
             semantic_hits = semantic_results.get("results", [])
             keyword_hits = keyword_results.get("results", [])
 
+            semantic_norm = self._normalize_scores(semantic_hits)
+            keyword_norm = self._normalize_scores(keyword_hits)
+
             # 创建结果字典
             merged_results = {}
 
             # 添加语义搜索结果
-            for hit in semantic_hits:
+            for rank, hit in enumerate(semantic_hits, 1):
                 segment_id = hit["segment_id"]
                 hit["semantic_score"] = hit["score"]
                 hit["keyword_score"] = 0.0
+                hit["semantic_rank"] = rank
+                hit["keyword_rank"] = None
+                hit["_semantic_norm"] = semantic_norm[rank - 1]
+                hit["_keyword_norm"] = 0.0
                 merged_results[segment_id] = hit
 
             # 添加关键词搜索结果
-            for hit in keyword_hits:
+            for rank, hit in enumerate(keyword_hits, 1):
                 segment_id = hit["segment_id"]
                 if segment_id in merged_results:
                     # 已存在，添加关键词分数
-                    merged_results[segment_id]["keyword_score"] = hit["score"]
-                    merged_results[segment_id]["highlights"] = hit.get("highlights", {})
+                    existing = merged_results[segment_id]
+                    existing["keyword_score"] = hit["score"]
+                    existing["keyword_rank"] = rank
+                    existing["_keyword_norm"] = keyword_norm[rank - 1]
+                    existing["highlights"] = hit.get("highlights", {})
                 else:
                     # 新结果
                     hit["semantic_score"] = 0.0
                     hit["keyword_score"] = hit["score"]
+                    hit["semantic_rank"] = None
+                    hit["keyword_rank"] = rank
+                    hit["_semantic_norm"] = 0.0
+                    hit["_keyword_norm"] = keyword_norm[rank - 1]
                     merged_results[segment_id] = hit
 
             # 计算混合分数并排序
+            rrf_k = settings.hybrid_search_rrf_k
             for result in merged_results.values():
-                # 混合分数：语义搜索权重0.6，关键词搜索权重0.4
-                result["hybrid_score"] = (
-                    result["semantic_score"] * 0.6 + result["keyword_score"] * 0.4
-                )
+                semantic_norm_score = result.pop("_semantic_norm")
+                keyword_norm_score = result.pop("_keyword_norm")
+                if fusion == FUSION_RRF:
+                    score = 0.0
+                    if result["semantic_rank"] is not None:
+                        score += semantic_weight / (rrf_k + result["semantic_rank"])
+                    if result["keyword_rank"] is not None:
+                        score += keyword_weight / (rrf_k + result["keyword_rank"])
+                    result["hybrid_score"] = score
+                elif fusion == FUSION_NORMALIZED:
+                    result["hybrid_score"] = (
+                        semantic_norm_score * semantic_weight + keyword_norm_score * keyword_weight
+                    )
+                else:
+                    result["hybrid_score"] = (
+                        result["semantic_score"] * semantic_weight + result["keyword_score"] * keyword_weight
+                    )
 
             # 按混合分数排序并返回前top_k个结果
             sorted_results = sorted(
@@ -361,6 +466,7 @@ class EnhancedSearchService:
                 "total": len(sorted_results),
                 "results": sorted_results,
                 "search_type": "hybrid",
+                "fusion": fusion,
                 "timestamp": datetime.now().isoformat()
             }
 
@@ -368,6 +474,17 @@ class EnhancedSearchService:
             logger.error(f"Failed to merge and rerank results: {e}")
             raise
 
+    @staticmethod
+    def _normalize_scores(hits: List[Dict[str, Any]]) -> List[float]:
+        """将一路检索的分数min-max归一化到[0, 1]"""
+        scores = [float(hit.get("score") or 0.0) for hit in hits]
+        if not scores:
+            return []
+        low, high = min(scores), max(scores)
+        if high == low:
+            return [1.0 for _ in scores]
+        return [(score - low) / (high - low) for score in scores]
+
     def _format_search_results(self, es_response: Dict[str, Any], search_type: str) -> Dict[str, Any]:
         """格式化搜索结果"""
         hits = es_response.get("hits", {})
@@ -13,6 +13,7 @@ from sqlalchemy import and_, desc
 
 from app.core.config import settings
 from app.services.ai_service import AIService
+from app.services.llm_cache import llm_cache
 from app.services.literature_reliability_service import LiteratureReliabilityService
 from app.services.progressive_batch_strategy import create_progressive_batch_strategy, BatchResult, BatchPhase
 from app.models.experience import ExperienceBook, MainExperience
@@ -21,6 +22,16 @@ from app.models.task import Task, TaskProgress
 from app.models.project import Project
 from app.models.user import User, MembershipType
 
+
+def _is_relevance_score(content: str) -> bool:
+    """缓存校验：只缓存可解析为数值的相关性评分"""
+    try:
+        float(content.strip())
+    except (AttributeError, ValueError):
+        return False
+    return True
+
+
 class EnhancedExperienceEngine:
     """增强版经验引擎 - 商业化版本"""
     
@@ -616,11 +627,13 @@ class EnhancedExperienceEngine:
 请只返回数值，如：0.75
 """
             
-            response = await self.ai_service.client.chat.completions.create(
+            response = await llm_cache.create(
+                self.ai_service.client,
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
-                max_tokens=50
+                max_tokens=50,
+                validate=_is_relevance_score
             )
             
             relevance_text = response.choices[0].message.content.strip()
@@ -18,7 +18,6 @@ import hashlib
 from sqlalchemy.orm import Session
 
 # 文档处理库
-import PyPDF2
 from docx import Document
 from pptx import Presentation
 import pandas as pd
@@ -28,6 +27,7 @@ from bs4 import BeautifulSoup
 from app.core.config import settings
 from app.services.ai_service import AIService
 from app.services.pdf_processor import PDFProcessor
+from app.services.pdf_worker_pool import PRIORITY_INTERACTIVE
 from app.models.user import User
 from app.models.project import Project
 
@@ -375,20 +375,10 @@ class FileUploadService:
             return {"success": False, "error": str(e)}
     
     async def _extract_pdf_content(self, file_path: str) -> str:
-        """提取PDF内容"""
+        """提取PDF内容（分级提取：快速解析质量不足时才升级到MinerU）"""
         try:
-            # 首先尝试使用MinerU
-            content = await self.pdf_processor.extract_text(file_path)
-            if content and len(content.strip()) > 100:
-                return content
-            
-            # 如果MinerU失败，使用PyPDF2作为备用
-            with open(file_path, "rb") as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                content = ""
-                for page in pdf_reader.pages:
-                    content += page.extract_text() + "\n"
-                return content.strip()
+            content = await self.pdf_processor.process_pdf_async(file_path, priority=PRIORITY_INTERACTIVE)
+            return (content or "").strip()
                 
         except Exception as e:
             logger.error(f"PDF内容提取失败: {e}")
@@ -505,8 +505,8 @@ class IntelligentAIRouter:
         # 这里应该根据model_type调用相应的API
         # 暂时使用OpenAI API作为示例
         
-        from openai import AsyncOpenAI
-        client = AsyncOpenAI(api_key=settings.openai_api_key)
+        from app.core.async_clients import async_clients
+        client = async_clients.openai()
         
         try:
             response = await client.chat.completions.create(
@@ -13,6 +13,7 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from app.core.config import settings
 from app.services.ai_service import AIService
+from app.services.llm_concurrency import PRIORITY_BATCH, llm_priority
 from app.services.pdf_processor import PDFProcessor
 from app.models.literature import Literature, LiteratureSegment
 from app.models.project import Project
@@ -189,8 +190,9 @@ class LightweightStructuringService:
                 task = self._extract_single_literature(project, literature)
                 tasks.append(task)
             
-            # 执行并行任务
-            batch_results = await asyncio.gather(*tasks, return_exceptions=True)
+            # 执行并行任务（大模型调用的实际并发由全局控制器决定，批处理优先级低于交互请求）
+            with llm_priority(PRIORITY_BATCH):
+                batch_results = await asyncio.gather(*tasks, return_exceptions=True)
             
             # 统计结果
             for i, result in enumerate(batch_results):
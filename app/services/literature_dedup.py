@@ -0,0 +1,219 @@
+"""
+搜索建库批量去重
+
+原先每个候选各查两次库（DOI、未建索引的 TEXT 标题），再与已接受的候选两两比较。
+现在整批候选只查一次库（doi IN / title_hash IN，分块），批内重复用哈希集合判定，
+并可选用 MinHash/LSH 在标题字符三元组上识别近似重复（如副标题标点、单复数差异）。
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.literature import Literature
+from app.utils.literature_identity import (
+    hash_normalized_title,
+    normalize_doi,
+    normalize_title,
+    strip_doi_prefix,
+)
+
+# IN 列表分块大小，避免超出数据库参数个数上限
+_LOOKUP_CHUNK = 500
+_SHINGLE_SIZE = 3
+_MAX_HASH = (1 << 32) - 1
+_SIGNATURE_CHUNK = 1000
+
+
+@dataclass
+class CandidateKey:
+    doi: Optional[str]
+    title_hash: Optional[str]
+    title: str
+
+
+def candidate_key(doi: Optional[str], title: Optional[str]) -> CandidateKey:
+    normalized = normalize_title(title)
+    return CandidateKey(doi=normalize_doi(doi), title_hash=hash_normalized_title(normalized), title=normalized)
+
+
+def _chunks(values: Sequence[str]) -> Iterable[Sequence[str]]:
+    for start in range(0, len(values), _LOOKUP_CHUNK):
+        yield values[start:start + _LOOKUP_CHUNK]
+
+
+def find_existing_literature(
+    db: Session,
+    dois: Iterable[Optional[str]],
+    hashes: Iterable[Optional[str]],
+) -> Tuple[Set[str], Set[str]]:
+    """批量查询库中已存在的 DOI（归一化后）与标题哈希"""
+    # 库中 DOI 按原样保存，同时查询原值、去掉解析前缀后的值及其小写形式
+    lookup_dois: Set[str] = set()
+    for doi in dois:
+        if doi:
+            stripped = strip_doi_prefix(doi)
+            lookup_dois.update((doi, stripped, stripped.lower()))
+    lookup_dois = sorted(lookup_dois)
+    title_hashes = sorted({value for value in hashes if value})
+
+    existing_dois: Set[str] = set()
+    for chunk in _chunks(lookup_dois):
+        existing_dois.update(
+            normalize_doi(doi) for doi in db.scalars(select(Literature.doi).where(Literature.doi.in_(chunk)))
+        )
+    existing_hashes: Set[str] = set()
+    for chunk in _chunks(title_hashes):
+        existing_hashes.update(
+            db.scalars(select(Literature.title_hash).where(Literature.title_hash.in_(chunk)))
+        )
+    existing_dois.discard(None)
+    return existing_dois, existing_hashes
+
+
+def title_shingles(titles: Sequence[str]) -> List[np.ndarray]:
+    """
+    计算归一化标题的 UTF-8 字节三元组（b0<<16 | b1<<8 | b2），整批标题一次性向量化
+
+    不足三个字节的标题返回空数组，不参与近似重复判断。
+    """
+    encoded = [title.encode("utf-8") for title in titles]
+    lengths = np.fromiter((len(data) for data in encoded), dtype=np.int64, count=len(encoded))
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint32)
+    if data.size < _SHINGLE_SIZE:
+        return [np.empty(0, dtype=np.uint32) for _ in titles]
+    ids = (data[:-2] << np.uint32(16)) | (data[1:-1] << np.uint32(8)) | data[2:]
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    windows = np.maximum(lengths - (_SHINGLE_SIZE - 1), 0)
+    return [ids[start:start + count] for start, count in zip(starts, windows)]
+
+
+class TitleMinHashIndex:
+    """标题近似重复检测：MinHash 签名 + LSH 分桶，候选对再以精确 Jaccard 复核"""
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 32, bands: int = 8, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm 必须能被 bands 整除")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        # 每个排列为 (a*x + b) mod 2^32（uint32 自然回绕），a 取奇数保证是双射
+        self._a = rng.integers(0, _MAX_HASH, size=num_perm, dtype=np.uint32) | np.uint32(1)
+        self._b = rng.integers(0, _MAX_HASH, size=num_perm, dtype=np.uint32)
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+        self._shingles: List[np.ndarray] = []
+        self._sets: Dict[int, Set[int]] = {}
+
+    def signatures(self, shingles: Sequence[np.ndarray]) -> np.ndarray:
+        """批量计算 MinHash 签名，按块展开以限制中间矩阵大小；空标题的签名全为最大值"""
+        result = np.full((len(shingles), self.num_perm), _MAX_HASH, dtype=np.uint32)
+        for start in range(0, len(shingles), _SIGNATURE_CHUNK):
+            rows = [row for row in range(start, min(start + _SIGNATURE_CHUNK, len(shingles))) if shingles[row].size]
+            if not rows:
+                continue
+            values = np.concatenate([shingles[row] for row in rows])
+            with np.errstate(over="ignore"):
+                hashed = np.multiply.outer(self._a, values) + self._b[:, None]
+            lengths = np.fromiter((shingles[row].size for row in rows), dtype=np.int64, count=len(rows))
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            result[rows] = np.minimum.reduceat(hashed, offsets, axis=1).T
+        return result
+
+    def band_keys(self, signatures: np.ndarray) -> List[List[int]]:
+        """把每个签名按 LSH 分段折叠成整数键（键冲突只会多出候选，最终由 Jaccard 复核）"""
+        bands = signatures.reshape(len(signatures), self.bands, self.rows).astype(np.uint64)
+        with np.errstate(over="ignore"):
+            keys = (bands * self._a[:self.rows].astype(np.uint64)).sum(axis=2, dtype=np.uint64)
+        return keys.tolist()
+
+    def _set(self, position: int) -> Set[int]:
+        cached = self._sets.get(position)
+        if cached is None:
+            cached = self._sets[position] = set(self._shingles[position].tolist())
+        return cached
+
+    def find(self, shingles: np.ndarray, keys: Sequence[int]) -> Optional[int]:
+        """返回与给定标题近似重复的已登记标题序号，没有时返回 None"""
+        if not shingles.size:
+            return None
+        candidates: Set[int] = set()
+        for band, key in enumerate(keys):
+            candidates.update(self._buckets[band].get(key, ()))
+        if not candidates:
+            return None
+        current = set(shingles.tolist())
+        for candidate in sorted(candidates):
+            other = self._set(candidate)
+            if len(current & other) / len(current | other) >= self.threshold:
+                return candidate
+        return None
+
+    def add(self, shingles: np.ndarray, keys: Sequence[int]) -> int:
+        position = len(self._shingles)
+        self._shingles.append(shingles)
+        if shingles.size:
+            for band, key in enumerate(keys):
+                self._buckets[band].setdefault(key, []).append(position)
+        return position
+
+
+@dataclass
+class DedupResult:
+    unique: List[int] = field(default_factory=list)
+    existing: List[int] = field(default_factory=list)
+    batch_duplicates: List[int] = field(default_factory=list)
+    near_duplicates: List[int] = field(default_factory=list)
+
+
+def deduplicate_candidates(
+    db: Session,
+    candidates: Sequence[Tuple[Optional[str], Optional[str]]],
+    near_duplicate: bool = True,
+    near_threshold: float = 0.8,
+) -> DedupResult:
+    """
+    对 (doi, title) 候选列表去重，按输入顺序保留首次出现的候选
+
+    Returns:
+        各类候选在输入中的下标
+    """
+    keys = [candidate_key(doi, title) for doi, title in candidates]
+    existing_dois, existing_hashes = find_existing_literature(
+        db, [doi for doi, _ in candidates], [key.title_hash for key in keys]
+    )
+
+    result = DedupResult()
+    seen_dois: Set[str] = set()
+    seen_hashes: Set[str] = set()
+    exact_unique: List[int] = []
+    for position, key in enumerate(keys):
+        if (key.doi and key.doi in existing_dois) or (key.title_hash and key.title_hash in existing_hashes):
+            result.existing.append(position)
+        elif (key.doi and key.doi in seen_dois) or (key.title_hash and key.title_hash in seen_hashes):
+            result.batch_duplicates.append(position)
+        else:
+            if key.doi:
+                seen_dois.add(key.doi)
+            if key.title_hash:
+                seen_hashes.add(key.title_hash)
+            exact_unique.append(position)
+
+    if not near_duplicate:
+        result.unique = exact_unique
+        return result
+
+    index = TitleMinHashIndex(threshold=near_threshold)
+    shingles = title_shingles([keys[position].title for position in exact_unique])
+    band_keys = index.band_keys(index.signatures(shingles))
+    for position, title_ids, keys in zip(exact_unique, shingles, band_keys):
+        if index.find(title_ids, keys) is not None:
+            result.near_duplicates.append(position)
+            continue
+        index.add(title_ids, keys)
+        result.unique.append(position)
+    return result
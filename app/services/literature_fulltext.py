@@ -0,0 +1,170 @@
+"""
+文献库内全文检索
+
+文献列表的关键词过滤原先使用 title/abstract 的 ILIKE '%x%'，每次都会全表扫描。
+这里按数据库方言提供全文检索条件与相关度得分:
+- MySQL: title+abstract 上的 FULLTEXT 索引（ngram 分词器，支持中文），布尔模式短语匹配;
+- SQLite（轻量模式）: FTS5 外部内容表（trigram 分词器），通过触发器与 literature 表同步。
+
+索引不存在或关键词短于分词粒度时返回 None，由调用方回退到 ILIKE。
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import column, func, literal_column, select, table, text
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import ColumnElement, Select
+
+from app.core.config import settings
+from app.models.literature import Literature
+
+MYSQL_FULLTEXT_INDEX = "ix_literature_fulltext"
+SQLITE_FTS_TABLE = "literature_fts"
+
+# MySQL ngram_token_size 默认为 2；SQLite trigram 分词器要求至少 3 个字符
+_MIN_TOKEN_LENGTH = {"mysql": 2, "sqlite": 3}
+_TOKEN_SPLIT = re.compile(r"\s+")
+_UNSAFE_CHARS = re.compile(r'["*+\-<>()~@]')
+
+_SQLITE_FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(
+        title, abstract, content='literature', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai AFTER INSERT ON literature BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, abstract) VALUES (new.id, new.title, new.abstract);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad AFTER DELETE ON literature BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, abstract)
+        VALUES ('delete', old.id, old.title, old.abstract);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au AFTER UPDATE OF title, abstract ON literature BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, abstract)
+        VALUES ('delete', old.id, old.title, old.abstract);
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, abstract) VALUES (new.id, new.title, new.abstract);
+    END
+    """,
+]
+
+
+def ensure_sqlite_fulltext(connection: Connection) -> bool:
+    """创建 SQLite FTS5 表及同步触发器；首次创建时从 literature 表重建索引
+
+    返回 False 表示当前 SQLite 不支持 FTS5/trigram，此时继续使用 ILIKE。
+    """
+    existed = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": SQLITE_FTS_TABLE},
+    ).first() is not None
+    try:
+        for statement in _SQLITE_FTS_DDL:
+            connection.exec_driver_sql(statement)
+        if not existed:
+            connection.exec_driver_sql(
+                f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')"
+            )
+    except Exception as exc:
+        logger.warning(f"SQLite 全文索引不可用，文献关键词过滤将使用 LIKE: {exc}")
+        return False
+    return True
+
+
+def _tokens(keyword: str) -> List[str]:
+    return [token for token in _TOKEN_SPLIT.split(_UNSAFE_CHARS.sub(" ", keyword)) if token]
+
+
+@dataclass
+class FulltextFilter:
+    """全文检索过滤条件；rank 为查询语句补充相关度得分列"""
+
+    condition: ColumnElement
+    rank: Callable[[Select], Tuple[Select, ColumnElement]]
+
+
+def _mysql_filter(tokens: List[str]) -> FulltextFilter:
+    # 每个词都作为必须出现的短语，语义与原先的子串匹配一致
+    against = " ".join(f'+"{token}"' for token in tokens)
+    score = match(Literature.title, Literature.abstract, against=against).in_boolean_mode()
+    return FulltextFilter(condition=score > 0, rank=lambda statement: (statement, score))
+
+
+def _sqlite_filter(tokens: List[str]) -> FulltextFilter:
+    fts = table(SQLITE_FTS_TABLE, column("rowid"))
+    expression = " ".join(f'"{token}"' for token in tokens)
+    matched = literal_column(SQLITE_FTS_TABLE).op("MATCH")(expression)
+
+    def rank(statement: Select) -> Tuple[Select, ColumnElement]:
+        hits = (
+            select(
+                fts.c.rowid.label("literature_id"),
+                # bm25 越小越相关，取负数使得分越大越相关
+                (-func.bm25(literal_column(SQLITE_FTS_TABLE))).label("score"),
+            )
+            .where(matched)
+            .subquery()
+        )
+        return statement.join(hits, hits.c.literature_id == Literature.id), hits.c.score
+
+    condition = Literature.id.in_(select(fts.c.rowid).where(matched))
+    return FulltextFilter(condition=condition, rank=rank)
+
+
+def fulltext_filter(dialect: str, keyword: str) -> Optional[FulltextFilter]:
+    """为指定方言构造全文检索条件；方言不支持或关键词短于分词粒度时返回 None"""
+    if dialect not in _MIN_TOKEN_LENGTH:
+        return None
+    tokens = _tokens(keyword)
+    if not tokens or any(len(token) < _MIN_TOKEN_LENGTH[dialect] for token in tokens):
+        return None
+    return _mysql_filter(tokens) if dialect == "mysql" else _sqlite_filter(tokens)
+
+
+class LiteratureFulltextSearch:
+    """按连接方言构造全文检索条件，并缓存各数据库上索引是否存在"""
+
+    def __init__(self):
+        self._available: Dict[str, bool] = {}
+
+    async def build(self, db, keyword: str) -> Optional[FulltextFilter]:
+        if not settings.literature_fulltext_enabled:
+            return None
+        bind = getattr(db, "bind", None)
+        dialect = getattr(getattr(bind, "dialect", None), "name", None)
+        fulltext = fulltext_filter(dialect, keyword)
+        if fulltext is None or not await self._is_available(db, bind, dialect):
+            return None
+        return fulltext
+
+    async def _is_available(self, db, bind, dialect: str) -> bool:
+        key = str(bind.url)
+        if key not in self._available:
+            if dialect == "mysql":
+                statement = text(
+                    "SELECT 1 FROM information_schema.statistics "
+                    "WHERE table_schema = DATABASE() AND table_name = 'literature' AND index_name = :name"
+                ).bindparams(name=MYSQL_FULLTEXT_INDEX)
+            else:
+                statement = text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+                ).bindparams(name=SQLITE_FTS_TABLE)
+            try:
+                self._available[key] = (await db.scalar(statement)) is not None
+            except Exception as exc:
+                logger.warning(f"检查文献全文索引失败: {exc}")
+                return False
+            if not self._available[key]:
+                logger.info("文献全文索引不存在，关键词过滤使用 LIKE")
+        return self._available[key]
+
+
+literature_fulltext_search = LiteratureFulltextSearch()
@@ -8,18 +8,15 @@ import hashlib
 from typing import List, Dict, Optional, Tuple, Union
 from enum import Enum
 from dataclasses import dataclass
-from pathlib import Path
-import aiofiles
 import aiohttp
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
-import PyPDF2
-import pdfplumber
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.models.shared_literature import SharedLiterature, LiteratureProcessingTask
 from app.services.research_rabbit_client import ResearchRabbitClient
 from app.services.pdf_processor import PDFProcessor
+from app.services.pdf_extraction import pdf_extraction_engine
 from app.core.config import settings
 
 class ProcessingMethod(Enum):
@@ -39,6 +36,24 @@ class ProcessingStatus(Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
+_METHOD_STATUS = {
+    ProcessingMethod.FAST_BASIC: ProcessingStatus.PROCESSING_FAST,
+    ProcessingMethod.STANDARD: ProcessingStatus.PROCESSING_STANDARD,
+    ProcessingMethod.PREMIUM_MINERU: ProcessingStatus.PROCESSING_PREMIUM,
+}
+
+_METHOD_QUALITY = {
+    ProcessingMethod.FAST_BASIC: 60,  # 快速处理质量较低
+    ProcessingMethod.STANDARD: 80,  # 标准质量
+    ProcessingMethod.PREMIUM_MINERU: 95,  # 最高质量
+}
+
+_METHOD_FEATURES = {
+    ProcessingMethod.FAST_BASIC: ["基础文本提取", "快速处理"],
+    ProcessingMethod.STANDARD: ["文本提取", "表格识别", "布局保持"],
+    ProcessingMethod.PREMIUM_MINERU: ["高质量OCR", "完整结构识别", "公式提取", "图表分析", "Markdown输出"],
+}
+
 @dataclass
 class ProcessingTask:
     """处理任务"""
@@ -46,8 +61,8 @@ class ProcessingTask:
     paper_id: str
     title: str
     pdf_url: str
-    doi: Optional[str] = None
     method: ProcessingMethod
+    doi: Optional[str] = None
     priority: int = 5
     created_at: float = None
 
@@ -206,16 +221,8 @@ class LiteratureProcessingPipeline:
             
             self.task_progress[task.task_id] = 0.3
             
-            # 2. 根据方法选择处理方式
-            if task.method == ProcessingMethod.FAST_BASIC:
-                result = await self._process_pdf_fast(pdf_content, task)
-            elif task.method == ProcessingMethod.STANDARD:
-                result = await self._process_pdf_standard(pdf_content, task)
-            elif task.method == ProcessingMethod.PREMIUM_MINERU:
-                result = await self._process_pdf_premium(pdf_content, task)
-            else:
-                # 默认快速处理
-                result = await self._process_pdf_fast(pdf_content, task)
+            # 2. 分级处理：按指定方式开始，质量不足时自动升级
+            result = await self._process_pdf(pdf_content, task)
             
             # 3. 保存结果
             self.task_status[task.task_id] = ProcessingStatus.COMPLETED
@@ -251,158 +258,39 @@ class LiteratureProcessingPipeline:
                     await asyncio.sleep(2 ** attempt)  # 指数退避
             return None
     
-    async def _process_pdf_fast(self, pdf_content: bytes, task: ProcessingTask) -> Dict:
-        """快速PDF处理 (PyPDF2) - 1-2秒"""
-        self.task_status[task.task_id] = ProcessingStatus.PROCESSING_FAST
-        self.task_progress[task.task_id] = 0.5
-        
-        start_time = time.time()
-        
-        # 在线程池中运行CPU密集型操作
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            self.thread_executor,
-            self._extract_text_pypdf2,
-            pdf_content
-        )
-        
-        processing_time = time.time() - start_time
-        
-        return {
-            "success": True,
-            "task_id": task.task_id,
-            "title": task.title,
-            "method": "fast_basic",
-            "processing_time": f"{processing_time:.2f}s",
-            "content": result.get("text", ""),
-            "metadata": result.get("metadata", {}),
-            "quality_score": 60,  # 快速处理质量较低
-            "features": ["基础文本提取", "快速处理"]
-        }
-    
-    async def _process_pdf_standard(self, pdf_content: bytes, task: ProcessingTask) -> Dict:
-        """标准PDF处理 (pdfplumber) - 3-5秒"""
-        self.task_status[task.task_id] = ProcessingStatus.PROCESSING_STANDARD
+    async def _process_pdf(self, pdf_content: bytes, task: ProcessingTask) -> Dict:
+        """
+        分级PDF处理
+
+        从任务指定的方式开始提取，结果未通过质量探测时自动升级到更高质量的后端，
+        大部分原生数字版PDF在快速解析后即可完成。
+        """
+        self.task_status[task.task_id] = _METHOD_STATUS.get(task.method, ProcessingStatus.PROCESSING_FAST)
         self.task_progress[task.task_id] = 0.5
-        
+
         start_time = time.time()
-        
-        # 在线程池中运行CPU密集型操作
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            self.thread_executor,
-            self._extract_text_pdfplumber,
-            pdf_content
-        )
-        
+        extraction = await pdf_extraction_engine.extract(pdf_content, method=task.method.value)
         processing_time = time.time() - start_time
-        
+
+        method = ProcessingMethod(extraction.backend)
+        self.task_status[task.task_id] = _METHOD_STATUS[method]
         return {
             "success": True,
             "task_id": task.task_id,
             "title": task.title,
-            "method": "standard",
+            "method": method.value,
             "processing_time": f"{processing_time:.2f}s",
-            "content": result.get("text", ""),
-            "metadata": result.get("metadata", {}),
-            "tables": result.get("tables", []),
-            "quality_score": 80,  # 标准质量
-            "features": ["文本提取", "表格识别", "布局保持"]
+            # MinerU 返回结构化内容，其余后端返回纯文本
+            "content": extraction.content if extraction.content is not None else extraction.text,
+            "metadata": {**extraction.metadata, "pages": extraction.page_count},
+            "tables": extraction.tables,
+            "quality_score": _METHOD_QUALITY[method],
+            "quality_probe": extraction.quality.as_dict() if extraction.quality else None,
+            "escalated": method != task.method,
+            "attempts": extraction.attempts,
+            "features": _METHOD_FEATURES[method]
         }
     
-    async def _process_pdf_premium(self, pdf_content: bytes, task: ProcessingTask) -> Dict:
-        """高质量PDF处理 (MinerU) - 30-60秒"""
-        self.task_status[task.task_id] = ProcessingStatus.PROCESSING_PREMIUM
-        self.task_progress[task.task_id] = 0.5
-        
-        start_time = time.time()
-        
-        # 保存临时文件
-        temp_path = f"/tmp/temp_pdf_{task.task_id}.pdf"
-        async with aiofiles.open(temp_path, 'wb') as f:
-            await f.write(pdf_content)
-        
-        # 使用现有的MinerU处理器
-        result = await self.pdf_processor.process_pdf(temp_path)
-        
-        # 清理临时文件
-        Path(temp_path).unlink(missing_ok=True)
-        
-        processing_time = time.time() - start_time
-        
-        if result.get("success"):
-            return {
-                "success": True,
-                "task_id": task.task_id,
-                "title": task.title,
-                "method": "premium_mineru",
-                "processing_time": f"{processing_time:.2f}s",
-                "content": result.get("content", {}),
-                "metadata": result.get("metadata", {}),
-                "quality_score": 95,  # 最高质量
-                "features": ["高质量OCR", "完整结构识别", "公式提取", "图表分析", "Markdown输出"]
-            }
-        else:
-            # MinerU失败时降级到标准处理
-            return await self._process_pdf_standard(pdf_content, task)
-    
-    def _extract_text_pypdf2(self, pdf_content: bytes) -> Dict:
-        """PyPDF2文本提取 (同步函数)"""
-        try:
-            import io
-            from PyPDF2 import PdfReader
-            
-            pdf_file = io.BytesIO(pdf_content)
-            reader = PdfReader(pdf_file)
-            
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            
-            return {
-                "text": text,
-                "metadata": {
-                    "pages": len(reader.pages),
-                    "method": "PyPDF2"
-                }
-            }
-        except Exception as e:
-            return {"text": "", "metadata": {"error": str(e)}}
-    
-    def _extract_text_pdfplumber(self, pdf_content: bytes) -> Dict:
-        """pdfplumber文本提取 (同步函数)"""
-        try:
-            import io
-            import pdfplumber
-            
-            pdf_file = io.BytesIO(pdf_content)
-            text = ""
-            tables = []
-            
-            with pdfplumber.open(pdf_file) as pdf:
-                for page in pdf.pages:
-                    # 提取文本
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                    
-                    # 提取表格
-                    page_tables = page.extract_tables()
-                    if page_tables:
-                        tables.extend(page_tables)
-            
-            return {
-                "text": text,
-                "tables": tables,
-                "metadata": {
-                    "pages": len(pdf.pages),
-                    "method": "pdfplumber",
-                    "tables_found": len(tables)
-                }
-            }
-        except Exception as e:
-            return {"text": "", "tables": [], "metadata": {"error": str(e)}}
-    
     async def _handle_user_choices(self, tasks: List[ProcessingTask], callback):
         """处理用户实时选择"""
         for task in tasks:
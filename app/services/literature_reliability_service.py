@@ -14,6 +14,7 @@ from sqlalchemy import desc, asc
 from app.models.literature import Literature, LiteratureSegment
 from app.models.experience import MainExperience
 from app.services.ai_service import AIService
+from app.services.llm_cache import is_json_content
 
 
 class LiteratureReliabilityService:
@@ -215,7 +216,8 @@ class LiteratureReliabilityService:
                 deviation_prompt,
                 model="gpt-4",
                 max_tokens=800,
-                temperature=0.2
+                temperature=0.2,
+                cache_validator=is_json_content
             )
             
             if response.get("success"):
@@ -0,0 +1,369 @@
+"""Content-hash cache for deterministic chat completions.
+
+Screening, extraction and structure-recognition prompts run at temperature
+0.1-0.2 on identical inputs across retries, re-runs and projects.  Completions
+are keyed by ``sha256(model + normalized messages + sampling params)`` and kept
+in an in-process LRU backed by a size-bounded SQLite file on local disk, so a
+repeated prompt never reaches the API again until its TTL expires.
+
+Only low-temperature requests are cached by default; callers can force or skip
+caching per call.  Hits, misses and the tokens a hit saved are reported to
+``task_cost_tracker`` under the ``llm_completion`` cache entry.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from loguru import logger
+
+from app.core.config import settings
+from app.services.task_cost_tracker import task_cost_tracker
+
+CACHE_NAME = "llm_completion"
+_KEY_VERSION = "v1"
+_WHITESPACE_RE = re.compile(r"\s+")
+# 影响输出内容的采样参数；其余参数（如超时）不参与缓存键
+_KEY_PARAMS = (
+    "temperature",
+    "top_p",
+    "max_tokens",
+    "presence_penalty",
+    "frequency_penalty",
+    "response_format",
+    "seed",
+    "stop",
+    "tools",
+    "tool_choice",
+)
+_EVICTION_CHECK_EVERY = 50
+
+
+def normalize_prompt(text: str) -> str:
+    normalized = unicodedata.normalize("NFC", text or "")
+    return _WHITESPACE_RE.sub(" ", normalized).strip()
+
+
+def completion_key(model: str, messages: Sequence[Dict[str, Any]], params: Dict[str, Any]) -> str:
+    payload = {
+        "version": _KEY_VERSION,
+        "model": model,
+        "messages": [
+            {"role": message.get("role"), "content": normalize_prompt(str(message.get("content", "")))}
+            for message in messages
+        ],
+        "params": {name: params[name] for name in _KEY_PARAMS if params.get(name) is not None},
+    }
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def is_json_content(content: str) -> bool:
+    """缓存校验：只缓存可直接解析为 JSON 的回复"""
+    try:
+        json.loads(content)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+@dataclass
+class _Usage:
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+
+
+@dataclass
+class _Message:
+    content: str
+    role: str = "assistant"
+
+
+@dataclass
+class _Choice:
+    message: _Message
+    index: int = 0
+    finish_reason: str = "stop"
+
+
+@dataclass
+class CachedCompletion:
+    """命中缓存时返回的补全对象，字段与 OpenAI ChatCompletion 的常用部分一致
+
+    usage 为 None，调用方记录 token 用量时不会把缓存命中算作实际消耗；
+    原始用量保存在 saved_usage 中。
+    """
+
+    model: str
+    choices: List[_Choice]
+    saved_usage: _Usage
+    usage: None = None
+    cached: bool = True
+    created_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class _Entry:
+    content: str
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    expires_at: float
+
+
+class _DiskStore:
+    """SQLite 存储，按最近访问时间淘汰超出容量的条目"""
+
+    def __init__(self, path: Path, max_bytes: int) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                " key TEXT PRIMARY KEY, model TEXT, content TEXT,"
+                " prompt_tokens INTEGER, completion_tokens INTEGER, total_tokens INTEGER,"
+                " size INTEGER, expires_at REAL, accessed_at REAL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_completions_accessed ON completions (accessed_at)")
+            self._connection = connection
+        return self._connection
+
+    def get(self, key: str) -> Optional[_Entry]:
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT content, prompt_tokens, completion_tokens, total_tokens, expires_at"
+                " FROM completions WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[4] < now:
+                connection.execute("DELETE FROM completions WHERE key = ?", (key,))
+                connection.commit()
+                return None
+            connection.execute("UPDATE completions SET accessed_at = ? WHERE key = ?", (now, key))
+            connection.commit()
+        return _Entry(*row)
+
+    def put(self, key: str, model: str, entry: _Entry) -> None:
+        now = time.time()
+        size = len(entry.content.encode("utf-8")) + len(key) + 64
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model, entry.content, entry.prompt_tokens, entry.completion_tokens,
+                 entry.total_tokens, size, entry.expires_at, now),
+            )
+            connection.commit()
+            self._writes += 1
+            if self._writes % _EVICTION_CHECK_EVERY == 1:
+                self._evict(connection, now)
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> None:
+        connection.execute("DELETE FROM completions WHERE expires_at < ?", (now,))
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total > self.max_bytes:
+            # 淘汰到容量的 90%，避免每次写入都触发淘汰
+            target = total - int(self.max_bytes * 0.9)
+            removed = 0
+            stale_keys = []
+            for key, size in connection.execute("SELECT key, size FROM completions ORDER BY accessed_at"):
+                stale_keys.append((key,))
+                removed += size
+                if removed >= target:
+                    break
+            connection.executemany("DELETE FROM completions WHERE key = ?", stale_keys)
+        connection.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            connection = self._connect()
+            entries, size = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions"
+            ).fetchone()
+        return {"disk_entries": entries, "disk_bytes": size}
+
+
+class LLMCompletionCache:
+    """聊天补全缓存：内存 LRU → 本地 SQLite"""
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        cache_dir: Optional[str] = None,
+        ttl: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        memory_size: Optional[int] = None,
+        max_temperature: Optional[float] = None,
+    ) -> None:
+        self.enabled = settings.llm_cache_enabled if enabled is None else enabled
+        self.ttl = ttl or settings.llm_cache_ttl
+        self.max_temperature = settings.llm_cache_max_temperature if max_temperature is None else max_temperature
+        self.memory_size = settings.llm_cache_memory_size if memory_size is None else memory_size
+        self._memory: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._memory_lock = threading.Lock()
+        self._disk = _DiskStore(
+            Path(cache_dir or settings.llm_cache_dir) / "completions.sqlite3",
+            max_bytes or settings.llm_cache_max_bytes,
+        )
+        self.stats: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "bypassed": 0,
+            "saved_tokens": 0,
+        }
+
+    def should_cache(self, params: Dict[str, Any], cache: Optional[bool]) -> bool:
+        """cache=None 时按温度自动判断；True/False 强制开启或关闭"""
+        if not self.enabled or cache is False:
+            return False
+        if cache is True:
+            return True
+        if params.get("stream") or (params.get("n") or 1) > 1:
+            return False
+        temperature = params.get("temperature")
+        return temperature is not None and temperature <= self.max_temperature
+
+    def _memory_get(self, key: str) -> Optional[_Entry]:
+        with self._memory_lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at < time.time():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return entry
+
+    def _memory_put(self, key: str, entry: _Entry) -> None:
+        if self.memory_size <= 0:
+            return
+        with self._memory_lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    async def lookup(self, key: str) -> Optional[_Entry]:
+        entry = self._memory_get(key)
+        if entry is not None:
+            self.stats["memory_hits"] += 1
+            return entry
+        try:
+            entry = await asyncio.to_thread(self._disk.get, key)
+        except Exception as exc:
+            logger.warning(f"LLM缓存磁盘读取失败: {exc}")
+            entry = None
+        if entry is not None:
+            self.stats["disk_hits"] += 1
+            self._memory_put(key, entry)
+        return entry
+
+    async def store(self, key: str, model: str, content: str, usage: Any) -> None:
+        entry = _Entry(
+            content=content,
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+            total_tokens=getattr(usage, "total_tokens", 0) or 0,
+            expires_at=time.time() + self.ttl,
+        )
+        self._memory_put(key, entry)
+        try:
+            await asyncio.to_thread(self._disk.put, key, model, entry)
+        except Exception as exc:
+            logger.warning(f"LLM缓存磁盘写入失败: {exc}")
+        self.stats["stores"] += 1
+
+    async def create(
+        self,
+        client: Any,
+        *,
+        model: str,
+        messages: List[Dict[str, Any]],
+        cache: Optional[bool] = None,
+        validate: Optional[Callable[[str], bool]] = None,
+        **params: Any,
+    ) -> Any:
+        """
+        带缓存的 client.chat.completions.create
+
+        Args:
+            client: AsyncOpenAI 客户端
+            cache: None 按温度自动判断，True 强制缓存，False 跳过缓存
+            validate: 回复内容校验函数，返回 False 时不写入缓存（如要求 JSON）
+
+        Returns:
+            未命中时为 API 原始响应；命中时为 CachedCompletion（usage 为 None）
+        """
+        if not self.should_cache(params, cache):
+            self.stats["bypassed"] += 1
+            return await client.chat.completions.create(model=model, messages=messages, **params)
+
+        key = completion_key(model, messages, params)
+        entry = await self.lookup(key)
+        if entry is not None:
+            self.stats["saved_tokens"] += entry.total_tokens
+            task_cost_tracker.record_cache_usage(CACHE_NAME, hits=1, misses=0, saved_tokens=entry.total_tokens)
+            return CachedCompletion(
+                model=model,
+                choices=[_Choice(message=_Message(content=entry.content))],
+                saved_usage=_Usage(entry.prompt_tokens, entry.completion_tokens, entry.total_tokens),
+            )
+
+        self.stats["misses"] += 1
+        task_cost_tracker.record_cache_usage(CACHE_NAME, hits=0, misses=1)
+        response = await client.chat.completions.create(model=model, messages=messages, **params)
+        try:
+            content = response.choices[0].message.content
+        except (AttributeError, IndexError):
+            content = None
+        if content and content.strip() and (validate is None or validate(content)):
+            await self.store(key, model, content, getattr(response, "usage", None))
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        lookups = hits + self.stats["misses"]
+        stats: Dict[str, Any] = {
+            **self.stats,
+            "hits": hits,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+        try:
+            stats.update(self._disk.stats())
+        except Exception as exc:
+            logger.debug(f"读取LLM缓存磁盘统计失败: {exc}")
+        return stats
+
+    def clear_memory(self) -> None:
+        with self._memory_lock:
+            self._memory.clear()
+
+
+llm_cache = LLMCompletionCache()
@@ -0,0 +1,518 @@
+"""
+出站大模型调用的全局自适应并发控制
+
+文献处理任务、轻结构化提取与海量文献处理器各自用信号量或固定批次决定并发，
+彼此不协调，两个大任务同时运行就会触发服务商 429，随后所有重试一起退避。
+这里为每类调用（对话补全 / 嵌入）提供一个进程级控制器:
+
+- 并发上限按 AIMD 调整：调用成功且延迟低于目标时加性增加（每轮约 +1），
+  遇到 429 减半、延迟超标乘以 0.9，两次下调之间至少间隔一个平均延迟;
+- 每分钟请求数 / token 数预算通过 Redis 在 API 进程与各 Celery worker 间共享
+  （Redis 不可用时退回进程内计数），调用结束后按实际用量修正预估 token;
+- 429 会设置全局冷却期，其他进程在冷却期内同样暂停发起请求;
+- 等待槽位时按优先级排队（交互式 RAG 先于后台批处理），批处理只能使用
+  预算的一部分，为交互请求留出余量；先预占预算再排队取槽位，等待预算的
+  调用不占用槽位，交互请求不会被耗尽预算的批处理堵住;
+- 控制器是进程级单例，线程池中 asyncio.run 的调用也会用到：槽位状态由线程锁
+  保护，唤醒等待者时通过其所属事件循环的 call_soon_threadsafe 完成。
+
+优先级通过 llm_priority 上下文设置，嵌套的 AIService 调用自动继承。
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.redis import CacheKeys, redis_manager
+
+# 取值与 pdf_worker_pool 的优先级一致
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 5
+PRIORITY_BATCH = 10
+
+_REDIS_RETRY_INTERVAL = 60.0
+_DEFAULT_COMPLETION_TOKENS = 512
+
+_llm_priority: contextvars.ContextVar[int] = contextvars.ContextVar("llm_priority", default=PRIORITY_NORMAL)
+
+# 原子地检查冷却期与当前分钟的预算，未超出时预占一次请求与预估 token
+# 返回 0 表示获准，否则为需要等待的毫秒数
+_RESERVE_SCRIPT = """
+local cooldown = redis.call('PTTL', KEYS[2])
+if cooldown > 0 then return cooldown end
+local requests = tonumber(redis.call('HGET', KEYS[1], 'requests') or '0')
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens') or '0')
+if requests > 0 and (requests + 1 > tonumber(ARGV[2]) or tokens + tonumber(ARGV[1]) > tonumber(ARGV[3])) then
+  return tonumber(ARGV[4])
+end
+redis.call('HINCRBY', KEYS[1], 'requests', 1)
+redis.call('HINCRBY', KEYS[1], 'tokens', ARGV[1])
+redis.call('EXPIRE', KEYS[1], 120)
+return 0
+"""
+
+
+def current_priority() -> int:
+    return _llm_priority.get()
+
+
+@contextmanager
+def llm_priority(priority: int) -> Iterator[None]:
+    """在上下文内发起的大模型调用使用指定优先级（数值越小越优先）"""
+    token = _llm_priority.set(priority)
+    try:
+        yield
+    finally:
+        _llm_priority.reset(token)
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    return getattr(exc, "status_code", None) == 429
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class LLMCallTicket:
+    """一次获准的调用，记录预占的预算以便结束时修正"""
+
+    priority: int
+    estimated_tokens: int
+    window: int
+    redis_reserved: bool
+    started_at: float
+    actual_tokens: Optional[int] = None
+
+    def record_usage(self, response: Any) -> None:
+        usage = getattr(response, "usage", None)
+        total = getattr(usage, "total_tokens", None)
+        if total is not None:
+            self.actual_tokens = int(total)
+
+
+class LLMConcurrencyController:
+    """AIMD 并发上限 + 每分钟请求/token预算 + 优先级排队"""
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        enabled: Optional[bool] = None,
+        initial_limit: Optional[int] = None,
+        min_limit: Optional[int] = None,
+        max_limit: Optional[int] = None,
+        latency_target: Optional[float] = None,
+        use_redis: Optional[bool] = None,
+    ):
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.enabled = settings.llm_concurrency_enabled if enabled is None else enabled
+        self.min_limit = float(min_limit or settings.llm_concurrency_min)
+        self.max_limit = float(max_limit or settings.llm_concurrency_max)
+        self.limit = float(initial_limit or settings.llm_concurrency_initial)
+        self.latency_target = latency_target or settings.llm_latency_target
+        self.use_redis = settings.llm_budget_redis_enabled if use_redis is None else use_redis
+
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._cooldown_until = 0.0
+        self._last_decrease = 0.0
+        self._latency_ewma: Optional[float] = None
+        self._redis_retry_at = 0.0
+        # 进程内预算窗口：(分钟序号, 请求数, token数)
+        self._local_window = (0, 0, 0)
+        self.stats: Dict[str, Any] = {
+            "acquired": 0,
+            "rate_limited": 0,
+            "increases": 0,
+            "decreases": 0,
+            "budget_waits": 0,
+            "budget_wait_seconds": 0.0,
+            "queue_wait_seconds": {"interactive": 0.0, "normal": 0.0, "batch": 0.0},
+        }
+
+    # ------------------------------------------------------------------
+    # 并发槽位
+    # ------------------------------------------------------------------
+    @property
+    def capacity(self) -> int:
+        return max(1, int(self.limit))
+
+    def _wake(self) -> None:
+        """把空闲槽位分配给排队最前的等待者（调用方须持有 self._lock）"""
+        while self._waiters and self.in_flight < self.capacity:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            try:
+                # 等待者可能属于其他线程的事件循环，只能在其所属循环中设置结果
+                future.get_loop().call_soon_threadsafe(self._grant, future)
+            except RuntimeError:
+                # 等待者所属的事件循环已关闭
+                continue
+            self.in_flight += 1
+
+    def _grant(self, future: asyncio.Future) -> None:
+        if future.done():
+            # 槽位分配后、回调执行前等待者已被取消，归还槽位
+            self._release_slot()
+        else:
+            future.set_result(None)
+
+    async def _acquire_slot(self, priority: int) -> None:
+        with self._lock:
+            if self.in_flight < self.capacity and not self._waiters:
+                self.in_flight += 1
+                return
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+            self._wake()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 已分配到槽位后才被取消，归还槽位
+                self._release_slot()
+            raise
+
+    def _release_slot(self) -> None:
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._wake()
+
+    # ------------------------------------------------------------------
+    # 每分钟预算
+    # ------------------------------------------------------------------
+    def _budget_key(self, window: int) -> str:
+        return f"{CacheKeys.PREFIX}llm:budget:{self.name}:{window}"
+
+    def _cooldown_key(self) -> str:
+        return f"{CacheKeys.PREFIX}llm:cooldown:{self.name}"
+
+    async def _redis_client(self):
+        if not self.use_redis or time.monotonic() < self._redis_retry_at:
+            return None
+        try:
+            client = await redis_manager.get_client()
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.debug(f"LLM预算无法获取Redis客户端: {exc}")
+            client = None
+        if client is None:
+            self._redis_retry_at = time.monotonic() + _REDIS_RETRY_INTERVAL
+        return client
+
+    def _budget_limits(self, priority: int) -> Tuple[int, int]:
+        ratio = settings.llm_batch_budget_ratio if priority >= PRIORITY_BATCH else 1.0
+        return (
+            max(1, int(self.requests_per_minute * ratio)),
+            max(1, int(self.tokens_per_minute * ratio)),
+        )
+
+    async def _reserve(self, tokens: int, priority: int) -> Tuple[float, int, bool]:
+        """预占预算，返回 (需等待秒数, 窗口序号, 是否在Redis中预占)"""
+        cooldown = self._cooldown_until - time.monotonic()
+        if cooldown > 0:
+            return cooldown, 0, False
+
+        now = time.time()
+        window = int(now // 60)
+        window_remaining = 60 - now % 60
+        rpm, tpm = self._budget_limits(priority)
+
+        client = await self._redis_client()
+        if client is not None:
+            try:
+                wait_ms = await client.eval(
+                    _RESERVE_SCRIPT, 2, self._budget_key(window), self._cooldown_key(),
+                    tokens, rpm, tpm, max(1, int(window_remaining * 1000)),
+                )
+                return int(wait_ms) / 1000, window, int(wait_ms) == 0
+            except Exception as exc:
+                logger.debug(f"LLM预算Redis协调失败，改用进程内计数: {exc}")
+                self._redis_retry_at = time.monotonic() + _REDIS_RETRY_INTERVAL
+
+        with self._lock:
+            local_window, requests, used_tokens = self._local_window
+            if local_window != window:
+                requests, used_tokens = 0, 0
+            if requests > 0 and (requests + 1 > rpm or used_tokens + tokens > tpm):
+                return window_remaining, window, False
+            self._local_window = (window, requests + 1, used_tokens + tokens)
+        return 0.0, window, False
+
+    async def _settle(self, ticket: LLMCallTicket) -> None:
+        """按实际 token 用量修正预占的预算"""
+        if ticket.actual_tokens is None:
+            return
+        delta = ticket.actual_tokens - ticket.estimated_tokens
+        if not delta:
+            return
+        if ticket.redis_reserved:
+            client = await self._redis_client()
+            if client is not None:
+                try:
+                    await client.hincrby(self._budget_key(ticket.window), "tokens", delta)
+                except Exception as exc:
+                    logger.debug(f"修正LLM预算失败: {exc}")
+            return
+        with self._lock:
+            window, requests, used_tokens = self._local_window
+            if window == ticket.window:
+                self._local_window = (window, requests, max(0, used_tokens + delta))
+
+    # ------------------------------------------------------------------
+    # AIMD
+    # ------------------------------------------------------------------
+    def _decrease(self, factor: float, now: float) -> None:
+        # 同一批并发请求的拥塞信号只下调一次
+        spacing = self._latency_ewma or 1.0
+        if now - self._last_decrease < spacing:
+            return
+        self.limit = max(self.min_limit, self.limit * factor)
+        self._last_decrease = now
+        self.stats["decreases"] += 1
+
+    def _on_complete(self, latency: float) -> None:
+        self._latency_ewma = latency if self._latency_ewma is None else 0.8 * self._latency_ewma + 0.2 * latency
+        if latency > self.latency_target:
+            self._decrease(0.9, time.monotonic())
+        elif self.limit < self.max_limit:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self.stats["increases"] += 1
+
+    async def _on_rate_limited(self, exc: BaseException) -> None:
+        now = time.monotonic()
+        self.stats["rate_limited"] += 1
+        self._decrease(0.5, now)
+        cooldown = _retry_after(exc) or settings.llm_rate_limit_cooldown
+        self._cooldown_until = max(self._cooldown_until, now + cooldown)
+        client = await self._redis_client()
+        if client is not None:
+            try:
+                await client.set(self._cooldown_key(), "1", px=max(1, int(cooldown * 1000)))
+            except Exception as exc:
+                logger.debug(f"广播LLM冷却期失败: {exc}")
+        logger.warning(f"LLM调用触发限流({self.name})，并发上限降至 {self.capacity}，冷却 {cooldown:.1f}s")
+
+    # ------------------------------------------------------------------
+    # 对外接口
+    # ------------------------------------------------------------------
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int = 0, priority: Optional[int] = None) -> AsyncIterator[Optional[LLMCallTicket]]:
+        """
+        获取一次调用的并发槽位与预算
+
+        Args:
+            estimated_tokens: 预估 token 数（提示词 + 最大生成长度）
+            priority: 优先级，默认取 llm_priority 上下文
+
+        Yields:
+            LLMCallTicket，调用方可通过 record_usage 记录实际用量；未启用时为 None
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        priority = current_priority() if priority is None else priority
+
+        # 先预占预算再排队取槽位：等待预算时不占用槽位，
+        # 否则耗尽批处理份额的调用会占满槽位，把仍有预算的交互请求堵在队列里
+        while True:
+            wait, window, redis_reserved = await self._reserve(estimated_tokens, priority)
+            if wait <= 0:
+                break
+            self.stats["budget_waits"] += 1
+            self.stats["budget_wait_seconds"] += wait
+            await asyncio.sleep(wait + random.uniform(0, 0.25))
+
+        waited_from = time.monotonic()
+        await self._acquire_slot(priority)
+        try:
+            queue_wait = time.monotonic() - waited_from
+            wait_bucket = (
+                "interactive" if priority <= PRIORITY_INTERACTIVE
+                else "batch" if priority >= PRIORITY_BATCH
+                else "normal"
+            )
+            self.stats["queue_wait_seconds"][wait_bucket] += queue_wait
+
+            ticket = LLMCallTicket(
+                priority=priority,
+                estimated_tokens=estimated_tokens,
+                window=window,
+                redis_reserved=redis_reserved,
+                started_at=time.monotonic(),
+            )
+            self.stats["acquired"] += 1
+            try:
+                yield ticket
+            except BaseException as exc:
+                if is_rate_limit_error(exc):
+                    await self._on_rate_limited(exc)
+                raise
+            else:
+                self._on_complete(time.monotonic() - ticket.started_at)
+            await self._settle(ticket)
+        finally:
+            self._release_slot()
+
+    def get_stats(self) -> Dict[str, Any]:
+        waiting: Dict[str, int] = {"interactive": 0, "normal": 0, "batch": 0}
+        with self._lock:
+            waiters = list(self._waiters)
+        for priority, _, future in waiters:
+            if future.done():
+                continue
+            if priority <= PRIORITY_INTERACTIVE:
+                waiting["interactive"] += 1
+            elif priority >= PRIORITY_BATCH:
+                waiting["batch"] += 1
+            else:
+                waiting["normal"] += 1
+        window, requests, tokens = self._local_window
+        return {
+            **self.stats,
+            "name": self.name,
+            "enabled": self.enabled,
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting": waiting,
+            "latency_ewma": round(self._latency_ewma, 3) if self._latency_ewma is not None else None,
+            "cooling_down": self._cooldown_until > time.monotonic(),
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "redis_coordinated": self.use_redis and time.monotonic() >= self._redis_retry_at,
+            "local_window": {"requests": requests, "tokens": tokens} if window == int(time.time() // 60) else {},
+        }
+
+
+def estimate_chat_tokens(kwargs: Dict[str, Any]) -> int:
+    """按字符数粗略估算提示词 token（中英文混排约 3 字符/token），加上最大生成长度"""
+    prompt_chars = sum(len(str(message.get("content") or "")) for message in kwargs.get("messages") or [])
+    return prompt_chars // 3 + int(kwargs.get("max_tokens") or _DEFAULT_COMPLETION_TOKENS)
+
+
+def estimate_embedding_tokens(kwargs: Dict[str, Any]) -> int:
+    inputs = kwargs.get("input") or []
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    return max(1, sum(len(str(text)) for text in inputs) // 3)
+
+
+chat_limiter = LLMConcurrencyController(
+    "chat", settings.llm_chat_requests_per_minute, settings.llm_chat_tokens_per_minute
+)
+embedding_limiter = LLMConcurrencyController(
+    "embedding", settings.llm_embedding_requests_per_minute, settings.llm_embedding_tokens_per_minute
+)
+
+
+class _GovernedEndpoint:
+    def __init__(self, create, controller: LLMConcurrencyController, estimate):
+        self._create = create
+        self._controller = controller
+        self._estimate = estimate
+
+    async def create(self, **kwargs):
+        if kwargs.get("stream"):
+            return _GovernedStream(self, kwargs)
+        async with self._controller.slot(self._estimate(kwargs)) as ticket:
+            response = await self._create(**kwargs)
+            if ticket is not None:
+                ticket.record_usage(response)
+            return response
+
+
+class _GovernedStream:
+    """流式补全：槽位与预算一直持有到流被读完或关闭，按最后一个分块的 usage 结算
+
+    请求在首次迭代时发出；提前停止读取时调用方应 close()，以便及时释放槽位。
+    """
+
+    def __init__(self, endpoint: _GovernedEndpoint, kwargs: Dict[str, Any]):
+        self._chunks = self._iterate(endpoint, kwargs)
+
+    @staticmethod
+    async def _iterate(endpoint: _GovernedEndpoint, kwargs: Dict[str, Any]) -> AsyncIterator[Any]:
+        async with endpoint._controller.slot(endpoint._estimate(kwargs)) as ticket:
+            stream = await endpoint._create(**kwargs)
+            try:
+                async for chunk in stream:
+                    if ticket is not None and getattr(chunk, "usage", None):
+                        ticket.record_usage(chunk)
+                    try:
+                        yield chunk
+                    except GeneratorExit:
+                        break  # 调用方提前关闭，按正常结束结算
+            finally:
+                await stream.close()
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self._chunks
+
+    async def close(self) -> None:
+        await self._chunks.aclose()
+
+    async def __aenter__(self) -> "_GovernedStream":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+class GovernedOpenAIClient:
+    """包装 AsyncOpenAI：chat.completions / embeddings 调用经过全局并发控制，其余属性透传"""
+
+    def __init__(self, client: Any):
+        self._client = client
+        # 调用时再解析方法：async_clients 的代理按当前事件循环返回不同的客户端
+        self.chat = SimpleNamespace(
+            completions=_GovernedEndpoint(
+                lambda **kwargs: client.chat.completions.create(**kwargs), chat_limiter, estimate_chat_tokens
+            )
+        )
+        self.embeddings = _GovernedEndpoint(
+            lambda **kwargs: client.embeddings.create(**kwargs), embedding_limiter, estimate_embedding_tokens
+        )
+
+    @property
+    def raw(self) -> Any:
+        return self._client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+def governed_client(client: Any) -> GovernedOpenAIClient:
+    return GovernedOpenAIClient(client)
+
+
+def get_llm_concurrency_stats() -> Dict[str, Any]:
+    return {
+        "chat": chat_limiter.get_stats(),
+        "embedding": embedding_limiter.get_stats(),
+    }
@@ -0,0 +1,374 @@
+"""Local, in-process vector index used when Elasticsearch is unavailable.
+
+Each project owns a directory with two append-only files: ``ids.i64`` (segment
+ids) and ``vectors.f32`` (L2-normalised float32 rows in the same order) plus a
+``meta.json`` recording the embedding model and dimension.  Searches memory-map
+the vector file and score it block by block with a single matrix-vector
+product, so a single box can serve top-k cosine queries without Elasticsearch.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from loguru import logger
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.literature import LiteratureSegment
+from app.models.project import project_literature_association
+from app.models.stats_tracking import projects_for_literature
+
+try:  # pragma: no cover - fcntl is unavailable on Windows
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+_ID_BYTES = 8
+_SEARCH_BLOCK_ROWS = 65536
+_EMBED_BATCH_SIZE = 256
+_DIRTY_INFO_KEY = "vector_index_dirty_projects"
+
+
+class ProjectVectorIndex:
+    """Append-only cosine index for a single project."""
+
+    def __init__(self, directory: Path, model: str, dim: Optional[int] = None) -> None:
+        self.directory = directory
+        self.model = model
+        self.dim = dim
+        self.ids_path = directory / "ids.i64"
+        self.vectors_path = directory / "vectors.f32"
+        self.meta_path = directory / "meta.json"
+        self._lock = threading.RLock()
+        self._ids: np.ndarray = np.empty(0, dtype="<i8")
+        self._id_set: Set[int] = set()
+        self._vectors: Optional[np.memmap] = None
+        self._loaded_rows = 0
+        self._load_meta()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _load_meta(self) -> None:
+        if not self.meta_path.exists():
+            return
+        try:
+            meta = json.loads(self.meta_path.read_text())
+        except (OSError, ValueError) as exc:
+            logger.warning(f"本地向量索引元数据损坏，将重建 {self.directory}: {exc}")
+            self.reset()
+            return
+        if meta.get("model") != self.model:
+            logger.info(f"嵌入模型变化({meta.get('model')} → {self.model})，重建本地向量索引 {self.directory}")
+            self.reset()
+            return
+        self.dim = int(meta["dim"])
+
+    def _write_meta(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.meta_path.write_text(json.dumps({"model": self.model, "dim": self.dim}))
+
+    def _rows_on_disk(self) -> int:
+        if not self.dim:
+            return 0
+        try:
+            id_rows = self.ids_path.stat().st_size // _ID_BYTES
+            vector_rows = self.vectors_path.stat().st_size // (self.dim * 4)
+        except FileNotFoundError:
+            return 0
+        return min(id_rows, vector_rows)
+
+    def refresh(self) -> None:
+        """Pick up rows appended since the last load, including by other processes."""
+
+        with self._lock:
+            rows = self._rows_on_disk()
+            if rows == self._loaded_rows:
+                return
+            if rows:
+                self._ids = np.fromfile(self.ids_path, dtype="<i8", count=rows)
+                self._vectors = np.memmap(self.vectors_path, dtype="<f4", mode="r", shape=(rows, self.dim))
+            else:
+                self._ids = np.empty(0, dtype="<i8")
+                self._vectors = None
+            self._id_set = set(self._ids.tolist())
+            self._loaded_rows = rows
+
+    def reset(self) -> None:
+        with self._lock:
+            for path in (self.ids_path, self.vectors_path, self.meta_path):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            self.dim = None
+            self._ids = np.empty(0, dtype="<i8")
+            self._id_set = set()
+            self._vectors = None
+            self._loaded_rows = 0
+
+    def add(self, segment_ids: Sequence[int], vectors: Sequence[Sequence[float]]) -> int:
+        """Append vectors for ids not yet indexed; returns the number of rows added."""
+
+        with self._lock:
+            self.refresh()
+            pending: Dict[int, np.ndarray] = {}
+            for segment_id, vector in zip(segment_ids, vectors):
+                segment_id = int(segment_id)
+                if segment_id in self._id_set or segment_id in pending:
+                    continue
+                array = np.asarray(vector, dtype="<f4")
+                norm = float(np.linalg.norm(array))
+                if norm == 0.0:
+                    continue
+                pending[segment_id] = array / norm
+            if not pending:
+                return 0
+
+            if self.dim is None:
+                self.dim = int(next(iter(pending.values())).shape[0])
+                self._write_meta()
+
+            matrix = np.vstack([vector for vector in pending.values() if vector.shape[0] == self.dim])
+            ids = np.asarray(
+                [segment_id for segment_id, vector in pending.items() if vector.shape[0] == self.dim],
+                dtype="<i8",
+            )
+            if not len(ids):
+                return 0
+
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.ids_path, "ab") as ids_handle, open(self.vectors_path, "ab") as vectors_handle:
+                if fcntl is not None:
+                    fcntl.flock(ids_handle.fileno(), fcntl.LOCK_EX)
+                try:
+                    rows = self._rows_on_disk()
+                    ids_handle.truncate(rows * _ID_BYTES)
+                    vectors_handle.truncate(rows * self.dim * 4)
+                    vectors_handle.write(matrix.astype("<f4").tobytes())
+                    vectors_handle.flush()
+                    ids_handle.write(ids.tobytes())
+                    ids_handle.flush()
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(ids_handle.fileno(), fcntl.LOCK_UN)
+            self.refresh()
+            return int(len(ids))
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+    @property
+    def size(self) -> int:
+        return self._loaded_rows
+
+    def contains(self, segment_id: int) -> bool:
+        return int(segment_id) in self._id_set
+
+    def search(
+        self,
+        query_vector: Sequence[float],
+        top_k: int = 10,
+        allowed_ids: Optional[Iterable[int]] = None,
+    ) -> List[Tuple[int, float]]:
+        """Return ``(segment_id, cosine)`` pairs ordered by descending similarity."""
+
+        with self._lock:
+            self.refresh()
+            vectors, ids = self._vectors, self._ids
+        if vectors is None or not len(ids) or top_k <= 0:
+            return []
+
+        query = np.asarray(query_vector, dtype="<f4")
+        if query.shape[0] != vectors.shape[1]:
+            logger.warning(f"查询向量维度 {query.shape[0]} 与索引维度 {vectors.shape[1]} 不一致")
+            return []
+        norm = float(np.linalg.norm(query))
+        if norm == 0.0:
+            return []
+        query = query / norm
+
+        mask = None
+        if allowed_ids is not None:
+            mask = np.isin(ids, np.fromiter(allowed_ids, dtype="<i8"))
+
+        best_scores = np.empty(0, dtype="<f4")
+        best_rows = np.empty(0, dtype=np.int64)
+        for start in range(0, len(ids), _SEARCH_BLOCK_ROWS):
+            block = np.asarray(vectors[start:start + _SEARCH_BLOCK_ROWS])
+            scores = block @ query
+            if mask is not None:
+                scores = np.where(mask[start:start + len(block)], scores, -np.inf)
+            rows = np.arange(start, start + len(block))
+            scores = np.concatenate([best_scores, scores])
+            rows = np.concatenate([best_rows, rows])
+            if len(scores) > top_k:
+                keep = np.argpartition(-scores, top_k - 1)[:top_k]
+                scores, rows = scores[keep], rows[keep]
+            best_scores, best_rows = scores, rows
+
+        order = np.argsort(-best_scores)
+        return [
+            (int(ids[best_rows[position]]), float(best_scores[position]))
+            for position in order
+            if np.isfinite(best_scores[position])
+        ]
+
+
+class LocalVectorIndexService:
+    """Registry of per-project indices plus DB/embedding synchronisation.
+
+    Synchronisation never runs inside a query: searches use whatever is indexed
+    and :meth:`schedule_sync` embeds missing segments in a background task with
+    its own session.  Projects are re-synced when segments were inserted for
+    them in this process (see :meth:`mark_dirty`) or, for inserts made by other
+    processes, once the sync interval has elapsed.
+    """
+
+    def __init__(self, root: Optional[str] = None, session_factory: Callable[[], Session] = SessionLocal) -> None:
+        self.root = Path(root or settings.local_vector_index_dir)
+        self.session_factory = session_factory
+        self._indices: Dict[int, ProjectVectorIndex] = {}
+        self._last_sync: Dict[int, float] = {}
+        self._dirty: Set[int] = set()
+        self._sync_tasks: Dict[int, asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+    def mark_dirty(self, project_ids: Iterable[int]) -> None:
+        """Record that segments were inserted for these projects so their next sync skips the throttle."""
+
+        self._dirty.update(project_id for project_id in project_ids if project_id is not None)
+
+    def needs_sync(self, project_id: int) -> bool:
+        if project_id in self._dirty:
+            return True
+        last_time = self._last_sync.get(project_id)
+        return last_time is None or time.monotonic() - last_time >= settings.local_vector_index_sync_interval
+
+    def get_index(self, project_id: int) -> ProjectVectorIndex:
+        with self._lock:
+            index = self._indices.get(project_id)
+            if index is None:
+                index = ProjectVectorIndex(
+                    self.root / f"project_{project_id}", settings.openai_embedding_model
+                )
+                self._indices[project_id] = index
+            return index
+
+    def schedule_sync(self, project_id: int, ai_service) -> Optional[asyncio.Task]:
+        """Start a background sync for the project unless one is running or it is up to date."""
+
+        task = self._sync_tasks.get(project_id)
+        if task is not None and not task.done():
+            return task
+        if not self.needs_sync(project_id):
+            return None
+        task = asyncio.get_running_loop().create_task(self._sync_in_background(project_id, ai_service))
+        self._sync_tasks[project_id] = task
+        task.add_done_callback(lambda _: self._sync_tasks.pop(project_id, None))
+        return task
+
+    async def _sync_in_background(self, project_id: int, ai_service) -> None:
+        db = self.session_factory()
+        try:
+            await self.sync_project(db, project_id, ai_service, force=True)
+        except Exception as exc:
+            logger.warning(f"本地向量索引后台同步项目 {project_id} 失败: {exc}")
+        finally:
+            db.close()
+
+    async def sync_project(self, db: Session, project_id: int, ai_service, force: bool = False) -> int:
+        """Index project segments that are in the database but not yet in the local index."""
+
+        if not force and not self.needs_sync(project_id):
+            return 0
+        self._last_sync[project_id] = time.monotonic()
+        self._dirty.discard(project_id)
+
+        index = self.get_index(project_id)
+        index.refresh()
+        segment_ids = self._project_segment_ids(db, project_id)
+        missing = [segment_id for segment_id in segment_ids if not index.contains(segment_id)]
+        if not missing:
+            return 0
+
+        added = 0
+        for start in range(0, len(missing), _EMBED_BATCH_SIZE):
+            chunk_ids = missing[start:start + _EMBED_BATCH_SIZE]
+            rows = db.query(LiteratureSegment.id, LiteratureSegment.content).filter(
+                LiteratureSegment.id.in_(chunk_ids)
+            ).all()
+            rows = [row for row in rows if row.content]
+            if not rows:
+                continue
+            vectors = await ai_service.get_embeddings_batch([row.content for row in rows])
+            added += index.add([row.id for row in rows], vectors)
+
+        logger.info(f"本地向量索引同步项目 {project_id}: 新增 {added} 个段落")
+        return added
+
+    @staticmethod
+    def _project_segment_ids(db: Session, project_id: int) -> List[int]:
+        rows = db.execute(
+            select(LiteratureSegment.id)
+            .join(
+                project_literature_association,
+                project_literature_association.c.literature_id == LiteratureSegment.literature_id,
+            )
+            .where(project_literature_association.c.project_id == project_id)
+            .order_by(LiteratureSegment.id)
+        )
+        return [row[0] for row in rows]
+
+    def search(
+        self,
+        project_id: int,
+        query_vector: Sequence[float],
+        top_k: int = 10,
+        db: Optional[Session] = None,
+    ) -> List[Tuple[int, float]]:
+        """Search the project's index.
+
+        The index is append-only, so when ``db`` is given hits are restricted to
+        segments whose literature is still associated with the project.
+        """
+
+        allowed_ids = self._project_segment_ids(db, project_id) if db is not None else None
+        return self.get_index(project_id).search(query_vector, top_k, allowed_ids=allowed_ids)
+
+
+local_vector_index = LocalVectorIndexService()
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_indexed_projects(session: Session, flush_context, instances) -> None:  # noqa: ARG001
+    literature_ids = {
+        obj.literature_id or getattr(obj.literature, "id", None)
+        for obj in session.new
+        if isinstance(obj, LiteratureSegment)
+    }
+    literature_ids.discard(None)
+    if literature_ids:
+        session.info.setdefault(_DIRTY_INFO_KEY, set()).update(projects_for_literature(session, literature_ids))
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_committed_projects_dirty(session: Session) -> None:
+    # 其他进程插入的段落由同步节流间隔兜底
+    project_ids = session.info.pop(_DIRTY_INFO_KEY, None)
+    if project_ids:
+        local_vector_index.mark_dirty(project_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_projects(session: Session) -> None:
+    session.info.pop(_DIRTY_INFO_KEY, None)
@@ -18,6 +18,8 @@ from app.models.literature import Literature, LiteratureSegment
 from app.models.project import Project
 from app.services.multi_model_ai_service import MultiModelAIService
 from app.services.pdf_processor import PDFProcessor
+from app.services.llm_concurrency import llm_priority
+from app.services.pdf_worker_pool import PRIORITY_BATCH, pdf_worker_pool
 from app.services.stream_progress_service import StreamProgressService
 from app.core.database import SessionLocal
 from app.utils.async_limiter import AsyncLimiter
@@ -466,7 +468,7 @@ class DistributedBatchProcessor:
 
                     # 处理PDF
                     pdf_path = literature.pdf_path or literature.pdf_url
-                    result = await self.pdf_processor.process_pdf(pdf_path)
+                    result = await pdf_worker_pool.extract(pdf_path, priority=PRIORITY_BATCH)
 
                     if result["success"]:
                         return {
@@ -812,7 +814,8 @@ class MassiveLiteratureProcessor:
                 for i, batch in enumerate(literature_batches)
             ]
 
-            batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
+            with llm_priority(PRIORITY_BATCH):
+                batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
 
             # 7. 汇总批次结果
             failed_literature_items = []
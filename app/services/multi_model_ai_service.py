@@ -3,9 +3,8 @@
 """
 
 import asyncio
-from typing import List, Dict, Optional, Any, Union
+from typing import AsyncIterator, List, Dict, Optional, Any, Union
 import openai
-from openai import AsyncOpenAI
 import json
 from datetime import datetime
 from loguru import logger
@@ -18,7 +17,11 @@ try:
 except ImportError:
     HAS_ANTHROPIC = False
 
+from app.core.async_clients import async_clients
 from app.core.config import settings
+from app.services.llm_cache import llm_cache
+from app.services.llm_concurrency import governed_client
+from app.services.task_cost_tracker import task_cost_tracker
 
 class AIModelProvider(Enum):
     OPENAI = "openai"
@@ -120,11 +123,7 @@ class MultiModelAIService:
         try:
             if provider == AIModelProvider.OPENAI:
                 # 构建客户端配置
-                client_config = {"api_key": config.api_key}
-                if config.endpoint:
-                    client_config["base_url"] = config.endpoint
-                
-                client = AsyncOpenAI(**client_config)
+                client = async_clients.openai(api_key=config.api_key, base_url=config.endpoint or "")
                 response = await client.chat.completions.create(
                     model="gpt-3.5-turbo",  # 使用轻量级模型进行测试
                     messages=[{"role": "user", "content": "test"}],
@@ -195,14 +194,12 @@ class MultiModelAIService:
     ) -> Dict[str, Any]:
         """OpenAI聊天完成"""
         try:
-            # 构建客户端配置
-            client_config = {"api_key": config.api_key}
-            if config.endpoint:
-                client_config["base_url"] = config.endpoint
-            
-            client = AsyncOpenAI(**client_config)
+            # 构建客户端配置（经过全局并发控制）
+            client = governed_client(async_clients.openai(api_key=config.api_key, base_url=config.endpoint or ""))
             
-            response = await client.chat.completions.create(
+            # 低温度请求经过补全缓存，命中时 usage 为 None
+            response = await llm_cache.create(
+                client,
                 model=config.model_name,
                 messages=messages,
                 max_tokens=options.get('max_tokens', config.max_tokens),
@@ -227,6 +224,73 @@ class MultiModelAIService:
         except Exception as e:
             logger.error(f"OpenAI API调用失败: {e}")
             raise
+
+    async def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        provider: Optional[AIModelProvider] = None,
+        model_options: Optional[Dict] = None,
+        usage_out: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        流式聊天完成，逐段产出生成的文本
+
+        仅 OpenAI 提供商真正流式返回，其余提供商退化为一次性返回完整内容。
+
+        Args:
+            messages: 对话消息列表
+            provider: 指定的AI提供商
+            model_options: 模型参数选项
+            usage_out: 传入字典时，流结束后写入 model 与 token 用量
+        """
+        selected_provider = provider or self.default_model
+        if selected_provider not in self.models:
+            raise ValueError(f"模型 {selected_provider.value} 不可用")
+
+        config = self.models[selected_provider]
+        options = model_options or {}
+
+        if selected_provider != AIModelProvider.OPENAI:
+            response = await self.chat_completion(messages, selected_provider, options)
+            if usage_out is not None:
+                usage_out.update({"model": config.model_name, **(response.get("usage") or {})})
+            if response.get("content"):
+                yield response["content"]
+            return
+
+        client = governed_client(async_clients.openai(api_key=config.api_key, base_url=config.endpoint or ""))
+        stream = await client.chat.completions.create(
+            model=config.model_name,
+            messages=messages,
+            max_tokens=options.get('max_tokens', config.max_tokens),
+            temperature=options.get('temperature', config.temperature),
+            top_p=options.get('top_p', 1.0),
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+
+        usage = None
+        try:
+            async for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                if chunk.choices:
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        yield delta
+        finally:
+            # 提前停止读取时及时释放并发槽位与连接
+            await stream.close()
+
+        usage_payload = {
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+            "total_tokens": getattr(usage, "total_tokens", 0) or 0,
+        }
+        if usage is not None:
+            task_cost_tracker.record_usage(config.model_name, usage_payload)
+        if usage_out is not None:
+            usage_out.update({"model": config.model_name, **usage_payload})
     
     async def _anthropic_chat_completion(
         self, 
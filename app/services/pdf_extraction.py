@@ -0,0 +1,313 @@
+"""
+分级 PDF 文本提取引擎
+
+三种提取后端按成本分级，与 ProcessingMethodEnum 对应:
+- fast_basic: PyPDF2，按页读取文本层，born-digital 论文约 1 秒;
+- standard: pdfplumber，保留版面并识别表格，3-5 秒;
+- premium_mineru: MinerU（经 PDFProcessor，带解析缓存），支持 OCR 与公式，30-60 秒。
+
+低成本后端完成后先做质量探测（每页字符密度、乱码比例、有文本页的覆盖率），
+只有探测不通过的文档（扫描件、字体编码损坏等）才升级到更昂贵的后端。
+后端可通过 register_backend 扩展。
+"""
+
+import asyncio
+import io
+import os
+import re
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from loguru import logger
+
+from app.core.config import settings
+
+PdfSource = Union[str, bytes]
+
+FAST_BASIC = "fast_basic"
+STANDARD = "standard"
+PREMIUM_MINERU = "premium_mineru"
+
+# pdfminer 无法映射字形时输出 (cid:123)；其余为替换字符、控制字符与私用区字符
+_CID_RE = re.compile(r"\(cid:\d+\)")
+_GARBLED_CHAR_RE = re.compile("[\ufffd\x00-\x08\x0b\x0c\x0e-\x1f\ue000-\uf8ff]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# 达到该成本级别的后端（MinerU，含 OCR）结果直接采用，不再做探测淘汰
+_TERMINAL_TIER = 2
+
+
+@dataclass
+class QualityReport:
+    chars_per_page: float
+    garbled_ratio: float
+    page_coverage: float
+    passed: bool
+    reasons: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "chars_per_page": round(self.chars_per_page, 1),
+            "garbled_ratio": round(self.garbled_ratio, 4),
+            "page_coverage": round(self.page_coverage, 3),
+            "passed": self.passed,
+            "reasons": self.reasons,
+        }
+
+
+def probe_quality(pages: Sequence[str], page_count: Optional[int] = None) -> QualityReport:
+    """
+    评估提取文本质量
+
+    Args:
+        pages: 每页提取出的文本
+        page_count: PDF 总页数（缺省时取 len(pages)）
+    """
+    total_pages = max(page_count or len(pages), 1)
+    page_lengths = [len(_WHITESPACE_RE.sub("", page or "")) for page in pages]
+    total_chars = sum(page_lengths)
+    text = "".join(pages)
+    garbled = len(_GARBLED_CHAR_RE.findall(text)) + sum(len(match) for match in _CID_RE.findall(text))
+
+    chars_per_page = total_chars / total_pages
+    garbled_ratio = garbled / total_chars if total_chars else 1.0
+    covered = sum(1 for length in page_lengths if length >= settings.pdf_probe_min_page_chars)
+    page_coverage = covered / total_pages
+
+    reasons = []
+    if chars_per_page < settings.pdf_probe_min_chars_per_page:
+        reasons.append("text_density")
+    if garbled_ratio > settings.pdf_probe_max_garbled_ratio:
+        reasons.append("garbled")
+    if page_coverage < settings.pdf_probe_min_page_coverage:
+        reasons.append("page_coverage")
+    return QualityReport(
+        chars_per_page=chars_per_page,
+        garbled_ratio=garbled_ratio,
+        page_coverage=page_coverage,
+        passed=not reasons,
+        reasons=reasons,
+    )
+
+
+@dataclass
+class ExtractionResult:
+    backend: str
+    pages: List[str]
+    page_count: int
+    tables: List[Any] = field(default_factory=list)
+    content: Optional[Dict[str, Any]] = None  # MinerU 的完整解析结果
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    quality: Optional[QualityReport] = None
+    elapsed: float = 0.0
+    attempts: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        if self.content is not None:
+            return self.content.get("text_content", "")
+        return "\n".join(page for page in self.pages if page)
+
+    def to_content(self) -> Dict[str, Any]:
+        """转换为 PDFProcessor._parse_mineru_output 的内容格式"""
+        if self.content is not None:
+            return self.content
+        return {
+            "text_content": self.text,
+            "structured_content": {},
+            "images": [],
+            "tables": self.tables,
+            "total_pages": self.page_count,
+        }
+
+
+class ExtractionBackend:
+    """提取后端基类；tier 越大成本越高"""
+
+    name: str = ""
+    tier: int = 0
+
+    def available(self) -> bool:
+        return True
+
+    async def extract(self, source: PdfSource) -> ExtractionResult:
+        raise NotImplementedError
+
+
+def _open_source(source: PdfSource):
+    return io.BytesIO(source) if isinstance(source, bytes) else open(source, "rb")
+
+
+class PyPDFBackend(ExtractionBackend):
+    name = FAST_BASIC
+    tier = 0
+
+    def _extract_sync(self, source: PdfSource) -> ExtractionResult:
+        from PyPDF2 import PdfReader
+
+        with _open_source(source) as handle:
+            reader = PdfReader(handle)
+            pages = [page.extract_text() or "" for page in reader.pages]
+        return ExtractionResult(backend=self.name, pages=pages, page_count=len(pages), metadata={"method": "PyPDF2"})
+
+    async def extract(self, source: PdfSource) -> ExtractionResult:
+        return await asyncio.to_thread(self._extract_sync, source)
+
+
+class PdfPlumberBackend(ExtractionBackend):
+    name = STANDARD
+    tier = 1
+
+    def _extract_sync(self, source: PdfSource) -> ExtractionResult:
+        import pdfplumber
+
+        pages: List[str] = []
+        tables: List[Any] = []
+        with _open_source(source) as handle, pdfplumber.open(handle) as pdf:
+            for page in pdf.pages:
+                pages.append(page.extract_text() or "")
+                tables.extend(page.extract_tables() or [])
+        return ExtractionResult(
+            backend=self.name,
+            pages=pages,
+            page_count=len(pages),
+            tables=tables,
+            metadata={"method": "pdfplumber", "tables_found": len(tables)},
+        )
+
+    async def extract(self, source: PdfSource) -> ExtractionResult:
+        return await asyncio.to_thread(self._extract_sync, source)
+
+
+class MinerUBackend(ExtractionBackend):
+    name = PREMIUM_MINERU
+    tier = 2
+
+    def available(self) -> bool:
+        from app.services.pdf_processor import PDFProcessor
+
+        return PDFProcessor.find_magic_pdf() is not None
+
+    async def extract(self, source: PdfSource) -> ExtractionResult:
+        from app.services.pdf_processor import PDFProcessor
+
+        temp_path = None
+        if isinstance(source, bytes):
+            handle, temp_path = tempfile.mkstemp(suffix=".pdf")
+            with os.fdopen(handle, "wb") as temp_file:
+                temp_file.write(source)
+        try:
+            result = await PDFProcessor().process_pdf(temp_path or source)
+        finally:
+            if temp_path:
+                os.unlink(temp_path)
+        if not result.get("success"):
+            raise RuntimeError(result.get("error") or "MinerU解析失败")
+        content = result["content"]
+        return ExtractionResult(
+            backend=self.name,
+            pages=[content.get("text_content", "")],
+            page_count=content.get("total_pages") or 0,
+            tables=content.get("tables", []),
+            content=content,
+            metadata=result.get("metadata", {}),
+        )
+
+
+class PDFExtractionEngine:
+    """按成本逐级提取，低成本结果通过质量探测即返回"""
+
+    def __init__(self, backends: Optional[Sequence[ExtractionBackend]] = None):
+        self._backends: Dict[str, ExtractionBackend] = {}
+        for backend in backends or (PyPDFBackend(), PdfPlumberBackend(), MinerUBackend()):
+            self.register_backend(backend)
+
+    def register_backend(self, backend: ExtractionBackend) -> None:
+        self._backends[backend.name] = backend
+
+    def chain(self, method: Optional[str] = None, escalate: Optional[bool] = None) -> List[ExtractionBackend]:
+        """
+        计算提取顺序
+
+        method 为空或 "auto" 时使用配置的自动链路；指定后端时从该后端开始，
+        允许升级时再接上自动链路中成本更高的后端。
+        """
+        escalate = settings.pdf_extraction_escalation_enabled if escalate is None else escalate
+        auto = [self._backends[name] for name in settings.pdf_extraction_auto_chain if name in self._backends]
+        if not method or method == "auto":
+            return auto if escalate else auto[:1]
+        start = self._backends.get(method)
+        if start is None:
+            raise ValueError(f"未知的PDF提取方式: {method}")
+        if not escalate:
+            return [start]
+        return [start] + [backend for backend in auto if backend.tier > start.tier]
+
+    async def extract(
+        self,
+        source: PdfSource,
+        method: Optional[str] = None,
+        escalate: Optional[bool] = None,
+    ) -> ExtractionResult:
+        """
+        提取 PDF 文本
+
+        Args:
+            source: PDF 文件路径或内容
+            method: 起始后端（fast_basic/standard/premium_mineru），默认自动
+            escalate: 质量探测不通过时是否升级，默认使用配置
+
+        Returns:
+            最终采用的提取结果；都未通过探测时返回文本密度最高的结果，所有后端都失败时抛出最后一个异常
+        """
+        backends = self.chain(method, escalate)
+        # 所有后端都失败（如 MinerU 未安装或解析报错）时，按成本从高到低降级
+        tried = {backend.name for backend in backends}
+        fallbacks = sorted(
+            (backend for backend in self._backends.values() if backend.name not in tried),
+            key=lambda backend: backend.tier,
+            reverse=True,
+        )
+        attempts: List[Dict[str, Any]] = []
+        best: Optional[ExtractionResult] = None
+        last_error: Optional[Exception] = None
+
+        for backend in backends + fallbacks:
+            if best is not None and backend.name not in tried:
+                break
+            if not backend.available():
+                attempts.append({"backend": backend.name, "skipped": "unavailable"})
+                continue
+            started = time.perf_counter()
+            try:
+                result = await backend.extract(source)
+            except Exception as exc:
+                last_error = exc
+                attempts.append({"backend": backend.name, "error": str(exc)})
+                logger.warning(f"PDF提取后端 {backend.name} 失败: {exc}")
+                continue
+            result.elapsed = time.perf_counter() - started
+            result.quality = probe_quality(result.pages, result.page_count)
+            attempts.append({
+                "backend": backend.name,
+                "elapsed": round(result.elapsed, 3),
+                "quality": result.quality.as_dict(),
+            })
+            if result.quality.passed or backend.tier >= _TERMINAL_TIER:
+                best = result
+                break
+            if best is None or result.quality.chars_per_page > best.quality.chars_per_page:
+                best = result
+            logger.info(
+                f"PDF提取质量不足（{backend.name}: {','.join(result.quality.reasons)}），尝试更高质量的后端"
+            )
+
+        if best is None:
+            raise last_error or RuntimeError("没有可用的PDF提取后端")
+        best.attempts = attempts
+        return best
+
+
+pdf_extraction_engine = PDFExtractionEngine()
@@ -0,0 +1,221 @@
+"""
+PDF 解析结果的内容寻址缓存
+
+MinerU 解析一篇论文需要 30-60 秒，原先的输出目录用完即删，同一 PDF 上传到
+不同项目或更换模板后重跑都会重新解析。这里按 PDF 内容的 SHA-256（与
+SharedLiterature.content_hash 相同）加解析器版本保存解析产物:
+
+    <cache_dir>/<processor_version>/<sha256[:2]>/<sha256>/
+        content.json      解析后的内容（text_content/structured_content/tables/images/total_pages）
+        metadata.json     解析器元数据与写入时间
+        artifacts/        MinerU 原始输出（markdown、版面 JSON、表格与图片）
+
+条目先写入同一文件系统下的临时目录再原子改名，多进程并发写入同一 PDF 时以先完成者为准。
+读取时更新目录的修改时间，gc 按解析器版本、最近访问时间与总大小淘汰条目。
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from loguru import logger
+
+from app.core.config import settings
+
+_READ_CHUNK = 1024 * 1024
+_CONTENT_FILE = "content.json"
+_METADATA_FILE = "metadata.json"
+_ARTIFACTS_DIR = "artifacts"
+_TMP_DIR = ".tmp"
+
+
+def file_sha256(path: str) -> str:
+    """分块计算文件的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_READ_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+
+@dataclass
+class CacheEntry:
+    version: str
+    digest: str
+    path: Path
+    last_access: float
+    size: int
+
+
+class PDFParseCache:
+    """按 (PDF 内容哈希, 解析器版本) 保存解析产物的磁盘缓存"""
+
+    def __init__(self, root: Optional[str] = None, enabled: Optional[bool] = None):
+        self.root = Path(root or settings.pdf_parse_cache_dir)
+        self.enabled = settings.pdf_parse_cache_enabled if enabled is None else enabled
+
+    @staticmethod
+    def _safe_version(version: str) -> str:
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", version)
+
+    def entry_path(self, digest: str, version: str) -> Path:
+        return self.root / self._safe_version(version) / digest[:2] / digest
+
+    def get(self, digest: str, version: str) -> Optional[Dict[str, Any]]:
+        """读取缓存的解析结果；返回 {"content", "metadata", "artifacts_dir"}，未命中时返回 None"""
+        if not self.enabled:
+            return None
+        path = self.entry_path(digest, version)
+        try:
+            with open(path / _CONTENT_FILE, "r", encoding="utf-8") as handle:
+                content = json.load(handle)
+            with open(path / _METADATA_FILE, "r", encoding="utf-8") as handle:
+                metadata = json.load(handle)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning(f"PDF解析缓存条目损坏，将重新解析 {path}: {exc}")
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return {"content": content, "metadata": metadata, "artifacts_dir": str(path / _ARTIFACTS_DIR)}
+
+    def put(
+        self,
+        digest: str,
+        version: str,
+        content: Dict[str, Any],
+        metadata: Dict[str, Any],
+        output_dir: Optional[str] = None,
+    ) -> Optional[Path]:
+        """写入解析结果与 MinerU 输出目录；条目已存在时保留原条目"""
+        if not self.enabled:
+            return None
+        final_path = self.entry_path(digest, version)
+        if final_path.exists():
+            return final_path
+
+        staging_root = self.root / _TMP_DIR
+        staging_root.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f"{digest[:12]}-", dir=staging_root))
+        try:
+            if output_dir and os.path.isdir(output_dir):
+                shutil.copytree(output_dir, staging / _ARTIFACTS_DIR)
+            else:
+                (staging / _ARTIFACTS_DIR).mkdir()
+            with open(staging / _CONTENT_FILE, "w", encoding="utf-8") as handle:
+                json.dump(content, handle, ensure_ascii=False)
+            with open(staging / _METADATA_FILE, "w", encoding="utf-8") as handle:
+                json.dump({**metadata, "sha256": digest, "cached_at": time.time()}, handle, ensure_ascii=False)
+            final_path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.rename(staging, final_path)
+            except OSError:
+                # 其他进程已写入同一条目
+                if not final_path.exists():
+                    raise
+            return final_path
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging, ignore_errors=True)
+
+    def entries(self) -> Iterator[CacheEntry]:
+        if not self.root.exists():
+            return
+        for version_dir in self.root.iterdir():
+            if not version_dir.is_dir() or version_dir.name == _TMP_DIR:
+                continue
+            for entry_path in version_dir.glob("*/*"):
+                if not entry_path.is_dir():
+                    continue
+                try:
+                    last_access = entry_path.stat().st_mtime
+                except OSError:
+                    continue
+                yield CacheEntry(
+                    version=version_dir.name,
+                    digest=entry_path.name,
+                    path=entry_path,
+                    last_access=last_access,
+                    size=_dir_size(entry_path),
+                )
+
+    def gc(
+        self,
+        current_version: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        max_age_days: Optional[float] = None,
+        dry_run: bool = False,
+    ) -> Dict[str, int]:
+        """
+        清理缓存
+
+        依次删除：其他解析器版本的条目、超过 max_age_days 未访问的条目，
+        以及总大小超过 max_bytes 时最久未访问的条目。
+        """
+        now = time.time()
+        current = self._safe_version(current_version) if current_version else None
+        kept: List[CacheEntry] = []
+        removed: List[CacheEntry] = []
+        for entry in self.entries():
+            stale_version = current is not None and entry.version != current
+            expired = max_age_days is not None and now - entry.last_access > max_age_days * 86400
+            (removed if stale_version or expired else kept).append(entry)
+
+        if max_bytes is not None:
+            kept.sort(key=lambda entry: entry.last_access, reverse=True)
+            total = 0
+            for index, entry in enumerate(kept):
+                total += entry.size
+                if total > max_bytes:
+                    removed.extend(kept[index:])
+                    kept = kept[:index]
+                    break
+
+        if not dry_run:
+            for entry in removed:
+                shutil.rmtree(entry.path, ignore_errors=True)
+            # 清理中断写入遗留的临时目录
+            staging_root = self.root / _TMP_DIR
+            if staging_root.exists():
+                for leftover in staging_root.iterdir():
+                    if now - leftover.stat().st_mtime > 3600:
+                        shutil.rmtree(leftover, ignore_errors=True)
+
+        return {
+            "removed_entries": len(removed),
+            "removed_bytes": sum(entry.size for entry in removed),
+            "kept_entries": len(kept),
+            "kept_bytes": sum(entry.size for entry in kept),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        versions: Dict[str, Dict[str, int]] = {}
+        for entry in self.entries():
+            bucket = versions.setdefault(entry.version, {"entries": 0, "bytes": 0})
+            bucket["entries"] += 1
+            bucket["bytes"] += entry.size
+        return {"root": str(self.root), "versions": versions}
+
+
+pdf_parse_cache = PDFParseCache()
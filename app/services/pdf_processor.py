@@ -4,6 +4,7 @@ PDF处理服务 - 集成MinerU
 
 import os
 import asyncio
+import shutil
 import subprocess
 from typing import Dict, List, Optional
 from pathlib import Path
@@ -12,6 +13,21 @@ import tempfile
 from loguru import logger
 
 from app.core.config import settings
+from app.services.pdf_extraction import pdf_extraction_engine
+from app.services.pdf_parse_cache import file_sha256, pdf_parse_cache
+from app.services.pdf_worker_pool import PRIORITY_NORMAL, pdf_worker_pool
+
+MINERU_VERSION = "1.3.12"
+# 解析缓存的版本键：升级 MinerU 或修改输出解析逻辑时递增，旧条目由 gc 清理
+PARSE_CACHE_VERSION = f"mineru-{MINERU_VERSION}-v1"
+
+# 尝试不同的magic-pdf路径
+MAGIC_PDF_PATHS = (
+    "/root/raggar/raggar/backend/venv/bin/magic-pdf",  # 虚拟环境路径
+    "magic-pdf",  # 系统路径
+    "./venv/bin/magic-pdf"  # 相对路径
+)
+
 
 class PDFProcessor:
     """PDF处理器 - 使用MinerU"""
@@ -20,12 +36,15 @@ class PDFProcessor:
         self.upload_dir = Path(settings.upload_path)
         self.upload_dir.mkdir(exist_ok=True)
 
-    async def process_pdf(self, file_path: str) -> Dict:
+    async def process_pdf(self, file_path: str, use_cache: bool = True) -> Dict:
         """
         处理PDF文件，提取结构化内容
 
+        相同内容的PDF（按SHA-256）只解析一次，之后直接读取解析缓存。
+
         Args:
             file_path: PDF文件路径
+            use_cache: 是否读写解析缓存
 
         Returns:
             处理结果字典
@@ -35,6 +54,23 @@ class PDFProcessor:
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"PDF文件不存在: {file_path}")
 
+            digest = None
+            if use_cache and pdf_parse_cache.enabled:
+                digest = await asyncio.to_thread(file_sha256, file_path)
+                cached = await asyncio.to_thread(pdf_parse_cache.get, digest, PARSE_CACHE_VERSION)
+                if cached:
+                    logger.info(f"PDF解析缓存命中: {file_path} ({digest[:12]})")
+                    return {
+                        "success": True,
+                        "content": cached["content"],
+                        "metadata": {**cached["metadata"], "cache_hit": True},
+                        "file_info": {
+                            "size": os.path.getsize(file_path),
+                            "pages": cached["content"].get("total_pages", 0),
+                            "sha256": digest
+                        }
+                    }
+
             # 创建临时输出目录
             with tempfile.TemporaryDirectory() as temp_dir:
                 output_dir = Path(temp_dir) / "output"
@@ -46,14 +82,30 @@ class PDFProcessor:
                 if result["success"]:
                     # 解析MinerU输出
                     parsed_content = await self._parse_mineru_output(str(output_dir))
+                    metadata = result.get("metadata", {})
+
+                    # 只缓存提取到正文的结果，避免把失败的解析固化下来
+                    if digest and parsed_content.get("text_content", "").strip():
+                        try:
+                            await asyncio.to_thread(
+                                pdf_parse_cache.put,
+                                digest,
+                                PARSE_CACHE_VERSION,
+                                parsed_content,
+                                metadata,
+                                str(output_dir)
+                            )
+                        except Exception as cache_error:
+                            logger.warning(f"写入PDF解析缓存失败: {cache_error}")
 
                     return {
                         "success": True,
                         "content": parsed_content,
-                        "metadata": result.get("metadata", {}),
+                        "metadata": {**metadata, "cache_hit": False},
                         "file_info": {
                             "size": os.path.getsize(file_path),
-                            "pages": parsed_content.get("total_pages", 0)
+                            "pages": parsed_content.get("total_pages", 0),
+                            "sha256": digest
                         }
                     }
                 else:
@@ -71,25 +123,24 @@ class PDFProcessor:
                 "content": None
             }
 
+    @staticmethod
+    def find_magic_pdf() -> Optional[str]:
+        """查找可用的magic-pdf命令，未安装时返回None"""
+        for path in MAGIC_PDF_PATHS:
+            if os.path.exists(path):
+                return path
+            resolved = shutil.which(path)
+            if resolved:
+                return resolved
+        return None
+
     async def _run_mineru(self, pdf_path: str, output_dir: str) -> Dict:
         """运行MinerU处理PDF"""
         try:
             # 确保输出目录存在
             os.makedirs(output_dir, exist_ok=True)
 
-            # 尝试不同的magic-pdf路径
-            magic_pdf_paths = [
-                "/root/raggar/raggar/backend/venv/bin/magic-pdf",  # 虚拟环境路径
-                "magic-pdf",  # 系统路径
-                "./venv/bin/magic-pdf"  # 相对路径
-            ]
-
-            magic_pdf_cmd = None
-            for path in magic_pdf_paths:
-                if os.path.exists(path) or path == "magic-pdf":
-                    magic_pdf_cmd = path
-                    break
-
+            magic_pdf_cmd = self.find_magic_pdf()
             if not magic_pdf_cmd:
                 return {
                     "success": False,
@@ -120,7 +171,7 @@ class PDFProcessor:
                     "stdout": stdout.decode(),
                     "metadata": {
                         "processor": "mineru",
-                        "version": "1.3.12",
+                        "version": MINERU_VERSION,
                         "command": magic_pdf_cmd
                     }
                 }
@@ -134,7 +185,7 @@ class PDFProcessor:
                         "stderr": stderr.decode(),
                         "metadata": {
                             "processor": "mineru",
-                            "version": "1.3.12",
+                            "version": MINERU_VERSION,
                             "command": magic_pdf_cmd
                         }
                     }
@@ -204,18 +255,59 @@ class PDFProcessor:
                 "total_pages": 0
             }
 
-    async def process_pdf_async(self, file_path: str) -> Optional[str]:
+    async def extract(self, file_path: str, method: Optional[str] = None) -> Dict:
+        """
+        分级提取PDF内容
+
+        先用低成本后端提取，质量探测不通过时才升级到MinerU，返回格式与 process_pdf 相同。
+
+        Args:
+            file_path: PDF文件路径
+            method: 起始提取方式（fast_basic/standard/premium_mineru），默认自动
+
+        Returns:
+            处理结果字典
+        """
+        try:
+            if not os.path.exists(file_path):
+                raise FileNotFoundError(f"PDF文件不存在: {file_path}")
+
+            extraction = await pdf_extraction_engine.extract(file_path, method=method)
+            return {
+                "success": True,
+                "content": extraction.to_content(),
+                "metadata": {
+                    **extraction.metadata,
+                    "extraction_backend": extraction.backend,
+                    "quality_probe": extraction.quality.as_dict() if extraction.quality else None,
+                    "attempts": extraction.attempts
+                },
+                "file_info": {
+                    "size": os.path.getsize(file_path),
+                    "pages": extraction.page_count
+                }
+            }
+        except Exception as e:
+            logger.error(f"PDF分级提取异常: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "content": None
+            }
+
+    async def process_pdf_async(self, file_path: str, priority: int = PRIORITY_NORMAL) -> Optional[str]:
         """
         异步处理PDF文件，返回文本内容
 
         Args:
             file_path: PDF文件路径
+            priority: PDF工作进程池中的排队优先级，越小越先执行
 
         Returns:
             提取的文本内容，失败时返回None
         """
         try:
-            result = await self.process_pdf(file_path)
+            result = await pdf_worker_pool.extract(file_path, priority=priority)
             if result["success"] and result["content"]:
                 return result["content"].get("text_content", "")
             return None
@@ -223,20 +315,26 @@ class PDFProcessor:
             logger.error(f"异步PDF处理失败: {e}")
             return None
 
-    async def process_pdf_with_segments(self, file_path: str, structure_template: Optional[Dict] = None) -> Dict:
+    async def process_pdf_with_segments(
+        self,
+        file_path: str,
+        structure_template: Optional[Dict] = None,
+        priority: int = PRIORITY_NORMAL
+    ) -> Dict:
         """
         处理PDF并返回结构化段落 - 使用语义分块策略
 
         Args:
             file_path: PDF文件路径
             structure_template: 结构化模板
+            priority: PDF工作进程池中的排队优先级，越小越先执行
 
         Returns:
             包含文本内容和段落的结果字典
         """
         try:
-            # 处理PDF获取内容
-            result = await self.process_pdf(file_path)
+            # 在PDF工作进程中提取内容
+            result = await pdf_worker_pool.extract(file_path, priority=priority)
             if not result["success"]:
                 return result
 
@@ -0,0 +1,334 @@
+"""
+PDF 解析进程池
+
+PDF 解析是 CPU 密集型操作（PyPDF2/pdfplumber 为纯 Python，MinerU 为重型子进程），
+直接在事件循环所在进程中运行会阻塞其他协程，并发的 magic-pdf 子进程还可能耗尽
+Celery worker 的内存。所有调用方通过本进程池提交 PDF 任务:
+
+- 固定数量的常驻工作进程（spawn 启动，避免 fork 带有事件循环和线程的父进程）;
+- 带优先级的等待队列：交互式上传优先于批量处理;
+- 每个任务有超时，父进程定期检查工作进程（含 magic-pdf 等子进程）的 RSS，
+  超限或超时即终止整个进程树并重启工作进程;
+- 工作进程处理 N 个文档后回收，释放解析库累积的内存碎片。
+"""
+
+import asyncio
+import itertools
+import multiprocessing
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import psutil
+from loguru import logger
+
+from app.core.config import settings
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 5
+PRIORITY_BATCH = 10
+
+_POLL_INTERVAL = 0.5
+
+
+class PDFWorkerError(RuntimeError):
+    """工作进程超时、内存超限或异常退出"""
+
+
+def extract_pdf_job(file_path: str, method: Optional[str] = None) -> Dict:
+    """在工作进程中执行分级提取，返回 PDFProcessor.extract 的结果"""
+    from app.services.pdf_processor import PDFProcessor
+
+    return asyncio.run(PDFProcessor().extract(file_path, method=method))
+
+
+def _worker_main(conn) -> None:
+    """工作进程主循环：逐个接收 (函数, 参数) 并返回结果，收到 None 时退出"""
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        func, args, kwargs = message
+        try:
+            conn.send(("ok", func(*args, **kwargs)))
+        except Exception as exc:
+            conn.send(("error", f"{type(exc).__name__}: {exc}"))
+
+
+def _process_tree_rss(pid: int) -> int:
+    try:
+        process = psutil.Process(pid)
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+    except psutil.Error:
+        return 0
+
+
+def _kill_process_tree(pid: int) -> None:
+    try:
+        process = psutil.Process(pid)
+        children = process.children(recursive=True)
+    except psutil.Error:
+        return
+    for victim in children + [process]:
+        try:
+            victim.kill()
+        except psutil.Error:
+            continue
+    psutil.wait_procs(children + [process], timeout=5)
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    sequence: int
+    func: Callable = field(compare=False)
+    args: tuple = field(compare=False)
+    kwargs: dict = field(compare=False)
+    timeout: float = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.completed = 0
+        self.busy = False
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+            self.process.join(timeout=5)
+        except (OSError, ValueError):
+            pass
+        if self.process.is_alive():
+            _kill_process_tree(self.process.pid)
+        self.conn.close()
+
+    def kill(self) -> None:
+        _kill_process_tree(self.process.pid)
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+class PDFWorkerPool:
+    """带优先级队列、超时、内存上限与定期回收的 PDF 解析进程池"""
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        max_rss_mb: Optional[int] = None,
+        task_timeout: Optional[float] = None,
+        max_tasks_per_child: Optional[int] = None,
+        enabled: Optional[bool] = None,
+    ):
+        configured = settings.pdf_worker_processes if processes is None else processes
+        self.processes = configured or max((os.cpu_count() or 2) - 1, 1)
+        self.max_rss = (settings.pdf_worker_max_rss_mb if max_rss_mb is None else max_rss_mb) * 1024 * 1024
+        self.task_timeout = settings.pdf_worker_task_timeout if task_timeout is None else task_timeout
+        self.max_tasks_per_child = (
+            settings.pdf_worker_max_tasks_per_child if max_tasks_per_child is None else max_tasks_per_child
+        )
+        self.enabled = settings.pdf_worker_pool_enabled if enabled is None else enabled
+
+        self._context = multiprocessing.get_context(settings.pdf_worker_start_method)
+        self._workers: List[Optional[_Worker]] = [None] * self.processes
+        self._sequence = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pid = os.getpid()
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._dispatchers: List[asyncio.Task] = []
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "memory_kills": 0,
+            "crashes": 0,
+            "recycled": 0,
+        }
+
+    def _bind_loop(self) -> asyncio.PriorityQueue:
+        """队列和调度协程绑定到当前事件循环；Celery 任务每次 asyncio.run 时重新绑定，工作进程保持常驻"""
+        loop = asyncio.get_running_loop()
+        if self._pid != os.getpid():
+            # fork 出的子进程不继承父进程的工作进程
+            self._pid = os.getpid()
+            self._workers = [None] * self.processes
+            self._loop = None
+        if self._loop is not loop or self._loop.is_closed():
+            # 上一个事件循环结束时仍在执行的任务会在管道中留下过期结果，需重启这些工作进程
+            for slot, worker in enumerate(self._workers):
+                if worker is not None and worker.busy:
+                    worker.kill()
+                    self._workers[slot] = None
+            self._loop = loop
+            self._queue = asyncio.PriorityQueue()
+            self._dispatchers = [
+                loop.create_task(self._dispatch(slot), name=f"pdf-worker-{slot}")
+                for slot in range(self.processes)
+            ]
+        return self._queue
+
+    async def submit(
+        self,
+        func: Callable,
+        *args,
+        priority: int = PRIORITY_NORMAL,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        提交任务并等待结果
+
+        Args:
+            func: 可被子进程导入的模块级函数
+            priority: 越小越先执行
+            timeout: 单个任务的执行超时（秒），不含排队时间
+
+        Raises:
+            PDFWorkerError: 超时、内存超限、工作进程崩溃或任务内部异常
+        """
+        self.stats["submitted"] += 1
+        if not self.enabled:
+            return await self._run_inline(func, args, kwargs)
+
+        queue = self._bind_loop()
+        future = asyncio.get_running_loop().create_future()
+        await queue.put(_Job(
+            priority=priority,
+            sequence=next(self._sequence),
+            func=func,
+            args=args,
+            kwargs=kwargs,
+            timeout=timeout or self.task_timeout,
+            future=future,
+        ))
+        return await future
+
+    async def extract(self, file_path: str, method: Optional[str] = None, priority: int = PRIORITY_NORMAL) -> Dict:
+        """在工作进程中分级提取 PDF；失败时返回与 PDFProcessor.process_pdf 相同格式的错误结果"""
+        try:
+            return await self.submit(extract_pdf_job, file_path, method, priority=priority)
+        except PDFWorkerError as exc:
+            logger.error(f"PDF工作进程处理失败 {file_path}: {exc}")
+            return {"success": False, "error": str(exc), "content": None}
+
+    async def _dispatch(self, slot: int) -> None:
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            try:
+                if job.future.done():
+                    continue
+                try:
+                    result = await self._run(slot, job)
+                except PDFWorkerError as exc:
+                    self.stats["failed"] += 1
+                    if not job.future.done():
+                        job.future.set_exception(exc)
+                else:
+                    self.stats["completed"] += 1
+                    if not job.future.done():
+                        job.future.set_result(result)
+            finally:
+                queue.task_done()
+
+    async def _run_inline(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        try:
+            return await asyncio.to_thread(func, *args, **kwargs)
+        except Exception as exc:
+            raise PDFWorkerError(f"{type(exc).__name__}: {exc}") from exc
+
+    def _ensure_worker(self, slot: int) -> _Worker:
+        worker = self._workers[slot]
+        if worker is None or not worker.alive():
+            worker = _Worker(self._context)
+            self._workers[slot] = worker
+        return worker
+
+    async def _run(self, slot: int, job: _Job) -> Any:
+        try:
+            worker = await asyncio.to_thread(self._ensure_worker, slot)
+        except AssertionError as exc:
+            # 守护进程中不允许再创建子进程，退回到线程中执行
+            logger.warning(f"无法启动PDF工作进程，改为在线程中解析: {exc}")
+            self.enabled = False
+            return await self._run_inline(job.func, job.args, job.kwargs)
+
+        worker.busy = True
+        worker.conn.send((job.func, job.args, job.kwargs))
+        started = time.monotonic()
+
+        while not await asyncio.to_thread(worker.conn.poll, _POLL_INTERVAL):
+            failure = None
+            if not worker.alive():
+                self.stats["crashes"] += 1
+                failure = f"PDF工作进程异常退出 (exitcode={worker.process.exitcode})"
+            elif time.monotonic() - started > job.timeout:
+                self.stats["timeouts"] += 1
+                failure = f"PDF解析超时 ({job.timeout:.0f}s)"
+            elif self.max_rss and _process_tree_rss(worker.process.pid) > self.max_rss:
+                self.stats["memory_kills"] += 1
+                failure = f"PDF工作进程内存超过 {self.max_rss // (1024 * 1024)}MB"
+            if failure:
+                await asyncio.to_thread(worker.kill)
+                self._workers[slot] = None
+                raise PDFWorkerError(failure)
+
+        try:
+            status, payload = worker.conn.recv()
+        except (EOFError, OSError) as exc:
+            self.stats["crashes"] += 1
+            await asyncio.to_thread(worker.kill)
+            self._workers[slot] = None
+            raise PDFWorkerError(f"PDF工作进程通信失败: {exc}") from exc
+
+        worker.busy = False
+        worker.completed += 1
+        if self.max_tasks_per_child and worker.completed >= self.max_tasks_per_child:
+            self.stats["recycled"] += 1
+            self._workers[slot] = None
+            await asyncio.to_thread(worker.stop)
+
+        if status == "error":
+            raise PDFWorkerError(payload)
+        return payload
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "processes": self.processes,
+            "alive_workers": sum(1 for worker in self._workers if worker is not None and worker.alive()),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+    def shutdown(self) -> None:
+        """停止所有工作进程"""
+        if self._loop is not None and not self._loop.is_closed():
+            for task in self._dispatchers:
+                task.cancel()
+        self._dispatchers = []
+        self._loop = None
+        for slot, worker in enumerate(self._workers):
+            if worker is not None:
+                worker.stop()
+                self._workers[slot] = None
+
+
+pdf_worker_pool = PDFWorkerPool()
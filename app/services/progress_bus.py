@@ -0,0 +1,192 @@
+"""
+跨进程进度总线
+
+任意进程（API worker、Celery worker）产生的 ProgressEvent 会:
+1. XADD 到按任务划分的定长 Redis Stream，供断线重连时回放历史;
+2. PUBLISH 到统一频道，每个 API 进程订阅后转发给本进程的 WebSocket 连接。
+
+Redis 不可用时总线静默降级为单进程行为，并在一段时间后重试。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import redis.asyncio as redis
+from loguru import logger
+
+from app.core.config import settings
+from app.core.redis import CacheKeys
+
+PROGRESS_CHANNEL = CacheKeys.PREFIX + "progress:events"
+PROGRESS_STREAM = CacheKeys.PREFIX + "progress:stream:{task_id}"
+
+_REDIS_RETRY_INTERVAL = 30.0
+_LISTENER_RECONNECT_DELAY = 5.0
+
+RemoteEventHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class ProgressBus:
+    """基于 Redis Pub/Sub + Stream 的进度事件总线"""
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis_url = redis_url or settings.redis_url
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.enabled = settings.progress_bus_enabled and os.getenv(
+            "LIGHTWEIGHT_MODE", "false"
+        ).lower() not in {"1", "true", "yes", "on"}
+        # Celery 任务每次 asyncio.run 都是新事件循环，客户端需按循环区分
+        self._clients: Dict[int, redis.Redis] = {}
+        self._retry_at = 0.0
+        self._listener: Optional[asyncio.Task] = None
+        self.stats = {"published": 0, "received": 0, "publish_errors": 0}
+
+    async def _client(self) -> Optional[redis.Redis]:
+        if not self.enabled or time.monotonic() < self._retry_at:
+            return None
+        loop_id = id(asyncio.get_running_loop())
+        client = self._clients.get(loop_id)
+        if client is None:
+            # 旧事件循环已关闭，其客户端不可复用
+            self._clients.clear()
+            client = redis.from_url(self.redis_url, decode_responses=True)
+            self._clients[loop_id] = client
+        return client
+
+    def _mark_unavailable(self, exc: Exception) -> None:
+        self._retry_at = time.monotonic() + _REDIS_RETRY_INTERVAL
+        logger.warning(f"进度总线Redis不可用，{_REDIS_RETRY_INTERVAL:.0f}秒内降级为单进程推送: {exc}")
+
+    async def publish(self, event: Dict[str, Any]) -> bool:
+        """写入任务历史流并广播到所有订阅进程"""
+        client = await self._client()
+        if client is None:
+            return False
+
+        payload = json.dumps(event, ensure_ascii=False, default=str)
+        stream_key = PROGRESS_STREAM.format(task_id=event["task_id"])
+        try:
+            pipeline = client.pipeline(transaction=False)
+            pipeline.xadd(
+                stream_key,
+                {"data": payload},
+                maxlen=settings.progress_stream_maxlen,
+                approximate=True,
+            )
+            pipeline.expire(stream_key, settings.progress_stream_ttl)
+            pipeline.publish(
+                PROGRESS_CHANNEL,
+                json.dumps({"origin": self.origin, "event": event}, ensure_ascii=False, default=str),
+            )
+            await pipeline.execute()
+        except Exception as exc:
+            self.stats["publish_errors"] += 1
+            self._mark_unavailable(exc)
+            return False
+
+        self.stats["published"] += 1
+        return True
+
+    async def history(
+        self,
+        task_id: str,
+        limit: int = 20,
+        after_event_id: Optional[str] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """从定长流读取最近的事件；Redis 不可用时返回 None 由调用方回退到本地历史
+
+        给定 after_event_id 时只返回该事件之后的部分，用于断线重连补发。
+        """
+        client = await self._client()
+        if client is None:
+            return None
+
+        stream_key = PROGRESS_STREAM.format(task_id=task_id)
+        count = settings.progress_stream_maxlen if after_event_id else limit
+        try:
+            entries = await client.xrevrange(stream_key, count=count)
+        except Exception as exc:
+            self._mark_unavailable(exc)
+            return None
+
+        events: List[Dict[str, Any]] = []
+        for _, fields in reversed(entries):
+            try:
+                events.append(json.loads(fields["data"]))
+            except (KeyError, ValueError):
+                continue
+
+        if after_event_id:
+            for position, event in enumerate(events):
+                if event.get("id") == after_event_id:
+                    events = events[position + 1:]
+                    break
+        return events[-limit:] if limit else events
+
+    async def start_listener(self, handler: RemoteEventHandler) -> None:
+        """启动订阅协程，把其他进程发布的事件交给 handler"""
+        if not self.enabled or (self._listener and not self._listener.done()):
+            return
+        self._listener = asyncio.create_task(self._listen(handler))
+
+    async def stop_listener(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        for client in self._clients.values():
+            try:
+                await client.close()
+            except Exception:
+                pass
+        self._clients.clear()
+
+    async def _listen(self, handler: RemoteEventHandler) -> None:
+        while True:
+            pubsub = None
+            try:
+                client = redis.from_url(self.redis_url, decode_responses=True)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(PROGRESS_CHANNEL)
+                logger.info(f"进度总线已订阅 {PROGRESS_CHANNEL}")
+                async for message in pubsub.listen():
+                    await self._handle_message(message, handler)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning(f"进度总线订阅中断，{_LISTENER_RECONNECT_DELAY:.0f}秒后重连: {exc}")
+                await asyncio.sleep(_LISTENER_RECONNECT_DELAY)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.close()
+                    except Exception:
+                        pass
+
+    async def _handle_message(self, message: Dict[str, Any], handler: RemoteEventHandler) -> None:
+        if message.get("type") != "message":
+            return
+        try:
+            envelope = json.loads(message["data"])
+        except (KeyError, ValueError):
+            return
+        # 本进程发布的事件已在本地分发过
+        if envelope.get("origin") == self.origin or "event" not in envelope:
+            return
+        self.stats["received"] += 1
+        try:
+            await handler(envelope["event"])
+        except Exception as exc:
+            logger.error(f"处理远程进度事件失败: {exc}")
+
+
+progress_bus = ProgressBus()
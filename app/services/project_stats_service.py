@@ -0,0 +1,152 @@
+"""
+项目文献统计物化服务
+
+统计结果保存在 project_literature_stats 表中，仪表盘读取时只查一行:
+- 文献变更时由 app.models.stats_tracking 把受影响项目标记为过期;
+- 读取时直接返回已有的行，过期行也不在请求中重算（统计最多滞后一个刷新周期）;
+  项目首次读取、尚无统计行时就地计算一次;
+- Celery 定时任务刷新所有过期行，并定期全量对账，兜底绕过 ORM 的写入。
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from loguru import logger
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.time_utils import utc_now
+from app.models.literature import Literature, LiteratureSegment
+from app.models.project import Project, ProjectLiteratureStats
+
+_TOP_JOURNALS = 10
+
+
+def _in_project(project_id: int):
+    return or_(
+        Literature.project_id == project_id,
+        Literature.projects.any(Project.id == project_id),
+    )
+
+
+def compute_project_stats(db: Session, project_id: int) -> Dict[str, Any]:
+    """从文献表实时计算项目统计（刷新与对账使用）"""
+    in_project = _in_project(project_id)
+    total, processed = db.execute(
+        select(
+            func.count(Literature.id),
+            func.sum(case((Literature.is_parsed == True, 1), else_=0)),  # noqa: E712
+        ).where(in_project)
+    ).one()
+    segments = db.scalar(
+        select(func.count(LiteratureSegment.id)).join(Literature).where(in_project)
+    ) or 0
+    years = db.execute(
+        select(Literature.publication_year, func.count(Literature.id))
+        .where(in_project, Literature.publication_year.isnot(None))
+        .group_by(Literature.publication_year)
+        .order_by(Literature.publication_year.desc())
+    ).all()
+    journal_count = func.count(Literature.id)
+    journals = db.execute(
+        select(Literature.journal, journal_count)
+        .where(in_project, Literature.journal.isnot(None))
+        .group_by(Literature.journal)
+        .order_by(journal_count.desc())
+        .limit(_TOP_JOURNALS)
+    ).all()
+    return {
+        "total_literature": int(total or 0),
+        "processed_literature": int(processed or 0),
+        "total_segments": segments,
+        "year_distribution": [{"year": year, "count": count} for year, count in years],
+        "top_journals": [{"journal": journal, "count": count} for journal, count in journals],
+    }
+
+
+def _get_or_create_stats_row(db: Session, project_id: int) -> ProjectLiteratureStats:
+    row = db.get(ProjectLiteratureStats, project_id)
+    if row is not None:
+        return row
+    try:
+        with db.begin_nested():
+            row = ProjectLiteratureStats(project_id=project_id)
+            db.add(row)
+    except IntegrityError:
+        # 并发的首次读取已插入该行，改为更新它
+        row = db.get(ProjectLiteratureStats, project_id)
+    return row
+
+
+def refresh_project_stats(db: Session, project_id: int) -> ProjectLiteratureStats:
+    """重新计算并写入一个项目的统计行（调用方负责提交）"""
+    row = _get_or_create_stats_row(db, project_id)
+    for key, value in compute_project_stats(db, project_id).items():
+        setattr(row, key, value)
+    row.is_stale = False
+    row.refreshed_at = utc_now()
+    db.flush()
+    return row
+
+
+def refresh_stale_project_stats(db: Session, limit: int = 100) -> int:
+    """刷新过期的统计行，返回刷新的项目数"""
+    project_ids = db.scalars(
+        select(ProjectLiteratureStats.project_id)
+        .where(ProjectLiteratureStats.is_stale.is_(True))
+        .limit(limit)
+    ).all()
+    for project_id in project_ids:
+        refresh_project_stats(db, project_id)
+        db.commit()
+    return len(project_ids)
+
+
+def reconcile_project_stats(db: Session, project_ids: Optional[Iterable[int]] = None) -> Dict[str, int]:
+    """全量对账：重算所有（或指定）项目并记录与已存值不一致的数量"""
+    ids: List[int] = list(project_ids) if project_ids is not None else db.scalars(select(Project.id)).all()
+    drifted = 0
+    for project_id in ids:
+        existing = db.get(ProjectLiteratureStats, project_id)
+        before = _counters(existing) if existing is not None else None
+        row = refresh_project_stats(db, project_id)
+        if before is not None and before != _counters(row):
+            drifted += 1
+        db.commit()
+    if drifted:
+        logger.warning(f"项目文献统计对账发现 {drifted} 个项目与物化值不一致，已修正")
+    return {"projects": len(ids), "drifted": drifted}
+
+
+def _counters(row: ProjectLiteratureStats):
+    return (row.total_literature, row.processed_literature, row.total_segments)
+
+
+def format_project_stats(row: ProjectLiteratureStats) -> Dict[str, Any]:
+    total = row.total_literature or 0
+    processed = row.processed_literature or 0
+    return {
+        "total_literature": total,
+        "processed_literature": processed,
+        "processing_rate": (processed / total * 100) if total > 0 else 0,
+        "total_segments": row.total_segments or 0,
+        "unprocessed_literature": total - processed,
+        "storage_saved": {
+            "year_distribution": row.year_distribution or [],
+            "top_journals": row.top_journals or [],
+        },
+        "refreshed_at": row.refreshed_at,
+    }
+
+
+async def get_project_stats(db: AsyncSession, project_id: int) -> Dict[str, Any]:
+    """读取项目统计：只查询一行；过期行照常返回，由定时任务重算"""
+    row = await db.get(ProjectLiteratureStats, project_id)
+    if row is None:
+        # 尚无物化行时只能就地计算一次
+        row = await db.run_sync(refresh_project_stats, project_id)
+        stats = format_project_stats(row)
+        await db.commit()
+        return stats
+    return format_project_stats(row)
@@ -2,16 +2,23 @@
 RAG检索增强生成服务 - 使用Elasticsearch进行语义/关键词混合检索
 """
 
+import os
 from typing import List, Dict, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from loguru import logger
 
+from app.core.async_clients import async_clients
 from app.core.config import settings
 from app.models.literature import LiteratureSegment, Literature
 from app.models.experience import MainExperience
+from app.models.project import project_literature_association
 from app.services.enhanced_search_service import get_enhanced_search_service
+from app.services.ai_service import AIService
 from app.services.data_sync_service import DataSyncService
-from openai import AsyncOpenAI
+from app.services.local_vector_index import local_vector_index
+from app.services.llm_concurrency import governed_client
+
+LIGHTWEIGHT_MODE = os.getenv("LIGHTWEIGHT_MODE", "false").lower() in {"1", "true", "yes", "on"}
 
 
 class RAGService:
@@ -19,7 +26,7 @@ class RAGService:
 
     def __init__(self, db: Session):
         self.db = db
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+        self.client = governed_client(async_clients.openai())
         self._search_service = None
 
     async def search_relevant_segments(
@@ -29,7 +36,10 @@ class RAGService:
         top_k: int = 10,
         similarity_threshold: float = 0.25
     ) -> List[Dict]:
-        """从Elasticsearch中检索相关文献段落"""
+        """从Elasticsearch中检索相关文献段落，ES不可用时退回本地向量索引"""
+        if LIGHTWEIGHT_MODE:
+            return await self._search_local_index(query, project_id, top_k, similarity_threshold)
+
         try:
             search_service = await self._get_search_service()
 
@@ -61,6 +71,72 @@ class RAGService:
 
         except Exception as e:
             logger.error(f"RAG搜索失败: {e}")
+            return await self._search_local_index(query, project_id, top_k, similarity_threshold)
+
+    async def _search_local_index(
+        self,
+        query: str,
+        project_id: int,
+        top_k: int,
+        similarity_threshold: float
+    ) -> List[Dict]:
+        """使用本地向量索引检索段落（轻量模式或ES故障时）"""
+        if not settings.local_vector_index_enabled:
+            return []
+
+        try:
+            ai_service = AIService()
+            # 新段落在后台补充进索引，查询只使用已索引的内容
+            local_vector_index.schedule_sync(project_id, ai_service)
+
+            query_embedding = await ai_service.get_embedding(query)
+            # 索引只追加不删除：只保留仍属于项目的段落，并多取一些以免过滤后不足 top_k
+            hits = local_vector_index.search(project_id, query_embedding, top_k * 2, db=self.db)
+            if not hits:
+                return []
+
+            segments = (
+                self.db.query(LiteratureSegment)
+                .options(joinedload(LiteratureSegment.literature))
+                .join(
+                    project_literature_association,
+                    project_literature_association.c.literature_id == LiteratureSegment.literature_id,
+                )
+                .filter(
+                    project_literature_association.c.project_id == project_id,
+                    LiteratureSegment.id.in_([segment_id for segment_id, _ in hits]),
+                )
+                .all()
+            )
+            segments_by_id = {segment.id: segment for segment in segments}
+
+            results = []
+            for segment_id, cosine in hits:
+                segment = segments_by_id.get(segment_id)
+                if segment is None:
+                    continue  # 段落已被删除或其文献已移出项目
+                # 与ES语义检索保持一致的 cos + 1 量纲
+                similarity = cosine + 1.0
+                if similarity < similarity_threshold:
+                    continue
+                literature = segment.literature
+                results.append({
+                    "id": segment.id,
+                    "content": segment.content,
+                    "segment_type": segment.segment_type,
+                    "section_title": segment.section_title,
+                    "structured_data": segment.structured_data or {},
+                    "extraction_confidence": float(segment.extraction_confidence or 0.0),
+                    "literature_title": literature.title if literature else None,
+                    "authors": (literature.authors or []) if literature else [],
+                    "publication_year": literature.publication_year if literature else None,
+                    "similarity_score": similarity,
+                    "search_type": "local_vector"
+                })
+            return results[:top_k]
+
+        except Exception as e:
+            logger.error(f"本地向量检索失败: {e}")
             return []
 
     async def _get_search_service(self):
@@ -0,0 +1,223 @@
+"""
+AI 筛选前的本地预排序
+
+在调用大模型筛选之前，用项目的研究方向与关键词对全部候选论文打分:
+- 语义分：研究方向与论文标题摘要的嵌入向量余弦相似度（走嵌入缓存）;
+- 关键词分：BM25 关键词匹配（英文按词、中文按二元组切分），以候选集合计算 IDF。
+两项分数在候选集合内归一化后加权，整组候选用 NumPy 一次性计算。
+
+排名靠前的一部分候选，以及分数距截断线不超过 borderline_margin 的边界候选，
+会交给大模型筛选，其余候选直接判为不相关。
+候选数不超过 min_forward 时全部放行，小规模搜索的行为保持不变。
+evaluate_prefilter 用带标注的样本计算召回率与送审比例，供调参时评估。
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+
+from app.core.config import settings
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_CJK_RE = re.compile(r"[一-鿿]+")
+_DOCUMENT_CHARS = 2000
+
+# BM25 参数
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """英文按词切分（长度≥2），中文连续片段按二元组切分"""
+    lowered = (text or "").lower()
+    tokens = [word for word in _WORD_RE.findall(lowered) if len(word) >= 2]
+    for run in _CJK_RE.findall(lowered):
+        if len(run) == 1:
+            tokens.append(run)
+        tokens.extend(run[index:index + 2] for index in range(len(run) - 1))
+    return tokens
+
+
+def paper_text(paper: Dict[str, Any]) -> str:
+    return f"{paper.get('title') or ''}\n{paper.get('abstract') or ''}"[:_DOCUMENT_CHARS]
+
+
+def bm25_scores(query_terms: Sequence[str], documents: Sequence[Sequence[str]]) -> np.ndarray:
+    """计算每篇文档对查询词的 BM25 分数，IDF 基于当前文档集合"""
+    terms = list(dict.fromkeys(query_terms))
+    if not terms or not documents:
+        return np.zeros(len(documents), dtype=np.float32)
+    column = {term: index for index, term in enumerate(terms)}
+    tf = np.zeros((len(documents), len(terms)), dtype=np.float32)
+    lengths = np.empty(len(documents), dtype=np.float32)
+    for row, tokens in enumerate(documents):
+        lengths[row] = len(tokens)
+        for term, count in Counter(token for token in tokens if token in column).items():
+            tf[row, column[term]] = count
+
+    doc_freq = (tf > 0).sum(axis=0)
+    idf = np.log1p((len(documents) - doc_freq + 0.5) / (doc_freq + 0.5))
+    average_length = max(float(lengths.mean()), 1.0)
+    norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * lengths / average_length)
+    return (idf * tf * (_BM25_K1 + 1) / (tf + norm[:, None])).sum(axis=1)
+
+
+def cosine_scores(query_vector: Sequence[float], document_vectors: Sequence[Sequence[float]]) -> np.ndarray:
+    """余弦相似度；任一侧为零向量（嵌入失败）时记为 NaN"""
+    query = np.asarray(query_vector, dtype=np.float32)
+    matrix = np.asarray(document_vectors, dtype=np.float32)
+    if matrix.ndim != 2 or matrix.shape[0] == 0 or query.shape[0] != matrix.shape[1]:
+        return np.full(len(document_vectors), np.nan, dtype=np.float32)
+    query_norm = float(np.linalg.norm(query))
+    norms = np.linalg.norm(matrix, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = matrix @ query / (norms * query_norm)
+    scores[(norms == 0) | (query_norm == 0)] = np.nan
+    return scores
+
+
+def _min_max(values: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(values)
+    result = np.full(values.shape, np.nan, dtype=np.float32)
+    if not valid.any():
+        return result
+    low, high = values[valid].min(), values[valid].max()
+    result[valid] = (values[valid] - low) / (high - low) if high > low else 0.5
+    return result
+
+
+def combine_scores(semantic: np.ndarray, keyword: np.ndarray, embedding_weight: float) -> np.ndarray:
+    """归一化后加权合并；缺少语义分的论文只使用关键词分"""
+    semantic = _min_max(semantic)
+    keyword = _min_max(keyword)
+    keyword = np.nan_to_num(keyword, nan=0.0)
+    return np.where(
+        np.isnan(semantic),
+        keyword,
+        embedding_weight * np.nan_to_num(semantic) + (1 - embedding_weight) * keyword,
+    )
+
+
+def select_forwarded(
+    scores: np.ndarray,
+    forward_fraction: float,
+    min_forward: int,
+    borderline_margin: float,
+) -> np.ndarray:
+    """返回需要交给大模型筛选的布尔掩码：排名前列 + 截断线附近的边界候选"""
+    count = len(scores)
+    keep = max(min_forward, int(np.ceil(count * forward_fraction)))
+    if keep >= count:
+        return np.ones(count, dtype=bool)
+    order = np.argsort(-scores, kind="stable")
+    mask = np.zeros(count, dtype=bool)
+    mask[order[:keep]] = True
+    cutoff = scores[order[keep - 1]]
+    # 得分为 0 的候选（集合内最不相关）不算作边界候选，避免并列时整体放行
+    return mask | ((scores > cutoff - borderline_margin) & (scores > 0))
+
+
+@dataclass
+class PrefilterResult:
+    scores: np.ndarray
+    forwarded: np.ndarray
+
+    @property
+    def forwarded_count(self) -> int:
+        return int(self.forwarded.sum())
+
+    @property
+    def rejected_count(self) -> int:
+        return len(self.forwarded) - self.forwarded_count
+
+
+class RelevancePrefilter:
+    """基于嵌入与关键词的候选预排序"""
+
+    def __init__(
+        self,
+        forward_fraction: Optional[float] = None,
+        min_forward: Optional[int] = None,
+        borderline_margin: Optional[float] = None,
+        embedding_weight: Optional[float] = None,
+    ):
+        self.forward_fraction = (
+            settings.relevance_prefilter_forward_fraction if forward_fraction is None else forward_fraction
+        )
+        self.min_forward = settings.relevance_prefilter_min_forward if min_forward is None else min_forward
+        self.borderline_margin = (
+            settings.relevance_prefilter_borderline_margin if borderline_margin is None else borderline_margin
+        )
+        self.embedding_weight = (
+            settings.relevance_prefilter_embedding_weight if embedding_weight is None else embedding_weight
+        )
+
+    async def score(
+        self,
+        ai_service,
+        research_direction: str,
+        keywords: Sequence[str],
+        papers: Sequence[Dict[str, Any]],
+    ) -> np.ndarray:
+        """计算候选论文的综合相关性分数（0-1）；ai_service 为 None 时只使用关键词分"""
+        query = " ".join([research_direction or "", *keywords])
+        keyword = bm25_scores(tokenize(query), [tokenize(paper_text(paper)) for paper in papers])
+
+        semantic = np.full(len(papers), np.nan, dtype=np.float32)
+        if ai_service is not None and self.embedding_weight > 0:
+            try:
+                vectors = await ai_service.get_embeddings_batch(
+                    [query] + [paper_text(paper) for paper in papers]
+                )
+                semantic = cosine_scores(vectors[0], vectors[1:])
+            except Exception as exc:
+                logger.warning(f"预筛选嵌入计算失败，仅使用关键词分: {exc}")
+        return combine_scores(semantic, keyword, self.embedding_weight)
+
+    async def rank(
+        self,
+        ai_service,
+        research_direction: str,
+        keywords: Sequence[str],
+        papers: Sequence[Dict[str, Any]],
+    ) -> PrefilterResult:
+        if len(papers) <= self.min_forward:
+            return PrefilterResult(
+                scores=np.ones(len(papers), dtype=np.float32),
+                forwarded=np.ones(len(papers), dtype=bool),
+            )
+        scores = await self.score(ai_service, research_direction, keywords, papers)
+        forwarded = select_forwarded(scores, self.forward_fraction, self.min_forward, self.borderline_margin)
+        return PrefilterResult(scores=scores, forwarded=forwarded)
+
+
+def evaluate_prefilter(result: PrefilterResult, labels: Sequence[bool]) -> Dict[str, float]:
+    """
+    用人工或大模型标注评估预筛选效果
+
+    Args:
+        result: 预筛选结果
+        labels: 与候选一一对应的真实相关性
+
+    Returns:
+        recall（相关论文被送审的比例）、forward_ratio（送审比例）等指标
+    """
+    relevant = np.asarray(labels, dtype=bool)
+    forwarded = result.forwarded
+    total_relevant = int(relevant.sum())
+    kept_relevant = int((relevant & forwarded).sum())
+    return {
+        "candidates": len(forwarded),
+        "forwarded": int(forwarded.sum()),
+        "forward_ratio": float(forwarded.mean()) if len(forwarded) else 0.0,
+        "relevant": total_relevant,
+        "recall": kept_relevant / total_relevant if total_relevant else 1.0,
+        "precision": kept_relevant / int(forwarded.sum()) if forwarded.any() else 0.0,
+    }
+
+
+relevance_prefilter = RelevancePrefilter()
@@ -0,0 +1,336 @@
+"""
+文献相关性批量筛选
+
+搜索建库与初筛原先每篇论文各发起一次对话补全，每次都重复同样的评估说明。
+这里把 N 篇论文放进同一次补全，要求模型返回 JSON 数组逐篇打分:
+- 数组解析失败或缺少某些论文时，仅对缺失的论文回退到逐篇评估;
+- 评分结果按 (研究方向+关键词, 论文ID) 缓存在进程内 LRU 与 Redis 中，
+  重复运行或关键词重叠的搜索不会再次调用模型。
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.redis import CacheKeys, redis_manager
+
+# 修改批量提示词或评分口径时递增，使旧的缓存判定失效
+PROMPT_VERSION = "v1"
+
+_ABSTRACT_CHARS = 500
+_REDIS_RETRY_INTERVAL = 60.0
+_WHITESPACE_RE = re.compile(r"\s+")
+_FENCE_RE = re.compile(r"^```(?:json)?|```$", re.MULTILINE)
+
+# 单篇回退评估：返回 0-10 分，无法评估时返回 None（不写入缓存）
+SingleScorer = Callable[[Dict[str, Any]], Awaitable[Optional[float]]]
+
+
+def _normalize(text: Optional[str]) -> str:
+    normalized = unicodedata.normalize("NFC", text or "")
+    return _WHITESPACE_RE.sub(" ", normalized).strip().lower()
+
+
+@dataclass(frozen=True)
+class ScreeningContext:
+    """一次筛选所依据的研究方向与关键词"""
+
+    research_direction: str
+    keywords: Sequence[str] = field(default_factory=tuple)
+
+    @property
+    def digest(self) -> str:
+        keywords = sorted({_normalize(keyword) for keyword in self.keywords if keyword})
+        payload = "\x00".join([PROMPT_VERSION, _normalize(self.research_direction), *keywords])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def paper_identity(paper: Dict[str, Any]) -> Optional[str]:
+    """论文在缓存中的标识：优先使用检索源ID/DOI，否则使用标题哈希"""
+    for key in ("paperId", "paper_id", "doi"):
+        value = paper.get(key)
+        if value:
+            return f"{key}:{value}"
+    title = _normalize(paper.get("title"))
+    if title:
+        return "title:" + hashlib.sha1(title.encode("utf-8")).hexdigest()
+    return None
+
+
+def build_batch_prompt(context: ScreeningContext, papers: Sequence[Dict[str, Any]]) -> str:
+    entries = []
+    for index, paper in enumerate(papers, start=1):
+        abstract = (paper.get("abstract") or "")[:_ABSTRACT_CHARS]
+        entries.append(f"[{index}] 标题: {paper.get('title', '')}\n摘要: {abstract}")
+    papers_text = "\n\n".join(entries)
+    return f"""
+你是一个专业的学术文献评估专家。请评估下列论文与研究项目的相关性。
+
+研究方向: {context.research_direction}
+关键词: {', '.join(context.keywords)}
+
+评估标准：标题和摘要与研究方向的匹配度、研究方法与应用领域的相关性。
+
+论文列表：
+{papers_text}
+
+请只返回一个JSON数组，每篇论文一个元素，不要输出其他内容：
+[{{"index": 论文编号, "score": 相关性评分(0-10), "reason": "不超过20字的理由"}}]
+"""
+
+
+def parse_batch_response(content: str, size: int) -> Dict[int, Dict[str, Any]]:
+    """解析批量评分结果，返回 {论文下标(0起): 判定}；无法解析时返回空字典"""
+    text = _FENCE_RE.sub("", content or "").strip()
+    start, end = text.find("["), text.rfind("]")
+    if start < 0 or end <= start:
+        return {}
+    try:
+        rows = json.loads(text[start:end + 1])
+    except (TypeError, ValueError):
+        return {}
+    if not isinstance(rows, list):
+        return {}
+
+    verdicts: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        try:
+            index = int(row.get("index")) - 1
+            score = float(row.get("score"))
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < size:
+            verdicts[index] = {
+                "score": min(10.0, max(0.0, score)),
+                "reason": str(row.get("reason") or "")[:200],
+            }
+    return verdicts
+
+
+class VerdictCache:
+    """筛选判定缓存：进程内 LRU + Redis（Redis 不可用时退避重试）"""
+
+    def __init__(self, memory_size: Optional[int] = None, ttl: Optional[int] = None):
+        self.memory_size = memory_size if memory_size is not None else settings.relevance_verdict_memory_size
+        self.ttl = ttl or settings.relevance_verdict_cache_ttl
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._redis_retry_at = 0.0
+
+    @staticmethod
+    def key(context: ScreeningContext, identity: str) -> str:
+        return f"{CacheKeys.PREFIX}relevance:{context.digest}:{identity}"
+
+    async def _redis_client(self):
+        if time.monotonic() < self._redis_retry_at:
+            return None
+        try:
+            client = await redis_manager.get_client()
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.debug(f"筛选缓存无法获取Redis客户端: {exc}")
+            client = None
+        if client is None:
+            self._redis_retry_at = time.monotonic() + _REDIS_RETRY_INTERVAL
+        return client
+
+    def _memory_get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, verdict = entry
+        if expires_at <= time.monotonic():
+            self._memory.pop(key, None)
+            return None
+        self._memory.move_to_end(key)
+        return verdict
+
+    def _memory_put(self, key: str, verdict: Dict[str, Any]) -> None:
+        if self.memory_size <= 0:
+            return
+        self._memory[key] = (time.monotonic() + self.ttl, verdict)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        found = {key: verdict for key in keys if (verdict := self._memory_get(key)) is not None}
+        pending = [key for key in dict.fromkeys(keys) if key not in found]
+        if not pending:
+            return found
+        client = await self._redis_client()
+        if client is None:
+            return found
+        try:
+            values = await client.mget(pending)
+        except Exception as exc:
+            logger.debug(f"筛选缓存Redis读取失败: {exc}")
+            self._redis_retry_at = time.monotonic() + _REDIS_RETRY_INTERVAL
+            return found
+        for key, value in zip(pending, values):
+            if not value:
+                continue
+            try:
+                verdict = json.loads(value)
+            except (TypeError, ValueError):
+                continue
+            self._memory_put(key, verdict)
+            found[key] = verdict
+        return found
+
+    async def set_many(self, items: Dict[str, Dict[str, Any]]) -> None:
+        if not items:
+            return
+        for key, verdict in items.items():
+            self._memory_put(key, verdict)
+        client = await self._redis_client()
+        if client is None:
+            return
+        try:
+            pipeline = client.pipeline()
+            for key, verdict in items.items():
+                pipeline.setex(key, self.ttl, json.dumps(verdict, ensure_ascii=False))
+            await pipeline.execute()
+        except Exception as exc:
+            logger.debug(f"筛选缓存Redis写入失败: {exc}")
+            self._redis_retry_at = time.monotonic() + _REDIS_RETRY_INTERVAL
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+
+
+class RelevanceScreener:
+    """按批评估论文相关性，结果逐篇缓存"""
+
+    def __init__(self, cache: Optional[VerdictCache] = None):
+        self.cache = cache or VerdictCache()
+        self.stats: Dict[str, int] = {
+            "cache_hits": 0,
+            "batch_calls": 0,
+            "batch_scored": 0,
+            "fallback_scored": 0,
+            "unscored": 0,
+        }
+
+    async def screen(
+        self,
+        ai_service,
+        context: ScreeningContext,
+        papers: Sequence[Dict[str, Any]],
+        single_scorer: SingleScorer,
+        batch_size: Optional[int] = None,
+        max_concurrency: int = 3,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        评估一组论文的相关性
+
+        Args:
+            ai_service: 提供 generate_completion 的 AI 服务
+            context: 研究方向与关键词
+            papers: 论文原始数据（title/abstract/paperId 等）
+            single_scorer: 批量结果缺失时的单篇评估函数
+            batch_size: 每次补全包含的论文数，默认使用配置
+            max_concurrency: 同时进行的补全请求数
+
+        Returns:
+            与输入一一对应的判定 {"score", "reason", "source"}；无法评估时为 None
+        """
+        batch_size = max(1, batch_size or settings.relevance_screening_batch_size)
+        identities = [paper_identity(paper) for paper in papers]
+        keys = [self.cache.key(context, identity) if identity else None for identity in identities]
+
+        cached = await self.cache.get_many([key for key in keys if key])
+        results: List[Optional[Dict[str, Any]]] = [None] * len(papers)
+        # 同一论文在本次输入中重复出现时只评估一次
+        pending: "OrderedDict[str, List[int]]" = OrderedDict()
+        for position, key in enumerate(keys):
+            if key and key in cached:
+                results[position] = {**cached[key], "source": "cache"}
+                self.stats["cache_hits"] += 1
+            else:
+                pending.setdefault(key or f"#{position}", []).append(position)
+
+        groups = list(pending.values())
+        batches = [groups[start:start + batch_size] for start in range(0, len(groups), batch_size)]
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run(batch: List[List[int]]) -> None:
+            verdicts = await self._score_batch(
+                ai_service, context, [papers[group[0]] for group in batch], single_scorer, semaphore
+            )
+            fresh: Dict[str, Dict[str, Any]] = {}
+            for group, verdict in zip(batch, verdicts):
+                if verdict is None:
+                    self.stats["unscored"] += 1
+                    continue
+                for position in group:
+                    results[position] = verdict
+                key = keys[group[0]]
+                if key:
+                    fresh[key] = {"score": verdict["score"], "reason": verdict.get("reason", "")}
+            await self.cache.set_many(fresh)
+
+        await asyncio.gather(*(run(batch) for batch in batches))
+        return results
+
+    async def _score_batch(
+        self,
+        ai_service,
+        context: ScreeningContext,
+        papers: List[Dict[str, Any]],
+        single_scorer: SingleScorer,
+        semaphore: asyncio.Semaphore,
+    ) -> List[Optional[Dict[str, Any]]]:
+        # 批量请求与回退的单篇请求共用同一并发上限
+        parsed: Dict[int, Dict[str, Any]] = {}
+        if len(papers) > 1:
+            self.stats["batch_calls"] += 1
+            try:
+                async with semaphore:
+                    response = await ai_service.generate_completion(
+                        build_batch_prompt(context, papers),
+                        model="gpt-3.5-turbo",
+                        max_tokens=60 * len(papers) + 100,
+                        temperature=0.1,
+                    )
+                if response.get("success"):
+                    parsed = parse_batch_response(response.get("content", ""), len(papers))
+            except Exception as exc:
+                logger.warning(f"批量相关性评估失败，回退逐篇评估: {exc}")
+            if len(parsed) < len(papers):
+                logger.info(f"批量相关性评估返回 {len(parsed)}/{len(papers)} 篇，其余逐篇评估")
+            self.stats["batch_scored"] += len(parsed)
+
+        async def fallback(index: int) -> Optional[Dict[str, Any]]:
+            try:
+                async with semaphore:
+                    score = await single_scorer(papers[index])
+            except Exception as exc:
+                logger.warning(f"单篇相关性评估失败: {exc}")
+                return None
+            if score is None:
+                return None
+            self.stats["fallback_scored"] += 1
+            return {"score": float(score), "reason": "", "source": "single"}
+
+        missing = [index for index in range(len(papers)) if index not in parsed]
+        fallbacks = dict(zip(missing, await asyncio.gather(*(fallback(index) for index in missing))))
+        return [
+            {**parsed[index], "source": "batch"} if index in parsed else fallbacks[index]
+            for index in range(len(papers))
+        ]
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats)
+
+
+relevance_screener = RelevanceScreener()
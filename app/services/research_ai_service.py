@@ -5,14 +5,15 @@
 
 import asyncio
 import json
-from typing import Dict, List, Optional, Any, Union
+from typing import Callable, Dict, List, Optional, Any, Union
 from datetime import datetime, timedelta
 from loguru import logger
 import openai
-from openai import AsyncOpenAI
 
-from app.core.config import settings
+from app.core.async_clients import async_clients
 from app.core.exceptions import AIServiceError
+from app.services.llm_cache import is_json_content, llm_cache
+from app.services.llm_concurrency import governed_client
 
 
 class ResearchAIService:
@@ -20,7 +21,7 @@ class ResearchAIService:
     
     def __init__(self):
         """初始化统一的AI服务"""
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+        self.client = governed_client(async_clients.openai())
         self.models = {
             "primary": "gpt-4",
             "fast": "gpt-3.5-turbo", 
@@ -87,6 +88,7 @@ class ResearchAIService:
             response = await self._make_request(
                 model=self.models["analysis"],
                 messages=[{"role": "user", "content": prompt}],
+                validate=is_json_content,
                 temperature=0.1
             )
             
@@ -201,6 +203,7 @@ class ResearchAIService:
             response = await self._make_request(
                 model=self.models["primary"],
                 messages=[{"role": "user", "content": prompt}],
+                validate=is_json_content,
                 max_tokens=3000,
                 temperature=0.2
             )
@@ -271,6 +274,7 @@ class ResearchAIService:
             response = await self._make_request(
                 model=self.models["fast"],
                 messages=[{"role": "user", "content": prompt}],
+                validate=is_json_content,
                 temperature=0.1
             )
             
@@ -306,9 +310,10 @@ class ResearchAIService:
         self, 
         model: str, 
         messages: List[Dict], 
+        validate: Optional[Callable[[str], bool]] = None,
         **kwargs
     ) -> str:
-        """统一的AI请求处理"""
+        """统一的AI请求处理（经过补全缓存，validate 决定回复是否可缓存）"""
         
         # 应用默认配置
         config = {**self.default_config, **kwargs}
@@ -317,9 +322,11 @@ class ResearchAIService:
             # 检查速率限制
             await self._check_rate_limit(model)
             
-            response = await self.client.chat.completions.create(
+            response = await llm_cache.create(
+                self.client,
                 model=model,
                 messages=messages,
+                validate=validate,
                 **config
             )
             
@@ -329,7 +336,7 @@ class ResearchAIService:
             logger.warning(f"API速率限制: {e}")
             # 等待后重试
             await asyncio.sleep(60)
-            return await self._make_request(model, messages, **kwargs)
+            return await self._make_request(model, messages, validate=validate, **kwargs)
             
         except openai.APIError as e:
             logger.error(f"OpenAI API错误: {e}")
@@ -436,6 +443,7 @@ class ResearchAIService:
             response = await self._make_request(
                 model=self.models["primary"],
                 messages=[{"role": "user", "content": prompt}],
+                validate=is_json_content,
                 temperature=0.3,
                 max_tokens=2000
             )
@@ -694,6 +702,7 @@ class ResearchAIService:
             response = await self._make_request(
                 model=self.models["fast"],
                 messages=[{"role": "user", "content": prompt}],
+                validate=is_json_content,
                 temperature=0.1,
                 max_tokens=1000
             )
@@ -2,10 +2,11 @@
 
 import copy
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
+from app.services.llm_concurrency import PRIORITY_INTERACTIVE, llm_priority
 from app.services.rag_service import RAGService
 from app.services.smart_research_assistant import smart_research_assistant
 from app.services.agent_orchestrator import get_agent_orchestrator
@@ -91,15 +92,36 @@ class ResearchOrchestrator:
         context_literature_ids: Optional[List[int]] = None,
     ) -> Dict[str, Any]:
         logger.info(f"RAG mode triggered by user {self.user.id} on project {project_id}")
-        result = await smart_research_assistant.answer_complex_research_question(
-            question=query,
-            project_id=project_id,
-            user_id=self.user.id,
-            context_literature_ids=context_literature_ids,
-            max_literature_count=max_literature_count,
-        )
+        # 交互式问答的大模型调用优先于后台批处理
+        with llm_priority(PRIORITY_INTERACTIVE):
+            result = await smart_research_assistant.answer_complex_research_question(
+                question=query,
+                project_id=project_id,
+                user_id=self.user.id,
+                context_literature_ids=context_literature_ids,
+                max_literature_count=max_literature_count,
+            )
         return result
 
+    async def stream_rag(
+        self,
+        project_id: int,
+        query: str,
+        max_literature_count: int,
+        context_literature_ids: Optional[List[int]] = None,
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """run_rag 的流式版本，产出 (事件名, 数据)"""
+        logger.info(f"Streaming RAG mode triggered by user {self.user.id} on project {project_id}")
+        with llm_priority(PRIORITY_INTERACTIVE):
+            async for event in smart_research_assistant.stream_complex_research_question(
+                question=query,
+                project_id=project_id,
+                user_id=self.user.id,
+                context_literature_ids=context_literature_ids,
+                max_literature_count=max_literature_count,
+            ):
+                yield event
+
     async def run_deep(
         self,
         project_id: int,
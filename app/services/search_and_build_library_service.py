@@ -29,6 +29,9 @@ from app.services.research_rabbit_client import ResearchRabbitClient
 from app.services.pdf_processor import PDFProcessor
 from app.services.lightweight_structuring_service import LightweightStructuringService
 from app.services.ai_service import AIService
+from app.services.literature_dedup import deduplicate_candidates
+from app.services.relevance_prefilter import relevance_prefilter
+from app.services.relevance_screening import ScreeningContext, paper_identity, relevance_screener
 from app.services.semantic_chunker import create_semantic_chunker
 from app.services.data_sync_service import DataSyncService
 from app.services.search_pipeline import (
@@ -256,39 +259,61 @@ class SearchAndBuildLibraryService:
         project: Project,
         config: ProcessingConfig
     ) -> List[LiteratureItem]:
-        """执行AI筛选阶段"""
+        """执行AI筛选阶段（按批评估，判定按研究方向与论文缓存）"""
         try:
-            # 构建筛选提示词
+            # 单篇回退评估使用的提示词
             filter_prompt = self._build_ai_filter_prompt(project)
+            context = ScreeningContext(
+                research_direction=project.research_direction or "通用科研",
+                keywords=tuple(project.keywords or []),
+            )
+            papers = [{**item.raw_data, "paperId": item.paper_id} for item in items]
+
+            # 本地预排序，排名靠后的候选不再调用大模型。
+            # 已有缓存判定的论文直接保留、不参与预排序：分数在候选集内归一化，
+            # 重叠检索中它们可能在读取缓存前就被淘汰
+            if settings.relevance_prefilter_enabled:
+                keys = [
+                    relevance_screener.cache.key(context, identity) if identity else None
+                    for identity in map(paper_identity, papers)
+                ]
+                cached = await relevance_screener.cache.get_many([key for key in keys if key])
+                uncached = [position for position, key in enumerate(keys) if not (key and key in cached)]
+                prefilter = await relevance_prefilter.rank(
+                    self.ai_service, context.research_direction, context.keywords,
+                    [papers[position] for position in uncached],
+                )
+                rejected = {position for position, forwarded in zip(uncached, prefilter.forwarded) if not forwarded}
+                items = [item for position, item in enumerate(items) if position not in rejected]
+                papers = [paper for position, paper in enumerate(papers) if position not in rejected]
+                self.stats.prefilter_rejected = prefilter.rejected_count
+                logger.info(
+                    f"预筛选保留 {prefilter.forwarded_count} 篇候选交给AI筛选，"
+                    f"跳过 {prefilter.rejected_count} 篇，已有缓存判定 {len(keys) - len(uncached)} 篇"
+                )
 
-            # 分批并行AI筛选
-            filtered_items = []
-            semaphore = asyncio.Semaphore(config.max_concurrent_ai_calls)
+            async def score_single(paper: Dict[str, Any]) -> Optional[float]:
+                return await self._evaluate_relevance_with_ai(paper, filter_prompt)
 
-            async def filter_single_item(item: LiteratureItem) -> LiteratureItem:
-                async with semaphore:
-                    try:
-                        relevance_score = await self._evaluate_relevance_with_ai(
-                            item, filter_prompt
-                        )
-                        item.ai_filtered = relevance_score >= config.quality_threshold
-                        if item.ai_filtered:
-                            item.quality_score = max(item.quality_score, relevance_score)
-                        return item
-                    except Exception as e:
-                        logger.warning(f"AI筛选失败 {item.paper_id}: {e}")
-                        item.error = str(e)
-                        return item
-
-            # 执行并行筛选
-            tasks = [filter_single_item(item) for item in items]
-            filtered_items = await asyncio.gather(*tasks, return_exceptions=True)
+            verdicts = await relevance_screener.screen(
+                self.ai_service,
+                context,
+                papers,
+                score_single,
+                max_concurrency=config.max_concurrent_ai_calls,
+            )
 
-            # 过滤成功的项目
-            valid_items = [
-                item for item in filtered_items
-                if isinstance(item, LiteratureItem) and item.ai_filtered
-            ]
+            valid_items = []
+            for item, verdict in zip(items, verdicts):
+                if verdict is None:
+                    logger.warning(f"AI筛选失败 {item.paper_id}")
+                    relevance_score = 5.0  # 默认中等分数
+                else:
+                    relevance_score = min(10.0, max(1.0, verdict["score"]))
+                item.ai_filtered = relevance_score >= config.quality_threshold
+                if item.ai_filtered:
+                    item.quality_score = max(item.quality_score, relevance_score)
+                    valid_items.append(item)
 
             self.stats.ai_filtered = len(valid_items)
             logger.info(f"AI筛选阶段完成，筛选出 {len(valid_items)} 篇高质量文献")
@@ -305,31 +330,27 @@ class SearchAndBuildLibraryService:
         project: Project,
         config: ProcessingConfig
     ) -> List[LiteratureItem]:
-        """执行去重和质量评估阶段"""
+        """执行去重和质量评估阶段（整批查询库中已有文献，批内用哈希集合与 MinHash 判重）"""
         try:
-            unique_items = []
-            duplicate_count = 0
+            result = deduplicate_candidates(
+                self.db,
+                [
+                    ((item.raw_data.get("externalIds") or {}).get("DOI"), item.raw_data.get("title", ""))
+                    for item in items
+                ],
+                near_duplicate=settings.literature_dedup_near_duplicate,
+                near_threshold=settings.literature_dedup_near_threshold,
+            )
+            for position in result.existing:
+                items[position].is_duplicate = True
+            unique_items = [items[position] for position in result.unique]
 
-            for item in items:
-                # 检查数据库中是否已存在
-                existing = await self._check_literature_exists(item, project)
-                if existing:
-                    item.is_duplicate = True
-                    duplicate_count += 1
-                    continue
-
-                # 检查当前批次中的重复
-                is_batch_duplicate = False
-                for existing_item in unique_items:
-                    if self._is_duplicate_item(item, existing_item):
-                        is_batch_duplicate = True
-                        break
-
-                if not is_batch_duplicate:
-                    unique_items.append(item)
-
-            self.stats.duplicates = duplicate_count
-            logger.info(f"去重阶段完成，剩余 {len(unique_items)} 篇唯一文献")
+            self.stats.duplicates = len(result.existing)
+            logger.info(
+                f"去重阶段完成，剩余 {len(unique_items)} 篇唯一文献"
+                f"（库中已有 {len(result.existing)}，批内重复 {len(result.batch_duplicates)}，"
+                f"近似重复 {len(result.near_duplicates)}）"
+            )
 
             requested_limit = max(1, config.max_results or 1)
             return unique_items[:requested_limit]
@@ -574,13 +595,13 @@ class SearchAndBuildLibraryService:
 
     async def _evaluate_relevance_with_ai(
         self,
-        item: LiteratureItem,
+        paper: Dict[str, Any],
         filter_prompt: str
-    ) -> float:
-        """使用AI评估文献相关性"""
+    ) -> Optional[float]:
+        """使用AI评估单篇文献相关性，无法评估时返回None"""
         try:
-            title = item.raw_data.get("title", "")
-            abstract = item.raw_data.get("abstract", "")
+            title = paper.get("title", "")
+            abstract = paper.get("abstract") or ""
 
             evaluation_prompt = f"""
 {filter_prompt}
@@ -605,13 +626,13 @@ class SearchAndBuildLibraryService:
                     score = float(response["content"].strip())
                     return min(10.0, max(1.0, score))
                 except ValueError:
-                    return 5.0  # 默认中等分数
+                    return None
 
-            return 5.0
+            return None
 
         except Exception as e:
             logger.warning(f"AI相关性评估失败: {e}")
-            return 5.0
+            return None
 
     async def _extract_item_content(self, item: LiteratureItem) -> Optional[str]:
         """提取文献项目内容"""
@@ -630,7 +651,7 @@ class SearchAndBuildLibraryService:
             # 如果有PDF文件，提取PDF内容
             if item.pdf_path and os.path.exists(item.pdf_path):
                 try:
-                    pdf_result = await self.pdf_processor.process_pdf(item.pdf_path)
+                    pdf_result = await self.pdf_processor.extract(item.pdf_path)
                     if pdf_result.get("success"):
                         pdf_content = pdf_result["content"].get("text_content", "")
                         if pdf_content:
@@ -869,48 +890,6 @@ class SearchAndBuildLibraryService:
 请给出1-10分的相关性评分。
 """
 
-    async def _check_literature_exists(
-        self,
-        item: LiteratureItem,
-        project: Project
-    ) -> bool:
-        """检查文献是否已存在"""
-        try:
-            doi = item.raw_data.get("externalIds", {}).get("DOI")
-            title = item.raw_data.get("title", "")
-
-            existing = None
-            if doi:
-                existing = self.db.query(Literature).filter(Literature.doi == doi).first()
-            if not existing and title:
-                existing = self.db.query(Literature).filter(Literature.title == title).first()
-
-            return existing is not None
-
-        except Exception as e:
-            logger.warning(f"检查文献重复失败: {e}")
-            return False
-
-    def _is_duplicate_item(
-        self,
-        item1: LiteratureItem,
-        item2: LiteratureItem
-    ) -> bool:
-        """检查两个项目是否重复"""
-        # DOI匹配
-        doi1 = item1.raw_data.get("externalIds", {}).get("DOI")
-        doi2 = item2.raw_data.get("externalIds", {}).get("DOI")
-        if doi1 and doi2 and doi1 == doi2:
-            return True
-
-        # 标题匹配
-        title1 = item1.raw_data.get("title", "").strip().lower()
-        title2 = item2.raw_data.get("title", "").strip().lower()
-        if title1 and title2 and title1 == title2:
-            return True
-
-        return False
-
     def _generate_safe_filename(self, identifier: str, extension: str) -> str:
         """生成安全的文件名"""
         hash_obj = hashlib.md5(identifier.encode('utf-8'))
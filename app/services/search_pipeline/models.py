@@ -41,6 +41,7 @@ class ProcessingStats:
 
     total_found: int = 0
     ai_filtered: int = 0
+    prefilter_rejected: int = 0
     pdf_downloaded: int = 0
     successfully_processed: int = 0
     structure_extracted: int = 0
@@ -0,0 +1,170 @@
+"""
+文献段落批量写入器
+
+文献处理任务中每篇文献解析出的段落先进入内存缓冲，达到数量或时间阈值后一次性写库：
+段落使用多行 INSERT，文献状态使用单条 CASE UPDATE，两者在同一事务中提交。
+批量写入失败时逐篇重试，避免一篇坏数据拖垮整批。
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import case, insert, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.literature import Literature, LiteratureSegment
+from app.models.stats_tracking import mark_literature_projects_stale, projects_for_literature
+from app.services.local_vector_index import local_vector_index
+
+PARSING_COMPLETED = "completed"
+PARSING_FAILED = "failed"
+
+
+@dataclass
+class _LiteratureResult:
+    literature_id: int
+    status: str
+    segments: List[Dict[str, Any]]
+    parsed_content: Optional[str] = None
+
+
+class SegmentBatchWriter:
+    """跨文献累积段落并按阈值批量落库"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_segments: Optional[int] = None,
+        max_literature: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.max_segments = max_segments or settings.segment_writer_batch_size
+        self.max_literature = max_literature or settings.segment_writer_max_literature
+        self.flush_interval = flush_interval if flush_interval is not None else settings.segment_writer_flush_interval
+        self._pending: List[_LiteratureResult] = []
+        self._pending_segments = 0
+        self._last_flush = time.monotonic()
+        self._flush_lock = asyncio.Lock()
+        self.failed_literature: List[Dict[str, Any]] = []
+        self.stats = {"flushes": 0, "segments_written": 0, "literature_updated": 0}
+
+    async def add(
+        self,
+        literature_id: int,
+        segments: List[Dict[str, Any]],
+        parsed_content: Optional[str] = None,
+    ) -> None:
+        """登记一篇解析成功的文献及其段落（段落为 LiteratureSegment 的列映射）"""
+        rows = [dict(segment, literature_id=literature_id) for segment in segments]
+        await self._append(_LiteratureResult(literature_id, PARSING_COMPLETED, rows, parsed_content))
+
+    async def mark_failed(self, literature_id: int) -> None:
+        await self._append(_LiteratureResult(literature_id, PARSING_FAILED, []))
+
+    async def _append(self, result: _LiteratureResult) -> None:
+        self._pending.append(result)
+        self._pending_segments += len(result.segments)
+        if (
+            self._pending_segments >= self.max_segments
+            or len(self._pending) >= self.max_literature
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending, self._pending_segments = self._pending, [], 0
+            self._last_flush = time.monotonic()
+            # 同步数据库写入放到线程中执行，不阻塞事件循环上的其他文献处理
+            await asyncio.to_thread(self._write, batch)
+
+    async def close(self) -> None:
+        await self.flush()
+
+    def _write(self, batch: List[_LiteratureResult]) -> None:
+        db = self.session_factory()
+        try:
+            try:
+                self._write_batch(db, batch)
+                db.commit()
+                written = batch
+            except Exception as exc:
+                db.rollback()
+                logger.warning(f"批量写入 {len(batch)} 篇文献的段落失败，改为逐篇写入: {exc}")
+                written = []
+                for result in batch:
+                    try:
+                        self._write_batch(db, [result])
+                        db.commit()
+                        written.append(result)
+                    except Exception as item_exc:
+                        db.rollback()
+                        self._record_failure(db, result.literature_id, item_exc)
+
+            segment_literature = [result.literature_id for result in written if result.segments]
+            if segment_literature:
+                # 批量 INSERT 不经过 ORM flush，需要手动通知本地向量索引哪些项目有新段落
+                try:
+                    local_vector_index.mark_dirty(projects_for_literature(db, segment_literature))
+                except Exception as exc:
+                    logger.warning(f"标记本地向量索引待同步项目失败: {exc}")
+        finally:
+            db.close()
+
+        self.stats["flushes"] += 1
+        self.stats["literature_updated"] += len(written)
+        self.stats["segments_written"] += sum(len(result.segments) for result in written)
+
+    @staticmethod
+    def _write_batch(db: Session, batch: List[_LiteratureResult]) -> None:
+        rows = [row for result in batch for row in result.segments]
+        if rows:
+            db.execute(insert(LiteratureSegment), rows)
+
+        ids = [result.literature_id for result in batch]
+        completed = {result.literature_id: result.parsed_content for result in batch if result.status == PARSING_COMPLETED}
+        values: Dict[str, Any] = {
+            "parsing_status": case(
+                {result.literature_id: result.status for result in batch},
+                value=Literature.id,
+            ),
+            "is_parsed": case(
+                {literature_id: True for literature_id in completed},
+                value=Literature.id,
+                else_=Literature.is_parsed,
+            ),
+        }
+        with_content = {literature_id: content for literature_id, content in completed.items() if content is not None}
+        if with_content:
+            values["parsed_content"] = case(with_content, value=Literature.id, else_=Literature.parsed_content)
+
+        db.execute(
+            update(Literature)
+            .where(Literature.id.in_(ids))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        # 批量写入不触发 ORM 事件，需显式标记项目统计过期
+        mark_literature_projects_stale(db, ids)
+
+    def _record_failure(self, db: Session, literature_id: int, exc: Exception) -> None:
+        logger.error(f"写入文献段落失败 {literature_id}: {exc}")
+        self.failed_literature.append({"literature_id": literature_id, "error": str(exc)})
+        try:
+            db.execute(
+                update(Literature)
+                .where(Literature.id == literature_id)
+                .values(parsing_status=PARSING_FAILED)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
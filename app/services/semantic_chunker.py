@@ -14,6 +14,7 @@ from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.services.ai_service import AIService
+from app.services.llm_cache import is_json_content
 
 
 class ChunkType(Enum):
@@ -278,7 +279,8 @@ class SemanticChunker:
                 structure_prompt,
                 model="gpt-3.5-turbo",
                 max_tokens=1000,
-                temperature=0.1
+                temperature=0.1,
+                cache_validator=is_json_content
             )
 
             if response.get("success"):
@@ -680,7 +682,8 @@ class SemanticChunker:
             extraction_prompt,
             model="gpt-3.5-turbo",
             max_tokens=800,
-            temperature=0.1
+            temperature=0.1,
+            cache_validator=is_json_content
         )
 
         if response.get("success"):
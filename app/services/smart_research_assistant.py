@@ -5,7 +5,9 @@ Smart Research Assistant - AI-powered intelligent research assistant
 
 import asyncio
 import json
-from typing import List, Dict, Optional, Any, Tuple
+import re
+import time
+from typing import AsyncIterator, Awaitable, List, Dict, Optional, Any, Set, Tuple
 from datetime import datetime
 from loguru import logger
 from sqlalchemy.orm import Session
@@ -20,6 +22,62 @@ from app.services.literature_ai_assistant import LiteratureAIAssistant
 from app.services.rag_service import RAGService
 from app.core.config import settings
 
+_STREAM_ANSWER_FORMAT = (
+    "请直接用 Markdown 输出，依次包含“## 主要答案”“## 详细分析”“## 关键发现”三个小节，"
+    "关键发现每条以“- ”开头，最后单独一行写“置信度: <0-1之间的数字>”。不要输出 JSON 或代码块。"
+)
+_CONFIDENCE_RE = re.compile(r"^\s*[*_]*置信度[*_]*\s*[:：]\s*[*_]*([01](?:\.\d+)?)[*_]*\s*$")
+
+_NO_CONTEXT_ANSWER = "抱歉，在当前项目中尚未找到可支撑该问题的结构化文献或主经验，请先运行搜索建库或上传文献。"
+_NO_CONTEXT_SUGGESTIONS = ["执行搜索建库任务", "上传相关PDF/DOI或导入Zotero库"]
+
+# 问答阶段依赖图：同组内的阶段并行执行，后一组依赖前一组的结果
+_STAGE_GROUPS = (
+    ("retrieve_segments", "retrieve_main_experiences"),
+    ("extract_evidence",),
+    ("generate_answer", "generate_suggestions"),
+)
+
+
+class _StageTimer:
+    """记录问答各阶段相对请求开始的起止时间，并给出关键路径"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    def start(self) -> float:
+        return time.perf_counter()
+
+    def record(self, name: str, begin: float) -> None:
+        self.stages[name] = {
+            "start_ms": round((begin - self.started) * 1000, 1),
+            "duration_ms": round((time.perf_counter() - begin) * 1000, 1),
+        }
+
+    async def run(self, name: str, awaitable: Awaitable[Any]) -> Any:
+        begin = self.start()
+        try:
+            return await awaitable
+        finally:
+            self.record(name, begin)
+
+    def summary(self) -> Dict[str, Any]:
+        critical_path = []
+        for group in _STAGE_GROUPS:
+            timed = [name for name in group if name in self.stages]
+            if timed:
+                # 并行组中最晚结束的阶段决定下一组何时开始
+                critical_path.append(max(
+                    timed,
+                    key=lambda name: self.stages[name]["start_ms"] + self.stages[name]["duration_ms"],
+                ))
+        return {
+            "stages": self.stages,
+            "critical_path": critical_path,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 1),
+        }
+
 
 class SmartResearchAssistant:
     """
@@ -37,6 +95,7 @@ class SmartResearchAssistant:
         self.ai_service = MultiModelAIService()
         self.literature_assistant = LiteratureAIAssistant()
         self.conversation_memory = {}  # 会话记忆
+        self._background_tasks: Set[asyncio.Task] = set()
 
     async def answer_complex_research_question(
         self,
@@ -56,68 +115,158 @@ class SmartResearchAssistant:
         - 引用溯源和可信度评估
         """
         try:
-            # 1. 智能检索相关段落
-            relevant_segments = await self._retrieve_relevant_segments(
-                question,
-                project_id,
-                context_literature_ids,
-                max_literature_count,
-            )
+            timer = _StageTimer()
 
-            main_experiences = await self._retrieve_main_experiences(project_id)
+            # 1. 并行检索相关段落与主经验
+            relevant_segments, main_experiences = await self._retrieve_context(
+                timer, question, project_id, context_literature_ids, max_literature_count
+            )
 
             if not relevant_segments and not main_experiences:
                 return {
-                    "answer": "抱歉，在当前项目中尚未找到可支撑该问题的结构化文献或主经验，请先运行搜索建库或上传文献。",
+                    "answer": _NO_CONTEXT_ANSWER,
                     "confidence": 0.0,
                     "sources": [],
-                    "suggestions": ["执行搜索建库任务", "上传相关PDF/DOI或导入Zotero库"],
+                    "suggestions": _NO_CONTEXT_SUGGESTIONS,
+                    "metadata": {"timings": timer.summary()},
                 }
 
-            # 2. 提取关键信息和证据
-            evidence_analysis = await self._extract_evidence_from_segments(
-                question, relevant_segments
+            # 2. 提取关键信息和证据（各文献并行）
+            evidence_analysis = await timer.run(
+                "extract_evidence",
+                self._extract_evidence_from_segments(question, relevant_segments),
             )
 
-            # 3. 生成多层次答案
-            comprehensive_answer = await self._generate_comprehensive_answer(
-                question, evidence_analysis, relevant_segments, main_experiences
+            # 3. 综合答案与研究建议都只依赖证据，并行生成
+            comprehensive_answer, research_suggestions = await asyncio.gather(
+                timer.run(
+                    "generate_answer",
+                    self._generate_comprehensive_answer(
+                        question, evidence_analysis, relevant_segments, main_experiences
+                    ),
+                ),
+                timer.run(
+                    "generate_suggestions",
+                    self._generate_research_suggestions(question, evidence_analysis),
+                ),
             )
 
-            # 4. 生成研究建议和后续问题
-            research_suggestions = await self._generate_research_suggestions(
-                question, comprehensive_answer, evidence_analysis
+            # 4. 构建结构化回答
+            result = self._build_answer_result(
+                question,
+                comprehensive_answer,
+                research_suggestions,
+                relevant_segments,
+                evidence_analysis,
+                main_experiences,
             )
+            result["metadata"] = {"timings": timer.summary()}
+
+            # 5. 对话历史在后台保存，不阻塞响应
+            self._save_conversation_history_in_background(user_id, project_id, question, result)
 
-            # 5. 构建结构化回答
-            result = {
+            return result
+
+        except Exception as e:
+            logger.error(f"回答研究问题时出错: {e}")
+            return {
+                "error": str(e),
                 "question": question,
-                "answer": comprehensive_answer["main_answer"],
-                "detailed_analysis": comprehensive_answer["detailed_analysis"],
-                "key_findings": comprehensive_answer["key_findings"],
-                "confidence": comprehensive_answer["confidence"],
-                "sources": self._format_sources(relevant_segments, evidence_analysis),
-                "research_gaps": research_suggestions["research_gaps"],
-                "next_questions": research_suggestions["next_questions"],
-                "methodology_suggestions": research_suggestions["methodology_suggestions"],
+                "answer": "处理问题时遇到技术错误，请稍后重试。",
+                "confidence": 0.0
+            }
+
+    async def stream_complex_research_question(
+        self,
+        question: str,
+        project_id: int,
+        user_id: int,
+        context_literature_ids: List[int] = None,
+        max_literature_count: int = 10
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        answer_complex_research_question 的流式版本
+
+        依次产出 (事件名, 数据):
+        - sources: 检索到的文献来源与主经验（生成答案之前即可展示）
+        - token: 答案文本片段
+        - done: 与非流式接口相同结构的完整结果，附带 token 用量
+        - error: 处理失败
+        """
+        suggestions_task: Optional[asyncio.Task] = None
+        try:
+            timer = _StageTimer()
+            relevant_segments, main_experiences = await self._retrieve_context(
+                timer, question, project_id, context_literature_ids, max_literature_count
+            )
+
+            if not relevant_segments and not main_experiences:
+                yield "done", {
+                    "question": question,
+                    "answer": _NO_CONTEXT_ANSWER,
+                    "confidence": 0.0,
+                    "sources": [],
+                    "suggestions": _NO_CONTEXT_SUGGESTIONS,
+                    "metadata": {"timings": timer.summary()},
+                }
+                return
+
+            yield "sources", {
+                "sources": self._format_sources(relevant_segments, {"confidence_scores": {}}),
                 "main_experiences": main_experiences,
-                "timestamp": datetime.now().isoformat(),
-                "literature_count": len({seg["literature_id"] for seg in relevant_segments})
+                "literature_count": len({seg["literature_id"] for seg in relevant_segments}),
             }
 
-            # 6. 保存对话历史
-            await self._save_conversation_history(user_id, project_id, question, result)
+            evidence_analysis = await timer.run(
+                "extract_evidence",
+                self._extract_evidence_from_segments(question, relevant_segments),
+            )
+            # 研究建议与答案流并行生成
+            suggestions_task = asyncio.create_task(timer.run(
+                "generate_suggestions",
+                self._generate_research_suggestions(question, evidence_analysis),
+            ))
+            answer_prompt = self._build_answer_prompt(
+                question, evidence_analysis, relevant_segments, main_experiences, streaming=True
+            )
 
-            return result
+            usage: Dict[str, Any] = {}
+            parts: List[str] = []
+            answer_started = timer.start()
+            async for delta in self.ai_service.stream_chat_completion(
+                [{"role": "user", "content": answer_prompt}],
+                model_options={"temperature": 0.2},
+                usage_out=usage,
+            ):
+                parts.append(delta)
+                yield "token", {"content": delta}
+            timer.record("generate_answer", answer_started)
+
+            comprehensive_answer = self._parse_streamed_answer("".join(parts), evidence_analysis)
+            research_suggestions = await suggestions_task
+            result = self._build_answer_result(
+                question,
+                comprehensive_answer,
+                research_suggestions,
+                relevant_segments,
+                evidence_analysis,
+                main_experiences,
+            )
+            result["metadata"] = {"timings": timer.summary()}
+            self._save_conversation_history_in_background(user_id, project_id, question, result)
+            yield "done", {**result, "usage": usage}
 
         except Exception as e:
-            logger.error(f"回答研究问题时出错: {e}")
-            return {
+            logger.error(f"流式回答研究问题时出错: {e}")
+            yield "error", {
                 "error": str(e),
                 "question": question,
                 "answer": "处理问题时遇到技术错误，请稍后重试。",
                 "confidence": 0.0
             }
+        finally:
+            if suggestions_task is not None and not suggestions_task.done():
+                suggestions_task.cancel()
 
     async def generate_research_hypotheses(
         self,
@@ -301,6 +450,24 @@ class SmartResearchAssistant:
 
     # =============== 私有辅助方法 ===============
 
+    async def _retrieve_context(
+        self,
+        timer: _StageTimer,
+        question: str,
+        project_id: int,
+        context_literature_ids: Optional[List[int]],
+        max_count: int,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """并行检索相关段落与主经验（两者各自使用独立的数据库会话）"""
+        relevant_segments, main_experiences = await asyncio.gather(
+            timer.run(
+                "retrieve_segments",
+                self._retrieve_relevant_segments(question, project_id, context_literature_ids, max_count),
+            ),
+            timer.run("retrieve_main_experiences", self._retrieve_main_experiences(project_id)),
+        )
+        return relevant_segments, main_experiences
+
     async def _retrieve_relevant_segments(
         self,
         question: str,
@@ -456,7 +623,7 @@ class SmartResearchAssistant:
         question: str,
         segments: List[Dict[str, Any]],
     ) -> Dict[str, Any]:
-        """基于检索到的段落生成证据集"""
+        """基于检索到的段落生成证据集（每篇文献一次补全，各文献并行）"""
         evidence = {
             "direct_answers": [],
             "supporting_evidence": [],
@@ -472,133 +639,159 @@ class SmartResearchAssistant:
             if literature_id is not None:
                 segments_by_literature[literature_id].append(segment)
 
-        for literature_id, lit_segments in segments_by_literature.items():
-            try:
-                metadata = lit_segments[0]
-                # 选取信息量最大的若干段落
-                sorted_segments = sorted(
-                    lit_segments,
-                    key=lambda s: (s.get("similarity_score") or 0, len(s.get("content", ""))),
-                    reverse=True,
-                )
-                selected_segments = sorted_segments[:3]
+        extracted = await asyncio.gather(*[
+            self._extract_literature_evidence(question, literature_id, lit_segments)
+            for literature_id, lit_segments in segments_by_literature.items()
+        ])
 
-                segment_text = "\n\n".join(
-                    [
-                        f"段落{i + 1} ({seg.get('section_title') or seg.get('segment_type') or '未命名段落'}):\n{seg.get('content', '')}"
-                        for i, seg in enumerate(selected_segments)
-                    ]
-                )
+        # 按检索顺序合并证据
+        for literature_id, extracted_data in zip(segments_by_literature, extracted):
+            if not extracted_data:
+                continue
+            evidence["direct_answers"].extend(extracted_data.get("direct_answers", []))
+            evidence["supporting_evidence"].extend(extracted_data.get("supporting_evidence", []))
+            evidence["contradictory_evidence"].extend(extracted_data.get("contradictory_evidence", []))
+            evidence["methodological_insights"].extend(extracted_data.get("methodological_insights", []))
 
-                extraction_prompt = f"""
-                研究问题: {question}
-
-                请阅读以下来自同一篇文献的关键段落，并完成提取：
-                文献标题: {metadata.get('literature_title')}
-                作者: {', '.join(metadata.get('literature_authors') or [])}
-                期刊/会议: {metadata.get('literature_journal') or '未知'}
-                发表年份: {metadata.get('literature_year') or '未知'}
-                DOI: {metadata.get('literature_doi') or '未知'}
-
-                文献段落内容:
-                {segment_text}
-
-                需要提取的信息（以 JSON 返回）：
-                {{
-                    "direct_answers": ["与问题直接相关的结论或答案"],
-                    "supporting_evidence": ["支撑结论的实验或数据"],
-                    "contradictory_evidence": ["可能与主流观点不同的证据"],
-                    "methodological_insights": ["方法与实验设计要点"],
-                    "confidence": 0.0   # 基于该文献提供回答的置信度 (0-1)
-                }}
-
-                要求：内容客观准确，引用应与段落对应。
-                """
-
-                response = await self.ai_service.chat_completion(
-                    [{"role": "user", "content": extraction_prompt}],
-                    temperature=0.3,
-                )
+            confidence = extracted_data.get("confidence")
+            if isinstance(confidence, (int, float)):
+                existing = evidence["confidence_scores"].get(literature_id, 0.0)
+                evidence["confidence_scores"][literature_id] = max(existing, float(confidence))
 
-                if not response or not response.get("choices"):
-                    continue
+        return evidence
 
-                content = response["choices"][0]["message"].get("content")
-                if not content:
-                    continue
+    async def _extract_literature_evidence(
+        self,
+        question: str,
+        literature_id: int,
+        lit_segments: List[Dict[str, Any]],
+    ) -> Optional[Dict[str, Any]]:
+        """从单篇文献的段落中提取证据，失败时返回 None"""
+        try:
+            metadata = lit_segments[0]
+            # 选取信息量最大的若干段落
+            sorted_segments = sorted(
+                lit_segments,
+                key=lambda s: (s.get("similarity_score") or 0, len(s.get("content", ""))),
+                reverse=True,
+            )
+            selected_segments = sorted_segments[:3]
 
-                try:
-                    extracted_data = json.loads(content)
-                except json.JSONDecodeError:
-                    logger.warning(f"无法解析文献 {literature_id} 的提取结果")
-                    continue
+            segment_text = "\n\n".join(
+                [
+                    f"段落{i + 1} ({seg.get('section_title') or seg.get('segment_type') or '未命名段落'}):\n{seg.get('content', '')}"
+                    for i, seg in enumerate(selected_segments)
+                ]
+            )
 
-                # 合并证据
-                evidence["direct_answers"].extend(extracted_data.get("direct_answers", []))
-                evidence["supporting_evidence"].extend(extracted_data.get("supporting_evidence", []))
-                evidence["contradictory_evidence"].extend(extracted_data.get("contradictory_evidence", []))
-                evidence["methodological_insights"].extend(extracted_data.get("methodological_insights", []))
+            extraction_prompt = f"""
+            研究问题: {question}
+
+            请阅读以下来自同一篇文献的关键段落，并完成提取：
+            文献标题: {metadata.get('literature_title')}
+            作者: {', '.join(metadata.get('literature_authors') or [])}
+            期刊/会议: {metadata.get('literature_journal') or '未知'}
+            发表年份: {metadata.get('literature_year') or '未知'}
+            DOI: {metadata.get('literature_doi') or '未知'}
+
+            文献段落内容:
+            {segment_text}
+
+            需要提取的信息（以 JSON 返回）：
+            {{
+                "direct_answers": ["与问题直接相关的结论或答案"],
+                "supporting_evidence": ["支撑结论的实验或数据"],
+                "contradictory_evidence": ["可能与主流观点不同的证据"],
+                "methodological_insights": ["方法与实验设计要点"],
+                "confidence": 0.0   # 基于该文献提供回答的置信度 (0-1)
+            }}
+
+            要求：内容客观准确，引用应与段落对应。
+            """
 
-                confidence = extracted_data.get("confidence")
-                if isinstance(confidence, (int, float)):
-                    existing = evidence["confidence_scores"].get(literature_id, 0.0)
-                    evidence["confidence_scores"][literature_id] = max(existing, float(confidence))
+            response = await self.ai_service.chat_completion(
+                [{"role": "user", "content": extraction_prompt}],
+                model_options={"temperature": 0.3},
+            )
 
-            except Exception as e:
-                logger.error(f"从文献 {literature_id} 提取证据时出错: {e}")
-                continue
+            content = response.get("content") if response else None
+            if not content:
+                return None
 
-        return evidence
+            try:
+                extracted_data = json.loads(content)
+            except json.JSONDecodeError:
+                logger.warning(f"无法解析文献 {literature_id} 的提取结果")
+                return None
 
-    async def _generate_comprehensive_answer(
+            return extracted_data if isinstance(extracted_data, dict) else None
+
+        except Exception as e:
+            logger.error(f"从文献 {literature_id} 提取证据时出错: {e}")
+            return None
+
+    def _build_answer_prompt(
         self,
         question: str,
         evidence: Dict[str, Any],
         segments: List[Dict[str, Any]],
         main_experiences: List[Dict[str, Any]],
-    ) -> Dict[str, Any]:
-        """生成综合性答案"""
-        try:
-            literature_count = len({segment.get("literature_id") for segment in segments if segment.get("literature_id")})
-            experience_summaries = [
-                {
-                    "title": exp.get("title"),
-                    "research_domain": exp.get("research_domain"),
-                    "coverage_scope": exp.get("coverage_scope"),
-                    "content": (exp.get("content") or "")[:1500],
-                    "source_literature_count": exp.get("source_literature_count", 0),
-                }
-                for exp in main_experiences
-            ]
-            # 构建综合分析提示
-            analysis_prompt = f"""
-            作为一个专业的科研助手，请基于以下证据回答研究问题:
+        streaming: bool = False,
+    ) -> str:
+        """构建综合答案提示词；流式回答要求直接输出 Markdown 而不是 JSON"""
+        literature_count = len({segment.get("literature_id") for segment in segments if segment.get("literature_id")})
+        experience_summaries = [
+            {
+                "title": exp.get("title"),
+                "research_domain": exp.get("research_domain"),
+                "coverage_scope": exp.get("coverage_scope"),
+                "content": (exp.get("content") or "")[:1500],
+                "source_literature_count": exp.get("source_literature_count", 0),
+            }
+            for exp in main_experiences
+        ]
+        output_format = _STREAM_ANSWER_FORMAT if streaming else "请以JSON格式返回，确保答案科学严谨。"
+        # 构建综合分析提示
+        analysis_prompt = f"""
+        作为一个专业的科研助手，请基于以下证据回答研究问题:
 
-            问题: {question}
+        问题: {question}
 
-            直接证据: {json.dumps(evidence["direct_answers"], ensure_ascii=False)}
-            支持性证据: {json.dumps(evidence["supporting_evidence"], ensure_ascii=False)}
-            矛盾性证据: {json.dumps(evidence["contradictory_evidence"], ensure_ascii=False)}
-            方法学见解: {json.dumps(evidence["methodological_insights"], ensure_ascii=False)}
+        直接证据: {json.dumps(evidence["direct_answers"], ensure_ascii=False)}
+        支持性证据: {json.dumps(evidence["supporting_evidence"], ensure_ascii=False)}
+        矛盾性证据: {json.dumps(evidence["contradictory_evidence"], ensure_ascii=False)}
+        方法学见解: {json.dumps(evidence["methodological_insights"], ensure_ascii=False)}
 
-            主经验知识: {json.dumps(experience_summaries, ensure_ascii=False) if experience_summaries else "无"}
+        主经验知识: {json.dumps(experience_summaries, ensure_ascii=False) if experience_summaries else "无"}
 
-            基于{literature_count}篇文献，请提供:
-            1. 主要答案 (简洁明确)
-            2. 详细分析 (包含各种观点和证据)
-            3. 关键发现 (要点总结)
-            4. 置信度评估 (0-1)
+        基于{literature_count}篇文献，请提供:
+        1. 主要答案 (简洁明确)
+        2. 详细分析 (包含各种观点和证据)
+        3. 关键发现 (要点总结)
+        4. 置信度评估 (0-1)
 
-            请以JSON格式返回，确保答案科学严谨。
-            """
+        {output_format}
+        """
+        return analysis_prompt
+
+    async def _generate_comprehensive_answer(
+        self,
+        question: str,
+        evidence: Dict[str, Any],
+        segments: List[Dict[str, Any]],
+        main_experiences: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """生成综合性答案"""
+        try:
+            analysis_prompt = self._build_answer_prompt(question, evidence, segments, main_experiences)
 
             response = await self.ai_service.chat_completion(
                 [{"role": "user", "content": analysis_prompt}],
-                temperature=0.2
+                model_options={"temperature": 0.2}
             )
 
-            if response and response.get("choices"):
-                content = response["choices"][0]["message"]["content"]
+            content = response.get("content") if response else None
+            if content:
                 try:
                     return json.loads(content)
                 except json.JSONDecodeError:
@@ -629,32 +822,33 @@ class SmartResearchAssistant:
     async def _generate_research_suggestions(
         self,
         question: str,
-        answer: Dict[str, Any],
         evidence: Dict[str, Any]
     ) -> Dict[str, Any]:
-        """生成研究建议和后续问题"""
+        """生成研究建议和后续问题（只依赖证据分析，可与综合答案并行生成）"""
         try:
             suggestion_prompt = f"""
-            基于刚才的问题和回答，请提供研究建议:
+            基于以下研究问题与文献证据，请提供研究建议:
 
             原问题: {question}
-            主要答案: {answer.get("main_answer", "")}
+            直接证据: {json.dumps(evidence["direct_answers"][:10], ensure_ascii=False)}
+            矛盾性证据: {json.dumps(evidence["contradictory_evidence"][:5], ensure_ascii=False)}
+            方法学见解: {json.dumps(evidence["methodological_insights"][:5], ensure_ascii=False)}
 
             请提供:
             1. 研究空白 (当前研究未覆盖的领域)
             2. 后续问题 (值得进一步探索的问题)
             3. 方法学建议 (建议的研究方法和技术)
 
-            以JSON格式返回。
+            以JSON格式返回，键为 research_gaps、next_questions、methodology_suggestions，值均为字符串列表。
             """
 
             response = await self.ai_service.chat_completion(
                 [{"role": "user", "content": suggestion_prompt}],
-                temperature=0.4
+                model_options={"temperature": 0.4}
             )
 
-            if response and response.get("choices"):
-                content = response["choices"][0]["message"]["content"]
+            content = response.get("content") if response else None
+            if content:
                 try:
                     return json.loads(content)
                 except json.JSONDecodeError:
@@ -678,6 +872,69 @@ class SmartResearchAssistant:
                 "methodology_suggestions": []
             }
 
+    def _build_answer_result(
+        self,
+        question: str,
+        comprehensive_answer: Dict[str, Any],
+        research_suggestions: Dict[str, Any],
+        segments: List[Dict[str, Any]],
+        evidence: Dict[str, Any],
+        main_experiences: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """组装研究问答的结构化结果"""
+        return {
+            "question": question,
+            "answer": comprehensive_answer["main_answer"],
+            "detailed_analysis": comprehensive_answer["detailed_analysis"],
+            "key_findings": comprehensive_answer["key_findings"],
+            "confidence": comprehensive_answer["confidence"],
+            "sources": self._format_sources(segments, evidence),
+            "research_gaps": research_suggestions.get("research_gaps", []),
+            "next_questions": research_suggestions.get("next_questions", []),
+            "methodology_suggestions": research_suggestions.get("methodology_suggestions", []),
+            "main_experiences": main_experiences,
+            "timestamp": datetime.now().isoformat(),
+            "literature_count": len({seg["literature_id"] for seg in segments})
+        }
+
+    @staticmethod
+    def _parse_streamed_answer(text: str, evidence: Dict[str, Any]) -> Dict[str, Any]:
+        """从流式输出的 Markdown 中拆出主要答案、关键发现与置信度"""
+        sections: Dict[str, List[str]] = defaultdict(list)
+        current = None
+        body_lines: List[str] = []
+        confidence = None
+        for line in text.splitlines():
+            match = _CONFIDENCE_RE.search(line)
+            if match:
+                confidence = min(1.0, max(0.0, float(match.group(1))))
+                continue
+            body_lines.append(line)
+            heading = line.strip()
+            if heading.startswith("#"):
+                current = heading.lstrip("#").strip()
+                continue
+            if current:
+                sections[current].append(line)
+
+        main_answer = "\n".join(sections.get("主要答案", [])).strip()
+        key_findings = [
+            line.strip()[2:].strip()
+            for line in sections.get("关键发现", [])
+            if line.strip().startswith(("- ", "* "))
+        ]
+        if confidence is None:
+            scores = list(evidence.get("confidence_scores", {}).values())
+            confidence = sum(scores) / len(scores) if scores else 0.7
+
+        detailed_analysis = "\n".join(body_lines).strip()
+        return {
+            "main_answer": main_answer or detailed_analysis,
+            "detailed_analysis": detailed_analysis,
+            "key_findings": key_findings,
+            "confidence": confidence,
+        }
+
     def _format_sources(
         self,
         segments: List[Dict[str, Any]],
@@ -774,6 +1031,18 @@ class SmartResearchAssistant:
             except Exception:
                 pass
 
+    def _save_conversation_history_in_background(
+        self,
+        user_id: int,
+        project_id: int,
+        question: str,
+        result: Dict[str, Any]
+    ) -> None:
+        """在后台任务中保存对话历史，响应不等待写入完成"""
+        task = asyncio.create_task(self._save_conversation_history(user_id, project_id, question, result))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
     async def _save_conversation_history(
         self,
         user_id: int,
@@ -12,6 +12,8 @@ from loguru import logger
 from dataclasses import dataclass, asdict
 import uuid
 
+from app.services.progress_bus import progress_bus
+
 @dataclass
 class ProgressEvent:
     """进度事件数据结构"""
@@ -236,6 +238,7 @@ class StreamProgressService:
                 self.event_history[task_id] = self.event_history[task_id][-self.max_history_per_task:]
         
         await self._notify_subscribers(task_id, event)
+        await progress_bus.publish(event.to_dict())
         await self._send_to_stderr(event)
         
         return event
@@ -342,8 +345,9 @@ class StreamProgressService:
             if len(self.event_history[task_id]) > self.max_history_per_task:
                 self.event_history[task_id] = self.event_history[task_id][-self.max_history_per_task:]
         
-        # 通知订阅者
+        # 通知订阅者，并发布到其他进程
         await self._notify_subscribers(task_id, event)
+        await progress_bus.publish(event.to_dict())
         
         # 发送到stderr供Claude Code查看
         await self._send_to_stderr(event)
@@ -438,13 +442,58 @@ class StreamProgressService:
         """获取任务状态"""
         return self.active_tasks.get(task_id)
     
-    async def get_task_history(self, task_id: str, limit: int = 20) -> List[Dict]:
-        """获取任务历史事件"""
-        if task_id not in self.event_history:
-            return []
-        
-        events = self.event_history[task_id][-limit:]
-        return [event.to_dict() for event in events]
+    async def get_task_history(
+        self,
+        task_id: str,
+        limit: int = 20,
+        after_event_id: Optional[str] = None
+    ) -> List[Dict]:
+        """获取任务历史事件
+
+        优先读取Redis中跨进程共享的历史流，给定 after_event_id 时只返回其后的事件（断线重连补发）。
+        """
+        shared_history = await progress_bus.history(task_id, limit, after_event_id)
+        if shared_history is not None:
+            return shared_history
+
+        events = self.event_history.get(task_id, [])
+        if after_event_id:
+            for position, event in enumerate(events):
+                if event.id == after_event_id:
+                    events = events[position + 1:]
+                    break
+        return [event.to_dict() for event in events[-limit:]]
+
+    async def apply_remote_event(self, event_data: Dict):
+        """应用其他进程发布的进度事件：更新本地状态并通知本进程订阅者，不再重复发布"""
+        event = ProgressEvent(**event_data)
+        task_id = event.task_id
+
+        if task_id not in self.active_tasks:
+            self.active_tasks[task_id] = {
+                "stream_id": str(uuid.uuid4()),
+                "task_name": event.task_name,
+                "current_step": 0,
+                "status": "pending",
+                "created_at": event.timestamp,
+                "updated_at": event.timestamp
+            }
+            self.subscribers.setdefault(task_id, [])
+            self.event_history.setdefault(task_id, [])
+
+        self.active_tasks[task_id].update({
+            "current_step": event.progress,
+            "status": event.status,
+            "updated_at": event.timestamp,
+            "last_message": event.message
+        })
+
+        history = self.event_history.setdefault(task_id, [])
+        history.append(event)
+        if len(history) > self.max_history_per_task:
+            self.event_history[task_id] = history[-self.max_history_per_task:]
+
+        await self._notify_subscribers(task_id, event)
     
     async def complete_task(self, task_id: str, final_message: str = "任务完成") -> ProgressEvent:
         """完成任务"""
@@ -646,8 +695,16 @@ class WSProgressManager:
         self.stream_service = stream_service
         self.websocket_connections: Dict[str, List] = {}  # task_id -> [websockets]
     
-    async def add_websocket_subscriber(self, task_id: str, websocket):
-        """添加WebSocket订阅者"""
+    async def add_websocket_subscriber(
+        self,
+        task_id: str,
+        websocket,
+        sender: Optional[Callable[..., bool]] = None
+    ):
+        """添加WebSocket订阅者
+
+        提供 sender（连接发送队列的非阻塞入队函数）时，事件经由队列发送，不会阻塞进度通知。
+        """
         if task_id not in self.websocket_connections:
             self.websocket_connections[task_id] = []
         
@@ -655,6 +712,10 @@ class WSProgressManager:
         
         # 创建回调函数
         async def websocket_callback(event: ProgressEvent):
+            if sender is not None:
+                terminal = event.status in ("completed", "failed", "stage_completed")
+                sender(event.to_json(), None if terminal else f"event:{task_id}")
+                return
             try:
                 await websocket.send_text(event.to_json())
             except Exception as e:
@@ -669,8 +730,12 @@ class WSProgressManager:
         # 发送历史事件
         history = await self.stream_service.get_task_history(task_id, 5)
         for event_dict in history:
+            message = json.dumps(event_dict, ensure_ascii=False)
+            if sender is not None:
+                sender(message)
+                continue
             try:
-                await websocket.send_text(json.dumps(event_dict, ensure_ascii=False))
+                await websocket.send_text(message)
             except:
                 pass
     
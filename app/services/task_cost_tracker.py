@@ -21,6 +21,9 @@ _MODEL_PRICING = {
     "gpt-4-turbo": {"prompt": 0.01, "completion": 0.03},
 }
 
+# Reserved cost_breakdown entry holding cache counters instead of model usage
+CACHE_BREAKDOWN_KEY = "cache"
+
 
 class TaskCostTracker:
     def __init__(self) -> None:
@@ -92,6 +95,60 @@ class TaskCostTracker:
             if own_session:
                 db.close()
 
+    def record_cache_usage(
+        self,
+        cache_name: str,
+        hits: int,
+        misses: int,
+        saved_tokens: int = 0,
+    ) -> None:
+        """Accumulate cache hit/miss counters under ``cost_breakdown['cache']``."""
+        if not hits and not misses:
+            return
+
+        context = _task_context.get()
+        if not context:
+            return
+
+        task_id, bound_session = context
+        if not task_id:
+            return
+
+        db: Session
+        own_session = False
+        if bound_session is not None:
+            db = bound_session
+        else:
+            db = self._session_factory()
+            own_session = True
+
+        try:
+            task = db.query(Task).filter(Task.id == task_id).first()
+            if not task:
+                return
+
+            current_breakdown = dict(task.cost_breakdown or {})
+            cache_breakdown = dict(current_breakdown.get(CACHE_BREAKDOWN_KEY, {}))
+            entry = dict(cache_breakdown.get(cache_name, {}))
+            entry["hits"] = entry.get("hits", 0) + hits
+            entry["misses"] = entry.get("misses", 0) + misses
+            entry["saved_tokens"] = entry.get("saved_tokens", 0) + saved_tokens
+            cache_breakdown[cache_name] = entry
+            current_breakdown[CACHE_BREAKDOWN_KEY] = cache_breakdown
+            task.cost_breakdown = current_breakdown
+
+            if own_session:
+                db.commit()
+            else:
+                db.flush()
+        except Exception as exc:
+            if own_session:
+                db.rollback()
+            logger.warning(f"Failed to record cache usage for task {task_id}: {exc}")
+        finally:
+            if own_session:
+                db.close()
+
     def _estimate_cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
         pricing = _MODEL_PRICING.get(model.lower()) or _MODEL_PRICING.get(model)
         if not pricing:
@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 from app.models.task import Task, TaskStatus, TaskProgress, TaskType
 from app.models.project import Project
 from app.models.literature import Literature
+from app.services.task_cost_tracker import CACHE_BREAKDOWN_KEY
 from app.tasks.celery_tasks import (
     search_and_build_library_celery,
     ai_search_batch_celery,
@@ -117,6 +118,7 @@ class TaskService:
         total_tokens = 0.0
         total_cost = 0.0
         model_breakdown: Dict[str, Dict[str, float]] = {}
+        cache_breakdown: Dict[str, Dict[str, float]] = {}
 
         for task in tasks:
             status_counter[task.status] = status_counter.get(task.status, 0) + 1
@@ -128,6 +130,15 @@ class TaskService:
 
             if task.cost_breakdown:
                 for model_name, metrics in task.cost_breakdown.items():
+                    if model_name == CACHE_BREAKDOWN_KEY:
+                        for cache_name, counters in (metrics or {}).items():
+                            cache_entry = cache_breakdown.setdefault(
+                                cache_name, {"hits": 0, "misses": 0, "saved_tokens": 0}
+                            )
+                            for counter in cache_entry:
+                                cache_entry[counter] += counters.get(counter, 0) or 0
+                        continue
+
                     entry = model_breakdown.setdefault(
                         model_name,
                         {
@@ -157,6 +168,7 @@ class TaskService:
                 "total_token_usage": total_tokens,
                 "total_cost_estimate": total_cost,
                 "models": model_breakdown,
+                "cache": cache_breakdown,
             },
         }
 
@@ -1,20 +1,52 @@
 """Unified task progress handling service."""
 
-from typing import Dict, Optional, Callable, Awaitable
+import asyncio
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Callable, Awaitable, Tuple
 from datetime import datetime
 
 from sqlalchemy.orm import Session
 from loguru import logger
 
+from app.core.config import settings
 from app.models.task import Task, TaskProgress, TaskStatus
 from app.services.stream_progress_service import StreamProgressService
 from app.services.task_cost_tracker import task_cost_tracker
 
+_STAGE_NOISE = re.compile(r"[\d.,:/%()（）\s]+")
+
+
+def _stage_key(step: str) -> str:
+    """去掉步骤文本中的计数和百分比，"处理文献 3/50" 与 "处理文献 4/50" 视为同一阶段"""
+    return _STAGE_NOISE.sub("", step or "")
+
+
+@dataclass
+class _ProgressState:
+    stage: Optional[str] = None
+    last_emit: float = 0.0
+    last_persist: float = 0.0
+    pending: Optional[Tuple[str, int, Optional[Dict]]] = None
+    flush_task: Optional[asyncio.Task] = None
+
 
 class TaskStreamService:
+    """任务进度推送
+
+    高频进度更新按任务合并：同一阶段内每秒最多推送 task_progress_max_rate 次，
+    被合并的更新在间隔结束时补发最新一条；阶段切换、100% 与终态立即推送。
+    Task.progress_percentage 与 TaskProgress 日志在 update_progress 调用中按
+    task_progress_persist_interval 间隔落库，补发推送的后台任务只广播、不提交会话。
+    """
+
     def __init__(self, db: Session, stream_service: Optional[StreamProgressService] = None):
         self.db = db
         self.stream_service = stream_service or StreamProgressService()
+        self.min_emit_interval = 1.0 / max(settings.task_progress_max_rate, 0.01)
+        self.persist_interval = settings.task_progress_persist_interval
+        self._progress_state: Dict[int, _ProgressState] = {}
 
     async def start_task(self, task: Task, step: str) -> None:
         task.status = TaskStatus.RUNNING.value
@@ -34,12 +66,47 @@ class TaskStreamService:
         task: Task,
         step: str,
         progress: int,
-        details: Optional[Dict] = None
+        details: Optional[Dict] = None,
+        force: bool = False
     ) -> None:
         task.current_step = step
         task.progress_percentage = progress
         if details:
             task.result = details
+
+        state = self._progress_state.setdefault(task.id, _ProgressState())
+        stage = _stage_key(step)
+        immediate = force or progress >= 100 or stage != state.stage
+        state.stage = stage
+
+        # 落库只在调用方自己的 await 点进行，定时补发的任务不接触调用方的会话
+        if immediate or time.monotonic() - state.last_persist >= self.persist_interval:
+            self._persist(task, state, step, progress, details)
+
+        wait = self.min_emit_interval - (time.monotonic() - state.last_emit)
+        if not immediate and wait > 0:
+            state.pending = (step, progress, details)
+            if state.flush_task is None or state.flush_task.done():
+                state.flush_task = asyncio.create_task(self._flush_later(task, state, wait))
+            return
+
+        await self._emit(task, state, step, progress, details)
+
+    async def _flush_later(self, task: Task, state: _ProgressState, delay: float) -> None:
+        await asyncio.sleep(delay)
+        if state.pending is not None:
+            step, progress, details = state.pending
+            await self._emit(task, state, step, progress, details)
+
+    def _persist(
+        self,
+        task: Task,
+        state: _ProgressState,
+        step: str,
+        progress: int,
+        details: Optional[Dict]
+    ) -> None:
+        state.last_persist = time.monotonic()
         progress_log = TaskProgress(
             task_id=task.id,
             step_name=step,
@@ -49,6 +116,20 @@ class TaskStreamService:
         )
         self.db.add(progress_log)
         self.db.commit()
+
+    async def _emit(
+        self,
+        task: Task,
+        state: _ProgressState,
+        step: str,
+        progress: int,
+        details: Optional[Dict]
+    ) -> None:
+        state.pending = None
+        state.last_emit = time.monotonic()
+        if state.flush_task and not state.flush_task.done() and state.flush_task is not asyncio.current_task():
+            state.flush_task.cancel()
+
         await self.stream_service.broadcast_task_update(task.id, {
             "type": "task_progress",
             "task_id": task.id,
@@ -57,7 +138,14 @@ class TaskStreamService:
             "details": details
         })
 
+    def _finish_progress(self, task: Task) -> None:
+        """任务结束时丢弃尚未推送的合并进度，终态事件会覆盖它"""
+        state = self._progress_state.pop(task.id, None)
+        if state and state.flush_task and not state.flush_task.done():
+            state.flush_task.cancel()
+
     async def complete_task(self, task: Task, details: Optional[Dict] = None) -> None:
+        self._finish_progress(task)
         task.status = TaskStatus.COMPLETED.value
         task.completed_at = datetime.utcnow()
         if task.started_at:
@@ -79,6 +167,7 @@ class TaskStreamService:
         })
 
     async def fail_task(self, task: Task, error_message: str) -> None:
+        self._finish_progress(task)
         task.status = TaskStatus.FAILED.value
         task.completed_at = datetime.utcnow()
         if task.started_at:
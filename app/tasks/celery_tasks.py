@@ -2,13 +2,13 @@
 Celery任务定义 - 统一的异步任务处理
 """
 
-import asyncio
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from celery import Celery
 from loguru import logger
 
 from app.celery import celery_app, default_retry_kwargs, high_priority_retry_kwargs
+from app.tasks.worker_runtime import run_async
 from app.tasks.literature_tasks import (
     ai_search_batch_async,
     start_literature_collection_task,
@@ -34,34 +34,28 @@ def search_and_build_library_celery(
     try:
         logger.info(f"启动搜索建库Celery任务: task_id={task_id}, keywords={keywords}")
 
-        # 运行异步任务
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-        try:
-            from app.tasks.literature_tasks import start_search_and_build_library_task
-            result = loop.run_until_complete(
-                start_search_and_build_library_task(
-                    task_id=task_id,
-                    keywords=keywords,
-                    project_id=project_id,
-                    user_id=user_id,
-                    config=config
-                )
+        # 在worker常驻事件循环中运行异步任务
+        from app.tasks.literature_tasks import start_search_and_build_library_task
+        result = run_async(
+            start_search_and_build_library_task(
+                task_id=task_id,
+                keywords=keywords,
+                project_id=project_id,
+                user_id=user_id,
+                config=config
             )
+        )
 
-            # 搜索建库成功后自动触发主经验生成
-            if result.get("success"):
-                logger.info(f"搜索建库成功，触发主经验生成: project_id={project_id}")
-                main_experience_generation_celery.delay(
-                    task_id=None,  # 新建任务
-                    project_id=project_id,
-                    user_id=user_id
-                )
-            logger.info(f"搜索建库Celery任务完成: task_id={task_id}")
-            return {"success": True, "task_id": task_id, "result": result}
-        finally:
-            loop.close()
+        # 搜索建库成功后自动触发主经验生成
+        if result.get("success"):
+            logger.info(f"搜索建库成功，触发主经验生成: project_id={project_id}")
+            main_experience_generation_celery.delay(
+                task_id=None,  # 新建任务
+                project_id=project_id,
+                user_id=user_id
+            )
+        logger.info(f"搜索建库Celery任务完成: task_id={task_id}")
+        return {"success": True, "task_id": task_id, "result": result}
 
     except Exception as e:
         logger.error(f"搜索建库Celery任务失败: task_id={task_id}, error={e}")
@@ -79,18 +73,12 @@ def ai_search_batch_celery(self, task_id: int, query: str, max_results: int):
     try:
         logger.info(f"启动Celery AI搜索任务: task_id={task_id}, query={query}")
         
-        # 运行异步任务
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            result = loop.run_until_complete(
-                ai_search_batch_async(task_id, query, max_results)
-            )
-            logger.info(f"Celery AI搜索任务完成: task_id={task_id}")
-            return {"success": True, "task_id": task_id, "result": result}
-        finally:
-            loop.close()
+        # 在worker常驻事件循环中运行异步任务
+        result = run_async(
+            ai_search_batch_async(task_id, query, max_results)
+        )
+        logger.info(f"Celery AI搜索任务完成: task_id={task_id}")
+        return {"success": True, "task_id": task_id, "result": result}
             
     except Exception as e:
         logger.error(f"Celery AI搜索任务失败: task_id={task_id}, error={e}")
@@ -108,18 +96,12 @@ def literature_collection_celery(self, task_id: int, keywords: List[str], max_co
     try:
         logger.info(f"启动Celery文献采集任务: task_id={task_id}, keywords={keywords}")
         
-        # 运行异步任务
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            result = loop.run_until_complete(
-                start_literature_collection_task(task_id, keywords, max_count, sources)
-            )
-            logger.info(f"Celery文献采集任务完成: task_id={task_id}")
-            return {"success": True, "task_id": task_id, "result": result}
-        finally:
-            loop.close()
+        # 在worker常驻事件循环中运行异步任务
+        result = run_async(
+            start_literature_collection_task(task_id, keywords, max_count, sources)
+        )
+        logger.info(f"Celery文献采集任务完成: task_id={task_id}")
+        return {"success": True, "task_id": task_id, "result": result}
             
     except Exception as e:
         logger.error(f"Celery文献采集任务失败: task_id={task_id}, error={e}")
@@ -137,18 +119,12 @@ def literature_processing_celery(self, task_id: int):
     try:
         logger.info(f"启动Celery文献处理任务: task_id={task_id}")
         
-        # 运行异步任务
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            result = loop.run_until_complete(
-                start_literature_processing_task(task_id)
-            )
-            logger.info(f"Celery文献处理任务完成: task_id={task_id}")
-            return {"success": True, "task_id": task_id, "result": result}
-        finally:
-            loop.close()
+        # 在worker常驻事件循环中运行异步任务
+        result = run_async(
+            start_literature_processing_task(task_id)
+        )
+        logger.info(f"Celery文献处理任务完成: task_id={task_id}")
+        return {"success": True, "task_id": task_id, "result": result}
             
     except Exception as e:
         logger.error(f"Celery文献处理任务失败: task_id={task_id}, error={e}")
@@ -166,18 +142,12 @@ def experience_generation_celery(self, task_id: int, research_question: str):
     try:
         logger.info(f"启动Celery经验生成任务: task_id={task_id}, question={research_question}")
         
-        # 运行异步任务
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            result = loop.run_until_complete(
-                start_experience_generation_task(task_id, research_question)
-            )
-            logger.info(f"Celery经验生成任务完成: task_id={task_id}")
-            return {"success": True, "task_id": task_id, "result": result}
-        finally:
-            loop.close()
+        # 在worker常驻事件循环中运行异步任务
+        result = run_async(
+            start_experience_generation_task(task_id, research_question)
+        )
+        logger.info(f"Celery经验生成任务完成: task_id={task_id}")
+        return {"success": True, "task_id": task_id, "result": result}
             
     except Exception as e:
         logger.error(f"Celery经验生成任务失败: task_id={task_id}, error={e}")
@@ -195,19 +165,13 @@ def main_experience_generation_celery(self, task_id: Optional[int], project_id:
     try:
         logger.info(f"启动Celery主经验生成任务: project_id={project_id}, user_id={user_id}")
 
-        # 运行异步任务
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-        try:
-            from app.tasks.literature_tasks import start_main_experience_generation_task
-            result = loop.run_until_complete(
-                start_main_experience_generation_task(task_id, project_id, user_id)
-            )
-            logger.info(f"Celery主经验生成任务完成: project_id={project_id}")
-            return {"success": True, "project_id": project_id, "result": result}
-        finally:
-            loop.close()
+        # 在worker常驻事件循环中运行异步任务
+        from app.tasks.literature_tasks import start_main_experience_generation_task
+        result = run_async(
+            start_main_experience_generation_task(task_id, project_id, user_id)
+        )
+        logger.info(f"Celery主经验生成任务完成: project_id={project_id}")
+        return {"success": True, "project_id": project_id, "result": result}
 
     except Exception as e:
         logger.error(f"Celery主经验生成任务失败: project_id={project_id}, error={e}")
@@ -225,18 +189,12 @@ def literature_index_celery(self, project_id: int, task_id: str, user_id: int):
     try:
         logger.info(f"启动Celery文献索引任务: project_id={project_id}, task_id={task_id}")
         
-        # 运行异步任务
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            result = loop.run_until_complete(
-                build_literature_index(project_id, task_id, user_id)
-            )
-            logger.info(f"Celery文献索引任务完成: project_id={project_id}")
-            return {"success": True, "project_id": project_id, "result": result}
-        finally:
-            loop.close()
+        # 在worker常驻事件循环中运行异步任务
+        result = run_async(
+            build_literature_index(project_id, task_id, user_id)
+        )
+        logger.info(f"Celery文献索引任务完成: project_id={project_id}")
+        return {"success": True, "project_id": project_id, "result": result}
             
     except Exception as e:
         logger.error(f"Celery文献索引任务失败: project_id={project_id}, error={e}")
@@ -255,8 +213,6 @@ def auto_select_clarification_card(self, session_id: str, card_id: str):
     from app.services.intelligent_interaction_engine import IntelligentInteractionEngine
 
     db = SessionLocal()
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
 
     try:
         card = (
@@ -310,7 +266,7 @@ def auto_select_clarification_card(self, session_id: str, card_id: str):
             "timeout_timestamp": datetime.utcnow().isoformat(),
         }
 
-        result = loop.run_until_complete(
+        result = run_async(
             engine.handle_user_selection(session_id=session_id, selection=selection_data)
         )
 
@@ -331,7 +287,7 @@ def auto_select_clarification_card(self, session_id: str, card_id: str):
             except Exception as broadcast_error:
                 logger.warning(f"广播自动澄清事件失败: {broadcast_error}")
 
-        loop.run_until_complete(broadcast_auto_selection())
+        run_async(broadcast_auto_selection())
 
         logger.info(
             "澄清卡片自动选择完成 | session=%s card=%s option=%s",
@@ -355,7 +311,6 @@ def auto_select_clarification_card(self, session_id: str, card_id: str):
         )
         raise
     finally:
-        loop.close()
         db.close()
 
 
@@ -367,18 +322,12 @@ def download_pdf_celery(self, literature_id: int, user_id: int, task_id: Optiona
     logger.info(f"开始Celery PDF下载任务: literature_id={literature_id}, user_id={user_id}")
 
     try:
-        # 运行异步任务
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-        try:
-            result = loop.run_until_complete(
-                download_and_process_pdf_task(literature_id, user_id, task_id)
-            )
-            logger.info(f"Celery PDF下载任务完成: literature_id={literature_id}")
-            return {"success": True, "literature_id": literature_id, "result": result}
-        finally:
-            loop.close()
+        # 在worker常驻事件循环中运行异步任务
+        result = run_async(
+            download_and_process_pdf_task(literature_id, user_id, task_id)
+        )
+        logger.info(f"Celery PDF下载任务完成: literature_id={literature_id}")
+        return {"success": True, "literature_id": literature_id, "result": result}
 
     except Exception as e:
         logger.error(f"Celery PDF下载任务失败: literature_id={literature_id}, error={e}")
@@ -387,3 +336,32 @@ def download_pdf_celery(self, literature_id: int, user_id: int, task_id: Optiona
             meta={'error': str(e), 'literature_id': literature_id}
         )
         raise
+
+
+@celery_app.task
+def refresh_project_stats_celery(limit: int = 100):
+    """定时刷新被标记为过期的项目文献统计"""
+    from app.core.database import SessionLocal
+    from app.services.project_stats_service import refresh_stale_project_stats
+
+    db = SessionLocal()
+    try:
+        refreshed = refresh_stale_project_stats(db, limit=limit)
+        if refreshed:
+            logger.info(f"已刷新 {refreshed} 个项目的文献统计")
+        return {"refreshed": refreshed}
+    finally:
+        db.close()
+
+
+@celery_app.task
+def reconcile_project_stats_celery():
+    """全量对账项目文献统计，修正绕过 ORM 的写入造成的偏差"""
+    from app.core.database import SessionLocal
+    from app.services.project_stats_service import reconcile_project_stats
+
+    db = SessionLocal()
+    try:
+        return reconcile_project_stats(db)
+    finally:
+        db.close()
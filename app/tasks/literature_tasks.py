@@ -20,11 +20,14 @@ from app.models.literature import Literature, LiteratureSegment
 from app.models.user import User
 from app.services.literature_collector import EnhancedLiteratureCollector
 from app.services.pdf_processor import PDFProcessor
+from app.services.pdf_worker_pool import PRIORITY_BATCH
+from app.services.llm_concurrency import llm_priority
 from app.services.research_ai_service import research_ai_service
 from app.services.experience_engine import EnhancedExperienceEngine
 from app.services.rag_service import RAGService
 from app.services.task_orchestrator import TaskOrchestrator
-from app.tasks.literature_tasks_helper import create_basic_segments
+from app.services.segment_writer import SegmentBatchWriter
+from app.tasks.literature_tasks_helper import build_basic_segments, create_basic_segments
 
 async def safe_broadcast_update(progress_service, task_id: int, data: dict):
     """安全的WebSocket广播更新"""
@@ -504,7 +507,18 @@ async def start_literature_processing_task(task_id: int):
             await progress_callback("生成结构化模板", 10, template_details)
 
             total_items = len(unprocessed_literature)
-            literature_ids = [lit.id for lit in unprocessed_literature]
+            # 项目与文献字段只在任务开始时读取一次，单篇处理不再开会话查询
+            structure_template = project.structure_template
+            literature_snapshots = [
+                {
+                    "id": lit.id,
+                    "title": lit.title,
+                    "abstract": lit.abstract,
+                    "pdf_path": lit.pdf_path or lit.pdf_url,
+                }
+                for lit in unprocessed_literature
+            ]
+            segment_writer = SegmentBatchWriter()
 
             concurrency_limit = max(settings.literature_processing_concurrency, 1)
             semaphore = asyncio.Semaphore(concurrency_limit)
@@ -517,106 +531,81 @@ async def start_literature_processing_task(task_id: int):
                 "failures": []
             }
 
-            async def process_single_literature(literature_id: int):
+            async def build_fallback_segments(snapshot: Dict[str, Any]) -> None:
+                try:
+                    segments, text_content = await build_basic_segments(
+                        snapshot["title"],
+                        snapshot["abstract"],
+                        structure_template,
+                    )
+                except Exception as fallback_exc:
+                    logger.error(f"创建基本段落失败: {fallback_exc}")
+                    await segment_writer.mark_failed(snapshot["id"])
+                    return
+                await segment_writer.add(snapshot["id"], segments, text_content)
+
+            async def process_single_literature(snapshot: Dict[str, Any]):
                 async with semaphore:
-                    local_db = SessionLocal()
+                    literature_id = snapshot["id"]
                     used_fallback = False
                     success = False
                     failure_info: Optional[Dict[str, Any]] = None
                     try:
-                        literature = (
-                            local_db.query(Literature)
-                            .filter(Literature.id == literature_id)
-                            .first()
-                        )
-                        if not literature:
-                            raise ValueError(f"文献不存在: {literature_id}")
-
-                        project_obj = (
-                            local_db.query(Project)
-                            .filter(Project.id == task.project_id)
-                            .first()
-                        )
-                        if not project_obj:
-                            raise ValueError(f"项目不存在: {task.project_id}")
-
-                        logger.info(f"并行处理文献: {literature.title[:50]}...")
-                        new_segments = 0
-
-                        if literature.pdf_url or literature.pdf_path:
-                            pdf_path = literature.pdf_path or literature.pdf_url
-                            if pdf_path and os.path.exists(pdf_path):
-                                try:
-                                    pdf_processor = PDFProcessor()
-                                    result = await pdf_processor.process_pdf_with_segments(
-                                        pdf_path,
-                                        project_obj.structure_template,
+                        logger.info(f"并行处理文献: {(snapshot['title'] or '')[:50]}...")
+
+                        pdf_path = snapshot["pdf_path"]
+                        result = None
+                        if pdf_path and os.path.exists(pdf_path):
+                            try:
+                                pdf_processor = PDFProcessor()
+                                result = await pdf_processor.process_pdf_with_segments(
+                                    pdf_path,
+                                    structure_template,
+                                    priority=PRIORITY_BATCH,
+                                )
+                                if not result.get("success"):
+                                    logger.warning(
+                                        f"PDF处理失败: {result.get('error', 'Unknown error')}"
                                     )
-
-                                    if result.get("success"):
-                                        segments = result.get("segments", [])
-                                        for segment_data in segments:
-                                            segment = LiteratureSegment(
-                                                literature_id=literature.id,
-                                                segment_type=segment_data.get("segment_type", "general"),
-                                                content=segment_data.get("content", ""),
-                                                page_number=segment_data.get("page_number", 1),
-                                                extraction_confidence=segment_data.get("confidence", 0.5),
-                                                structured_data={
-                                                    "source": "mineru_processing",
-                                                    "processor_version": result.get("metadata", {}).get("version", "unknown"),
-                                                },
-                                            )
-                                            local_db.add(segment)
-                                            new_segments += 1
-
-                                        literature.is_parsed = True
-                                        literature.parsing_status = "completed"
-                                        content_payload = result.get("content") or {}
-                                        literature.parsed_content = content_payload.get("text_content", "")
-                                        success = True
-                                    else:
-                                        logger.warning(
-                                            f"PDF处理失败: {result.get('error', 'Unknown error')}"
-                                        )
-                                        await create_basic_segments(literature, local_db, project_obj)
-                                        used_fallback = True
-                                        success = True
-                                except Exception as processing_exc:
-                                    logger.error(f"PDF处理异常: {processing_exc}")
-                                    await create_basic_segments(literature, local_db, project_obj)
-                                    used_fallback = True
-                                    success = True
-                            else:
-                                await create_basic_segments(literature, local_db, project_obj)
-                                used_fallback = True
-                                success = True
+                                    result = None
+                            except Exception as processing_exc:
+                                logger.error(f"PDF处理异常: {processing_exc}")
+                                result = None
+
+                        if result is not None:
+                            processor_version = result.get("metadata", {}).get("version", "unknown")
+                            segments = [
+                                {
+                                    "segment_type": segment_data.get("segment_type", "general"),
+                                    "content": segment_data.get("content", ""),
+                                    "page_number": segment_data.get("page_number", 1),
+                                    "extraction_confidence": segment_data.get("confidence", 0.5),
+                                    "structured_data": {
+                                        "source": "mineru_processing",
+                                        "processor_version": processor_version,
+                                    },
+                                }
+                                for segment_data in result.get("segments", [])
+                            ]
+                            content_payload = result.get("content") or {}
+                            await segment_writer.add(
+                                literature_id,
+                                segments,
+                                content_payload.get("text_content", ""),
+                            )
                         else:
-                            await create_basic_segments(literature, local_db, project_obj)
+                            await build_fallback_segments(snapshot)
                             used_fallback = True
-                            success = True
-
-                        local_db.commit()
+                        success = True
 
                     except Exception as item_error:
-                        local_db.rollback()
                         failure_info = {
                             "literature_id": literature_id,
                             "error": str(item_error),
                         }
                         logger.error(f"并行处理文献失败 {literature_id}: {item_error}")
-
-                        # 更新状态为失败
-                        persisted = (
-                            local_db.query(Literature)
-                            .filter(Literature.id == literature_id)
-                            .first()
-                        )
-                        if persisted:
-                            persisted.parsing_status = "failed"
-                            local_db.commit()
-                    finally:
-                        local_db.close()
+                        # 更新状态为失败（随下一批一起写库）
+                        await segment_writer.mark_failed(literature_id)
 
                     async with progress_lock:
                         progress_state["processed"] += 1
@@ -645,7 +634,16 @@ async def start_literature_processing_task(task_id: int):
                             details,
                         )
 
-            await asyncio.gather(*[process_single_literature(lit_id) for lit_id in literature_ids])
+            try:
+                # 批量处理中的大模型调用排在交互请求之后
+                with llm_priority(PRIORITY_BATCH):
+                    await asyncio.gather(*[process_single_literature(snapshot) for snapshot in literature_snapshots])
+            finally:
+                await segment_writer.close()
+
+            if segment_writer.failed_literature:
+                progress_state["failures"].extend(segment_writer.failed_literature)
+                progress_state["processed_success"] -= len(segment_writer.failed_literature)
 
             summary = {
                 "success": True,
@@ -2,6 +2,8 @@
 文献处理任务的辅助函数
 """
 
+from typing import Any, Dict, List, Optional, Tuple
+
 from loguru import logger
 from sqlalchemy.orm import Session
 
@@ -10,43 +12,57 @@ from app.models.project import Project
 from app.services.pdf_processor import PDFProcessor
 
 
+async def build_basic_segments(
+    title: str,
+    abstract: Optional[str],
+    structure_template: Optional[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], str]:
+    """基于摘要和标题生成段落列映射，返回 (段落列表, 解析文本)"""
+    # 基于摘要和标题生成结构化内容
+    text_content = f"标题: {title}\n\n摘要: {abstract or ''}"
+    segments: List[Dict[str, Any]] = []
+
+    if structure_template:
+        pdf_processor = PDFProcessor()
+        extraction_result = await pdf_processor.extract_text_segments(
+            {"text_content": text_content},
+            structure_template
+        )
+
+        for segment_data in extraction_result:
+            segments.append({
+                "segment_type": segment_data.get("segment_type", "general"),
+                "content": segment_data.get("content", ""),
+                "page_number": segment_data.get("page_number", 1),
+                "extraction_confidence": segment_data.get("confidence", 0.5),
+                "structured_data": {"source": "abstract_title"},
+            })
+    elif abstract:
+        # 没有模板时，创建简单段落
+        segments.append({
+            "segment_type": "abstract",
+            "content": abstract,
+            "page_number": 1,
+            "extraction_confidence": 0.9,
+            "structured_data": {"source": "abstract"},
+        })
+
+    return segments, text_content
+
+
 async def create_basic_segments(literature: Literature, db: Session, project: Project):
     """基于摘要和标题创建基本文献段落"""
     try:
-        # 基于摘要和标题生成结构化内容
-        text_content = f"标题: {literature.title}\n\n摘要: {literature.abstract or ''}"
-        
-        if project.structure_template:
-            pdf_processor = PDFProcessor()
-            extraction_result = await pdf_processor.extract_text_segments(
-                {"text_content": text_content},
-                project.structure_template
-            )
-            
-            # 保存文献段落
-            for segment_data in extraction_result:
-                segment = LiteratureSegment(
-                    literature_id=literature.id,
-                    segment_type=segment_data.get("segment_type", "general"),
-                    content=segment_data.get("content", ""),
-                    page_number=segment_data.get("page_number", 1),
-                    extraction_confidence=segment_data.get("confidence", 0.5),
-                    structured_data={"source": "abstract_title"}
-                )
-                db.add(segment)
-        else:
-            # 没有模板时，创建简单段落
-            if literature.abstract:
-                segment = LiteratureSegment(
-                    literature_id=literature.id,
-                    segment_type="abstract",
-                    content=literature.abstract,
-                    page_number=1,
-                    extraction_confidence=0.9,
-                    structured_data={"source": "abstract"}
-                )
-                db.add(segment)
-        
+        segments, text_content = await build_basic_segments(
+            literature.title,
+            literature.abstract,
+            project.structure_template
+        )
+
+        # 保存文献段落
+        for segment_data in segments:
+            db.add(LiteratureSegment(literature_id=literature.id, **segment_data))
+
         # 标记文献已处理
         literature.is_parsed = True
         literature.parsing_status = "completed"
@@ -54,4 +70,4 @@ async def create_basic_segments(literature: Literature, db: Session, project: Pr
         
     except Exception as e:
         logger.error(f"创建基本段落失败: {e}")
-        literature.parsing_status = "failed"
\ No newline at end of file
+        literature.parsing_status = "failed"
@@ -0,0 +1,157 @@
+"""
+Celery worker 的常驻事件循环
+
+原先每个 Celery 任务都新建并关闭一个事件循环，绑定在旧循环上的 Redis 连接池、
+Elasticsearch/aiohttp 会话与 AsyncOpenAI 连接池都无法复用，短任务的大部分时间
+花在重新建立连接上。这里在 worker 子进程启动时（worker_process_init）创建一个
+运行在后台线程中的事件循环，任务通过 run_async 把协程提交到该循环并同步等待结果，
+进程内的异步客户端因此可以跨任务复用；子进程退出时统一关闭客户端并停止循环。
+
+未收到 worker_process_init 的进程（solo/threads 池、API 进程中的 eager 执行）
+在第一次调用 run_async 时懒启动同一个循环。
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Awaitable, Dict, Optional
+
+from loguru import logger
+
+from app.core.async_clients import async_clients
+
+
+class WorkerRuntime:
+    """在后台线程中运行的进程级事件循环"""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self.stats = {"tasks": 0, "loops_started": 0}
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        return self._loop
+
+    def running(self) -> bool:
+        return (
+            self._loop is not None
+            and self._pid == os.getpid()
+            and self._thread is not None
+            and self._thread.is_alive()
+        )
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        """启动事件循环线程（已启动时直接返回）"""
+        with self._lock:
+            if self.running():
+                return self._loop
+            if self._pid is not None and self._pid != os.getpid():
+                # fork 继承的循环与客户端属于父进程，不能在子进程中使用
+                async_clients.reset()
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run_loop() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=run_loop, name="celery-async-loop", daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+            self._pid = os.getpid()
+            self.stats["loops_started"] += 1
+            return loop
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """在常驻循环中执行协程并阻塞等待结果；调用方被中断（如软超时）时取消协程"""
+        loop = self.start()
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        self.stats["tasks"] += 1
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    async def _close_clients(self) -> None:
+        from app.core.elasticsearch import es_client
+        from app.core.redis import redis_manager
+        from app.services.pdf_worker_pool import pdf_worker_pool
+
+        await async_clients.aclose()
+        try:
+            await redis_manager.disconnect()
+        except Exception as exc:
+            logger.warning(f"关闭Redis连接失败: {exc}")
+        if es_client.client is not None:
+            try:
+                await es_client.close()
+            except Exception as exc:
+                logger.warning(f"关闭Elasticsearch连接失败: {exc}")
+            es_client.client = None
+        pdf_worker_pool.shutdown()
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """关闭共享客户端、取消遗留协程并停止循环"""
+        with self._lock:
+            if not self.running():
+                return
+            loop = self._loop
+            try:
+                asyncio.run_coroutine_threadsafe(self._close_clients(), loop).result(timeout)
+            except Exception as exc:
+                logger.warning(f"关闭worker异步客户端失败: {exc}")
+
+            async def cancel_pending() -> None:
+                current = asyncio.current_task()
+                pending = [task for task in asyncio.all_tasks() if task is not current]
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                await loop.shutdown_asyncgens()
+
+            try:
+                asyncio.run_coroutine_threadsafe(cancel_pending(), loop).result(timeout)
+            except Exception as exc:
+                logger.warning(f"取消遗留协程失败: {exc}")
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join(timeout)
+            loop.close()
+            self._loop = None
+            self._thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "running": self.running(), "clients": list(async_clients.names())}
+
+
+worker_runtime = WorkerRuntime()
+
+
+def run_async(coro: Awaitable[Any]) -> Any:
+    """在 worker 常驻事件循环中执行协程（Celery 任务使用）"""
+    return worker_runtime.run(coro)
+
+
+async def _warm_up() -> None:
+    """预先建立 Redis 连接与共享 OpenAI 客户端，使第一个任务不必承担建连开销"""
+    from app.core.redis import redis_manager
+
+    started = time.perf_counter()
+    await redis_manager.get_client()
+    async_clients.openai().current()
+    logger.info(f"Celery worker 事件循环已就绪 ({(time.perf_counter() - started) * 1000:.0f}ms)")
+
+
+def bootstrap_worker() -> None:
+    """worker_process_init 钩子：启动常驻循环并预热连接"""
+    worker_runtime.start()
+    try:
+        worker_runtime.run(_warm_up(), timeout=15)
+    except Exception as exc:
+        logger.warning(f"worker 连接预热失败，将在首次使用时重试: {exc}")
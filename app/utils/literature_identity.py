@@ -0,0 +1,41 @@
+"""
+文献标识归一化
+
+去重时 DOI 与标题都先归一化：DOI 去掉解析前缀并转小写；标题做 NFKC 归一、
+转小写并去掉标点与多余空白，使大小写、标点、全半角不同的同一标题得到相同的哈希。
+literature.title_hash 列保存归一化标题的 SHA-1，供带索引的等值查询使用。
+"""
+
+import hashlib
+import re
+import unicodedata
+from typing import Optional
+
+_DOI_PREFIX_RE = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+_NON_WORD_RE = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def strip_doi_prefix(doi: str) -> str:
+    return _DOI_PREFIX_RE.sub("", doi.strip())
+
+
+def normalize_doi(doi: Optional[str]) -> Optional[str]:
+    if not doi:
+        return None
+    return strip_doi_prefix(doi).lower() or None
+
+
+def normalize_title(title: Optional[str]) -> str:
+    normalized = unicodedata.normalize("NFKC", title or "").lower()
+    return " ".join(_NON_WORD_RE.sub(" ", normalized).split())
+
+
+def hash_normalized_title(normalized: str) -> Optional[str]:
+    if not normalized:
+        return None
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def title_hash(title: Optional[str]) -> Optional[str]:
+    """归一化标题的 SHA-1（40位十六进制）；标题为空时返回 None"""
+    return hash_normalized_title(normalize_title(title))
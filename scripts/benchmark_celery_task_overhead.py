@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Measure per-task overhead of short Celery tasks.
+
+Each simulated task does what a short task such as
+``auto_select_clarification_card`` does on the async side: one HTTP round trip
+(the LLM / websocket broadcast call) and, with ``--redis-url``, one Redis
+command. Two execution models are compared:
+
+* ``per_task_loop``: the previous behaviour. A new event loop is created for
+  every task, an HTTP session and a Redis client are built inside it and
+  everything is closed when the task ends.
+* ``worker_runtime``: ``app.tasks.worker_runtime.run_async`` submits the task
+  to the worker-lifetime loop, where the session and the Redis client are
+  created once and reused.
+
+The HTTP target defaults to a local aiohttp server. Pass ``--url`` with an
+HTTPS endpoint (for example the configured OpenAI base URL) to include DNS and
+TLS handshakes, which is where most of the difference shows up in production.
+
+Usage example:
+  python3 scripts/benchmark_celery_task_overhead.py --tasks 200
+  python3 scripts/benchmark_celery_task_overhead.py --url https://api.openai.com/v1/models --redis-url redis://localhost:6379/0
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import aiohttp  # noqa: E402
+from aiohttp import web  # noqa: E402
+
+from app.tasks.worker_runtime import WorkerRuntime  # noqa: E402
+
+
+def _start_local_server() -> str:
+    """在后台线程启动一个返回固定 JSON 的 HTTP 服务"""
+    ready = threading.Event()
+    address: Dict[str, str] = {}
+
+    async def handle(_request):
+        return web.json_response({"ok": True})
+
+    def serve() -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        app = web.Application()
+        app.router.add_get("/", handle)
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        loop.run_until_complete(site.start())
+        port = site._server.sockets[0].getsockname()[1]
+        address["url"] = f"http://127.0.0.1:{port}/"
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    ready.wait()
+    return address["url"]
+
+
+async def _task_body(session: aiohttp.ClientSession, url: str, redis_client) -> None:
+    async with session.get(url) as response:
+        await response.read()
+    if redis_client is not None:
+        await redis_client.ping()
+
+
+def _redis_client(redis_url: Optional[str]):
+    if not redis_url:
+        return None
+    import redis.asyncio as redis
+
+    return redis.from_url(redis_url)
+
+
+def _per_task_loop(url: str, redis_url: Optional[str]) -> None:
+    async def run() -> None:
+        redis_client = _redis_client(redis_url)
+        async with aiohttp.ClientSession() as session:
+            await _task_body(session, url, redis_client)
+        if redis_client is not None:
+            await redis_client.close()
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(run())
+    finally:
+        loop.close()
+
+
+class _SharedClients:
+    def __init__(self, redis_url: Optional[str]):
+        self.redis_url = redis_url
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.redis = None
+
+    async def run(self, url: str) -> None:
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+            self.redis = _redis_client(self.redis_url)
+        await _task_body(self.session, url, self.redis)
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+        if self.redis is not None:
+            await self.redis.close()
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "tasks": len(samples),
+        "mean_ms": round(statistics.mean(samples) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1] * 1000, 3),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=100)
+    parser.add_argument("--url", help="HTTP(S) endpoint called once per task (default: local server)")
+    parser.add_argument("--redis-url", help="Also issue one Redis PING per task")
+    args = parser.parse_args(argv)
+
+    url = args.url or _start_local_server()
+
+    per_task: List[float] = []
+    for _ in range(args.tasks):
+        started = time.perf_counter()
+        _per_task_loop(url, args.redis_url)
+        per_task.append(time.perf_counter() - started)
+
+    runtime = WorkerRuntime()
+    clients = _SharedClients(args.redis_url)
+    shared: List[float] = []
+    for _ in range(args.tasks):
+        started = time.perf_counter()
+        runtime.run(clients.run(url))
+        shared.append(time.perf_counter() - started)
+    runtime.run(clients.close())
+
+    print(json.dumps({
+        "url": url,
+        "redis": bool(args.redis_url),
+        "per_task_loop": _summary(per_task),
+        "worker_runtime": _summary(shared),
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
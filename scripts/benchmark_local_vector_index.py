@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Benchmark the local vector index against the Elasticsearch kNN path.
+
+Random unit vectors are generated for each corpus size, appended to a
+temporary ``ProjectVectorIndex`` and queried with ``--queries`` random probes.
+When ``--es-url`` is given the same vectors are bulk indexed into a temporary
+HNSW index and queried with ``knn`` so both paths report comparable latency.
+
+Usage example:
+  python3 scripts/benchmark_local_vector_index.py --sizes 10000 100000 1000000
+  python3 scripts/benchmark_local_vector_index.py --sizes 10000 100000 \\
+    --es-url http://localhost:9200 --output vector_benchmark.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.local_vector_index import ProjectVectorIndex  # noqa: E402
+
+_APPEND_BATCH = 50000
+
+
+def _random_vectors(rng: np.random.Generator, count: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((count, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "mean_ms": statistics.fmean(ordered),
+        "p50_ms": ordered[len(ordered) // 2],
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+    }
+
+
+def benchmark_local(size: int, dim: int, queries: np.ndarray, top_k: int, seed: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        index = ProjectVectorIndex(Path(directory), model="benchmark")
+        started = time.perf_counter()
+        for start in range(0, size, _APPEND_BATCH):
+            count = min(_APPEND_BATCH, size - start)
+            index.add(range(start, start + count), _random_vectors(rng, count, dim))
+        build_seconds = time.perf_counter() - started
+
+        # 首次查询触发页缓存加载，不计入统计
+        index.search(queries[0], top_k)
+        latencies = []
+        for query in queries:
+            started = time.perf_counter()
+            index.search(query, top_k)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        return {
+            "backend": "local",
+            "vectors": size,
+            "build_seconds": build_seconds,
+            "disk_mb": (index.vectors_path.stat().st_size + index.ids_path.stat().st_size) / 1024 / 1024,
+            **_percentiles(latencies),
+        }
+
+
+async def benchmark_elasticsearch(
+    es_url: str, size: int, dim: int, queries: np.ndarray, top_k: int, num_candidates: int, seed: int
+) -> Dict[str, Any]:
+    from elasticsearch import AsyncElasticsearch
+    from elasticsearch.helpers import async_bulk
+
+    from app.core.elasticsearch import dense_vector_field
+
+    rng = np.random.default_rng(seed)
+    index_name = f"vector_benchmark_{size}_{int(time.time())}"
+    client = AsyncElasticsearch(hosts=[es_url], request_timeout=300)
+    try:
+        await client.indices.create(
+            index=index_name,
+            mappings={"properties": {
+                "segment_id": {"type": "keyword"},
+                "project_ids": {"type": "keyword"},
+                "content_embedding": dense_vector_field(dim),
+            }},
+            settings={"number_of_shards": 1, "number_of_replicas": 0, "refresh_interval": "-1"},
+        )
+
+        started = time.perf_counter()
+        for start in range(0, size, _APPEND_BATCH):
+            count = min(_APPEND_BATCH, size - start)
+            vectors = _random_vectors(rng, count, dim)
+            actions = (
+                {
+                    "_index": index_name,
+                    "_id": str(start + offset),
+                    "segment_id": start + offset,
+                    "project_ids": [1],
+                    "content_embedding": vectors[offset].tolist(),
+                }
+                for offset in range(count)
+            )
+            await async_bulk(client, actions, chunk_size=1000)
+        await client.indices.refresh(index=index_name)
+        await client.indices.forcemerge(index=index_name, max_num_segments=1)
+        build_seconds = time.perf_counter() - started
+
+        async def run(query: np.ndarray) -> None:
+            await client.search(
+                index=index_name,
+                knn={
+                    "field": "content_embedding",
+                    "query_vector": query.tolist(),
+                    "k": top_k,
+                    "num_candidates": num_candidates,
+                    "filter": [{"term": {"project_ids": 1}}],
+                },
+                size=top_k,
+                source=False,
+            )
+
+        await run(queries[0])
+        latencies = []
+        for query in queries:
+            started = time.perf_counter()
+            await run(query)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        return {"backend": "elasticsearch_knn", "vectors": size, "build_seconds": build_seconds, **_percentiles(latencies)}
+    finally:
+        await client.indices.delete(index=index_name, ignore_unavailable=True)
+        await client.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--num-candidates", type=int, default=200)
+    parser.add_argument("--es-url", default=None, help="Elasticsearch URL; omit to benchmark only the local index")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    queries = _random_vectors(np.random.default_rng(args.seed + 1), args.queries, args.dim)
+    results: List[Dict[str, Any]] = []
+    for size in args.sizes:
+        results.append(benchmark_local(size, args.dim, queries, args.top_k, args.seed))
+        print(json.dumps(results[-1], ensure_ascii=False))
+        if args.es_url:
+            results.append(asyncio.run(benchmark_elasticsearch(
+                args.es_url, size, args.dim, queries, args.top_k, args.num_candidates, args.seed
+            )))
+            print(json.dumps(results[-1], ensure_ascii=False))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Measure recall of the local relevance pre-filter against labelled papers.
+
+The input is a JSONL file with one candidate per line::
+
+  {"title": "...", "abstract": "...", "relevant": true}
+
+Labels can come from manual review or from earlier LLM screening runs. For
+each forward fraction the script reports how many candidates would still reach
+the LLM (``forward_ratio``) and how many relevant papers survive the
+pre-filter (``recall``).
+
+Usage example:
+  python3 scripts/evaluate_relevance_prefilter.py labelled.jsonl \\
+      --direction "锂离子电池硅基负极" --keywords silicon anode --fractions 0.2 0.35 0.5
+  python3 scripts/evaluate_relevance_prefilter.py labelled.jsonl --direction "..." --embeddings
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.relevance_prefilter import (  # noqa: E402
+    PrefilterResult,
+    RelevancePrefilter,
+    evaluate_prefilter,
+    select_forwarded,
+)
+
+
+def _load(path: str):
+    papers, labels = [], []
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            papers.append(row)
+            labels.append(bool(row.get("relevant")))
+    return papers, labels
+
+
+async def _run(args) -> List[dict]:
+    papers, labels = _load(args.dataset)
+    ai_service = None
+    if args.embeddings:
+        os.environ.setdefault("OPENAI_API_KEY", "")
+        from app.services.ai_service import AIService
+
+        ai_service = AIService()
+
+    prefilter = RelevancePrefilter(embedding_weight=args.embedding_weight if args.embeddings else 0.0)
+    scores = await prefilter.score(ai_service, args.direction, args.keywords, papers)
+    results = []
+    for fraction in args.fractions:
+        forwarded = select_forwarded(scores, fraction, args.min_forward, args.margin)
+        metrics = evaluate_prefilter(PrefilterResult(scores=scores, forwarded=forwarded), labels)
+        results.append({"forward_fraction": fraction, **metrics})
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset", help="Labelled JSONL file")
+    parser.add_argument("--direction", required=True, help="Project research direction")
+    parser.add_argument("--keywords", nargs="*", default=[])
+    parser.add_argument("--fractions", nargs="+", type=float, default=[0.2, 0.35, 0.5])
+    parser.add_argument("--min-forward", type=int, default=0)
+    parser.add_argument("--margin", type=float, default=0.05, help="Borderline band below the cutoff")
+    parser.add_argument("--embeddings", action="store_true", help="Include cosine similarity (calls the embeddings API, cached)")
+    parser.add_argument("--embedding-weight", type=float, default=0.6)
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(_run(args))
+    for result in results:
+        print(json.dumps(result, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
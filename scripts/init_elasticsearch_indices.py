@@ -105,16 +105,21 @@ async def create_indices() -> None:
         logger.warning("连接 Elasticsearch 失败，跳过索引初始化: %s", exc)
         return
 
+    from app.core.config import settings  # noqa: WPS433
+
+    dims = settings.embedding_dimensions
     tasks = [
         es_client.create_index(
             index_name="literature_index",
             mapping=_literature_index_mapping(),
             settings_config={"number_of_shards": 1, "number_of_replicas": 0},
+            vector_fields={"title_embedding": dims, "abstract_embedding": dims},
         ),
         es_client.create_index(
             index_name="literature_segments_index",
             mapping=_literature_segments_mapping(),
             settings_config={"number_of_shards": 1, "number_of_replicas": 0},
+            vector_fields={"content_embedding": dims},
         ),
     ]
 
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Manage the content-addressed PDF parse cache.
+
+``prewarm`` parses PDFs that are not cached yet (files, directories scanned
+recursively, and/or every ``pdf_path``/``file_path`` recorded in the
+database). Later uploads and reprocessing of the same bytes then read from
+disk instead of running MinerU again. ``gc`` removes entries written by other
+parser versions, entries not read for ``--max-age-days`` and, above
+``--max-bytes``, the least recently read entries. ``stats`` prints entry
+counts and sizes per parser version.
+
+Usage example:
+  python3 scripts/pdf_parse_cache.py prewarm ./uploads --from-db --concurrency 2
+  python3 scripts/pdf_parse_cache.py gc --max-bytes 10000000000 --max-age-days 90 --dry-run
+  python3 scripts/pdf_parse_cache.py stats
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings  # noqa: E402
+from app.services.pdf_parse_cache import file_sha256, pdf_parse_cache  # noqa: E402
+from app.services.pdf_processor import PARSE_CACHE_VERSION  # noqa: E402
+
+
+def _collect_paths(targets: Iterable[str]) -> List[Path]:
+    paths: List[Path] = []
+    for target in targets:
+        path = Path(target)
+        if path.is_dir():
+            paths.extend(sorted(path.rglob("*.pdf")))
+        elif path.is_file():
+            paths.append(path)
+        else:
+            print(f"skip missing path: {target}", file=sys.stderr)
+    return paths
+
+
+def _paths_from_db() -> List[Path]:
+    from sqlalchemy import select
+
+    from app.core.database import SessionLocal
+    from app.models.literature import Literature
+    from app.models.shared_literature import SharedLiterature
+
+    with SessionLocal() as db:
+        values = list(db.scalars(select(Literature.pdf_path).where(Literature.pdf_path.isnot(None))))
+        values += db.scalars(select(Literature.file_path).where(Literature.file_path.isnot(None)))
+        values += db.scalars(select(SharedLiterature.pdf_path).where(SharedLiterature.pdf_path.isnot(None)))
+    return [Path(value) for value in values if value.lower().endswith(".pdf") and Path(value).is_file()]
+
+
+async def _prewarm(paths: List[Path], concurrency: int) -> dict:
+    from app.services.pdf_processor import PDFProcessor
+
+    processor = PDFProcessor()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    seen: Set[str] = set()
+    counts = {"cached": 0, "parsed": 0, "failed": 0, "duplicates": 0}
+
+    async def warm(path: Path) -> None:
+        digest = await asyncio.to_thread(file_sha256, str(path))
+        if digest in seen:
+            counts["duplicates"] += 1
+            return
+        seen.add(digest)
+        if pdf_parse_cache.entry_path(digest, PARSE_CACHE_VERSION).exists():
+            counts["cached"] += 1
+            return
+        async with semaphore:
+            started = time.perf_counter()
+            result = await processor.process_pdf(str(path))
+        status = "parsed" if result.get("success") else "failed"
+        counts[status] += 1
+        print(json.dumps({"path": str(path), "status": status, "seconds": round(time.perf_counter() - started, 1)}))
+
+    await asyncio.gather(*(warm(path) for path in paths))
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    prewarm = commands.add_parser("prewarm", help="Parse PDFs that are not cached yet")
+    prewarm.add_argument("paths", nargs="*", help="PDF files or directories")
+    prewarm.add_argument("--from-db", action="store_true", help="Include PDF paths stored on literature rows")
+    prewarm.add_argument("--concurrency", type=int, default=2)
+
+    gc = commands.add_parser("gc", help="Remove outdated or least recently used entries")
+    gc.add_argument("--max-bytes", type=int, default=settings.pdf_parse_cache_max_bytes)
+    gc.add_argument("--max-age-days", type=float, default=settings.pdf_parse_cache_max_age_days)
+    gc.add_argument("--keep-other-versions", action="store_true", help="Keep entries of other parser versions")
+    gc.add_argument("--dry-run", action="store_true")
+
+    commands.add_parser("stats", help="Show cache size per parser version")
+    args = parser.parse_args(argv)
+
+    if args.command == "prewarm":
+        paths = _collect_paths(args.paths)
+        if args.from_db:
+            paths += _paths_from_db()
+        if not paths:
+            print("no PDF files to prewarm", file=sys.stderr)
+            return 1
+        print(json.dumps(asyncio.run(_prewarm(paths, args.concurrency))))
+    elif args.command == "gc":
+        result = pdf_parse_cache.gc(
+            current_version=None if args.keep_other_versions else PARSE_CACHE_VERSION,
+            max_bytes=args.max_bytes,
+            max_age_days=args.max_age_days,
+            dry_run=args.dry_run,
+        )
+        print(json.dumps({**result, "dry_run": args.dry_run}))
+    else:
+        print(json.dumps(pdf_parse_cache.stats(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
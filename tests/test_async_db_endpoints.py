@@ -0,0 +1,83 @@
+"""
+异步会话端点测试（aiosqlite 内存库）
+"""
+
+import os
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app.api.literature import get_literature, get_project_literature_statistics, list_literature
+from app.api.task.routes import get_task_detail
+from app.core.database import Base
+from app.models.literature import Literature, LiteratureSegment
+from app.models.project import Project
+from app.models.task import Task, TaskProgress
+from app.models.user import User
+
+
+@asynccontextmanager
+async def _seeded_session():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        owner = User(id=1, email="a@example.com", username="a", hashed_password="x")
+        other = User(id=2, email="b@example.com", username="b", hashed_password="x")
+        project = Project(id=10, name="mine", owner_id=1)
+        foreign = Project(id=20, name="theirs", owner_id=2)
+        shared = Literature(id=100, title="Graphene anodes", authors=[], quality_score=9.0, is_parsed=True)
+        shared.projects.append(project)
+        direct = Literature(id=101, title="Direct paper", authors=[], project_id=10, quality_score=5.0)
+        hidden = Literature(id=102, title="Someone else", authors=[])
+        hidden.projects.append(foreign)
+        task = Task(id=5, project_id=10, task_type="literature_processing", title="处理", status="running")
+        session.add_all([owner, other, project, foreign, shared, direct, hidden, task])
+        session.add(LiteratureSegment(literature_id=100, segment_type="general", content="c"))
+        session.add(TaskProgress(task_id=5, step_name="处理文献 1/2", progress_percentage=50))
+        await session.commit()
+
+    async with session_factory() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_list_literature_only_returns_owned():
+    async with _seeded_session() as db:
+        page = await list_literature(page=1, page_size=20, size=None, query=None, project_id=None,
+                                     current_user=SimpleNamespace(id=1), db=db)
+
+    assert [item.id for item in page.items] == [100, 101]
+    assert page.total == 2
+
+
+@pytest.mark.asyncio
+async def test_get_literature_checks_access():
+    async with _seeded_session() as db:
+        assert (await get_literature(100, current_user=SimpleNamespace(id=1), db=db)).title == "Graphene anodes"
+        with pytest.raises(HTTPException) as exc:
+            await get_literature(102, current_user=SimpleNamespace(id=1), db=db)
+    assert exc.value.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_project_statistics_and_task_detail():
+    async with _seeded_session() as db:
+        stats = await get_project_literature_statistics(10, current_user=SimpleNamespace(id=1), db=db)
+        detail = await get_task_detail(5, db=db, current_user=SimpleNamespace(id=1))
+        with pytest.raises(HTTPException):
+            await get_task_detail(5, db=db, current_user=SimpleNamespace(id=2))
+
+    assert stats["total_literature"] == 2
+    assert stats["processed_literature"] == 1
+    assert stats["total_segments"] == 1
+    assert [log.step_name for log in detail.progress_logs] == ["处理文献 1/2"]
@@ -0,0 +1,123 @@
+"""
+认证路径缓存单元测试
+"""
+
+import os
+
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app.core import security
+from app.core.auth_cache import LastLoginRecorder, PrincipalCache, TokenMemo
+from app.core.database import Base
+from app.models.user import User
+
+
+@pytest.fixture
+def auth_env(monkeypatch):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add(User(id=1, email="alice@example.com", username="alice", hashed_password="x"))
+        db.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    cache = PrincipalCache(use_redis=False)
+    recorder = LastLoginRecorder(session_factory=factory, interval=60, flush_delay=60)
+    monkeypatch.setattr(security, "token_memo", TokenMemo())
+    monkeypatch.setattr(security, "principal_cache", cache)
+    monkeypatch.setattr("app.core.auth_cache.principal_cache", cache)
+    monkeypatch.setattr(security, "last_login_recorder", recorder)
+    yield factory, statements, cache, recorder
+    engine.dispose()
+
+
+def _credentials(subject):
+    token = security.create_access_token({"sub": subject})
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def test_verify_token_is_memoized(monkeypatch):
+    monkeypatch.setattr(security, "token_memo", TokenMemo())
+    token = security.create_access_token({"sub": "1"})
+    calls = []
+    original = security.jwt.decode
+    monkeypatch.setattr(security.jwt, "decode", lambda *args, **kwargs: calls.append(1) or original(*args, **kwargs))
+
+    assert security.verify_token(token)["sub"] == "1"
+    assert security.verify_token(token)["sub"] == "1"
+    assert len(calls) == 1
+    assert security.verify_token(token + "x") is None
+
+
+@pytest.mark.asyncio
+async def test_cached_principal_needs_no_queries_or_writes(auth_env):
+    factory, statements, cache, recorder = auth_env
+    credentials = _credentials("1")
+
+    with factory() as db:
+        user = await security.get_current_user(credentials, db)
+        assert user.email == "alice@example.com"
+    statements.clear()
+
+    for _ in range(3):
+        with factory() as db:
+            user = await security.get_current_user(credentials, db)
+            assert user.username == "alice"
+    assert statements == []
+    assert cache.stats["local_hits"] == 3
+
+    # 多次请求只记录一次最后登录时间，由一条 UPDATE 批量写入
+    assert recorder.stats == {"touches": 4, "recorded": 1, "flushes": 0, "errors": 0}
+    await recorder.flush()
+    assert len([sql for sql in statements if sql.startswith("UPDATE")]) == 1
+    with factory() as db:
+        assert db.get(User, 1).last_login is not None
+
+
+@pytest.mark.asyncio
+async def test_cached_user_is_writable_and_invalidated_on_commit(auth_env):
+    factory, _, cache, _ = auth_env
+    credentials = _credentials("alice@example.com")
+
+    with factory() as db:
+        await security.get_current_user(credentials, db)
+    with factory() as db:
+        user = await security.get_current_user(credentials, db)
+        user.full_name = "Alice"
+        user.is_active = False
+        db.commit()
+
+    assert await cache.get("alice@example.com") is None
+    with factory() as db:
+        assert db.get(User, 1).full_name == "Alice"
+        user = await security.get_current_user(credentials, db)
+        with pytest.raises(security.AuthenticationError):
+            await security.get_current_active_user(user)
+
+
+@pytest.mark.asyncio
+async def test_cached_snapshot_excludes_password_hash(auth_env):
+    factory, statements, cache, _ = auth_env
+    credentials = _credentials("1")
+
+    with factory() as db:
+        await security.get_current_user(credentials, db)
+    cached = await cache.get("1")
+    assert "hashed_password" not in cached
+    assert cached["email"] == "alice@example.com"
+
+    # 还原的用户访问未缓存的列时从数据库按需加载
+    with factory() as db:
+        user = await security.get_current_user(credentials, db)
+        statements.clear()
+        assert user.hashed_password == "x"
+    assert len([sql for sql in statements if sql.startswith("SELECT")]) == 1
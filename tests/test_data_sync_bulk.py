@@ -0,0 +1,110 @@
+"""
+批量重建索引流水线单元测试
+"""
+
+import asyncio
+import os
+from unittest.mock import AsyncMock
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app.services.data_sync_service import DataSyncService
+
+
+def _chunks(count, size=2):
+    for index in range(count):
+        first = index * size + 1
+        yield {
+            "last_id": first + size - 1,
+            "documents": [{"segment_id": first + offset, "content": "text"} for offset in range(size)],
+        }
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr("app.services.data_sync_service.settings.es_bulk_concurrency", 3)
+    monkeypatch.setattr("app.services.data_sync_service.settings.es_bulk_max_retries", 2)
+    monkeypatch.setattr("app.services.data_sync_service.asyncio.sleep", AsyncMock())
+    return DataSyncService()
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_only_advances_over_contiguous_chunks(service):
+    checkpoints = []
+
+    async def index_chunk(documents):
+        # 第一个批次最慢，后面的批次先完成
+        if documents[0]["segment_id"] == 1:
+            await asyncio.sleep(0)
+        return []
+
+    async def on_checkpoint(last_id):
+        checkpoints.append(last_id)
+
+    result = await service._run_bulk_pipeline(
+        "segments", _chunks(4), index_chunk, on_checkpoint=on_checkpoint
+    )
+
+    assert result == {"indexed": 8, "failed": 0}
+    assert checkpoints == sorted(checkpoints)
+    assert checkpoints[-1] == 8
+
+
+@pytest.mark.asyncio
+async def test_failed_documents_are_retried_then_block_checkpoint(service):
+    checkpoints = []
+    attempts = []
+
+    async def index_chunk(documents):
+        attempts.append([doc["segment_id"] for doc in documents])
+        if any(doc["segment_id"] == 3 for doc in documents):
+            return ["3"]
+        return []
+
+    async def on_checkpoint(last_id):
+        checkpoints.append(last_id)
+
+    result = await service._run_bulk_pipeline(
+        "segments", _chunks(3), index_chunk, on_checkpoint=on_checkpoint
+    )
+
+    assert result == {"indexed": 4, "failed": 2}
+    # 失败批次只重试失败的文档
+    assert [3] in attempts
+    assert max(checkpoints) == 2
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_round_trips_through_async_redis(service, monkeypatch):
+    store = {}
+
+    class FakeRedis:
+        async def hset(self, key, field, value):
+            store.setdefault(key, {})[field.encode()] = str(value).encode()
+
+        async def hgetall(self, key):
+            return dict(store.get(key, {}))
+
+        async def delete(self, key):
+            store.pop(key, None)
+
+    monkeypatch.setattr(
+        "app.services.data_sync_service.redis_manager.get_client", AsyncMock(return_value=FakeRedis())
+    )
+
+    await service._save_checkpoint(7, "segments", 42)
+    assert await service._load_checkpoint(7) == {"segments": "42"}
+    await service._clear_checkpoint(7)
+    assert await service._load_checkpoint(7) == {}
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_is_skipped_without_redis(service, monkeypatch):
+    monkeypatch.setattr(
+        "app.services.data_sync_service.redis_manager.get_client", AsyncMock(return_value=None)
+    )
+
+    await service._save_checkpoint(7, "segments", 42)
+    assert await service._load_checkpoint(7) == {}
@@ -0,0 +1,113 @@
+"""
+嵌入向量缓存单元测试
+"""
+
+import os
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app.services import ai_service as ai_service_module
+from app.services.embedding_cache import EmbeddingCache, embedding_key
+
+
+def _make_cache(tmp_path, **kwargs):
+    cache = EmbeddingCache(memory_size=kwargs.pop("memory_size", 100), cache_dir=str(tmp_path), enabled=True)
+    # 单元测试中不连接Redis
+    cache._redis_client = AsyncMock(return_value=None)
+    return cache
+
+
+def _embedding_response(vectors):
+    return SimpleNamespace(
+        data=[SimpleNamespace(embedding=vector) for vector in vectors],
+        usage=SimpleNamespace(prompt_tokens=3, completion_tokens=0, total_tokens=3),
+    )
+
+
+def test_embedding_key_covers_exact_embedded_text():
+    # 空白不同的文本会得到不同的向量，不能共用缓存
+    assert embedding_key("m", "hello   world") != embedding_key("m", "hello world")
+    assert embedding_key("m", "hello world") == embedding_key("m", "hello world")
+    assert embedding_key("m", "hello") != embedding_key("other", "hello")
+
+
+@pytest.mark.asyncio
+async def test_memory_and_disk_tiers(tmp_path):
+    cache = _make_cache(tmp_path)
+    await cache.set_many("model-a", ["alpha", "beta"], [[1.0, 2.0, 3.0], [0.5, 0.25, 0.125]])
+
+    assert await cache.get("model-a", "alpha") == [1.0, 2.0, 3.0]
+    assert cache.stats["memory_hits"] == 1
+
+    # 新实例只能从磁盘读取
+    fresh = _make_cache(tmp_path)
+    result = await fresh.get_many("model-a", ["beta", "gamma"])
+    assert result == [[0.5, 0.25, 0.125], None]
+    assert fresh.stats["disk_hits"] == 1
+    assert fresh.stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_zero_vectors_are_not_cached(tmp_path):
+    cache = _make_cache(tmp_path)
+    await cache.set("model-a", "failed", [0.0, 0.0])
+    assert await cache.get("model-a", "failed") is None
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction(tmp_path):
+    cache = _make_cache(tmp_path, memory_size=1)
+    await cache.set_many("m", ["a", "b"], [[1.0], [2.0]])
+    assert len(cache._memory) == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_only_requests_missing_texts(tmp_path):
+    cache = _make_cache(tmp_path)
+    await cache.set("text-embedding-ada-002", "cached", [0.1, 0.2])
+
+    with patch.object(ai_service_module, "embedding_cache", cache):
+        service = ai_service_module.AIService()
+        service.client = SimpleNamespace(embeddings=SimpleNamespace(
+            create=AsyncMock(return_value=_embedding_response([[0.3, 0.4]]))
+        ))
+
+        result = await service.get_embeddings_batch(
+            ["cached", "", "fresh", "fresh"], model="text-embedding-ada-002"
+        )
+
+        service.client.embeddings.create.assert_awaited_once()
+        assert service.client.embeddings.create.await_args.kwargs["input"] == ["fresh"]
+        assert len(result) == 4
+        assert result[0] == pytest.approx([0.1, 0.2])
+        assert result[1] == [0.0] * 1536
+        assert result[2] == result[3] == [0.3, 0.4]
+
+        # 第二次调用全部命中缓存
+        await service.get_embedding("fresh", model="text-embedding-ada-002")
+        service.client.embeddings.create.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_hits_and_misses_count_unique_texts(tmp_path):
+    cache = _make_cache(tmp_path)
+    await cache.set("text-embedding-ada-002", "cached", [0.1, 0.2])
+
+    with patch.object(ai_service_module, "embedding_cache", cache), \
+            patch.object(ai_service_module, "task_cost_tracker") as tracker:
+        service = ai_service_module.AIService()
+        service.client = SimpleNamespace(embeddings=SimpleNamespace(
+            create=AsyncMock(return_value=_embedding_response([[0.3, 0.4]]))
+        ))
+
+        await service.get_embeddings_batch(
+            ["cached", "cached", "fresh", "fresh"], model="text-embedding-ada-002"
+        )
+
+    tracker.record_cache_usage.assert_called_once_with("embedding", hits=1, misses=1)
+    assert cache.stats["memory_hits"] == 1
+    assert cache.stats["misses"] == 1
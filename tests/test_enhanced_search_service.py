@@ -0,0 +1,120 @@
+"""
+增强搜索服务单元测试：混合检索并发、结果融合与kNN检索
+"""
+
+import asyncio
+import os
+from unittest.mock import AsyncMock
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app.services.enhanced_search_service import EnhancedSearchService
+
+
+def _results(*pairs):
+    return {"results": [{"segment_id": segment_id, "score": score} for segment_id, score in pairs]}
+
+
+def test_rrf_is_insensitive_to_score_scale():
+    service = EnhancedSearchService()
+    semantic = _results((1, 1.9), (2, 1.8), (3, 1.1))
+    # BM25分数量纲远大于余弦分数，加权融合时会压倒语义结果
+    keyword = _results((3, 40.0), (2, 12.0))
+
+    weighted = service.merge_and_rerank(semantic, keyword, top_k=3, fusion="weighted")
+    rrf = service.merge_and_rerank(_results((1, 1.9), (2, 1.8), (3, 1.1)), _results((3, 40.0), (2, 12.0)), top_k=3, fusion="rrf")
+
+    assert weighted["results"][0]["segment_id"] == 3
+    assert [hit["segment_id"] for hit in rrf["results"]] == [2, 3, 1]
+    assert rrf["fusion"] == "rrf"
+    # 原始分数保留，供下游阈值过滤使用
+    assert rrf["results"][0]["semantic_score"] == 1.8
+    assert rrf["results"][0]["keyword_score"] == 12.0
+
+
+def test_normalized_fusion_scores_are_bounded():
+    service = EnhancedSearchService()
+    merged = service.merge_and_rerank(
+        _results((1, 1.9), (2, 1.2)), _results((2, 30.0), (3, 3.0)), top_k=5, fusion="normalized"
+    )
+    assert all(0.0 <= hit["hybrid_score"] <= 1.0 for hit in merged["results"])
+
+
+@pytest.mark.asyncio
+async def test_hybrid_legs_run_concurrently():
+    service = EnhancedSearchService()
+    running = set()
+    overlap = []
+
+    async def leg(name, payload):
+        running.add(name)
+        await asyncio.sleep(0.01)
+        overlap.append(set(running))
+        running.discard(name)
+        return payload
+
+    service.semantic_search = lambda *args, **kwargs: leg("semantic", _results((1, 1.5)))
+    service.keyword_search = lambda *args, **kwargs: leg("keyword", _results((2, 5.0)))
+
+    result = await service.hybrid_search("query", project_id=1, top_k=2)
+
+    assert {"semantic", "keyword"} in overlap
+    assert {hit["segment_id"] for hit in result["results"]} == {1, 2}
+
+
+@pytest.mark.asyncio
+async def test_hybrid_degrades_when_one_leg_fails():
+    service = EnhancedSearchService()
+
+    async def failing(*args, **kwargs):
+        raise RuntimeError("es down")
+
+    async def keyword(*args, **kwargs):
+        return _results((7, 2.0))
+
+    service.semantic_search = failing
+    service.keyword_search = keyword
+
+    result = await service.hybrid_search("query", top_k=3)
+    assert [hit["segment_id"] for hit in result["results"]] == [7]
+
+
+def _es_response(*pairs):
+    return {"hits": {"total": {"value": len(pairs)}, "hits": [
+        {"_score": score, "_source": {"segment_id": segment_id}} for segment_id, score in pairs
+    ]}}
+
+
+@pytest.mark.asyncio
+async def test_semantic_search_uses_knn_with_prefilter(monkeypatch):
+    monkeypatch.setattr("app.services.enhanced_search_service.settings.semantic_search_mode", "knn")
+    service = EnhancedSearchService()
+    service.ai_service.get_embedding = AsyncMock(return_value=[0.1, 0.2])
+    service.es_client = AsyncMock()
+    service.es_client.search = AsyncMock(return_value=_es_response((5, 0.9)))
+
+    result = await service.semantic_search("query", project_id=3, top_k=4)
+
+    body = service.es_client.search.await_args.kwargs["query"]
+    assert body["knn"]["k"] == 4
+    assert body["knn"]["num_candidates"] >= 40
+    assert body["knn"]["filter"] == [{"term": {"project_ids": 3}}]
+    # kNN得分换算为 cos + 1 的量纲
+    assert result["results"][0]["score"] == pytest.approx(1.8)
+
+
+@pytest.mark.asyncio
+async def test_semantic_search_falls_back_to_script_score(monkeypatch):
+    monkeypatch.setattr("app.services.enhanced_search_service.settings.semantic_search_mode", "knn")
+    service = EnhancedSearchService()
+    service.ai_service.get_embedding = AsyncMock(return_value=[0.1, 0.2])
+    service.es_client = AsyncMock()
+    service.es_client.search = AsyncMock(side_effect=[RuntimeError("not indexed"), _es_response((5, 1.7))])
+
+    result = await service.semantic_search("query", top_k=2)
+
+    fallback_body = service.es_client.search.await_args.kwargs["query"]
+    assert "script_score" in fallback_body["query"]
+    assert result["results"][0]["score"] == 1.7
@@ -0,0 +1,90 @@
+"""
+搜索建库批量去重测试
+"""
+
+import os
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app.core.database import Base
+from app.models.literature import Literature
+from app.services.literature_dedup import TitleMinHashIndex, deduplicate_candidates, title_shingles
+from app.utils.literature_identity import normalize_doi, normalize_title, title_hash
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_identity_normalization():
+    assert normalize_doi("https://doi.org/10.1000/ABC") == "10.1000/abc"
+    assert normalize_title("  Graphene-Based  Anodes: A Review!") == "graphene based anodes a review"
+    assert title_hash("ＧＲＡＰＨＥＮＥ anodes") == title_hash("graphene, anodes.")
+    assert title_hash("   ") is None
+
+
+def test_title_hash_is_maintained_by_orm(db):
+    paper = Literature(title="Silicon Anodes", authors=[])
+    db.add(paper)
+    db.commit()
+    assert paper.title_hash == title_hash("silicon anodes")
+
+    paper.title = "Silicon anodes, revisited"
+    db.commit()
+    assert paper.title_hash == title_hash("silicon anodes revisited")
+
+
+def test_deduplicates_with_one_batched_lookup(db):
+    db.add_all([
+        Literature(title="Existing Paper", authors=[], doi="10.1/Existing"),
+        Literature(title="Known Title: Variant", authors=[]),
+    ])
+    db.commit()
+
+    statements = []
+    event.listen(db.bind, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    result = deduplicate_candidates(db, [
+        ("https://doi.org/10.1/Existing", "A completely new title"),
+        (None, "known title variant"),
+        ("10.1/new", "Fresh result on perovskite solar cells"),
+        ("https://doi.org/10.1/NEW", "Different title same doi"),
+        (None, "FRESH RESULT ON PEROVSKITE SOLAR CELLS!"),
+        (None, "Fresh results on perovskite solar cells"),
+        (None, "Unrelated study of lithium metal anodes"),
+    ])
+
+    assert len(statements) == 2
+    assert result.existing == [0, 1]
+    assert result.batch_duplicates == [3, 4]
+    assert result.near_duplicates == [5]
+    assert result.unique == [2, 6]
+
+    exact_only = deduplicate_candidates(db, [(None, "Fresh result"), (None, "Fresh results")], near_duplicate=False)
+    assert exact_only.unique == [0, 1]
+
+
+def test_minhash_index_matches_cjk_variants():
+    titles = [normalize_title(title) for title in [
+        "锂离子电池硅基负极材料的界面稳定性研究",
+        "锂离子电池硅基负极材料界面稳定性的研究",
+        "钙钛矿太阳能电池的缺陷钝化",
+        "ab",
+    ]]
+    index = TitleMinHashIndex(threshold=0.6)
+    shingles = title_shingles(titles)
+    keys = index.band_keys(index.signatures(shingles))
+    index.add(shingles[0], keys[0])
+    assert index.find(shingles[1], keys[1]) == 0
+    assert index.find(shingles[2], keys[2]) is None
+    assert shingles[3].size == 0 and index.find(shingles[3], keys[3]) is None
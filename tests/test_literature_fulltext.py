@@ -0,0 +1,117 @@
+"""
+文献库全文检索测试（SQLite FTS5 + MySQL 语句编译）
+"""
+
+import os
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event, update
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app.api.literature import list_literature
+from app.core.database import Base
+from app.models.literature import Literature
+from app.models.project import Project
+from app.models.user import User
+from app.services.literature_fulltext import LiteratureFulltextSearch, ensure_sqlite_fulltext, fulltext_filter
+
+
+@asynccontextmanager
+async def _library(statements):
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.run_sync(ensure_sqlite_fulltext)
+
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        session.add(User(id=1, email="a@example.com", username="a", hashed_password="x"))
+        session.add(Project(id=10, name="mine", owner_id=1))
+        session.add_all([
+            Literature(id=1, title="锂离子电池负极材料", abstract="石墨烯复合负极", authors=[], project_id=10, quality_score=9),
+            Literature(id=2, title="Graphene anodes for batteries", abstract="graphene graphene graphene", authors=[], project_id=10, quality_score=1),
+            Literature(id=3, title="Solid electrolytes", abstract="A review mentioning graphene once", authors=[], project_id=10, quality_score=5),
+            Literature(id=4, title="Perovskite solar cells", abstract=None, authors=[], project_id=10, quality_score=7),
+        ])
+        await session.commit()
+
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    async with session_factory() as session:
+        yield session
+    await engine.dispose()
+
+
+async def _search(db, keyword, **kwargs):
+    params = dict(page=1, page_size=20, size=None, query=keyword, project_id=None,
+                  cursor=None, fields="summary", total_mode="exact")
+    params.update(kwargs)
+    return await list_literature(current_user=SimpleNamespace(id=1), db=db, **params)
+
+
+@pytest.mark.asyncio
+async def test_keyword_filter_uses_fts_with_relevance(monkeypatch):
+    monkeypatch.setattr("app.api.literature.literature_fulltext_search", LiteratureFulltextSearch())
+    statements = []
+    async with _library(statements) as db:
+        result = await _search(db, "Graphene")
+        chinese = await _search(db, "石墨烯")
+
+        # 触发器保持索引与 literature 表同步
+        await db.execute(update(Literature).where(Literature.id == 4).values(abstract="graphene electrodes"))
+        await db.commit()
+        updated = await _search(db, "graphene")
+
+    assert [item.id for item in result.items] == [2, 3]
+    assert result.total == 2
+    assert [item.id for item in chinese.items] == [1]
+    assert sorted(item.id for item in updated.items) == [2, 3, 4]
+    assert any("literature_fts MATCH" in sql for sql in statements)
+    assert not any("LIKE" in sql.upper() for sql in statements)
+
+
+@pytest.mark.asyncio
+async def test_short_keyword_falls_back_to_like(monkeypatch):
+    monkeypatch.setattr("app.api.literature.literature_fulltext_search", LiteratureFulltextSearch())
+    statements = []
+    async with _library(statements) as db:
+        result = await _search(db, "电池")
+
+    assert [item.id for item in result.items] == [1]
+    assert any("LIKE" in sql.upper() for sql in statements)
+
+
+def test_mysql_filter_compiles_to_boolean_match():
+    fulltext = fulltext_filter("mysql", "锂电池 graphene")
+    compiled = fulltext.condition.compile(dialect=mysql.dialect(), compile_kwargs={"literal_binds": True})
+
+    assert "MATCH (literature.title, literature.abstract) AGAINST" in str(compiled)
+    assert "IN BOOLEAN MODE" in str(compiled)
+    assert '+"锂电池" +"graphene"' in str(compiled)
+    assert fulltext_filter("mysql", "锂") is None
+
+
+@pytest.mark.asyncio
+async def test_keyword_search_pages_by_cursor_in_relevance_order(monkeypatch):
+    monkeypatch.setattr("app.api.literature.literature_fulltext_search", LiteratureFulltextSearch())
+    async with _library([]) as db:
+        await db.execute(update(Literature).where(Literature.id == 4).values(abstract="graphene electrodes"))
+        await db.commit()
+        expected = [item.id for item in (await _search(db, "graphene")).items]
+
+        walked, cursor = [], None
+        for _ in range(10):
+            result = await _search(db, "graphene", page_size=1, cursor=cursor)
+            walked.extend(item.id for item in result.items)
+            if not result.has_more:
+                break
+            cursor = result.next_cursor
+
+    assert sorted(expected) == [2, 3, 4]
+    assert walked == expected
+    assert result.next_cursor is None
@@ -0,0 +1,144 @@
+"""
+文献列表游标分页与字段投影测试（aiosqlite 内存库）
+"""
+
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app.api.literature import list_literature
+from app.core.database import Base
+from app.models.literature import Literature
+from app.models.project import Project
+from app.models.user import User
+
+_BASE_TIME = datetime(2024, 1, 1)
+
+
+@asynccontextmanager
+async def _library(statements=None):
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        session.add(User(id=1, email="a@example.com", username="a", hashed_password="x"))
+        session.add(Project(id=10, name="mine", owner_id=1))
+        for index in range(1, 24):
+            # 质量分与创建时间大量重复，质量分包含 NULL，覆盖游标的并列与空值分支
+            session.add(Literature(
+                id=index,
+                title=f"Paper {index}",
+                authors=[],
+                project_id=10,
+                quality_score=None if index % 5 == 0 else index % 3,
+                created_at=_BASE_TIME + timedelta(days=index % 4),
+                parsed_content="full text " * 100,
+            ))
+        await session.commit()
+
+    if statements is not None:
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    async with session_factory() as session:
+        yield session
+    await engine.dispose()
+
+
+async def _list(db, **kwargs):
+    params = dict(page=1, page_size=5, size=None, query=None, project_id=None,
+                  cursor=None, fields="summary", total_mode="exact")
+    params.update(kwargs)
+    return await list_literature(current_user=SimpleNamespace(id=1), db=db, **params)
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_match_offset_pages():
+    async with _library() as db:
+        expected = []
+        for page in range(1, 6):
+            expected.extend(item.id for item in (await _list(db, page=page)).items)
+
+        walked, cursor = [], None
+        while True:
+            result = await _list(db, cursor=cursor, total_mode="none")
+            walked.extend(item.id for item in result.items)
+            assert result.total is None
+            if not result.has_more:
+                break
+            cursor = result.next_cursor
+
+    assert len(expected) == 23
+    assert walked == expected
+
+
+@pytest.mark.asyncio
+async def test_summary_projection_skips_large_columns():
+    statements = []
+    async with _library(statements) as db:
+        summary = await _list(db)
+        page_query = statements[-1]
+        full = await _list(db, fields="full")
+
+    assert "parsed_content" not in page_query and "raw_data" not in page_query
+    assert all(item.parsed_content is None for item in summary.items)
+    assert all(item.parsed_content for item in full.items)
+
+
+@pytest.mark.asyncio
+async def test_cached_total_and_invalid_cursor():
+    statements = []
+    async with _library(statements) as db:
+        first = await _list(db, total_mode="cached", project_id=10)
+        counts_before = len([sql for sql in statements if "count(" in sql.lower()])
+        second = await _list(db, total_mode="cached", project_id=10)
+        counts_after = len([sql for sql in statements if "count(" in sql.lower()])
+
+        with pytest.raises(HTTPException) as exc:
+            await _list(db, cursor="not-a-cursor")
+
+    assert first.total == second.total == 23
+    assert counts_after == counts_before
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_cursor_advances_over_server_default_timestamps():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        session.add(User(id=1, email="a@example.com", username="a", hashed_password="x"))
+        session.add(Project(id=10, name="mine", owner_id=1))
+        # created_at 取 CURRENT_TIMESTAMP 默认值，另有一行由 ORM 写入带微秒的时间
+        session.add_all([
+            Literature(id=index, title=f"Paper {index}", authors=[], project_id=10, quality_score=1)
+            for index in range(1, 5)
+        ])
+        await session.commit()
+        session.add(Literature(id=5, title="Paper 5", authors=[], project_id=10, quality_score=1,
+                               created_at=datetime(2000, 1, 1, 0, 0, 0, 500000)))
+        await session.commit()
+
+    async with session_factory() as db:
+        walked, cursor = [], None
+        for _ in range(10):
+            result = await _list(db, page_size=2, cursor=cursor, total_mode="none")
+            walked.extend(item.id for item in result.items)
+            if not result.has_more:
+                break
+            cursor = result.next_cursor
+    await engine.dispose()
+
+    assert walked == [4, 3, 2, 1, 5]
@@ -0,0 +1,181 @@
+"""
+聊天补全缓存单元测试
+"""
+
+import os
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app.services import ai_service as ai_service_module
+from app.services.llm_cache import LLMCompletionCache, completion_key, is_json_content
+
+
+def _make_cache(tmp_path, **kwargs):
+    kwargs.setdefault("memory_size", 100)
+    return LLMCompletionCache(enabled=True, cache_dir=str(tmp_path), **kwargs)
+
+
+def _response(content, total_tokens=30):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(prompt_tokens=total_tokens - 10, completion_tokens=10, total_tokens=total_tokens),
+    )
+
+
+def _client(*contents):
+    create = AsyncMock(side_effect=[_response(content) for content in contents])
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))), create
+
+
+def _messages(text):
+    return [{"role": "user", "content": text}]
+
+
+def test_completion_key_normalizes_prompt_and_params():
+    base = completion_key("m", _messages("hello   world\n"), {"temperature": 0.1, "max_tokens": 10})
+    assert base == completion_key("m", _messages("hello world"), {"max_tokens": 10, "temperature": 0.1, "timeout": 5})
+    assert base != completion_key("m", _messages("hello world"), {"temperature": 0.2, "max_tokens": 10})
+    assert base != completion_key("other", _messages("hello world"), {"temperature": 0.1, "max_tokens": 10})
+
+
+@pytest.mark.asyncio
+async def test_hit_skips_api_and_reports_saved_tokens(tmp_path):
+    cache = _make_cache(tmp_path)
+    client, create = _client("answer")
+
+    with patch("app.services.llm_cache.task_cost_tracker") as tracker:
+        first = await cache.create(client, model="m", messages=_messages("q"), temperature=0.1, max_tokens=50)
+        second = await cache.create(client, model="m", messages=_messages("q "), temperature=0.1, max_tokens=50)
+
+    assert create.await_count == 1
+    assert first.choices[0].message.content == "answer"
+    assert second.cached is True and second.usage is None
+    assert second.choices[0].message.content == "answer"
+    assert second.saved_usage.total_tokens == 30
+    tracker.record_cache_usage.assert_any_call("llm_completion", hits=0, misses=1)
+    tracker.record_cache_usage.assert_any_call("llm_completion", hits=1, misses=0, saved_tokens=30)
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["saved_tokens"] == 30
+
+    # 新实例从磁盘命中
+    fresh = _make_cache(tmp_path)
+    client2, create2 = _client()
+    hit = await fresh.create(client2, model="m", messages=_messages("q"), temperature=0.1, max_tokens=50)
+    assert hit.choices[0].message.content == "answer"
+    assert fresh.stats["disk_hits"] == 1
+    create2.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_temperature_gate_and_per_call_opt_out(tmp_path):
+    cache = _make_cache(tmp_path, max_temperature=0.2)
+    client, create = _client("a", "b", "c", "d", "e")
+
+    await cache.create(client, model="m", messages=_messages("q"), temperature=0.7)
+    await cache.create(client, model="m", messages=_messages("q"), temperature=0.7)
+    assert create.await_count == 2
+    assert cache.stats["bypassed"] == 2
+
+    await cache.create(client, model="m", messages=_messages("q"), temperature=0.1, cache=False)
+    await cache.create(client, model="m", messages=_messages("q"), temperature=0.7, cache=True)
+    forced = await cache.create(client, model="m", messages=_messages("q"), temperature=0.7, cache=True)
+    assert create.await_count == 4
+    assert forced.choices[0].message.content == "d"
+
+
+@pytest.mark.asyncio
+async def test_validator_and_empty_content_are_not_cached(tmp_path):
+    cache = _make_cache(tmp_path)
+    client, create = _client("not json", "", '{"ok": true}', "unused")
+
+    for _ in range(3):
+        await cache.create(
+            client, model="m", messages=_messages("q"), temperature=0.1, validate=is_json_content
+        )
+    hit = await cache.create(client, model="m", messages=_messages("q"), temperature=0.1, validate=is_json_content)
+
+    assert create.await_count == 3
+    assert hit.choices[0].message.content == '{"ok": true}'
+    assert cache.stats["stores"] == 1
+
+
+@pytest.mark.asyncio
+async def test_ttl_expiry(tmp_path):
+    cache = _make_cache(tmp_path, ttl=60)
+    client, create = _client("old", "new")
+    await cache.create(client, model="m", messages=_messages("q"), temperature=0.1)
+
+    with patch("app.services.llm_cache.time.time", return_value=time.time() + 120):
+        cache.clear_memory()
+        response = await cache.create(client, model="m", messages=_messages("q"), temperature=0.1)
+
+    assert create.await_count == 2
+    assert response.choices[0].message.content == "new"
+
+
+@pytest.mark.asyncio
+async def test_disk_store_is_size_bounded(tmp_path):
+    cache = _make_cache(tmp_path, max_bytes=2000, memory_size=0)
+    contents = [f"{index}" * 400 for index in range(10)]
+    client, _ = _client(*contents)
+    for index in range(10):
+        await cache.create(client, model="m", messages=_messages(f"q{index}"), temperature=0.1)
+    # 淘汰按写入批次检查，最后再触发一次
+    cache._disk._writes = 0
+    await cache.store("k", "m", "x", None)
+
+    stats = cache.get_stats()
+    assert stats["disk_bytes"] <= 2000
+    assert stats["disk_entries"] < 11
+    # 最近写入的条目保留
+    assert await cache.lookup("k") is not None
+
+
+@pytest.mark.asyncio
+async def test_generate_completion_reports_cached_result(tmp_path):
+    cache = _make_cache(tmp_path)
+    client, create = _client('{"a": 1}')
+    service = ai_service_module.AIService.__new__(ai_service_module.AIService)
+    service.client = client
+
+    with patch.object(ai_service_module, "llm_cache", cache), \
+            patch.object(ai_service_module, "task_cost_tracker") as tracker, \
+            patch("app.services.llm_cache.task_cost_tracker"):
+        first = await service.generate_completion("prompt", model="m", temperature=0.1)
+        second = await service.generate_completion("prompt", model="m", temperature=0.1)
+
+    assert create.await_count == 1
+    assert first["cached"] is False and first["usage"]["total_tokens"] == 30
+    assert second["cached"] is True and second["usage"]["total_tokens"] == 0
+    assert second["content"] == '{"a": 1}'
+    # 只有真实调用计入 token 消耗
+    assert tracker.record_usage.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_research_requests_cache_only_valid_json(tmp_path):
+    from app.services import research_ai_service as research_module
+
+    cache = _make_cache(tmp_path)
+    client, create = _client("not json", '{"a": 1}', '{"b": 2}')
+    service = research_module.ResearchAIService()
+    service.client = client
+
+    with patch.object(research_module, "llm_cache", cache), \
+            patch("app.services.llm_cache.task_cost_tracker"):
+        for _ in range(3):
+            content = await service._make_request(
+                "m", _messages("evaluate"), validate=is_json_content, temperature=0.1
+            )
+
+    # 非 JSON 回复不入缓存，第二次得到的合法 JSON 被第三次复用
+    assert create.await_count == 2
+    assert content == '{"a": 1}'
@@ -0,0 +1,301 @@
+"""
+大模型调用全局并发控制单元测试
+"""
+
+import asyncio
+import os
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app.services import llm_concurrency
+from app.services.llm_concurrency import (
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    LLMConcurrencyController,
+    governed_client,
+    llm_priority,
+)
+
+
+def _controller(**kwargs):
+    kwargs.setdefault("requests_per_minute", 1000)
+    kwargs.setdefault("tokens_per_minute", 1_000_000)
+    kwargs.setdefault("initial_limit", 4)
+    kwargs.setdefault("min_limit", 1)
+    kwargs.setdefault("max_limit", 16)
+    kwargs.setdefault("latency_target", 5.0)
+    return LLMConcurrencyController("test", enabled=True, use_redis=False, **kwargs)
+
+
+class _RateLimited(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after=None):
+        super().__init__("rate limited")
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.response = SimpleNamespace(headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_served_by_priority():
+    controller = _controller(initial_limit=1)
+    order = []
+    release = asyncio.Event()
+
+    async def holder():
+        async with controller.slot():
+            await release.wait()
+
+    async def caller(name, priority):
+        async with controller.slot(priority=priority):
+            order.append(name)
+
+    held = asyncio.create_task(holder())
+    await asyncio.sleep(0)
+    batch = asyncio.create_task(caller("batch", PRIORITY_BATCH))
+    await asyncio.sleep(0)
+    with llm_priority(PRIORITY_INTERACTIVE):
+        interactive = asyncio.create_task(caller("interactive", None))
+    await asyncio.sleep(0)
+
+    assert controller.get_stats()["waiting"] == {"interactive": 1, "normal": 0, "batch": 1}
+    release.set()
+    await asyncio.gather(held, batch, interactive)
+
+    assert order == ["interactive", "batch"]
+    assert controller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_slot():
+    controller = _controller(initial_limit=1)
+    release = asyncio.Event()
+
+    async def holder():
+        async with controller.slot():
+            await release.wait()
+
+    held = asyncio.create_task(holder())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(holder())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    release.set()
+    await held
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert controller.in_flight == 0
+    async with controller.slot():
+        assert controller.in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_aimd_adjusts_limit_from_latency_and_rate_limits():
+    controller = _controller(initial_limit=4, latency_target=5.0)
+
+    async with controller.slot():
+        pass
+    assert controller.limit == pytest.approx(4.25)
+
+    controller._last_decrease = float("-inf")
+    controller._on_complete(10.0)
+    assert controller.limit == pytest.approx(4.25 * 0.9)
+
+    limit_before = controller.limit
+    controller._last_decrease = float("-inf")
+    with pytest.raises(_RateLimited):
+        async with controller.slot():
+            raise _RateLimited(retry_after=3)
+    assert controller.limit == pytest.approx(limit_before * 0.5)
+    assert controller.stats["rate_limited"] == 1
+    assert controller.get_stats()["cooling_down"] is True
+
+    # 冷却期内的预占请求需要等待
+    wait, _, _ = await controller._reserve(10, PRIORITY_INTERACTIVE)
+    assert 0 < wait <= 3
+
+    # 同一批拥塞信号只下调一次
+    await controller._on_rate_limited(_RateLimited())
+    assert controller.limit == pytest.approx(limit_before * 0.5)
+    assert controller.stats["rate_limited"] == 2
+
+
+@pytest.mark.asyncio
+async def test_local_budget_reserves_headroom_for_interactive_calls():
+    controller = _controller(requests_per_minute=10, tokens_per_minute=1000)
+
+    with patch("app.services.llm_concurrency.time.time", return_value=60 * 1000 + 1.0):
+        for _ in range(8):
+            wait, _, _ = await controller._reserve(10, PRIORITY_BATCH)
+            assert wait == 0
+        wait, _, _ = await controller._reserve(10, PRIORITY_BATCH)
+        assert wait == pytest.approx(59.0)
+        # 交互请求仍可使用剩余 20% 的预算
+        wait, _, _ = await controller._reserve(10, PRIORITY_INTERACTIVE)
+        assert wait == 0
+        wait, _, _ = await controller._reserve(2000, PRIORITY_INTERACTIVE)
+        assert wait > 0
+
+
+@pytest.mark.asyncio
+async def test_batch_calls_waiting_for_budget_do_not_hold_slots():
+    controller = _controller(requests_per_minute=5, initial_limit=2)
+    calls = []
+
+    async def call(name, priority):
+        async with controller.slot(10, priority=priority):
+            calls.append(name)
+
+    with patch("app.services.llm_concurrency.time.time", return_value=60 * 1000 + 1.0):
+        # 批处理用完 80% 的份额
+        for index in range(4):
+            await call(f"batch-{index}", PRIORITY_BATCH)
+        # 后续批处理调用等待下一分钟的预算
+        waiting = [asyncio.create_task(call(f"late-{index}", PRIORITY_BATCH)) for index in range(3)]
+        await asyncio.sleep(0.01)
+        assert controller.in_flight == 0
+
+        # 交互请求使用剩余份额，立即完成
+        await asyncio.wait_for(call("interactive", PRIORITY_INTERACTIVE), timeout=1.0)
+
+    for task in waiting:
+        task.cancel()
+    await asyncio.gather(*waiting, return_exceptions=True)
+    assert calls[-1] == "interactive"
+    assert controller.in_flight == 0
+
+
+def test_waiter_on_another_thread_loop_is_woken_on_release():
+    controller = _controller(initial_limit=1)
+    held = threading.Event()
+    durations = {}
+
+    def holder():
+        async def run():
+            async with controller.slot():
+                held.set()
+                await asyncio.sleep(0.1)
+        asyncio.run(run())
+
+    def waiter():
+        async def run():
+            started = time.monotonic()
+            async with controller.slot():
+                durations["waiter"] = time.monotonic() - started
+        held.wait()
+        asyncio.run(asyncio.wait_for(run(), timeout=5.0))
+
+    threads = [threading.Thread(target=holder), threading.Thread(target=waiter)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    # 释放槽位的线程必须唤醒另一个事件循环中的等待者，而不是等它超时
+    assert durations["waiter"] < 1.0
+    assert controller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_redis_budget_reservation_and_settlement():
+    controller = _controller()
+    controller.use_redis = True
+    redis_client = AsyncMock()
+    redis_client.eval.return_value = 0
+
+    with patch.object(llm_concurrency.redis_manager, "get_client", AsyncMock(return_value=redis_client)):
+        async with controller.slot(estimated_tokens=100) as ticket:
+            ticket.record_usage(SimpleNamespace(usage=SimpleNamespace(total_tokens=60)))
+
+    args = redis_client.eval.await_args.args
+    assert args[1] == 2
+    assert args[2].startswith("vibesearch:llm:budget:test:")
+    assert args[4:7] == (100, 1000, 1_000_000)
+    redis_client.hincrby.assert_awaited_once_with(args[2], "tokens", -40)
+
+
+@pytest.mark.asyncio
+async def test_governed_client_routes_calls_through_limiters():
+    create = AsyncMock(return_value=SimpleNamespace(usage=SimpleNamespace(total_tokens=7)))
+    embed = AsyncMock(return_value=SimpleNamespace(usage=None, data=[]))
+    raw = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create)),
+        embeddings=SimpleNamespace(create=embed),
+        api_key="k",
+    )
+    chat_limiter = _controller()
+    embedding_limiter = _controller()
+
+    with patch.object(llm_concurrency, "chat_limiter", chat_limiter), \
+            patch.object(llm_concurrency, "embedding_limiter", embedding_limiter):
+        client = governed_client(raw)
+        await client.chat.completions.create(model="m", messages=[{"role": "user", "content": "x" * 30}], max_tokens=5)
+        await client.embeddings.create(model="e", input=["abc"])
+
+    assert client.api_key == "k"
+    assert create.await_args.kwargs["max_tokens"] == 5
+    assert chat_limiter.stats["acquired"] == 1
+    assert embedding_limiter.stats["acquired"] == 1
+    assert chat_limiter._local_window[2] == 7
+
+
+class _FakeStream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_streamed_completion_holds_slot_until_consumed():
+    chunks = [
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="a"))], usage=None),
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="b"))], usage=None),
+        SimpleNamespace(choices=[], usage=SimpleNamespace(total_tokens=9)),
+    ]
+    streams = []
+
+    async def create(**kwargs):
+        streams.append(_FakeStream(chunks))
+        return streams[-1]
+
+    raw = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create)),
+        embeddings=SimpleNamespace(create=AsyncMock()),
+    )
+    limiter = _controller()
+
+    with patch.object(llm_concurrency, "chat_limiter", limiter):
+        client = governed_client(raw)
+        stream = await client.chat.completions.create(model="m", messages=[], max_tokens=5, stream=True)
+        seen = []
+        async for chunk in stream:
+            seen.append(limiter.in_flight)
+        assert seen == [1, 1, 1]
+        assert limiter.in_flight == 0
+        assert limiter._local_window[2] == 9
+        assert streams[0].closed
+
+        # 提前关闭同样释放槽位并关闭底层连接
+        early = await client.chat.completions.create(model="m", messages=[], max_tokens=5, stream=True)
+        async for _ in early:
+            break
+        assert limiter.in_flight == 1
+        await early.close()
+
+    assert limiter.in_flight == 0
+    assert streams[1].closed
+    assert limiter.stats["acquired"] == 2
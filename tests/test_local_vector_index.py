@@ -0,0 +1,148 @@
+"""
+本地向量索引单元测试
+"""
+
+import os
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app.core.database import Base
+from app.models.literature import Literature, LiteratureSegment
+from app.models.project import project_literature_association
+from app.services.local_vector_index import LocalVectorIndexService, ProjectVectorIndex
+
+
+def test_add_and_search_orders_by_cosine(tmp_path):
+    index = ProjectVectorIndex(tmp_path, model="m")
+    added = index.add([1, 2, 3], [[1.0, 0.0], [0.7, 0.7], [0.0, 1.0]])
+
+    assert added == 3
+    hits = index.search([1.0, 0.1], top_k=2)
+    assert [segment_id for segment_id, _ in hits] == [1, 2]
+    assert hits[0][1] <= 1.0
+
+
+def test_duplicates_and_zero_vectors_are_skipped(tmp_path):
+    index = ProjectVectorIndex(tmp_path, model="m")
+    index.add([1], [[1.0, 0.0]])
+
+    assert index.add([1, 2], [[0.0, 1.0], [0.0, 0.0]]) == 0
+    assert index.size == 1
+
+
+def test_index_persists_and_respects_allowed_ids(tmp_path):
+    ProjectVectorIndex(tmp_path, model="m").add([10, 20], [[1.0, 0.0], [0.9, 0.1]])
+
+    reopened = ProjectVectorIndex(tmp_path, model="m")
+    hits = reopened.search(np.array([1.0, 0.0]), top_k=5, allowed_ids=[20])
+    assert [segment_id for segment_id, _ in hits] == [20]
+
+
+def test_model_change_resets_index(tmp_path):
+    ProjectVectorIndex(tmp_path, model="old").add([1], [[1.0, 0.0]])
+
+    assert ProjectVectorIndex(tmp_path, model="new").search([1.0, 0.0]) == []
+
+
+class _FakeEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    async def get_embeddings_batch(self, texts):
+        self.calls.append(list(texts))
+        return [[1.0, float(len(text))] for text in texts]
+
+    async def get_embedding(self, text):
+        return [1.0, 5.0]
+
+
+def _segment_db():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add_all([
+            Literature(id=1, title="A", authors=[], project_id=10),
+            Literature(id=2, title="B", authors=[], project_id=20),
+        ])
+        db.execute(insert(project_literature_association), [
+            {"project_id": 10, "literature_id": 1},
+            {"project_id": 20, "literature_id": 2},
+        ])
+        db.commit()
+    return engine, factory
+
+
+@pytest.mark.asyncio
+async def test_committed_segments_mark_only_their_project_dirty(tmp_path):
+    engine, factory = _segment_db()
+    service = LocalVectorIndexService(str(tmp_path), session_factory=factory)
+    embeddings = _FakeEmbeddings()
+
+    with patch("app.services.local_vector_index.local_vector_index", service):
+        for project_id in (10, 20):
+            await service.schedule_sync(project_id, embeddings)
+        assert not service.needs_sync(10) and not service.needs_sync(20)
+
+        with factory() as db:
+            db.add(LiteratureSegment(literature_id=1, segment_type="general", content="alpha"))
+            db.commit()
+
+    assert service.needs_sync(10)
+    assert not service.needs_sync(20)
+    assert service.schedule_sync(20, embeddings) is None
+
+    # 同步在后台任务中使用独立会话完成，查询方无需等待
+    task = service.schedule_sync(10, embeddings)
+    assert service.schedule_sync(10, embeddings) is task
+    await task
+    assert embeddings.calls == [["alpha"]]
+    assert service.get_index(10).size == 1
+    assert not service.needs_sync(10)
+    engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_segments_of_unlinked_literature_drop_out_of_rag_results(tmp_path, monkeypatch):
+    from app.services import rag_service as rag_module
+
+    engine, factory = _segment_db()
+    service = LocalVectorIndexService(str(tmp_path), session_factory=factory)
+    embeddings = _FakeEmbeddings()
+    monkeypatch.setattr(rag_module.settings, "local_vector_index_enabled", True)
+    monkeypatch.setattr(rag_module, "AIService", lambda: embeddings)
+    monkeypatch.setattr(rag_module, "local_vector_index", service)
+
+    with factory() as db:
+        db.add(Literature(id=3, title="C", authors=[], project_id=10))
+        db.execute(insert(project_literature_association), [{"project_id": 10, "literature_id": 3}])
+        db.add_all([
+            LiteratureSegment(id=1, literature_id=1, segment_type="general", content="alpha"),
+            LiteratureSegment(id=2, literature_id=3, segment_type="general", content="gamma"),
+        ])
+        db.commit()
+        await service.sync_project(db, 10, embeddings, force=True)
+        assert service.get_index(10).size == 2
+
+        rag = rag_module.RAGService(db)
+        results = await rag._search_local_index("query", 10, top_k=5, similarity_threshold=0.0)
+        assert {result["id"] for result in results} == {1, 2}
+
+        # 文献移出项目后，索引中残留的段落不再出现在该项目的结果里
+        db.execute(
+            project_literature_association.delete().where(
+                project_literature_association.c.literature_id == 1
+            )
+        )
+        db.commit()
+        assert [segment_id for segment_id, _ in service.search(10, [1.0, 5.0], 5, db=db)] == [2]
+        results = await rag._search_local_index("query", 10, top_k=5, similarity_threshold=0.0)
+        assert [result["id"] for result in results] == [2]
+    engine.dispose()
@@ -0,0 +1,135 @@
+"""
+分级 PDF 提取引擎测试
+"""
+
+import os
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app.services.pdf_extraction import (
+    FAST_BASIC,
+    PREMIUM_MINERU,
+    STANDARD,
+    ExtractionBackend,
+    ExtractionResult,
+    PDFExtractionEngine,
+    PyPDFBackend,
+    probe_quality,
+)
+
+
+def _make_pdf(page_texts):
+    """生成每页一行 Helvetica 文本的最小 PDF"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in page_texts:
+        stream = f"BT /F1 10 Tf 20 700 Td ({text}) Tj ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects))
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(output)
+
+
+class FakeBackend(ExtractionBackend):
+    def __init__(self, name, tier, pages=None, error=None, available=True):
+        self.name = name
+        self.tier = tier
+        self.pages = pages
+        self.error = error
+        self._available = available
+        self.calls = 0
+
+    def available(self):
+        return self._available
+
+    async def extract(self, source):
+        self.calls += 1
+        if self.error:
+            raise RuntimeError(self.error)
+        return ExtractionResult(backend=self.name, pages=list(self.pages), page_count=len(self.pages))
+
+
+GOOD_PAGE = "Born digital paper text with a proper text layer. " * 20
+
+
+def test_probe_flags_sparse_garbled_and_partial_text():
+    assert probe_quality([GOOD_PAGE] * 4).passed
+
+    scanned = probe_quality(["", "", "", ""])
+    assert not scanned.passed and {"text_density", "page_coverage"} <= set(scanned.reasons)
+
+    broken_fonts = probe_quality(["(cid:12)(cid:40)(cid:7) " * 80 + GOOD_PAGE[:200]] * 3)
+    assert broken_fonts.reasons == ["garbled"]
+
+    # 正文只出现在一半页面（后半部分为扫描页）
+    half = probe_quality([GOOD_PAGE * 2, GOOD_PAGE * 2, "", ""])
+    assert half.reasons == ["page_coverage"]
+
+
+@pytest.mark.asyncio
+async def test_pypdf_backend_reads_text_layer():
+    pdf = _make_pdf(["Lithium anode interface study", "Second page results"])
+    result = await PyPDFBackend().extract(pdf)
+    assert result.page_count == 2
+    assert "Lithium anode interface study" in result.pages[0]
+    assert result.to_content()["total_pages"] == 2
+
+
+@pytest.mark.asyncio
+async def test_escalates_only_when_probe_fails():
+    fast = FakeBackend(FAST_BASIC, 0, pages=[GOOD_PAGE] * 3)
+    premium = FakeBackend(PREMIUM_MINERU, 2, pages=[GOOD_PAGE * 3])
+    engine = PDFExtractionEngine([fast, FakeBackend(STANDARD, 1, pages=[]), premium])
+
+    result = await engine.extract(b"%PDF")
+    assert result.backend == FAST_BASIC and premium.calls == 0
+
+    fast.pages = ["", "", ""]
+    result = await engine.extract(b"%PDF")
+    assert result.backend == PREMIUM_MINERU
+    assert [attempt["backend"] for attempt in result.attempts] == [FAST_BASIC, PREMIUM_MINERU]
+    assert result.attempts[0]["quality"]["passed"] is False
+
+    no_escalation = await engine.extract(b"%PDF", escalate=False)
+    assert no_escalation.backend == FAST_BASIC and premium.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_falls_back_when_expensive_backend_is_missing():
+    sparse = ["short text"] * 2
+    engine = PDFExtractionEngine([
+        FakeBackend(FAST_BASIC, 0, pages=sparse),
+        FakeBackend(STANDARD, 1, pages=[GOOD_PAGE] * 2),
+        FakeBackend(PREMIUM_MINERU, 2, available=False),
+    ])
+    # 自动链路中 MinerU 不可用：保留快速解析的最好结果
+    result = await engine.extract(b"%PDF")
+    assert result.backend == FAST_BASIC
+    assert result.attempts[-1] == {"backend": PREMIUM_MINERU, "skipped": "unavailable"}
+
+    # 显式要求 MinerU 但不可用时降级到标准解析
+    result = await engine.extract(b"%PDF", method=PREMIUM_MINERU)
+    assert result.backend == STANDARD
+
+    failing = PDFExtractionEngine([FakeBackend(FAST_BASIC, 0, error="broken xref")])
+    with pytest.raises(RuntimeError, match="broken xref"):
+        await failing.extract(b"%PDF")
+    with pytest.raises(ValueError):
+        failing.chain("unknown")
@@ -0,0 +1,95 @@
+"""
+PDF 解析缓存测试
+"""
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app.services import pdf_processor as pdf_processor_module
+from app.services.pdf_parse_cache import PDFParseCache, file_sha256
+from app.services.pdf_processor import PARSE_CACHE_VERSION, PDFProcessor
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = PDFParseCache(root=str(tmp_path / "cache"), enabled=True)
+    monkeypatch.setattr(pdf_processor_module, "pdf_parse_cache", cache)
+    return cache
+
+
+def _write_pdf(path: Path, payload: bytes) -> str:
+    path.write_bytes(b"%PDF-1.4\n" + payload)
+    return str(path)
+
+
+@pytest.mark.asyncio
+async def test_repeat_processing_reads_from_cache(tmp_path, cache, monkeypatch):
+    calls = []
+
+    async def fake_mineru(self, pdf_path, output_dir):
+        calls.append(pdf_path)
+        images = Path(output_dir) / "paper" / "images"
+        images.mkdir(parents=True)
+        (images / "fig1.png").write_bytes(b"png")
+        (Path(output_dir) / "paper" / "paper.md").write_text("# Title\n\nBody", encoding="utf-8")
+        return {"success": True, "metadata": {"processor": "mineru"}}
+
+    monkeypatch.setattr(PDFProcessor, "_run_mineru", fake_mineru)
+    processor = PDFProcessor()
+    first_path = _write_pdf(tmp_path / "a.pdf", b"same bytes")
+    # 内容相同、路径不同的 PDF（如上传到另一个项目）
+    second_path = _write_pdf(tmp_path / "copy.pdf", b"same bytes")
+
+    first = await processor.process_pdf(first_path)
+    second = await processor.process_pdf(second_path)
+
+    assert len(calls) == 1
+    assert first["metadata"]["cache_hit"] is False
+    assert second["metadata"]["cache_hit"] is True
+    assert second["content"]["text_content"] == first["content"]["text_content"]
+    assert second["file_info"]["sha256"] == file_sha256(first_path)
+
+    entry = cache.entry_path(file_sha256(first_path), PARSE_CACHE_VERSION)
+    assert (entry / "artifacts" / "paper" / "images" / "fig1.png").exists()
+
+    await processor.process_pdf(second_path, use_cache=False)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_empty_parses_are_not_cached(tmp_path, cache, monkeypatch):
+    async def empty_mineru(self, pdf_path, output_dir):
+        return {"success": True, "metadata": {}}
+
+    monkeypatch.setattr(PDFProcessor, "_run_mineru", empty_mineru)
+    path = _write_pdf(tmp_path / "scan.pdf", b"scanned")
+    await PDFProcessor().process_pdf(path)
+    assert cache.get(file_sha256(path), PARSE_CACHE_VERSION) is None
+
+
+def test_gc_removes_other_versions_then_least_recently_read(tmp_path):
+    cache = PDFParseCache(root=str(tmp_path), enabled=True)
+    content = {"text_content": "x" * 1000}
+    for digest in ("aa" * 32, "bb" * 32, "cc" * 32):
+        cache.put(digest, "v2", content, {})
+    cache.put("dd" * 32, "v1", content, {})
+
+    old = time.time() - 3600
+    os.utime(cache.entry_path("aa" * 32, "v2"), (old, old))
+    # 读取会刷新访问时间，使该条目在按大小淘汰时被保留
+    os.utime(cache.entry_path("bb" * 32, "v2"), (old - 10, old - 10))
+    assert cache.get("bb" * 32, "v2") is not None
+
+    entry_size = max(entry.size for entry in cache.entries())
+    preview = cache.gc(current_version="v2", max_bytes=entry_size * 2 + 100, dry_run=True)
+    assert preview["removed_entries"] == 2
+    assert cache.entry_path("dd" * 32, "v1").exists()
+
+    cache.gc(current_version="v2", max_bytes=entry_size * 2 + 100)
+    remaining = sorted(entry.digest for entry in cache.entries())
+    assert remaining == ["bb" * 32, "cc" * 32]
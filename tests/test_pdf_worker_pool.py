@@ -0,0 +1,102 @@
+"""
+PDF 解析进程池测试
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app.services.pdf_worker_pool import (
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    PDFWorkerError,
+    PDFWorkerPool,
+)
+from tests.test_pdf_extraction import GOOD_PAGE, _make_pdf
+
+
+def _sleep_and_return(seconds, value):
+    time.sleep(seconds)
+    return value
+
+
+def _worker_pid():
+    return os.getpid()
+
+
+def _hold_memory(megabytes):
+    ballast = b"x" * (megabytes * 1024 * 1024)
+    time.sleep(10)
+    return len(ballast)
+
+
+def _fail():
+    raise ValueError("corrupt xref table")
+
+
+@pytest.mark.asyncio
+async def test_priority_queue_and_recycling():
+    pool = PDFWorkerPool(processes=1, max_rss_mb=0, task_timeout=30, max_tasks_per_child=3, enabled=True)
+    finished = []
+
+    async def run(value, priority, seconds=0.0):
+        finished.append(await pool.submit(_sleep_and_return, seconds, value, priority=priority))
+
+    try:
+        first = asyncio.create_task(run("first", PRIORITY_BATCH, 0.5))
+        await asyncio.sleep(0.1)
+        await asyncio.gather(first, run("batch", PRIORITY_BATCH), run("upload", PRIORITY_INTERACTIVE))
+        assert finished == ["first", "upload", "batch"]
+
+        # 每个工作进程处理三个任务后回收；任务内部异常不影响计数
+        assert pool.get_stats()["recycled"] == 1
+        pids = [await pool.submit(_worker_pid) for _ in range(2)]
+        assert pids[0] == pids[1]
+        with pytest.raises(PDFWorkerError, match="corrupt xref table"):
+            await pool.submit(_fail)
+        assert await pool.submit(_worker_pid) != pids[1]
+        assert pool.get_stats()["recycled"] == 2
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_timeout_and_memory_limit_restart_worker():
+    pool = PDFWorkerPool(processes=1, max_rss_mb=300, task_timeout=30, max_tasks_per_child=0, enabled=True)
+    try:
+        pid = await pool.submit(_worker_pid)
+
+        with pytest.raises(PDFWorkerError, match="超时"):
+            await pool.submit(_sleep_and_return, 30, None, timeout=1)
+        restarted = await pool.submit(_worker_pid)
+        assert restarted != pid
+
+        with pytest.raises(PDFWorkerError, match="内存"):
+            await pool.submit(_hold_memory, 600)
+        assert await pool.submit(_worker_pid) != restarted
+
+        stats = pool.get_stats()
+        assert stats["timeouts"] == 1 and stats["memory_kills"] == 1
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_extract_runs_tiered_extraction_in_worker(tmp_path):
+    path = tmp_path / "paper.pdf"
+    path.write_bytes(_make_pdf([GOOD_PAGE[:90]] * 2))
+    pool = PDFWorkerPool(processes=1, enabled=True)
+    try:
+        result = await pool.extract(str(path), method="fast_basic")
+        assert result["success"] is True
+        assert result["metadata"]["extraction_backend"] == "fast_basic"
+        assert "Born digital paper" in result["content"]["text_content"]
+
+        missing = await pool.extract(str(tmp_path / "missing.pdf"))
+        assert missing["success"] is False
+    finally:
+        pool.shutdown()
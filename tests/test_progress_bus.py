@@ -0,0 +1,117 @@
+"""
+跨进程进度总线单元测试
+"""
+
+import json
+
+import pytest
+
+from app.services.progress_bus import PROGRESS_CHANNEL, ProgressBus
+from app.services.stream_progress_service import StreamProgressService
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def xadd(self, key, fields, maxlen=None, approximate=True):
+        self.commands.append(("xadd", key, fields, maxlen))
+
+    def expire(self, key, ttl):
+        self.commands.append(("expire", key, ttl))
+
+    def publish(self, channel, message):
+        self.commands.append(("publish", channel, message))
+
+    async def execute(self):
+        for command in self.commands:
+            if command[0] == "xadd":
+                _, key, fields, maxlen = command
+                stream = self.client.streams.setdefault(key, [])
+                stream.append((f"{len(stream)}-0", fields))
+                del stream[:-maxlen]
+            elif command[0] == "publish":
+                self.client.published.append((command[1], command[2]))
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.streams = {}
+        self.published = []
+
+    def pipeline(self, transaction=False):
+        return _FakePipeline(self)
+
+    async def xrevrange(self, key, count=None):
+        return list(reversed(self.streams.get(key, [])))[:count]
+
+
+class _BrokenRedis:
+    def pipeline(self, transaction=False):
+        raise ConnectionError("redis down")
+
+    async def xrevrange(self, key, count=None):
+        raise ConnectionError("redis down")
+
+
+def _bus(client):
+    bus = ProgressBus(redis_url="redis://unused")
+    bus.enabled = True
+
+    async def _client():
+        return client if bus._retry_at == 0.0 else None
+
+    bus._client = _client
+    return bus
+
+
+@pytest.mark.asyncio
+async def test_history_replays_events_after_last_seen(monkeypatch):
+    client = _FakeRedis()
+    bus = _bus(client)
+    monkeypatch.setattr("app.services.stream_progress_service.progress_bus", bus)
+    service = StreamProgressService()
+
+    events = [await service.update_progress("7", step * 10, f"step {step}") for step in range(4)]
+
+    assert [channel for channel, _ in client.published] == [PROGRESS_CHANNEL] * 4
+    # 新进程（无本地历史）也能从共享流取到历史
+    replay = await StreamProgressService().get_task_history("7", limit=10, after_event_id=events[1].id)
+    assert [event["id"] for event in replay] == [events[2].id, events[3].id]
+
+
+@pytest.mark.asyncio
+async def test_remote_events_reach_local_subscribers_but_not_own_echo():
+    bus = _bus(_FakeRedis())
+    service = StreamProgressService()
+    received = []
+    await service.subscribe_to_task("9", received.append)
+
+    remote = {
+        "id": "evt-1", "task_id": "9", "task_name": "Task 9", "progress": 40,
+        "message": "解析中", "timestamp": "2024-01-01T00:00:00", "status": "running",
+    }
+    await bus._handle_message(
+        {"type": "message", "data": json.dumps({"origin": "other-worker", "event": remote})},
+        service.apply_remote_event,
+    )
+    await bus._handle_message(
+        {"type": "message", "data": json.dumps({"origin": bus.origin, "event": remote})},
+        service.apply_remote_event,
+    )
+
+    assert [event.id for event in received] == ["evt-1"]
+    assert service.active_tasks["9"]["current_step"] == 40
+
+
+@pytest.mark.asyncio
+async def test_redis_failure_falls_back_to_local_history(monkeypatch):
+    bus = _bus(_BrokenRedis())
+    monkeypatch.setattr("app.services.stream_progress_service.progress_bus", bus)
+    service = StreamProgressService()
+
+    event = await service.update_progress("5", 50, "half")
+
+    assert bus.stats["publish_errors"] == 1
+    assert [item["id"] for item in await service.get_task_history("5")] == [event.id]
@@ -104,44 +104,33 @@ async def test_start_interaction_filters_by_owner_id(monkeypatch):
 
 @pytest.mark.asyncio
 async def test_list_literature_joins_owner_filter(monkeypatch):
-    captured_filters = []
-
-    class _FakeLiteratureQuery:
-        def join(self, model):
-            assert model is Project
-            return self
-
-        def filter(self, *criteria):
-            captured_filters.extend(criteria)
-            return self
-
-        def offset(self, _):
-            return self
-
-        def limit(self, _):
-            return self
+    captured_statements = []
 
+    class _EmptyResult:
         def all(self):
             return []
 
-    class _FakeDB:
-        def query(self, model):
-            if model is Literature:
-                return _FakeLiteratureQuery()
-            raise AssertionError("Unexpected model query")
+    class _FakeAsyncDB:
+        async def scalar(self, statement):
+            captured_statements.append(statement)
+            return 0
+
+        async def scalars(self, statement):
+            captured_statements.append(statement)
+            return _EmptyResult()
 
     result = await list_literature(
         page=1,
         page_size=20,
         project_id=None,
         current_user=SimpleNamespace(id=99),
-        db=_FakeDB(),
+        db=_FakeAsyncDB(),
     )
 
-    assert result == []
-    owner_filters = [
-        criterion
-        for criterion in captured_filters
-        if getattr(getattr(criterion, "left", None), "key", None) == "owner_id"
-    ]
-    assert owner_filters, "联结查询必须使用 Project.owner_id 过滤"
+    assert result.items == []
+    assert result.total == 0
+    assert captured_statements
+    for statement in captured_statements:
+        compiled = statement.compile()
+        assert "projects.owner_id" in str(compiled), "文献查询必须使用 Project.owner_id 过滤"
+        assert 99 in compiled.params.values()
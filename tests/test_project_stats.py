@@ -0,0 +1,161 @@
+"""
+项目文献统计物化测试
+"""
+
+import os
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine, delete, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app.core.database import Base
+from app.core.time_utils import utc_now
+from app.models.literature import Literature, LiteratureSegment
+from app.models.project import Project, ProjectLiteratureStats, project_literature_association
+from app.models.user import User
+from app.services.project_stats_service import (
+    get_project_stats,
+    reconcile_project_stats,
+    refresh_project_stats,
+    refresh_stale_project_stats,
+)
+
+
+def _seed(db):
+    db.add(User(id=1, email="a@example.com", username="a", hashed_password="x"))
+    project = Project(id=10, name="mine", owner_id=1)
+    shared = Literature(id=1, title="Shared", authors=[], journal="Nature", publication_year=2023, is_parsed=True)
+    shared.projects.append(project)
+    direct = Literature(id=2, title="Direct", authors=[], project_id=10, journal="Nature", publication_year=2024)
+    db.add_all([project, shared, direct, LiteratureSegment(literature_id=1, segment_type="general", content="c")])
+    db.commit()
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        _seed(db)
+    yield factory
+    engine.dispose()
+
+
+def _row(factory):
+    with factory() as db:
+        row = db.get(ProjectLiteratureStats, 10)
+        return row.is_stale, row.total_literature, row.processed_literature, row.total_segments
+
+
+def test_changes_mark_project_stale_and_refresh_recomputes(session_factory):
+    with session_factory() as db:
+        refresh_project_stats(db, 10)
+        db.commit()
+    assert _row(session_factory) == (False, 2, 1, 1)
+
+    with session_factory() as db:
+        paper = Literature(id=3, title="New", authors=[], is_parsed=True)
+        paper.projects.append(db.get(Project, 10))
+        db.add(paper)
+        db.commit()
+    assert _row(session_factory)[0] is True
+
+    with session_factory() as db:
+        assert refresh_stale_project_stats(db) == 1
+    assert _row(session_factory) == (False, 3, 2, 1)
+
+    # 移出项目与删除段落同样使统计过期
+    with session_factory() as db:
+        paper = db.get(Literature, 3)
+        paper.projects.clear()
+        db.commit()
+    assert _row(session_factory)[0] is True
+    with session_factory() as db:
+        refresh_stale_project_stats(db)
+        db.delete(db.query(LiteratureSegment).first())
+        db.commit()
+    assert _row(session_factory)[0] is True
+
+    # 不相关的字段变化不会标记过期
+    with session_factory() as db:
+        refresh_stale_project_stats(db)
+        paper = db.get(Literature, 1)
+        paper.title = "Renamed"
+        db.commit()
+    assert _row(session_factory) == (False, 2, 1, 0)
+
+
+def test_reconcile_fixes_writes_that_bypass_the_orm(session_factory):
+    with session_factory() as db:
+        refresh_project_stats(db, 10)
+        db.commit()
+        db.execute(delete(project_literature_association))
+        db.commit()
+
+    with session_factory() as db:
+        assert reconcile_project_stats(db) == {"projects": 1, "drifted": 1}
+    assert _row(session_factory) == (False, 1, 0, 0)
+
+
+@pytest.mark.asyncio
+async def test_endpoint_reads_single_row_until_stale():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    async with factory() as db:
+        await db.run_sync(_seed)
+
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    async with factory() as db:
+        first = await get_project_stats(db, 10)
+    assert first["total_literature"] == 2
+    assert first["storage_saved"]["top_journals"] == [{"journal": "Nature", "count": 2}]
+
+    statements.clear()
+    async with factory() as db:
+        second = await get_project_stats(db, 10)
+    assert second["total_segments"] == 1
+    assert len(statements) == 1
+
+    async with factory() as db:
+        row = await db.get(ProjectLiteratureStats, 10)
+        row.is_stale = True
+        row.refreshed_at = utc_now() - timedelta(minutes=5)
+        await db.commit()
+    statements.clear()
+    async with factory() as db:
+        stale = await get_project_stats(db, 10)
+    # 过期行照常返回，不在读取请求中重算
+    assert stale["total_literature"] == 2
+    assert len(statements) == 1
+    await engine.dispose()
+
+
+def test_concurrent_first_refresh_reuses_existing_row(session_factory, monkeypatch):
+    with session_factory() as other, session_factory() as db:
+        real_get = db.get
+        lookups = []
+
+        def racing_get(entity, ident, **kwargs):
+            lookups.append(ident)
+            if len(lookups) == 1:
+                # 本会话查询之后、插入之前，另一个请求已插入统计行
+                other.add(ProjectLiteratureStats(project_id=10, total_literature=0))
+                other.commit()
+                return None
+            return real_get(entity, ident, **kwargs)
+
+        monkeypatch.setattr(db, "get", racing_get)
+        refresh_project_stats(db, 10)
+        db.commit()
+
+    assert _row(session_factory) == (False, 2, 1, 1)
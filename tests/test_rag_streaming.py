@@ -0,0 +1,203 @@
+"""
+RAG 流式回答单元测试
+"""
+
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app.api.research import routes as research_routes
+from app.services import ai_service as ai_service_module
+from app.services.smart_research_assistant import SmartResearchAssistant
+
+SEGMENTS = [
+    {"literature_id": 1, "segment_id": 11, "literature_title": "Paper A", "content": "alpha"},
+    {"literature_id": 2, "segment_id": 21, "literature_title": "Paper B", "content": "beta"},
+]
+EVIDENCE = {
+    "direct_answers": ["a"],
+    "supporting_evidence": [],
+    "contradictory_evidence": [],
+    "methodological_insights": [],
+    "confidence_scores": {1: 0.9},
+}
+STREAMED_ANSWER = """## 主要答案
+使用溶胶-凝胶法。
+
+## 详细分析
+两篇文献均报道了该方法。
+
+## 关键发现
+- 煅烧温度 450℃
+- 升温速率 2℃/min
+置信度: 0.8
+"""
+
+
+def _make_assistant():
+    assistant = SmartResearchAssistant.__new__(SmartResearchAssistant)
+    assistant.conversation_memory = {}
+    assistant._background_tasks = set()
+    return assistant
+
+
+def test_parse_streamed_answer_extracts_sections():
+    parsed = SmartResearchAssistant._parse_streamed_answer(STREAMED_ANSWER, EVIDENCE)
+
+    assert parsed["main_answer"] == "使用溶胶-凝胶法。"
+    assert parsed["key_findings"] == ["煅烧温度 450℃", "升温速率 2℃/min"]
+    assert parsed["confidence"] == 0.8
+    assert "置信度" not in parsed["detailed_analysis"]
+
+    fallback = SmartResearchAssistant._parse_streamed_answer("纯文本回答", EVIDENCE)
+    assert fallback["main_answer"] == "纯文本回答"
+    assert fallback["confidence"] == 0.9
+
+
+@pytest.mark.asyncio
+async def test_stream_emits_sources_before_tokens_and_usage_at_end():
+    assistant = _make_assistant()
+
+    async def fake_stream(messages, model_options=None, usage_out=None):
+        for piece in (STREAMED_ANSWER[:20], STREAMED_ANSWER[20:]):
+            yield piece
+        usage_out.update({"model": "m", "total_tokens": 42})
+
+    assistant.ai_service = SimpleNamespace(stream_chat_completion=fake_stream)
+    with patch.object(assistant, "_retrieve_relevant_segments", AsyncMock(return_value=SEGMENTS)), \
+            patch.object(assistant, "_retrieve_main_experiences", AsyncMock(return_value=[])), \
+            patch.object(assistant, "_extract_evidence_from_segments", AsyncMock(return_value=EVIDENCE)), \
+            patch.object(assistant, "_generate_research_suggestions", AsyncMock(return_value={"next_questions": ["q"]})):
+        events = [event async for event in assistant.stream_complex_research_question("问题", 1, 7)]
+    await asyncio.gather(*assistant._background_tasks)
+
+    names = [name for name, _ in events]
+    assert names == ["sources", "token", "token", "done"]
+    assert [source["id"] for source in events[0][1]["sources"]] == [1, 2]
+    assert "".join(data["content"] for name, data in events if name == "token") == STREAMED_ANSWER
+    done = events[-1][1]
+    assert done["answer"] == "使用溶胶-凝胶法。"
+    assert done["next_questions"] == ["q"]
+    assert done["usage"]["total_tokens"] == 42
+    assert set(done["metadata"]["timings"]["stages"]) == {
+        "retrieve_segments", "retrieve_main_experiences", "extract_evidence",
+        "generate_answer", "generate_suggestions",
+    }
+    assert assistant.conversation_memory["user_7_project_1"][0]["question"] == "问题"
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_formats_events_and_keeps_alive():
+    async def events():
+        yield "sources", {"sources": []}
+        await asyncio.sleep(0.05)
+        yield "token", {"content": "你好"}
+
+    with patch.object(research_routes, "_SSE_KEEPALIVE_SECONDS", 0.01):
+        chunks = [chunk async for chunk in research_routes._sse_stream(events())]
+
+    assert chunks[0] == 'event: sources\ndata: {"sources": []}\n\n'
+    assert ": keep-alive\n\n" in chunks
+    assert chunks[-1].startswith("event: token\n")
+    assert json.loads(chunks[-1].split("data: ", 1)[1]) == {"content": "你好"}
+
+
+@pytest.mark.asyncio
+async def test_ai_service_stream_records_usage_at_end():
+    chunks = [
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="Hel"))], usage=None),
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="lo"))], usage=None),
+        SimpleNamespace(choices=[], usage=SimpleNamespace(prompt_tokens=5, completion_tokens=2, total_tokens=7)),
+    ]
+
+    class _Stream:
+        closed = False
+
+        async def __aiter__(self):
+            for chunk in chunks:
+                yield chunk
+
+        async def close(self):
+            self.closed = True
+
+    stream = _Stream()
+    create = AsyncMock(return_value=stream)
+    service = ai_service_module.AIService.__new__(ai_service_module.AIService)
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    usage = {}
+
+    with patch.object(ai_service_module, "task_cost_tracker") as tracker:
+        pieces = [piece async for piece in service.stream_chat_completion(
+            model="m", messages=[{"role": "user", "content": "hi"}], usage_out=usage
+        )]
+
+    assert pieces == ["Hel", "lo"]
+    assert create.await_args.kwargs["stream"] is True
+    tracker.record_usage.assert_called_once_with(
+        "m", {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7}
+    )
+    assert usage["total_tokens"] == 7
+    assert stream.closed
+
+
+@pytest.mark.asyncio
+async def test_answer_stages_run_as_dependency_graph():
+    assistant = _make_assistant()
+    running = set()
+    overlaps = []
+
+    async def stage(name, result, delay=0.05):
+        running.add(name)
+        overlaps.append(set(running))
+        await asyncio.sleep(delay)
+        running.discard(name)
+        return result
+
+    answer = {"main_answer": "答案", "detailed_analysis": "", "key_findings": [], "confidence": 0.8}
+    with patch.object(assistant, "_retrieve_relevant_segments", lambda *args: stage("segments", SEGMENTS)), \
+            patch.object(assistant, "_retrieve_main_experiences", lambda *args: stage("experiences", [])), \
+            patch.object(assistant, "_extract_evidence_from_segments", lambda *args: stage("evidence", EVIDENCE)), \
+            patch.object(assistant, "_generate_comprehensive_answer", lambda *args: stage("answer", answer, 0.1)), \
+            patch.object(assistant, "_generate_research_suggestions", lambda *args: stage("suggestions", {})):
+        result = await assistant.answer_complex_research_question("问题", 1, 7)
+
+    assert {"segments", "experiences"} in overlaps
+    assert {"answer", "suggestions"} in overlaps
+    assert not any("evidence" in group and len(group) > 1 for group in overlaps)
+
+    timings = result["metadata"]["timings"]
+    assert timings["critical_path"][1:] == ["extract_evidence", "generate_answer"]
+    assert timings["stages"]["generate_suggestions"]["start_ms"] >= timings["stages"]["extract_evidence"]["duration_ms"]
+    assert result["answer"] == "答案"
+
+    await asyncio.gather(*assistant._background_tasks)
+    assert assistant.conversation_memory["user_7_project_1"][0]["answer"] is result
+
+
+@pytest.mark.asyncio
+async def test_evidence_is_extracted_per_literature_in_parallel():
+    assistant = _make_assistant()
+    in_flight = 0
+    peak = 0
+
+    async def chat_completion(messages, model_options=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.02)
+        in_flight -= 1
+        title = "A" if "Paper A" in messages[0]["content"] else "B"
+        return {"content": json.dumps({"direct_answers": [title], "confidence": 0.6})}
+
+    assistant.ai_service = SimpleNamespace(chat_completion=chat_completion)
+    evidence = await assistant._extract_evidence_from_segments("问题", SEGMENTS)
+
+    assert peak == 2
+    assert evidence["direct_answers"] == ["A", "B"]
+    assert evidence["confidence_scores"] == {1: 0.6, 2: 0.6}
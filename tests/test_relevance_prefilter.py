@@ -0,0 +1,77 @@
+"""
+AI 筛选前本地预排序测试
+"""
+
+import os
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app.services.relevance_prefilter import (
+    RelevancePrefilter,
+    bm25_scores,
+    combine_scores,
+    cosine_scores,
+    evaluate_prefilter,
+    select_forwarded,
+    tokenize,
+)
+
+
+def test_tokenize_splits_words_and_cjk_bigrams():
+    assert tokenize("Silicon anode, 硅负极") == ["silicon", "anode", "硅负", "负极"]
+
+
+def test_bm25_prefers_documents_with_rare_query_terms():
+    documents = [tokenize(text) for text in ["silicon anode silicon", "graphite anode", "solar cell", "anode"]]
+    scores = bm25_scores(tokenize("silicon anode"), documents)
+    assert scores.argmax() == 0
+    assert scores[2] == 0
+    assert scores[1] < scores[0]
+
+
+def test_cosine_marks_zero_vectors_missing_and_combine_falls_back_to_keywords():
+    semantic = cosine_scores([1.0, 0.0], [[1.0, 0.0], [0.0, 1.0], [0.0, 0.0]])
+    assert semantic[0] == pytest.approx(1.0)
+    assert np.isnan(semantic[2])
+
+    combined = combine_scores(semantic, np.array([0.0, 2.0, 4.0], dtype=np.float32), embedding_weight=0.5)
+    assert combined.tolist() == pytest.approx([0.5, 0.25, 1.0])
+
+
+def test_select_forwarded_keeps_top_fraction_and_borderline_band():
+    scores = np.array([0.9, 0.1, 0.52, 0.5, 0.3, 0.7], dtype=np.float32)
+    forwarded = select_forwarded(scores, forward_fraction=0.5, min_forward=0, borderline_margin=0.05)
+    assert forwarded.tolist() == [True, False, True, True, False, True]
+
+    assert select_forwarded(scores, 0.1, min_forward=10, borderline_margin=0).all()
+
+
+@pytest.mark.asyncio
+async def test_rank_with_embeddings_and_evaluation():
+    papers = [{"title": f"paper {index}", "abstract": "solar cell"} for index in range(8)]
+    papers[3] = {"title": "silicon anode", "abstract": "silicon anode capacity"}
+    papers[5] = {"title": "anode binder", "abstract": "binder for graphite"}
+    # 第 6 篇关键词不匹配，但语义向量接近研究方向
+    vectors = [[1.0, 0.0]] + [[0.0, 1.0]] * 8
+    vectors[1 + 6] = [0.9, 0.1]
+    ai_service = AsyncMock()
+    ai_service.get_embeddings_batch.return_value = vectors
+
+    prefilter = RelevancePrefilter(forward_fraction=0.3, min_forward=2, borderline_margin=0.0, embedding_weight=0.5)
+    result = await prefilter.rank(ai_service, "硅基负极", ["silicon", "anode"], papers)
+
+    assert set(np.flatnonzero(result.forwarded)) == {3, 5, 6}
+    assert result.rejected_count == 5
+    metrics = evaluate_prefilter(result, [index in (3, 6) for index in range(8)])
+    assert metrics["recall"] == 1.0
+    assert metrics["forward_ratio"] == pytest.approx(3 / 8)
+
+    # 候选数不超过下限时全部放行，不计算嵌入
+    ai_service.get_embeddings_batch.reset_mock()
+    small = await RelevancePrefilter(min_forward=30).rank(ai_service, "x", [], papers)
+    assert small.forwarded.all()
+    ai_service.get_embeddings_batch.assert_not_awaited()
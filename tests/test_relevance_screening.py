@@ -0,0 +1,140 @@
+"""
+文献相关性批量筛选测试
+"""
+
+import json
+import os
+import re
+from unittest.mock import AsyncMock
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app.services.relevance_screening import (
+    RelevanceScreener,
+    ScreeningContext,
+    VerdictCache,
+    parse_batch_response,
+)
+
+CONTEXT = ScreeningContext(research_direction="锂电池负极", keywords=("graphite", "anode"))
+
+
+class FakeAI:
+    """按提示词中的论文编号返回批量评分；broken=True 时返回无法解析的内容"""
+
+    def __init__(self, broken=False, drop=()):
+        self.broken = broken
+        self.drop = set(drop)
+        self.prompts = []
+
+    async def generate_completion(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        if self.broken:
+            return {"success": True, "content": "相关性都不错"}
+        indexes = [int(match) for match in re.findall(r"^\[(\d+)\] 标题", prompt, re.MULTILINE)]
+        rows = [{"index": index, "score": 7, "reason": "ok"} for index in indexes if index not in self.drop]
+        return {"success": True, "content": "```json\n" + json.dumps(rows) + "\n```"}
+
+
+def _screener():
+    cache = VerdictCache(memory_size=100, ttl=60)
+    # 单元测试中不连接Redis
+    cache._redis_client = AsyncMock(return_value=None)
+    return RelevanceScreener(cache=cache)
+
+
+def _papers(count):
+    return [{"paperId": f"p{index}", "title": f"Paper {index}", "abstract": "..."} for index in range(count)]
+
+
+def test_parse_batch_response_ignores_invalid_rows():
+    content = '说明\n[{"index": 1, "score": 12}, {"index": 9, "score": 3}, {"index": "x"}, {"index": 2, "score": "4.5"}]'
+    assert parse_batch_response(content, 2) == {
+        0: {"score": 10.0, "reason": ""},
+        1: {"score": 4.5, "reason": ""},
+    }
+    assert parse_batch_response("not json [", 2) == {}
+
+
+def test_context_digest_ignores_keyword_order_and_case():
+    same = ScreeningContext(research_direction=" 锂电池负极 ", keywords=("Anode", "graphite"))
+    assert same.digest == CONTEXT.digest
+    assert ScreeningContext(research_direction="钙钛矿", keywords=("graphite",)).digest != CONTEXT.digest
+
+
+@pytest.mark.asyncio
+async def test_batches_papers_and_reuses_cached_verdicts():
+    screener = _screener()
+    ai = FakeAI()
+    single = AsyncMock(return_value=3.0)
+
+    results = await screener.screen(ai, CONTEXT, _papers(45), single, batch_size=20)
+    assert len(ai.prompts) == 3
+    assert all(result["score"] == 7.0 and result["source"] == "batch" for result in results)
+    single.assert_not_awaited()
+
+    # 重复运行与重叠的搜索直接命中缓存
+    overlapping = _papers(50)[40:]
+    results = await screener.screen(ai, CONTEXT, overlapping, single, batch_size=20)
+    assert len(ai.prompts) == 4
+    assert [result["source"] for result in results] == ["cache"] * 5 + ["batch"] * 5
+
+    # 研究方向不同则不复用判定
+    other = ScreeningContext(research_direction="钙钛矿", keywords=())
+    await screener.screen(ai, other, _papers(1), single, batch_size=20)
+    single.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_single_scoring_for_unparsed_items():
+    screener = _screener()
+    single = AsyncMock(side_effect=[4.0, None, 8.0])
+
+    results = await screener.screen(FakeAI(drop={2}), CONTEXT, _papers(3), single, batch_size=3)
+    assert [result["source"] for result in results] == ["batch", "single", "batch"]
+    assert results[1]["score"] == 4.0
+
+    screener = _screener()
+    results = await screener.screen(FakeAI(broken=True), CONTEXT, _papers(2), single, batch_size=5)
+    assert results[0] is None
+    assert results[1]["score"] == 8.0
+    # 无法评估的论文不写入缓存，下次仍会重新评估
+    assert screener.stats["unscored"] == 1
+    assert len(screener.cache._memory) == 1
+
+
+@pytest.mark.asyncio
+async def test_papers_with_cached_verdicts_bypass_the_prefilter(monkeypatch):
+    import numpy as np
+
+    from app.services import search_and_build_library_service as library_module
+    from app.services.relevance_prefilter import PrefilterResult
+    from app.services.search_pipeline import LiteratureItem, ProcessingConfig, ProcessingStats
+
+    screener = _screener()
+    await screener.cache.set_many({screener.cache.key(CONTEXT, "paperId:p0"): {"score": 9, "reason": "cached"}})
+    ranked = []
+
+    async def reject_all(ai_service, research_direction, keywords, papers):
+        ranked.append([paper["paperId"] for paper in papers])
+        return PrefilterResult(scores=np.zeros(len(papers)), forwarded=np.zeros(len(papers), dtype=bool))
+
+    monkeypatch.setattr(library_module, "relevance_screener", screener)
+    monkeypatch.setattr(library_module.relevance_prefilter, "rank", reject_all)
+    monkeypatch.setattr(library_module.settings, "relevance_prefilter_enabled", True)
+
+    service = library_module.SearchAndBuildLibraryService.__new__(library_module.SearchAndBuildLibraryService)
+    service.ai_service = FakeAI()
+    service.stats = ProcessingStats()
+    project = type("Project", (), {"research_direction": "锂电池负极", "keywords": ["graphite", "anode"]})()
+    items = [LiteratureItem(paper_id=paper["paperId"], raw_data=paper) for paper in _papers(3)]
+
+    kept = await service._execute_ai_filtering_stage(items, project, ProcessingConfig())
+
+    # 已有缓存判定的论文不参与候选集内归一化的预排序
+    assert ranked == [["p1", "p2"]]
+    assert [item.paper_id for item in kept] == ["p0"]
+    assert kept[0].quality_score == 9
+    assert service.ai_service.prompts == []
@@ -0,0 +1,85 @@
+"""
+文献段落批量写入器单元测试
+"""
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.literature import Literature, LiteratureSegment
+from app.services.segment_writer import SegmentBatchWriter
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add_all([Literature(id=index, title=f"Paper {index}", authors=[]) for index in (1, 2, 3)])
+        db.commit()
+    yield factory
+    engine.dispose()
+
+
+def _segment(content):
+    return {"segment_type": "general", "content": content, "page_number": 1, "extraction_confidence": 0.5}
+
+
+@pytest.mark.asyncio
+async def test_flushes_many_papers_in_one_batch(session_factory):
+    engine = session_factory.kw["bind"]
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    writer = SegmentBatchWriter(session_factory, max_segments=100, max_literature=100, flush_interval=60)
+    await writer.add(1, [_segment("a"), _segment("b")], "text one")
+    await writer.add(2, [_segment("c")], "text two")
+    await writer.mark_failed(3)
+    assert writer.stats["flushes"] == 0
+
+    await writer.close()
+
+    writes = [sql for sql in statements if sql.startswith(("INSERT", "UPDATE"))]
+    assert len([sql for sql in writes if sql.startswith("UPDATE")]) == 1
+    with session_factory() as db:
+        assert db.query(LiteratureSegment).count() == 3
+        statuses = {lit.id: (lit.parsing_status, lit.is_parsed, lit.parsed_content) for lit in db.query(Literature)}
+    assert statuses[1] == ("completed", True, "text one")
+    assert statuses[2] == ("completed", True, "text two")
+    assert statuses[3][0] == "failed"
+    assert not statuses[3][1]
+
+
+@pytest.mark.asyncio
+async def test_size_threshold_and_bad_row_isolation(session_factory):
+    writer = SegmentBatchWriter(session_factory, max_segments=2, max_literature=100, flush_interval=60)
+
+    await writer.add(1, [_segment(None)], "bad")  # content 非空约束失败
+    await writer.add(2, [_segment("ok")], "good")
+
+    assert writer.stats["flushes"] == 1
+    assert [item["literature_id"] for item in writer.failed_literature] == [1]
+    with session_factory() as db:
+        assert db.query(LiteratureSegment).count() == 1
+        assert db.get(Literature, 1).parsing_status == "failed"
+        assert db.get(Literature, 2).parsing_status == "completed"
+
+
+@pytest.mark.asyncio
+async def test_marks_only_affected_projects_for_vector_index(session_factory, monkeypatch):
+    with session_factory() as db:
+        db.get(Literature, 1).project_id = 10
+        db.get(Literature, 2).project_id = 20
+        db.commit()
+    marked = []
+    monkeypatch.setattr("app.services.segment_writer.local_vector_index.mark_dirty", marked.append)
+
+    writer = SegmentBatchWriter(session_factory, max_segments=100, max_literature=100, flush_interval=60)
+    await writer.add(1, [_segment("a")], "text")
+    await writer.mark_failed(2)
+    await writer.close()
+
+    assert marked == [{10}]
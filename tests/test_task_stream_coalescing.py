@@ -0,0 +1,88 @@
+"""
+任务进度合并与限流单元测试
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.task_stream_service import TaskStreamService, _stage_key
+
+
+def _service(monkeypatch, max_rate=10.0, persist_interval=60.0):
+    monkeypatch.setattr("app.services.task_stream_service.settings.task_progress_max_rate", max_rate)
+    monkeypatch.setattr("app.services.task_stream_service.settings.task_progress_persist_interval", persist_interval)
+    stream = SimpleNamespace(broadcast_task_update=AsyncMock())
+    service = TaskStreamService(MagicMock(), stream_service=stream)
+    return service, stream
+
+
+def _task():
+    return SimpleNamespace(
+        id=1, current_step=None, progress_percentage=0, result=None, status="running",
+        started_at=None, completed_at=None, token_usage=0, cost_estimate=0, cost_breakdown={},
+    )
+
+
+def test_stage_key_ignores_counters():
+    assert _stage_key("处理文献 3/50") == _stage_key("处理文献 48/50")
+    assert _stage_key("处理文献 3/50") != _stage_key("生成结构化模板")
+
+
+@pytest.mark.asyncio
+async def test_item_updates_are_coalesced_to_latest(monkeypatch):
+    service, stream = _service(monkeypatch)
+    task = _task()
+
+    for processed in range(1, 101):
+        await service.update_progress(task, f"处理文献 {processed}/100", 10 + processed // 2, {"processed": processed})
+
+    assert stream.broadcast_task_update.await_count == 1
+    # 内存中的任务状态始终是最新的
+    assert task.progress_percentage == 60
+
+    await asyncio.sleep(0.15)
+    payloads = [call.args[1] for call in stream.broadcast_task_update.await_args_list]
+    assert len(payloads) == 2
+    assert payloads[-1]["details"] == {"processed": 100}
+    # 进度日志按定时落库，而不是每篇文献写一次
+    assert service.db.commit.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_stage_change_and_completion_emit_immediately(monkeypatch):
+    service, stream = _service(monkeypatch, max_rate=0.1)
+    task = _task()
+
+    await service.update_progress(task, "处理文献 1/2", 50)
+    await service.update_progress(task, "处理文献 2/2", 90)
+    await service.update_progress(task, "汇总结果", 95)
+    await service.complete_task(task, {"success": True})
+
+    types = [call.args[1]["type"] for call in stream.broadcast_task_update.await_args_list]
+    steps = [call.args[1].get("current_step") for call in stream.broadcast_task_update.await_args_list]
+    assert types == ["task_progress", "task_progress", "task_completed"]
+    assert steps[:2] == ["处理文献 1/2", "汇总结果"]
+    assert not service._progress_state
+
+
+@pytest.mark.asyncio
+async def test_deferred_flush_never_commits_caller_session(monkeypatch):
+    service, stream = _service(monkeypatch, persist_interval=0.05)
+    task = _task()
+
+    await service.update_progress(task, "处理文献 1/3", 10)
+    await service.update_progress(task, "处理文献 2/3", 20)
+    assert service.db.commit.call_count == 1
+
+    await asyncio.sleep(0.15)
+    # 定时补发只推送，不提交调用方的会话
+    assert stream.broadcast_task_update.await_count == 2
+    assert service.db.commit.call_count == 1
+
+    # 超过落库间隔后，在调用方的下一次更新中落库
+    await service.update_progress(task, "处理文献 3/3", 30)
+    assert service.db.commit.call_count == 2
+    service._finish_progress(task)
@@ -0,0 +1,84 @@
+"""
+WebSocket发送队列单元测试
+"""
+
+import asyncio
+import os
+
+import pytest
+from fastapi.websockets import WebSocketState
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app.api.websocket import ConnectionManager, ConnectionSender
+
+
+class _FakeWebSocket:
+    def __init__(self, delay=0.0, fail=False):
+        self.client_state = WebSocketState.CONNECTED
+        self.delay = delay
+        self.fail = fail
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        if self.fail:
+            raise RuntimeError("socket closed")
+        await asyncio.sleep(self.delay)
+        self.sent.append(message)
+
+
+async def _noop(websocket):
+    pass
+
+
+def test_progress_messages_coalesce_and_drop_oldest_first():
+    sender = ConnectionSender(_FakeWebSocket(), max_queue_size=3, send_timeout=1, on_dead=_noop)
+
+    sender.enqueue("welcome")
+    sender.enqueue("p1", "progress:1")
+    sender.enqueue("p2", "progress:1")
+    sender.enqueue("q1", "progress:2")
+    sender.enqueue("done")
+
+    # p2 合并了 p1；队列满时丢弃最旧的可合并消息（p2），不丢普通消息
+    assert sender.stats["coalesced"] == 1
+    assert sender.stats["dropped"] == 1
+    assert [sender._pop() for _ in range(4)] == ["welcome", "q1", "done", None]
+
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_block_broadcast(monkeypatch):
+    monkeypatch.setattr("app.api.websocket.settings.websocket_send_queue_size", 8)
+    manager = ConnectionManager()
+    slow, fast = _FakeWebSocket(delay=0.5), _FakeWebSocket()
+    await manager.connect(slow)
+    await manager.connect(fast)
+
+    started = asyncio.get_running_loop().time()
+    for index in range(5):
+        await manager.broadcast(f"m{index}")
+    assert asyncio.get_running_loop().time() - started < 0.1
+
+    await asyncio.sleep(0.05)
+    assert fast.sent == [f"m{index}" for index in range(5)]
+    assert manager.get_metrics()["queued"] >= 4
+
+    await manager.disconnect(slow)
+    await manager.disconnect(fast)
+    assert manager.get_metrics()["connections"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_send_removes_connection():
+    manager = ConnectionManager()
+    broken = _FakeWebSocket(fail=True)
+    await manager.connect(broken)
+
+    await manager.broadcast("hello")
+    await asyncio.sleep(0.01)
+
+    assert broken not in manager.senders
+    assert broken not in manager.active_connections["global"]
@@ -0,0 +1,95 @@
+"""
+Celery worker 常驻事件循环与共享异步客户端测试
+"""
+
+import asyncio
+import os
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app.core.async_clients import AsyncClientRegistry, async_clients
+from app.tasks import celery_tasks
+from app.tasks.worker_runtime import WorkerRuntime, worker_runtime
+
+
+async def _current_loop():
+    return asyncio.get_running_loop()
+
+
+def test_tasks_share_one_loop_and_clients():
+    runtime = WorkerRuntime()
+    registry = AsyncClientRegistry()
+    created, closed = [], []
+
+    async def use_client():
+        return registry.get("http", lambda: created.append(object()) or created[-1], closed.append)
+
+    try:
+        first_loop = runtime.run(_current_loop())
+        assert runtime.run(_current_loop()) is first_loop
+        assert runtime.run(use_client()) is runtime.run(use_client())
+        assert len(created) == 1
+
+        async def boom():
+            raise ValueError("task failed")
+
+        with pytest.raises(ValueError, match="task failed"):
+            runtime.run(boom())
+        # 任务失败不影响循环继续服务后续任务
+        assert runtime.run(_current_loop()) is first_loop
+
+        runtime.run(registry.aclose())
+        assert closed == created and registry.names() == ()
+    finally:
+        runtime.shutdown()
+    assert not runtime.running() and first_loop.is_closed()
+
+    # 关闭后再次提交会启动新的循环
+    try:
+        assert runtime.run(_current_loop()) is not first_loop
+    finally:
+        runtime.shutdown()
+
+
+def test_openai_clients_are_shared_per_configuration():
+    registry = AsyncClientRegistry()
+    default = registry.openai(api_key="key-a")
+    assert registry.openai(api_key="key-a") is default
+    assert registry.openai(api_key="key-b") is not default
+    assert registry.openai(api_key="key-a", base_url="http://proxy/v1") is not default
+
+
+def test_openai_clients_are_bound_to_the_running_loop():
+    registry = AsyncClientRegistry()
+    proxy = registry.openai(api_key="key-a")
+
+    async def resolve():
+        return proxy.current(), proxy.current()
+
+    first, again = asyncio.run(resolve())
+    assert first is again
+    # 线程池中的 asyncio.run 每次都是新循环，不能复用已关闭循环上的客户端
+    second, _ = asyncio.run(resolve())
+    assert second is not first
+    assert len(registry._clients) == 1
+    assert proxy.api_key == "key-a"
+
+
+def test_celery_tasks_run_on_worker_loop(monkeypatch):
+    loops = []
+
+    async def fake_build_index(project_id, task_id, user_id):
+        loops.append(asyncio.get_running_loop())
+        return {"indexed": project_id}
+
+    monkeypatch.setattr(celery_tasks, "build_literature_index", fake_build_index)
+    try:
+        for _ in range(2):
+            result = celery_tasks.literature_index_celery(7, "task-1", 1)
+            assert result == {"success": True, "project_id": 7, "result": {"indexed": 7}}
+        assert loops[0] is loops[1] is worker_runtime.loop
+    finally:
+        worker_runtime.shutdown()
+        async_clients.reset()